@@ -0,0 +1,27 @@
+//-------------------------------------------------------------------------
+// A_noparam.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL SystemVerilog translation pass.
+
+// PyMTL Component A Definition
+// At /root/package/pymtl3/passes/backends/verilog/test/TranslationImport_dynlib_close_test.py
+
+module A_noparam
+(
+  input  logic [0:0] clk ,
+  input  logic [31:0] in_ ,
+  output logic [31:0] out ,
+  input  logic [0:0] reset 
+);
+
+  // PyMTL Update Block Source
+  // At /root/package/pymtl3/passes/backends/verilog/test/TranslationImport_dynlib_close_test.py:31
+  // @update
+  // def upblk():
+  //   s.out @= s.in_
+  
+  always_comb begin : upblk
+    out = in_;
+  end
+
+endmodule
@@ -0,0 +1,70 @@
+//***********************************************************
+// Pickled source file of placeholder Bits32VRegPassThroughComp_noparam
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder Bits32VRegPassThroughComp
+//-----------------------------------------------------------
+
+`ifndef BITS32VREGPASSTHROUGHCOMP
+`define BITS32VREGPASSTHROUGHCOMP
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component Bits32VRegPassThroughComp_noparam.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component Bits32VRegPassThroughComp_noparam
+
+`line 1 "VRegPassThrough.v" 0
+// We do not explicitly include VReg here. Instead we assume the include
+// directory or the v_lib is correctly passed to Verilator.
+
+module VRegPassThrough(
+  input  logic          clk,
+  input  logic          reset,
+  output logic [32-1:0] q,
+  input  logic [32-1:0] d
+);
+
+  VReg inner_reg(
+    .clk(clk),
+    .reset(reset),
+    .q(q),
+    .d(d)
+  );
+
+endmodule
+
+`endif /* BITS32VREGPASSTHROUGHCOMP */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder Bits32VRegPassThroughComp_noparam
+//-----------------------------------------------------------
+
+`ifndef BITS32VREGPASSTHROUGHCOMP_NOPARAM
+`define BITS32VREGPASSTHROUGHCOMP_NOPARAM
+
+module Bits32VRegPassThroughComp_noparam
+(
+  input logic [1-1:0] clk ,
+  input logic [32-1:0] d ,
+  output logic [32-1:0] q ,
+  input logic [1-1:0] reset 
+);
+  VRegPassThrough
+  #(
+  ) v
+  (
+    .clk( clk ),
+    .d( d ),
+    .q( q ),
+    .reset( reset )
+  );
+endmodule
+
+`endif /* BITS32VREGPASSTHROUGHCOMP_NOPARAM */
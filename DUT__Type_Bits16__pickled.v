@@ -0,0 +1,27 @@
+//-------------------------------------------------------------------------
+// DUT__Type_Bits16.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// PyMTL Component DUT Definition
+// At /root/package/pymtl3/passes/testcases/test_cases.py
+module DUT__Type_Bits16
+(
+  input  logic [0:0]    clk,
+  input  logic [15:0]   in_1,
+  input  logic [15:0]   in_2,
+  output logic [15:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PyMTL Update Block Source
+  // At /root/package/pymtl3/passes/testcases/test_cases.py:2320
+  // @update
+  // def add_upblk():
+  //   s.out @= s.in_1 + s.in_2
+  
+  always_comb begin : add_upblk
+    out = in_1 + in_2;
+  end
+
+endmodule
@@ -0,0 +1,22 @@
+//-------------------------------------------------------------------------
+// DUT_noparam.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// PyMTL Component DUT Definition
+// At /root/package/pymtl3/passes/testcases/test_cases.py
+module DUT_noparam
+(
+  input  logic [0:0]    clk,
+  input  logic [31:0]   in___foo,
+  output logic [31:0]   out,
+  input  logic [0:0]    reset
+);
+  // Struct/Array ports in the form of wires
+  logic [31:0]   in_;
+
+  // Connections
+  assign in_[31:0] = in___foo;
+  assign out = in___foo;
+
+endmodule
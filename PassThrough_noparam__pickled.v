@@ -0,0 +1,221 @@
+//-------------------------------------------------------------------------
+// PassThrough_noparam.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL SystemVerilog translation pass.
+
+// PyMTL VerilogPlaceholder VPassThrough Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+//***********************************************************
+// Pickled source file of placeholder VPassThrough__nports_1__nbits_16
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder VPassThrough
+//-----------------------------------------------------------
+
+`ifndef VPASSTHROUGH
+`define VPASSTHROUGH
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component VPassThrough__nports_1__nbits_16.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component VPassThrough__nports_1__nbits_16
+
+`line 1 "VPassThrough.v" 0
+module test_VPassThrough
+#(
+  parameter num_ports = 2,
+  parameter bitwidth  = 32
+)
+(
+  input  logic [bitwidth-1:0] in_ [0:num_ports-1],
+  output logic [bitwidth-1:0] out [0:num_ports-1]
+);
+
+  genvar i;
+
+  generate
+    for(i = 0; i < num_ports; i= i+1) begin
+      assign out[i] = in_[i];
+    end
+  endgenerate
+
+endmodule
+
+`endif /* VPASSTHROUGH */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder VPassThrough__nports_1__nbits_16
+//-----------------------------------------------------------
+
+`ifndef VPASSTHROUGH__NPORTS_1__NBITS_16
+`define VPASSTHROUGH__NPORTS_1__NBITS_16
+
+module VPassThrough__nports_1__nbits_16
+(
+  input logic reset,
+  input logic clk,
+  input logic [16-1:0] in_ [0:0],
+  output logic [16-1:0] out [0:0]
+);
+  test_VPassThrough
+  #(
+    .num_ports( 1 ),
+    .bitwidth( 16 )
+  ) v
+  (
+    .in_( in_ ),
+    .out( out )
+  );
+endmodule
+
+`endif /* VPASSTHROUGH__NPORTS_1__NBITS_16 */
+
+
+
+// PyMTL VerilogPlaceholder VPassThrough Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+//***********************************************************
+// Pickled source file of placeholder VPassThrough__nports_1__nbits_32
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder VPassThrough
+//-----------------------------------------------------------
+
+`ifndef VPASSTHROUGH
+`define VPASSTHROUGH
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component VPassThrough__nports_1__nbits_32.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component VPassThrough__nports_1__nbits_32
+
+`line 1 "VPassThrough.v" 0
+module test_VPassThrough
+#(
+  parameter num_ports = 2,
+  parameter bitwidth  = 32
+)
+(
+  input  logic [bitwidth-1:0] in_ [0:num_ports-1],
+  output logic [bitwidth-1:0] out [0:num_ports-1]
+);
+
+  genvar i;
+
+  generate
+    for(i = 0; i < num_ports; i= i+1) begin
+      assign out[i] = in_[i];
+    end
+  endgenerate
+
+endmodule
+
+`endif /* VPASSTHROUGH */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder VPassThrough__nports_1__nbits_32
+//-----------------------------------------------------------
+
+`ifndef VPASSTHROUGH__NPORTS_1__NBITS_32
+`define VPASSTHROUGH__NPORTS_1__NBITS_32
+
+module VPassThrough__nports_1__nbits_32
+(
+  input logic reset,
+  input logic clk,
+  input logic [32-1:0] in_ [0:0],
+  output logic [32-1:0] out [0:0]
+);
+  test_VPassThrough
+  #(
+    .num_ports( 1 ),
+    .bitwidth( 32 )
+  ) v
+  (
+    .in_( in_ ),
+    .out( out )
+  );
+endmodule
+
+`endif /* VPASSTHROUGH__NPORTS_1__NBITS_32 */
+
+
+
+// PyMTL Component PassThrough Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+module PassThrough_noparam
+(
+  input  logic [0:0] clk ,
+  input  logic [47:0] in_ ,
+  output logic [47:0] out ,
+  input  logic [0:0] reset 
+);
+  //-------------------------------------------------------------
+  // Component pt16
+  //-------------------------------------------------------------
+
+  logic [0:0] pt16__clk;
+  logic [15:0] pt16__in_ [0:0];
+  logic [15:0] pt16__out [0:0];
+  logic [0:0] pt16__reset;
+
+  VPassThrough__nports_1__nbits_16 pt16
+  (
+    .clk( pt16__clk ),
+    .in_( pt16__in_ ),
+    .out( pt16__out ),
+    .reset( pt16__reset )
+  );
+
+  //-------------------------------------------------------------
+  // End of component pt16
+  //-------------------------------------------------------------
+
+  //-------------------------------------------------------------
+  // Component pt32
+  //-------------------------------------------------------------
+
+  logic [0:0] pt32__clk;
+  logic [31:0] pt32__in_ [0:0];
+  logic [31:0] pt32__out [0:0];
+  logic [0:0] pt32__reset;
+
+  VPassThrough__nports_1__nbits_32 pt32
+  (
+    .clk( pt32__clk ),
+    .in_( pt32__in_ ),
+    .out( pt32__out ),
+    .reset( pt32__reset )
+  );
+
+  //-------------------------------------------------------------
+  // End of component pt32
+  //-------------------------------------------------------------
+
+  assign pt16__clk = clk;
+  assign pt16__reset = reset;
+  assign pt32__clk = clk;
+  assign pt32__reset = reset;
+  assign pt16__in_[0] = in_[15:0];
+  assign out[15:0] = pt16__out[0];
+  assign pt32__in_[0] = in_[47:16];
+  assign out[47:16] = pt32__out[0];
+
+endmodule
@@ -0,0 +1,105 @@
+//-------------------------------------------------------------------------
+// PipeQueue1RTL__Type_Bits32.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// PyMTL Component RegEn Definition
+// At /root/package/pymtl3/stdlib/basic_rtl/registers.py
+module RegEn__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    en,
+  input  logic [31:0]   in_,
+  output logic [31:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PyMTL Update Block Source
+  // At /root/package/pymtl3/stdlib/basic_rtl/registers.py:25
+  // @update_ff
+  // def up_regen():
+  //   if s.en:
+  //     s.out <<= s.in_
+  
+  always_ff @(posedge clk) begin : up_regen
+    if ( en ) begin
+      out <= in_;
+    end
+  end
+
+endmodule
+
+
+// PyMTL Component PipeQueue1RTL Definition
+// At /root/package/pymtl3/stdlib/queues/valrdy_queues.py
+module PipeQueue1RTL__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  output logic [31:0]   deq__msg,
+  input  logic [0:0]    deq__rdy,
+  output logic [0:0]    deq__val,
+  input  logic [31:0]   enq__msg,
+  output logic [0:0]    enq__rdy,
+  input  logic [0:0]    enq__val
+);
+  // Wire declarations
+  logic [0:0]    full;
+  logic [0:0]    next_full;
+
+  // Sub-component declarations
+  logic [0:0]    buffer__clk;
+  logic [0:0]    buffer__en;
+  logic [31:0]   buffer__in_;
+  logic [31:0]   buffer__out;
+  logic [0:0]    buffer__reset;
+
+  RegEn__Type_Bits32 buffer
+  (
+    .clk            (        buffer__clk        ),
+    .en             (         buffer__en        ),
+    .in_            (        buffer__in_        ),
+    .out            (        buffer__out        ),
+    .reset          (       buffer__reset       )
+  );
+
+  // PyMTL Update Block Source
+  // At /root/package/pymtl3/stdlib/queues/valrdy_queues.py:28
+  // @update
+  // def up_pipeq_full():
+  //   s.buffer.en @= s.enq.val & s.enq.rdy
+  //   s.next_full @= s.enq.val | (s.full & ~s.deq.rdy)
+  
+  always_comb begin : up_pipeq_full
+    buffer__en = enq__val & enq__rdy;
+    next_full = enq__val | ( full & ( ~deq__rdy ) );
+  end
+
+  // PyMTL Update Block Source
+  // At /root/package/pymtl3/stdlib/queues/valrdy_queues.py:24
+  // @update
+  // def up_pipeq_set_enq_rdy():
+  //   s.enq.rdy @= ~s.full | s.deq.rdy
+  
+  always_comb begin : up_pipeq_set_enq_rdy
+    enq__rdy = ( ~full ) | deq__rdy;
+  end
+
+  // PyMTL Update Block Source
+  // At /root/package/pymtl3/stdlib/queues/valrdy_queues.py:20
+  // @update_ff
+  // def up_full():
+  //   s.full <<= s.next_full
+  
+  always_ff @(posedge clk) begin : up_full
+    full <= next_full;
+  end
+
+  // Connections
+  assign buffer__clk = clk;
+  assign buffer__reset = reset;
+  assign deq__msg = buffer__out;
+  assign buffer__in_ = enq__msg;
+  assign deq__val = full;
+
+endmodule
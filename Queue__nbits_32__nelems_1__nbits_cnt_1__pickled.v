@@ -0,0 +1,140 @@
+//-------------------------------------------------------------------------
+// Queue__nbits_32__nelems_1__nbits_cnt_1.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// PyMTL VerilogPlaceholder Queue Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+//***********************************************************
+// Pickled source file of placeholder Queue__nbits_32__nelems_1__nbits_cnt_1
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder Queue
+//-----------------------------------------------------------
+
+`ifndef QUEUE
+`define QUEUE
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component Queue__nbits_32__nelems_1__nbits_cnt_1.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component Queue__nbits_32__nelems_1__nbits_cnt_1
+
+`line 1 "VQueue.v" 0
+/*========================================================================
+  NormalQueue
+ *======================================================================
+  System verilog implementation of a register based normal queue.
+
+  Author : Yanghui Ou
+    Date : June 9, 2019
+*/
+
+module test_VQueue
+#(
+  parameter data_width  = 32,
+  parameter num_entries = 2,
+  parameter count_width = $clog2( num_entries+1 )
+)
+(
+  input  logic                   clk,
+  input  logic                   reset,
+  output logic [count_width-1:0] count,
+  input  logic                   deq_en,
+  output logic                   deq_rdy,
+  output logic [data_width -1:0] deq_msg,
+  input  logic                   enq_en,
+  output logic                   enq_rdy,
+  input  logic [data_width -1:0] enq_msg
+);
+
+  localparam                   addr_width = num_entries == 1 ? 1 : $clog2( num_entries );
+  localparam [count_width-1:0] max_size   = num_entries[count_width-1:0];
+  localparam [addr_width -1:0] last_idx   = num_entries[addr_width -1:0] - 'd1;
+
+  // Wire declaration
+  logic [addr_width-1:0] deq_ptr;
+  logic [addr_width-1:0] enq_ptr;
+  logic [data_width-1:0] data_reg [0:num_entries-1];
+
+  // Sequential logic
+  always_ff @(posedge clk) begin
+    if (reset) begin
+      deq_ptr <= 'd0;
+      deq_ptr <= 'd0;
+      count   <= 'd0;
+    end
+    else begin
+      deq_ptr <= ~deq_en ? deq_ptr : deq_ptr == last_idx? 'd0 : deq_ptr + 'd1;
+      enq_ptr <= ~enq_en ? enq_ptr : enq_ptr == last_idx? 'd0 : enq_ptr + 'd1;
+      count <= ( enq_en & ~deq_en ) ? count + 'd1 :
+               ( deq_en & ~enq_en ) ? count - 'd1 : count;
+    end
+  end
+
+  always_ff @(posedge clk) begin
+    if (reset) begin
+      for (int i = 0; i < num_entries; i += 1)
+        data_reg[i] <= 'd0;
+    end
+    else if (enq_en) begin
+      data_reg[enq_ptr] <= enq_msg;
+    end
+  end
+
+  assign enq_rdy = count < max_size;
+  assign deq_rdy = count > 'd0;
+  assign deq_msg = data_reg[deq_ptr];
+
+endmodule
+
+`endif /* QUEUE */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder Queue__nbits_32__nelems_1__nbits_cnt_1
+//-----------------------------------------------------------
+
+`ifndef QUEUE__NBITS_32__NELEMS_1__NBITS_CNT_1
+`define QUEUE__NBITS_32__NELEMS_1__NBITS_CNT_1
+
+module Queue__nbits_32__nelems_1__nbits_cnt_1
+(
+  input logic [1-1:0] clk ,
+  output logic [1-1:0] count ,
+  input logic [1-1:0] deq_en ,
+  output logic [32-1:0] deq_msg ,
+  output logic [1-1:0] deq_rdy ,
+  input logic [1-1:0] enq_en ,
+  input logic [32-1:0] enq_msg ,
+  output logic [1-1:0] enq_rdy ,
+  input logic [1-1:0] reset 
+);
+  test_VQueue
+  #(
+    .data_width( 32 ),
+    .num_entries( 1 ),
+    .count_width( 1 )
+  ) v
+  (
+    .clk( clk ),
+    .count( count ),
+    .deq_en( deq_en ),
+    .deq_msg( deq_msg ),
+    .deq_rdy( deq_rdy ),
+    .enq_en( enq_en ),
+    .enq_msg( enq_msg ),
+    .enq_rdy( enq_rdy ),
+    .reset( reset )
+  );
+endmodule
+
+`endif /* QUEUE__NBITS_32__NELEMS_1__NBITS_CNT_1 */
+
@@ -0,0 +1,110 @@
+//-------------------------------------------------------------------------
+// VAdder_noparam.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// PyMTL VerilogPlaceholder VAdder Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+//***********************************************************
+// Pickled source file of placeholder VAdder_noparam
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder VAdder
+//-----------------------------------------------------------
+
+`ifndef VADDER
+`define VADDER
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component VAdder_noparam.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component VAdder_noparam
+
+`line 1 "VAdder.v" 0
+module VAdder #( parameter nbits = 32 )
+(
+  input  logic clk,
+  input  logic reset,
+  input  logic [nbits-1:0] in0,
+  input  logic [nbits-1:0] in1,
+  input  logic cin,
+  output logic [nbits-1:0] out,
+  output logic cout
+);
+
+  logic [nbits:0] temp;
+
+  always_comb begin
+    temp = ( in0 + in1 ) + 32'(cin);
+  end
+  
+  assign cout = temp[nbits];
+  assign out = temp[nbits-1:0];
+
+endmodule
+
+module test_VAdder #( parameter nbits = 32 )
+(
+  input  logic clk,
+  input  logic reset,
+  input  logic [nbits-1:0] in0,
+  input  logic [nbits-1:0] in1,
+  input  logic cin,
+  output logic [nbits-1:0] out,
+  output logic cout
+);
+
+  logic [nbits:0] temp;
+
+  always_comb begin
+    temp = ( in0 + in1 ) + 32'(cin);
+  end
+  
+  assign cout = temp[nbits];
+  assign out = temp[nbits-1:0];
+
+endmodule
+
+`endif /* VADDER */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder VAdder_noparam
+//-----------------------------------------------------------
+
+`ifndef VADDER_NOPARAM
+`define VADDER_NOPARAM
+
+module VAdder_noparam
+(
+  input logic [1-1:0] cin ,
+  input logic [1-1:0] clk ,
+  output logic [1-1:0] cout ,
+  input logic [32-1:0] in0 ,
+  input logic [32-1:0] in1 ,
+  output logic [32-1:0] out ,
+  input logic [1-1:0] reset 
+);
+  test_VAdder
+  #(
+  ) v
+  (
+    .cin( cin ),
+    .clk( clk ),
+    .cout( cout ),
+    .in0( in0 ),
+    .in1( in1 ),
+    .out( out ),
+    .reset( reset )
+  );
+endmodule
+
+`endif /* VADDER_NOPARAM */
+
@@ -0,0 +1,80 @@
+//-------------------------------------------------------------------------
+// VPassThrough__nports_1__nbits_16.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL SystemVerilog translation pass.
+
+// PyMTL VerilogPlaceholder VPassThrough Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+//***********************************************************
+// Pickled source file of placeholder VPassThrough__nports_1__nbits_16
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder VPassThrough
+//-----------------------------------------------------------
+
+`ifndef VPASSTHROUGH
+`define VPASSTHROUGH
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component VPassThrough__nports_1__nbits_16.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component VPassThrough__nports_1__nbits_16
+
+`line 1 "VPassThrough.v" 0
+module test_VPassThrough
+#(
+  parameter num_ports = 2,
+  parameter bitwidth  = 32
+)
+(
+  input  logic [bitwidth-1:0] in_ [0:num_ports-1],
+  output logic [bitwidth-1:0] out [0:num_ports-1]
+);
+
+  genvar i;
+
+  generate
+    for(i = 0; i < num_ports; i= i+1) begin
+      assign out[i] = in_[i];
+    end
+  endgenerate
+
+endmodule
+
+`endif /* VPASSTHROUGH */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder VPassThrough__nports_1__nbits_16
+//-----------------------------------------------------------
+
+`ifndef VPASSTHROUGH__NPORTS_1__NBITS_16
+`define VPASSTHROUGH__NPORTS_1__NBITS_16
+
+module VPassThrough__nports_1__nbits_16
+(
+  input logic reset,
+  input logic clk,
+  input logic [16-1:0] in_ [0:0],
+  output logic [16-1:0] out [0:0]
+);
+  test_VPassThrough
+  #(
+    .num_ports( 1 ),
+    .bitwidth( 16 )
+  ) v
+  (
+    .in_( in_ ),
+    .out( out )
+  );
+endmodule
+
+`endif /* VPASSTHROUGH__NPORTS_1__NBITS_16 */
+
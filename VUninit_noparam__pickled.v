@@ -0,0 +1,74 @@
+//-------------------------------------------------------------------------
+// VUninit_noparam.v
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// PyMTL VerilogPlaceholder VUninit Definition
+// At /root/package/pymtl3/passes/backends/verilog/import_/test/ImportedObject_test.py
+
+//***********************************************************
+// Pickled source file of placeholder VUninit_noparam
+//***********************************************************
+
+//-----------------------------------------------------------
+// Dependency of placeholder VUninit
+//-----------------------------------------------------------
+
+`ifndef VUNINIT
+`define VUNINIT
+
+// The source code below are included because they are specified
+// as the v_libs Verilog placeholder option of component VUninit_noparam.
+
+// If you get a duplicated def error from files included below, please
+// make sure they are included either through the v_libs option or the
+// explicit `include statement in the Verilog source code -- if they
+// appear in both then they will be included twice!
+
+
+// End of all v_libs files for component VUninit_noparam
+
+`line 1 "VUninit.v" 0
+module test_VUninit(
+  input  logic          clk,
+  input  logic          reset,
+  output logic [32-1:0] q,
+  input  logic [32-1:0] d
+);
+
+  always_comb begin
+    if (d == 32'd42)
+      q = 32'd42;
+  end
+
+endmodule
+
+`endif /* VUNINIT */
+
+//-----------------------------------------------------------
+// Wrapper of placeholder VUninit_noparam
+//-----------------------------------------------------------
+
+`ifndef VUNINIT_NOPARAM
+`define VUNINIT_NOPARAM
+
+module VUninit_noparam
+(
+  input logic [1-1:0] clk ,
+  input logic [32-1:0] d ,
+  output logic [32-1:0] q ,
+  input logic [1-1:0] reset 
+);
+  test_VUninit
+  #(
+  ) v
+  (
+    .clk( clk ),
+    .d( d ),
+    .q( q ),
+    .reset( reset )
+  );
+endmodule
+
+`endif /* VUNINIT_NOPARAM */
+
@@ -0,0 +1,311 @@
+"""
+========================================================================
+bench.py
+========================================================================
+Measurement and comparison helpers of the simulation benchmark suite.
+
+Every metric of a design is measured on freshly built components, takes
+the best of several runs, and ends up as an entry of the results:
+
+- {"time": seconds, ...} if the measurement succeeded
+- {"error": message} otherwise, so that one broken design or a missing
+  tool (e.g. Verilator) does not stop the whole suite
+
+Date   : Oct 17, 2026
+"""
+import os
+import platform
+import subprocess
+import tempfile
+import traceback
+from datetime import datetime
+from time import perf_counter
+
+from pymtl3 import DefaultPassGroup
+from pymtl3.passes.backends.verilog import (
+    VerilogPlaceholderPass,
+    VerilogTranslationImportPass,
+    VerilogTranslationPass,
+)
+from pymtl3.passes.mamba import Mamba2020
+from pymtl3.passes.mamba.HeuristicTopoPass import HeuristicTopoPass
+from pymtl3.passes.mamba.Mamba2020Pass import Mamba2020Pass
+from pymtl3.passes.sim.DynamicSchedulePass import DynamicSchedulePass
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+from pymtl3.passes.sim.SimpleSchedulePass import SimpleSchedulePass
+from pymtl3.passes.sim.WrapGreenletPass import WrapGreenletPass
+from pymtl3.passes.tracing import VcdGenerationPass
+from pymtl3.stdlib.test_utils.test_helpers import finalize_verilator
+from pymtl3.version import __version__
+
+# Bump this whenever the layout of the results changes
+BENCH_VERSION = 1
+
+METRICS = [
+  "elaborate",
+  "GenDAGPass",
+  "SimpleSchedulePass",
+  "DynamicSchedulePass",
+  "HeuristicTopoPass",
+  "Mamba2020Pass",
+  "tick",
+  "tick_mamba",
+  "tick_vcd",
+  "translate",
+  "translate_import",
+]
+
+#-------------------------------------------------------------------------
+# Measurement
+#-------------------------------------------------------------------------
+
+def measure( setup, func, repeat, teardown=None ):
+  """ Run setup() and time func( setup() ) repeat times. Returns the
+  best time and the return value of func in that run. """
+  best, best_ret = None, None
+  for _ in range(repeat):
+    state = setup()
+    try:
+      t0  = perf_counter()
+      ret = func( state )
+      t   = perf_counter() - t0
+    finally:
+      if teardown is not None:
+        teardown( state )
+    if best is None or t < best:
+      best, best_ret = t, ret
+  return best, best_ret
+
+def _elaborated( design ):
+  top = design.make_harness()
+  top.elaborate()
+  return top
+
+def _dag( design ):
+  top = _elaborated( design )
+  GenDAGPass()( top )
+  WrapGreenletPass()( top )
+  return top
+
+def _run( design, top ):
+  while not top.done():
+    top.sim_tick()
+    if top.sim_cycle_count() > design.max_cycles:
+      raise RuntimeError( f"{design.name} is not done after {design.max_cycles} cycles" )
+  return top.sim_cycle_count()
+
+def _sim_setup( design, pass_group, vcd_dir=None ):
+  def setup():
+    top = design.make_harness()
+    if vcd_dir is not None:
+      top.elaborate()
+      top.set_metadata( VcdGenerationPass.vcd_file_name, os.path.join( vcd_dir, design.name ) )
+    top.apply( pass_group() )
+    if design.load is not None:
+      design.load( top )
+    top.sim_reset()
+    return top
+  return setup
+
+def _tick_entry( design, pass_group, repeat, vcd_dir=None ):
+  def run( top ):
+    cycles = _run( design, top )
+    return cycles, top.sim_stats() if hasattr( top, "sim_stats" ) else None
+
+  t, ( cycles, stats ) = measure( _sim_setup( design, pass_group, vcd_dir ), run, repeat )
+  ret = { "time": t, "cycles": cycles, "cycles_per_sec": cycles / t if t else 0.0 }
+  if stats is not None:
+    ret[ "phases" ] = stats[ "phases" ]
+  return ret
+
+def _translate_setup( design, enable ):
+  def setup():
+    dut = design.make_dut()
+    dut.elaborate()
+    dut.set_metadata( enable, True )
+    dut.apply( VerilogPlaceholderPass() )
+    return dut
+  return setup
+
+def _bench_design( design, metric, repeat, workdir ):
+  """ Return the entry of one metric of one design. """
+
+  if metric == "elaborate":
+    t, _ = measure( design.make_harness, lambda top: top.elaborate(), repeat )
+    return { "time": t }
+
+  if metric == "GenDAGPass":
+    t, _ = measure( lambda: _elaborated( design ), lambda top: GenDAGPass()( top ), repeat )
+    return { "time": t }
+
+  if metric in ( "SimpleSchedulePass", "DynamicSchedulePass" ):
+    pass_cls = { "SimpleSchedulePass": SimpleSchedulePass,
+                 "DynamicSchedulePass": DynamicSchedulePass }[ metric ]
+    t, _ = measure( lambda: _dag( design ), lambda top: pass_cls()( top ), repeat )
+    return { "time": t }
+
+  # These two passes schedule and generate the tick function together
+  if metric in ( "HeuristicTopoPass", "Mamba2020Pass" ):
+    pass_cls = { "HeuristicTopoPass": HeuristicTopoPass,
+                 "Mamba2020Pass": Mamba2020Pass }[ metric ]
+    t, _ = measure( lambda: _dag( design ),
+                    lambda top: pass_cls( print_line_trace=False )( top ), repeat )
+    return { "time": t }
+
+  if metric == "tick":
+    return _tick_entry( design, lambda: DefaultPassGroup( print_line_trace=False, sim_stats=True ),
+                        repeat )
+
+  if metric == "tick_mamba":
+    return _tick_entry( design, lambda: Mamba2020( print_line_trace=False ), repeat )
+
+  if metric == "tick_vcd":
+    return _tick_entry( design, lambda: DefaultPassGroup( print_line_trace=False, sim_stats=True ),
+                        repeat, vcd_dir=workdir )
+
+  if metric == "translate":
+    t, _ = measure( _translate_setup( design, VerilogTranslationPass.enable ),
+                    lambda dut: dut.apply( VerilogTranslationPass() ), repeat )
+    return { "time": t }
+
+  if metric == "translate_import":
+    imported = []
+    def translate_import( dut ):
+      imported.append( VerilogTranslationImportPass()( dut ) )
+    def teardown( dut ):
+      while imported:
+        finalize_verilator( imported.pop() )
+    t, _ = measure( _translate_setup( design, VerilogTranslationImportPass.enable ),
+                    translate_import, repeat, teardown )
+    return { "time": t }
+
+  raise ValueError( f"Unknown metric {metric}" )
+
+def run_design( design, repeat=3, metrics=METRICS, verilog=True, log=None ):
+  """ Benchmark all metrics of a design. Translation writes files to a
+  temporary directory. """
+
+  ret = {}
+  cwd = os.getcwd()
+  with tempfile.TemporaryDirectory( prefix="pymtl-bench-" ) as workdir:
+    os.chdir( workdir )
+    try:
+      for metric in metrics:
+        if metric.startswith( "translate" ) and ( not verilog or design.make_dut is None ):
+          continue
+        try:
+          entry = _bench_design( design, metric, repeat, workdir )
+        except Exception as e:
+          entry = { "error": f"{type(e).__name__}: {e}".strip() }
+          if log is not None:
+            log( traceback.format_exc() )
+        ret[ metric ] = entry
+        if log is not None:
+          log( f"  {design.name:20} {metric:20} {_format_entry( entry )}" )
+    finally:
+      os.chdir( cwd )
+
+  # VCD overhead relative to the plain tick
+  if "time" in ret.get( "tick", {} ) and "time" in ret.get( "tick_vcd", {} ):
+    ret[ "tick_vcd" ][ "overhead" ] = ret[ "tick_vcd" ][ "time" ] / ret[ "tick" ][ "time" ]
+
+  return ret
+
+def _git_commit():
+  try:
+    return subprocess.run( [ "git", "rev-parse", "HEAD" ], capture_output=True, text=True,
+                           cwd=os.path.dirname( os.path.abspath( __file__ ) ),
+                           check=True ).stdout.strip()
+  except Exception:
+    return None
+
+def run_suite( designs, repeat=3, metrics=METRICS, verilog=True, log=None ):
+  """ Benchmark the given designs and return the results that can be
+  dumped as JSON. """
+  return {
+    "version":        BENCH_VERSION,
+    "date":           datetime.now().isoformat( timespec="seconds" ),
+    "pymtl3":         __version__,
+    "commit":         _git_commit(),
+    "python":         platform.python_version(),
+    "implementation": platform.python_implementation(),
+    "repeat":         repeat,
+    "results":        { d.name: run_design( d, repeat, metrics, verilog, log ) for d in designs },
+  }
+
+#-------------------------------------------------------------------------
+# Comparison
+#-------------------------------------------------------------------------
+
+def _format_entry( entry ):
+  if "error" in entry:
+    return f"ERROR {entry['error'].splitlines()[0][:60]}"
+  ret = f"{entry['time']*1e3:10.3f} ms"
+  if "cycles_per_sec" in entry:
+    ret += f" {entry['cycles_per_sec']:12.1f} cycles/s"
+  return ret
+
+def _cost( entry ):
+  # Tick benchmarks are compared per simulated cycle
+  if entry.get( "cycles" ):
+    return entry[ "time" ] / entry[ "cycles" ]
+  return entry[ "time" ]
+
+def compare( old, new, threshold=0.1, min_time=1e-4 ):
+  """ Compare two results and return a list of
+  ( design, metric, old entry, new entry, ratio, status ) where status
+  is one of regression, improvement, ok, error (fails only in new),
+  fixed (fails only in old), new and missing. Measurements shorter than
+  min_time in both runs are too noisy to flag. """
+
+  if old.get( "version" ) != new.get( "version" ):
+    raise ValueError( f"Cannot compare results of versions {old.get('version')} and {new.get('version')}" )
+
+  rows = []
+  old_results, new_results = old[ "results" ], new[ "results" ]
+  for design in sorted( set( old_results ) | set( new_results ) ):
+    a_metrics = old_results.get( design, {} )
+    b_metrics = new_results.get( design, {} )
+    for metric in sorted( set( a_metrics ) | set( b_metrics ),
+                          key=lambda x: METRICS.index(x) if x in METRICS else len(METRICS) ):
+      a, b = a_metrics.get( metric ), b_metrics.get( metric )
+      ratio = None
+      if a is None:
+        status = "new"
+      elif b is None:
+        status = "missing"
+      elif "error" in b:
+        status = "ok" if "error" in a else "error"
+      elif "error" in a:
+        status = "fixed"
+      else:
+        ratio = _cost( b ) / _cost( a ) if _cost( a ) else float( "inf" )
+        if max( a[ "time" ], b[ "time" ] ) < min_time:
+          status = "ok"
+        elif ratio > 1 + threshold:
+          status = "regression"
+        elif ratio < 1 / ( 1 + threshold ):
+          status = "improvement"
+        else:
+          status = "ok"
+      rows.append( ( design, metric, a, b, ratio, status ) )
+  return rows
+
+def has_regression( rows ):
+  return any( status in ( "regression", "error" ) for *_, status in rows )
+
+def format_comparison( rows, only_changes=False ):
+  lines = [ f"{'design':20} {'metric':20} {'old':>14} {'new':>14} {'ratio':>7}  status" ]
+  for design, metric, a, b, ratio, status in rows:
+    if only_changes and status == "ok":
+      continue
+    def fmt( entry ):
+      if entry is None:
+        return "-"
+      if "error" in entry:
+        return "error"
+      return f"{entry['time']*1e3:.3f}ms"
+    ratio_str = f"{ratio:.3f}" if ratio is not None else "-"
+    flag = "  <<<" if status in ( "regression", "error" ) else ""
+    lines.append( f"{design:20} {metric:20} {fmt(a):>14} {fmt(b):>14} {ratio_str:>7}  {status}{flag}" )
+  return "\n".join( lines )
@@ -0,0 +1,188 @@
+"""
+========================================================================
+designs.py
+========================================================================
+Designs of the simulation benchmark suite. Each BenchDesign knows how
+to build a fresh harness to simulate and, for RTL designs, a fresh DUT
+to translate to Verilog.
+
+The processor and checksum classes are imported lazily so that a design
+that cannot be imported only fails its own benchmarks.
+
+Date   : Oct 17, 2026
+"""
+import importlib
+import random
+import struct
+
+from pymtl3 import *
+from pymtl3.stdlib.connects import connect_pairs
+from pymtl3.stdlib.mem.MagicMemoryCL import MagicMemoryCL
+from pymtl3.stdlib.test_utils import TestSinkCL, TestSrcCL
+
+
+def _import( module, name ):
+  return getattr( importlib.import_module( module ), name )
+
+#-------------------------------------------------------------------------
+# BenchDesign
+#-------------------------------------------------------------------------
+
+class BenchDesign:
+  """ make_harness() returns a new harness with a done() method,
+  load( harness ) is called after the simulation passes, make_dut()
+  returns a new RTL component to translate (or None if there is none).
+  The harness has to be done within max_cycles. """
+
+  def __init__( s, name, make_harness, load=None, make_dut=None, max_cycles=100000 ):
+    s.name         = name
+    s.make_harness = make_harness
+    s.load         = load
+    s.make_dut     = make_dut
+    s.max_cycles   = max_cycles
+
+  def __repr__( s ):
+    return f"BenchDesign({s.name})"
+
+#-------------------------------------------------------------------------
+# ex03_proc
+#-------------------------------------------------------------------------
+# Same as examples/ex03_proc/test/harness.py but without the test
+# dependencies.
+
+class ProcHarness( Component ):
+
+  def construct( s, proc_cls ):
+    s.commit_inst = OutPort()
+
+    s.src  = TestSrcCL ( Bits32, [] )
+    s.sink = TestSinkCL( Bits32, [] )
+    s.proc = proc_cls()
+    s.xcel = _import( "examples.ex03_proc.NullXcel", "NullXcelRTL" )()
+    s.mem  = MagicMemoryCL( 2 )
+
+    connect_pairs(
+      s.proc.commit_inst, s.commit_inst,
+      s.src.send, s.proc.mngr2proc,
+      s.proc.proc2mngr, s.sink.recv,
+      s.proc.imem, s.mem.ifc[0],
+      s.proc.dmem, s.mem.ifc[1],
+    )
+    connect( s.proc.xcel, s.xcel.xcel )
+
+  def load( s, mem_image ):
+    for section in mem_image.get_sections():
+      if section.name == ".mngr2proc":
+        s.src.msgs.extend( Bits32(x[0]) for x in struct.iter_unpack( "<I", section.data ) )
+      elif section.name == ".proc2mngr":
+        s.sink.msgs.extend( Bits32(x[0]) for x in struct.iter_unpack( "<I", section.data ) )
+      else:
+        s.mem.write_mem( section.addr, section.data )
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+def _proc_design( impl ):
+  module = f"examples.ex03_proc.Proc{impl}"
+  ubmark = "examples.ex03_proc.ubmark.proc_ubmark_vvadd_unopt"
+
+  def load( harness ):
+    harness.load( _import( ubmark, "ubmark_vvadd_unopt" ).gen_mem_image() )
+
+  make_dut = None
+  if impl == "RTL":
+    make_dut = lambda: _import( module, "ProcRTL" )()
+
+  return BenchDesign( f"proc-{impl.lower()}",
+                      lambda: ProcHarness( _import( module, f"Proc{impl}" ) ),
+                      load=load, make_dut=make_dut )
+
+#-------------------------------------------------------------------------
+# ex02_cksum
+#-------------------------------------------------------------------------
+
+class CksumHarness( Component ):
+
+  def construct( s, dut_cls, nmsgs=100 ):
+    words_to_b128 = _import( "examples.ex02_cksum.utils", "words_to_b128" )
+    checksum      = _import( "examples.ex02_cksum.ChecksumFL", "checksum" )
+
+    rng  = random.Random( 0xdeadbeef )
+    msgs = [ [ b16( rng.getrandbits(16) ) for _ in range(8) ] for _ in range(nmsgs) ]
+
+    s.src  = TestSrcCL ( Bits128, [ words_to_b128( x ) for x in msgs ] )
+    s.dut  = dut_cls()
+    s.sink = TestSinkCL( Bits32,  [ checksum( x ) for x in msgs ] )
+
+    s.src.send //= s.dut.recv
+    s.dut.send //= s.sink.recv
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+def _cksum_design( impl ):
+  module = f"examples.ex02_cksum.Checksum{impl}"
+
+  make_dut = None
+  if impl == "RTL":
+    make_dut = lambda: _import( module, "ChecksumRTL" )()
+
+  return BenchDesign( f"cksum-{impl.lower()}",
+                      lambda: CksumHarness( _import( module, f"Checksum{impl}" ) ),
+                      make_dut=make_dut )
+
+#-------------------------------------------------------------------------
+# stdlib queues
+#-------------------------------------------------------------------------
+
+class QueueHarness( Component ):
+
+  def construct( s, qtype, rtl, num_entries=2, nmsgs=200 ):
+    msgs = [ Bits32( i * 7 ) for i in range(nmsgs) ]
+
+    s.src  = TestSrcCL ( Bits32, msgs )
+    s.dut  = qtype( Bits32, num_entries ) if rtl else qtype( num_entries )
+    s.sink = TestSinkCL( Bits32, msgs, interval_delay=1 )
+
+    s.src.send //= s.dut.enq
+
+    if rtl:
+      @update_once
+      def up_deq_rtl():
+        s.dut.deq.en @= 0
+        if s.dut.deq.rdy & s.sink.recv.rdy():
+          s.dut.deq.en @= 1
+          s.sink.recv( s.dut.deq.ret )
+    else:
+      @update_once
+      def up_deq_cl():
+        if s.dut.deq.rdy() and s.sink.recv.rdy():
+          s.sink.recv( s.dut.deq() )
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+def _queue_design( kind, rtl ):
+  from pymtl3.stdlib import queues
+
+  qtype = getattr( queues, f"{kind}Queue{'RTL' if rtl else 'CL'}" )
+
+  make_dut = None
+  if rtl:
+    make_dut = lambda: qtype( Bits32, 2 )
+
+  return BenchDesign( f"queue-{kind.lower()}-{'rtl' if rtl else 'cl'}",
+                      lambda: QueueHarness( qtype, rtl ), make_dut=make_dut )
+
+#-------------------------------------------------------------------------
+# All designs
+#-------------------------------------------------------------------------
+
+DESIGNS = { x.name: x for x in [
+  _proc_design( "FL" ),
+  _proc_design( "CL" ),
+  _proc_design( "RTL" ),
+  _cksum_design( "CL" ),
+  _cksum_design( "RTL" ),
+] + [ _queue_design( kind, rtl ) for rtl in [ False, True ]
+                                 for kind in [ "Normal", "Pipe", "Bypass" ] ] }
@@ -0,0 +1,152 @@
+"""
+========================================================================
+scaling.py
+========================================================================
+Time and memory of the elaboration-related steps on synthetic designs
+of growing size, to plot scaling curves and catch super-linear
+behavior. The results have the same layout as bench.run_suite so that
+sim-bench-compare works on them, with one "design" per shape and size,
+e.g. "deep-10000".
+
+Memory is measured with tracemalloc in separate runs because tracing
+slows down the timed runs. peak_mem is the peak of the memory allocated
+during the step and retained_mem what is still allocated after it.
+bytes_per_signal is the memory retained by constructing and elaborating
+the design divided by its number of signals, which tracks the footprint
+of the DSL objects and their metadata.
+
+Date   : Oct 17, 2026
+"""
+import gc
+import platform
+import tracemalloc
+from datetime import datetime
+
+from pymtl3.passes.BasePass import PassMetadata
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+from pymtl3.passes.sim.PrepareSimPass import PrepareSimPass
+from pymtl3.version import __version__
+
+from .bench import BENCH_VERSION, _git_commit, measure
+from .synthetic import SHAPES, design_params, make_design
+
+STEPS = [
+  "elaborate",
+  "resolve_value_connections",
+  "GenDAGPass",
+  "lock_in_simulation",
+]
+
+def _setup( shape, nsignals, step ):
+  """ Build the design up to right before the step and return the
+  design and the function that performs the step. """
+  top = make_design( shape, nsignals )
+  if step == "elaborate":
+    return top, top.elaborate
+
+  top.elaborate()
+  if step == "resolve_value_connections":
+    return top, top._resolve_value_connections
+
+  if step == "GenDAGPass":
+    return top, lambda: GenDAGPass()( top )
+
+  if step == "lock_in_simulation":
+    top._sim = PassMetadata()
+    PrepareSimPass.create_lock_unlock_simulation( top )
+    return top, top.lock_in_simulation
+
+  raise ValueError( f"Unknown step {step}" )
+
+def measure_memory( setup ):
+  """ Return ( peak, retained ) bytes allocated by the step. """
+  top, step = setup()
+  gc.collect()
+  tracemalloc.start()
+  try:
+    step()
+    retained, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return peak, retained
+
+def measure_design_memory( shape, nsignals ):
+  """ Return the bytes retained by constructing and elaborating the
+  design. """
+  gc.collect()
+  tracemalloc.start()
+  try:
+    top = make_design( shape, nsignals )
+    top.elaborate()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return retained
+
+def run_scaling( shapes=SHAPES, sizes=( 1000, 10000, 100000 ), steps=STEPS,
+                 repeat=1, memory=True, log=None ):
+  results = {}
+  for shape in shapes:
+    for nsignals in sizes:
+      name = f"{shape}-{nsignals}"
+      entries = results[ name ] = {}
+
+      # Describe the actual design
+      top = make_design( shape, nsignals )
+      top.elaborate()
+      info = { "params":     design_params( shape, nsignals ),
+               "signals":    len( top._dsl.all_signals ),
+               "components": len( top._dsl.all_components ),
+               "upblks":     len( top.get_all_update_blocks() ) }
+      del top
+
+      if memory:
+        info[ "bytes_per_signal" ] = measure_design_memory( shape, nsignals ) / info[ "signals" ]
+        if log is not None:
+          log( f"  {name:16} {'design':26} {info['signals']:9} signals "
+               f"{info['bytes_per_signal']:10.1f} bytes/signal" )
+
+      for step in steps:
+        setup = lambda: _setup( shape, nsignals, step )
+        try:
+          t, _ = measure( setup, lambda x: x[1](), repeat )
+          entry = { "time": t, **info }
+          if memory:
+            entry[ "peak_mem" ], entry[ "retained_mem" ] = measure_memory( setup )
+        except Exception as e:
+          entry = { "error": f"{type(e).__name__}: {e}".strip() }
+        entries[ step ] = entry
+        if log is not None:
+          log( _format_row( name, step, entry ) )
+
+  return {
+    "version":        BENCH_VERSION,
+    "date":           datetime.now().isoformat( timespec="seconds" ),
+    "pymtl3":         __version__,
+    "commit":         _git_commit(),
+    "python":         platform.python_version(),
+    "implementation": platform.python_implementation(),
+    "repeat":         repeat,
+    "results":        results,
+  }
+
+def _format_row( name, step, entry ):
+  if "error" in entry:
+    return f"  {name:16} {step:26} ERROR {entry['error'].splitlines()[0][:60]}"
+  ret = f"  {name:16} {step:26} {entry['signals']:9} signals {entry['time']:10.4f} s"
+  if "peak_mem" in entry:
+    ret += f" {entry['peak_mem']/2**20:10.2f} MiB peak {entry['retained_mem']/2**20:10.2f} MiB retained"
+  return ret
+
+def format_curves( results ):
+  """ A CSV of shape, step, signals, time, memory for plotting. """
+  lines = [ "shape,step,signals,time,peak_mem,retained_mem,bytes_per_signal" ]
+  for name, entries in results[ "results" ].items():
+    shape = name.rsplit( "-", 1 )[0]
+    for step, entry in entries.items():
+      if "error" not in entry:
+        lines.append( f"{shape},{step},{entry['signals']},{entry['time']:.6f},"
+                      f"{entry.get('peak_mem', '')},{entry.get('retained_mem', '')},"
+                      f"{entry.get('bytes_per_signal', '')}" )
+  return "\n".join( lines )
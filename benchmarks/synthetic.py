@@ -0,0 +1,167 @@
+"""
+========================================================================
+synthetic.py
+========================================================================
+A generator of parameterized synthetic designs to stress elaboration
+and scheduling at scale. A design is a tree of Node components with
+Leaf components at the bottom:
+
+- every component has a bcast input that is connected to the bcast of
+  all its children, so the whole tree shares one wide fanout net
+- every leaf has nports input/output ports of a (nested) bitstruct type
+  and the ports are chained leaf by leaf through the hierarchy
+- every leaf has nloops LoopPair children, each of which is a false
+  combinational loop, i.e. a two-block SCC
+
+make_design( shape, nsignals ) picks parameters that emphasize one of
+the SHAPES and reach roughly nsignals signals.
+
+Date   : Oct 17, 2026
+"""
+from pymtl3 import *
+
+#-------------------------------------------------------------------------
+# Types
+#-------------------------------------------------------------------------
+
+_struct_types = {}
+
+def mk_nested_struct( depth ):
+  """ Bits32 for depth 0, otherwise a bitstruct with two fields of the
+  type of depth-1. """
+  if depth == 0:
+    return Bits32
+  try:
+    return _struct_types[ depth ]
+  except KeyError:
+    Field = mk_nested_struct( depth - 1 )
+    ret = _struct_types[ depth ] = mk_bitstruct( f"SyntheticStruct{depth}",
+                                                 { 'lo': Field, 'hi': Field } )
+    return ret
+
+#-------------------------------------------------------------------------
+# Components
+#-------------------------------------------------------------------------
+
+class LoopPair( Component ):
+
+  def construct( s ):
+    s.bcast = InPort( Bits32 )
+    s.out   = OutPort( Bits32 )
+    s.x     = Wire( Bits32 )
+    s.y     = Wire( Bits32 )
+
+    # up_a -> up_b -> up_a is a false combinational loop
+    @update
+    def up_a():
+      s.x   @= s.bcast + 1
+      s.out @= s.y
+
+    @update
+    def up_b():
+      s.y @= s.x + 1
+
+class Leaf( Component ):
+
+  def construct( s, Type, nports, nloops ):
+    s.bcast = InPort( Bits32 )
+    s.in_   = [ InPort( Type )  for _ in range(nports) ]
+    s.out   = [ OutPort( Type ) for _ in range(nports) ]
+    s.sum   = OutPort( Bits32 )
+
+    for i in range(nports):
+      s.out[i] //= s.in_[i]
+
+    s.loops = [ LoopPair() for _ in range(nloops) ]
+    for x in s.loops:
+      x.bcast //= s.bcast
+
+    if nloops:
+      s.sum //= s.loops[-1].out
+    else:
+      s.sum //= s.bcast
+
+class Node( Component ):
+
+  def construct( s, Type, nports, nloops, nleaves, fanout ):
+    s.bcast = InPort( Bits32 )
+    s.in_   = [ InPort( Type )  for _ in range(nports) ]
+    s.out   = [ OutPort( Type ) for _ in range(nports) ]
+
+    # Split the leaves among at most fanout children
+    nchildren = min( fanout, nleaves )
+    sizes = [ nleaves // nchildren + (i < nleaves % nchildren) for i in range(nchildren) ]
+
+    s.children = [ Leaf( Type, nports, nloops ) if n == 1 else
+                   Node( Type, nports, nloops, n, fanout ) for n in sizes ]
+
+    prev = s.in_
+    for x in s.children:
+      x.bcast //= s.bcast
+      for i in range(nports):
+        x.in_[i] //= prev[i]
+      prev = x.out
+    for i in range(nports):
+      s.out[i] //= prev[i]
+
+class SyntheticTop( Component ):
+
+  def construct( s, nleaves=4, fanout=4, nports=4, nloops=1, struct_depth=0 ):
+    Type = mk_nested_struct( struct_depth )
+
+    s.bcast = InPort( Bits32 )
+    s.in_   = [ InPort( Type )  for _ in range(nports) ]
+    s.out   = [ OutPort( Type ) for _ in range(nports) ]
+
+    if nleaves == 1:
+      s.tree = Leaf( Type, nports, nloops )
+    else:
+      s.tree = Node( Type, nports, nloops, nleaves, fanout )
+
+    s.tree.bcast //= s.bcast
+    for i in range(nports):
+      s.tree.in_[i] //= s.in_[i]
+      s.out[i]      //= s.tree.out[i]
+
+#-------------------------------------------------------------------------
+# Shapes
+#-------------------------------------------------------------------------
+# Each shape fixes the leaf parameters and the fanout, and scales the
+# number of leaves.
+
+SHAPES = {
+  # a binary tree, i.e. the deepest hierarchy for the number of leaves
+  "deep":    dict( fanout=2,     nports=2,  nloops=1, struct_depth=0 ),
+  # one level with all leaves, i.e. one parent with a huge fanout
+  "wide":    dict( fanout=None,  nports=2,  nloops=1, struct_depth=0 ),
+  # large port arrays per leaf
+  "ports":   dict( fanout=8,     nports=64, nloops=0, struct_depth=0 ),
+  # ports of nested bitstructs
+  "structs": dict( fanout=8,     nports=4,  nloops=0, struct_depth=3 ),
+  # many SCCs per leaf
+  "sccs":    dict( fanout=8,     nports=1,  nloops=16, struct_depth=0 ),
+}
+
+def signals_per_leaf( fanout, nports, nloops ):
+  """ The approximate number of signals per leaf including its share of
+  the nodes above it. Bitstruct ports count as one signal each. """
+  # clk/reset/bcast/sum and the ports of the leaf, clk/reset/bcast/out/x/y
+  # of each loop pair, and clk/reset/bcast and the ports of the about
+  # 1/(fanout-1) nodes per leaf
+  leaf = 4 + 2 * nports + 6 * nloops
+  if fanout is None:
+    return leaf
+  return leaf + ( 3 + 2 * nports ) / ( fanout - 1 )
+
+def design_params( shape, nsignals ):
+  """ Return the kwargs of SyntheticTop for the shape with about
+  nsignals signals. """
+  params = dict( SHAPES[ shape ] )
+  per_leaf = signals_per_leaf( params['fanout'], params['nports'], params['nloops'] )
+  params[ 'nleaves' ] = nleaves = max( 1, round( nsignals / per_leaf ) )
+  if params[ 'fanout' ] is None:
+    params[ 'fanout' ] = nleaves
+  return params
+
+def make_design( shape, nsignals ):
+  return SyntheticTop( **design_params( shape, nsignals ) )
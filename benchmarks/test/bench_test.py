@@ -0,0 +1,66 @@
+#=========================================================================
+# bench_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import copy
+import json
+
+from ..bench import METRICS, compare, has_regression, run_suite
+from ..designs import DESIGNS
+
+
+def test_run_suite():
+  results = run_suite( [ DESIGNS["queue-normal-cl"] ], repeat=1,
+                       metrics=[ "elaborate", "GenDAGPass", "tick", "tick_vcd" ] )
+  json.dumps( results )
+
+  entries = results["results"]["queue-normal-cl"]
+  assert list( entries ) == [ "elaborate", "GenDAGPass", "tick", "tick_vcd" ]
+  for entry in entries.values():
+    assert "error" not in entry and entry["time"] > 0
+
+  tick = entries["tick"]
+  assert tick["cycles"] > 200
+  assert tick["cycles_per_sec"] > 0
+  assert "update_ff" in tick["phases"]
+  assert entries["tick_vcd"]["overhead"] > 0
+
+def test_errors_are_recorded():
+  design = copy.copy( DESIGNS["queue-normal-cl"] )
+  design.make_harness = lambda: 1/0
+  entries = run_suite( [ design ], repeat=1, metrics=[ "elaborate", "tick" ] )["results"][ design.name ]
+  assert entries["elaborate"]["error"].startswith( "ZeroDivisionError" )
+  assert "error" in entries["tick"]
+
+def _results( **entries ):
+  return { "version": 1, "results": { "d": entries } }
+
+def test_compare():
+  old = _results( elaborate={ "time": 1.0 },
+                  tick={ "time": 1.0, "cycles": 100 },
+                  GenDAGPass={ "time": 1.0 },
+                  translate={ "error": "no verilator" },
+                  Mamba2020Pass={ "time": 1e-6 } )
+  new = _results( elaborate={ "time": 0.5 },
+                  tick={ "time": 1.5, "cycles": 200 }, # faster per cycle
+                  GenDAGPass={ "time": 1.2 },
+                  translate={ "time": 1.0 },
+                  Mamba2020Pass={ "time": 1e-5 },
+                  tick_vcd={ "time": 1.0 } )
+
+  status = { metric: st for _, metric, _, _, _, st in compare( old, new ) }
+  assert status == {
+    "elaborate":     "improvement",
+    "tick":          "improvement",
+    "GenDAGPass":    "regression",
+    "translate":     "fixed",
+    "Mamba2020Pass": "ok",
+    "tick_vcd":      "new",
+  }
+  assert [ m for _, m, *_ in compare( old, new ) ] == \
+         sorted( status, key=METRICS.index )
+  assert has_regression( compare( old, new ) )
+  assert not has_regression( compare( old, new, threshold=0.5 ) )
+  assert has_regression( compare( new, old ) ) # translate now fails
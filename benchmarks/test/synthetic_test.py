@@ -0,0 +1,47 @@
+#=========================================================================
+# synthetic_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import pytest
+
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..bench import compare
+from ..scaling import STEPS, format_curves, run_scaling
+from ..synthetic import SHAPES, design_params, make_design
+
+
+@pytest.mark.parametrize( "shape", list(SHAPES) )
+def test_signal_count( shape ):
+  top = make_design( shape, 2000 )
+  top.elaborate()
+  assert 1400 < len( top._dsl.all_signals ) < 2800
+
+def test_simulate_sccs():
+  top = make_design( "sccs", 500 )
+  top.apply( DefaultPassGroup(print_line_trace=False) )
+  assert len( top._sched.scc_blocks ) == design_params( "sccs", 500 )["nleaves"] * 16
+
+  top.sim_reset()
+  top.bcast @= 5
+  top.in_[0] @= 3
+  top.sim_tick()
+  assert top.out[0] == 3
+  leaf = top.tree
+  while hasattr( leaf, "children" ):
+    leaf = leaf.children[-1]
+  assert leaf.sum == 7
+
+def test_run_scaling():
+  results = run_scaling( [ "deep", "structs" ], [ 200, 400 ] )
+  assert list( results["results"] ) == [ "deep-200", "deep-400", "structs-200", "structs-400" ]
+  for entries in results["results"].values():
+    assert list( entries ) == STEPS
+    for entry in entries.values():
+      assert entry["time"] > 0 and entry["peak_mem"] > 0
+      assert entry["bytes_per_signal"] > 0
+
+  assert len( format_curves( results ).splitlines() ) == 1 + 4 * len(STEPS)
+  assert { x[-1] for x in compare( results, results ) } == { "ok" }
@@ -14,8 +14,6 @@ from pymtl3.stdlib.mem import MemMasterIfcFL
 
 from .tinyrv0_encoding import RegisterFile, TinyRV0Inst, disassemble_inst
 
-import ipdb; ipdb.set_trace()
-
 class ProcFL( Component ):
 
   def construct( s ):
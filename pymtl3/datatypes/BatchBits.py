@@ -0,0 +1,425 @@
+"""
+========================================================================
+BatchBits.py
+========================================================================
+NumPy-backed fixed-bitwidth data type for batched simulation. A
+BatchBits object holds one value per lane in a uint64 vector, and
+mirrors the operator surface of Bits so that the same update block can
+operate on all lanes at once. Operands can be BatchBits with the same
+number of lanes, scalar Bits, or Python ints, which are broadcast to
+every lane. Only bitwidths up to 64 are supported.
+
+Different from Bits, converting a BatchBits to bool/int is only allowed
+when all lanes hold the same value.
+
+Date   : Oct 17, 2026
+"""
+import numpy as np
+
+from .bits_import import Bits
+
+_u64 = np.uint64
+
+_upper = [ 0 ] + [ (1 << i) - 1 for i in range(1, 65) ]
+_mask  = [ _u64(x) for x in _upper ]
+
+object_new = object.__new__
+def _new_valid_batch_bits( nbits, uint ):
+  ret = object_new( BatchBits )
+  ret._nbits = nbits
+  ret._uint  = uint
+  return ret
+
+class _Masked:
+  """ Wrap a value to be assigned only to the lanes where mask is True.
+  BatchBits.__imatmul__ and __ilshift__ recognize this wrapper. """
+  __slots__ = ( "mask", "value" )
+
+  def __init__( self, mask, value ):
+    self.mask  = mask
+    self.value = value
+
+def masked( mask, value ):
+  if mask is None:
+    return value
+  return _Masked( mask, value )
+
+class BatchBits:
+  __slots__ = ( "_nbits", "_uint", "_next" )
+
+  @property
+  def nbits( self ):
+    return self._nbits
+
+  @property
+  def nlanes( self ):
+    return len(self._uint)
+
+  def __init__( self, nbits, nlanes, v=0 ):
+    nbits = int(nbits)
+    if nbits < 1 or nbits > 64: raise ValueError(f"BatchBits only supports 1 <= nbits <= 64, not {nbits}")
+
+    self._nbits = nbits
+    self._uint  = np.zeros( nlanes, dtype=_u64 )
+    self._uint  = self._broadcast( self._lanes( v, "construct" ) )
+
+  # Convert the operand to a uint64 lane vector or a uint64 scalar. We
+  # never mutate a vector in place, so it is safe to share them.
+
+  def _lanes( self, v, op ):
+    nbits = self._nbits
+    if isinstance( v, BatchBits ):
+      if v._nbits != nbits:
+        raise ValueError( f"Operands of {op} must have matching bitwidth, "
+                          f"but here BatchBits{nbits} != BatchBits{v._nbits}.\n" )
+      return v._uint
+
+    if isinstance( v, Bits ) or hasattr( v, "to_bits" ):
+      v = v.to_bits()
+      if v.nbits != nbits:
+        raise ValueError( f"Operands of {op} must have matching bitwidth, "
+                          f"but here BatchBits{nbits} != Bits{v.nbits}.\n" )
+      return _u64( int(v) )
+
+    if isinstance( v, (np.ndarray, list, tuple) ):
+      v = np.asarray( v )
+      if v.shape != self._uint.shape:
+        raise ValueError( f"Expect {len(self._uint)} lanes in {op}, but got shape {v.shape}" )
+      if v.dtype.kind == 'i' and (v < 0).any():
+        raise ValueError( f"Negative value in {op} with BatchBits{nbits}" )
+      v = v.astype( _u64 )
+      if (v > _mask[nbits]).any():
+        raise ValueError( f"Value is too wide for BatchBits{nbits} in {op}" )
+      return v
+
+    v = int(v)
+    if v < 0 or v > _upper[nbits]:
+      raise ValueError( f"Integer {hex(v)} is not a valid operand of {op} with BatchBits{nbits}!\n"
+                        f"Suggestion: 0 <= x <= {hex(_upper[nbits])}" )
+    return _u64( v )
+
+  def _broadcast( self, v ):
+    if isinstance( v, np.ndarray ):
+      return v
+    return np.full( len(self._uint), v, dtype=_u64 )
+
+  # PyMTL simulation specific
+
+  def __ilshift__( self, v ):
+    if v.__class__ is _Masked:
+      self._next = np.where( v.mask, self._lanes( v.value, "<<=" ), self._next )
+    else:
+      self._next = self._broadcast( self._lanes( v, "<<=" ) )
+    return self
+
+  def _flip( self ):
+    self._uint = self._next
+
+  def clone( self ):
+    return _new_valid_batch_bits( self._nbits, self._uint )
+
+  def __deepcopy__( self, memo ):
+    return _new_valid_batch_bits( self._nbits, self._uint )
+
+  def __imatmul__( self, v ):
+    if v.__class__ is _Masked:
+      self._uint = np.where( v.mask, self._lanes( v.value, "@=" ), self._uint )
+    else:
+      self._uint = self._broadcast( self._lanes( v, "@=" ) )
+    return self
+
+  def to_bits( self ):
+    return self
+
+  # Arithmetics
+
+  def __getitem__( self, idx ):
+    if isinstance( idx, slice ):
+      if idx.step:
+        raise IndexError( "Index cannot contain step" )
+      try:
+        start, stop = int(idx.start or 0), int(idx.stop or self._nbits)
+        assert 0 <= start < stop <= self._nbits
+      except:
+        raise IndexError( f"Invalid access: [{idx.start}:{idx.stop}] in a BatchBits{self._nbits} instance" )
+      nbits = stop - start
+      return _new_valid_batch_bits( nbits, (self._uint >> _u64(start)) & _mask[nbits] )
+
+    if isinstance( idx, BatchBits ): # per-lane bit index
+      i = idx._uint
+      if (i >= self._nbits).any():
+        raise IndexError( f"Invalid access: some lanes are out of range in a BatchBits{self._nbits} instance" )
+      return _new_valid_batch_bits( 1, (self._uint >> i) & _u64(1) )
+
+    i = int(idx)
+    if i >= self._nbits or i < 0:
+      raise IndexError( f"Invalid access: [{i}] in a BatchBits{self._nbits} instance" )
+    return _new_valid_batch_bits( 1, (self._uint >> _u64(i)) & _u64(1) )
+
+  def __setitem__( self, idx, v ):
+    if isinstance( idx, slice ):
+      if idx.step:
+        raise IndexError( "Index cannot contain step" )
+      try:
+        start, stop = int(idx.start or 0), int(idx.stop or self._nbits)
+        assert 0 <= start < stop <= self._nbits
+      except:
+        raise IndexError( f"Invalid access: [{idx.start}:{idx.stop}] in a BatchBits{self._nbits} instance" )
+    else:
+      start = int(idx)
+      if start >= self._nbits or start < 0:
+        raise IndexError( f"Invalid access: [{start}] in a BatchBits{self._nbits} instance" )
+      stop = start + 1
+
+    nbits = stop - start
+    if isinstance( v, BatchBits ) and v._nbits == nbits:
+      v = v._uint
+    elif isinstance( v, Bits ) and v.nbits == nbits:
+      v = _u64( int(v) )
+    else:
+      v = _new_valid_batch_bits( nbits, self._uint )._lanes( v, "slice assignment" )
+
+    m = _u64( ((1 << stop) - 1) ^ ((1 << start) - 1) )
+    self._uint = (self._uint & ~m) | ((v << _u64(start)) & m)
+
+  def _binop( self, other, op ):
+    return self._lanes( other, op )
+
+  def __add__( self, other ):
+    nbits = self._nbits
+    return _new_valid_batch_bits( nbits, (self._uint + self._binop( other, "'+' (add)" )) & _mask[nbits] )
+
+  def __radd__( self, other ):
+    return self.__add__( other )
+
+  def __sub__( self, other ):
+    nbits = self._nbits
+    return _new_valid_batch_bits( nbits, (self._uint - self._binop( other, "'-' (sub)" )) & _mask[nbits] )
+
+  def __rsub__( self, other ):
+    nbits = self._nbits
+    return _new_valid_batch_bits( nbits, (self._binop( other, "'-' (sub)" ) - self._uint) & _mask[nbits] )
+
+  def __mul__( self, other ):
+    nbits = self._nbits
+    return _new_valid_batch_bits( nbits, (self._uint * self._binop( other, "'*' (mul)" )) & _mask[nbits] )
+
+  def __rmul__( self, other ):
+    return self.__mul__( other )
+
+  def __and__( self, other ):
+    return _new_valid_batch_bits( self._nbits, self._uint & self._binop( other, "'&' (and)" ) )
+
+  def __rand__( self, other ):
+    return self.__and__( other )
+
+  def __or__( self, other ):
+    return _new_valid_batch_bits( self._nbits, self._uint | self._binop( other, "'|' (or)" ) )
+
+  def __ror__( self, other ):
+    return self.__or__( other )
+
+  def __xor__( self, other ):
+    return _new_valid_batch_bits( self._nbits, self._uint ^ self._binop( other, "'^' (xor)" ) )
+
+  def __rxor__( self, other ):
+    return self.__xor__( other )
+
+  # Division by zero produces 0 in the corresponding lanes instead of
+  # raising an exception for the whole batch.
+
+  def __floordiv__( self, other ):
+    other = self._binop( other, "'//' (div)" )
+    with np.errstate( divide='ignore' ):
+      return _new_valid_batch_bits( self._nbits, self._broadcast( self._uint // other ) )
+
+  def __rfloordiv__( self, other ):
+    other = self._binop( other, "'//' (div)" )
+    with np.errstate( divide='ignore' ):
+      return _new_valid_batch_bits( self._nbits, self._broadcast( other // self._uint ) )
+
+  def __mod__( self, other ):
+    other = self._binop( other, "'%' (mod)" )
+    with np.errstate( divide='ignore' ):
+      return _new_valid_batch_bits( self._nbits, self._broadcast( self._uint % other ) )
+
+  def __rmod__( self, other ):
+    other = self._binop( other, "'%' (mod)" )
+    with np.errstate( divide='ignore' ):
+      return _new_valid_batch_bits( self._nbits, self._broadcast( other % self._uint ) )
+
+  def __invert__( self ):
+    return _new_valid_batch_bits( self._nbits, ~self._uint & _mask[self._nbits] )
+
+  # NumPy shifts are undefined when the amount is >= 64 so we clamp the
+  # shift amount and zero out the lanes that shift everything out.
+
+  def __lshift__( self, other ):
+    nbits = self._nbits
+    amt = self._binop( other, "'<<' (lshift)" )
+    ret = (self._uint << np.minimum( amt, _u64(63) )) & _mask[nbits]
+    return _new_valid_batch_bits( nbits, self._broadcast( np.where( amt >= nbits, _u64(0), ret ) ) )
+
+  def __rshift__( self, other ):
+    nbits = self._nbits
+    amt = self._binop( other, "'>>' (rshift)" )
+    ret = self._uint >> np.minimum( amt, _u64(63) )
+    return _new_valid_batch_bits( nbits, self._broadcast( np.where( amt >= nbits, _u64(0), ret ) ) )
+
+  def _cmp( self, res ):
+    return _new_valid_batch_bits( 1, self._broadcast( res.astype( _u64 ) ) )
+
+  def __eq__( self, other ):
+    try:
+      other = self._binop( other, "'==' (eq)" )
+    except TypeError:
+      return _new_valid_batch_bits( 1, np.zeros( len(self._uint), dtype=_u64 ) )
+    return self._cmp( self._uint == other )
+
+  def __ne__( self, other ):
+    try:
+      other = self._binop( other, "'!=' (ne)" )
+    except TypeError:
+      return _new_valid_batch_bits( 1, np.ones( len(self._uint), dtype=_u64 ) )
+    return self._cmp( self._uint != other )
+
+  def __lt__( self, other ):
+    return self._cmp( self._uint < self._binop( other, "'<' (lt)" ) )
+
+  def __le__( self, other ):
+    return self._cmp( self._uint <= self._binop( other, "'<=' (le)" ) )
+
+  def __gt__( self, other ):
+    return self._cmp( self._uint > self._binop( other, "'>' (gt)" ) )
+
+  def __ge__( self, other ):
+    return self._cmp( self._uint >= self._binop( other, "'>=' (ge)" ) )
+
+  __hash__ = None
+
+  # Lane-wise views
+
+  def is_uniform( self ):
+    u = self._uint
+    return bool( (u == u[0]).all() )
+
+  def any( self ):
+    return bool( self._uint.any() )
+
+  def all( self ):
+    return bool( self._uint.all() )
+
+  def lane( self, i ):
+    return Bits( self._nbits, int(self._uint[i]) )
+
+  def _uniform_value( self, op ):
+    if not self.is_uniform():
+      raise ValueError( f"Cannot {op} a BatchBits{self._nbits} whose lanes hold different values: {self}" )
+    return int( self._uint[0] )
+
+  def __bool__( self ):
+    return self._uniform_value( "convert to bool" ) != 0
+
+  def __int__( self ):
+    return self._uniform_value( "convert to int" )
+
+  def __index__( self ):
+    return self._uniform_value( "use as an index" )
+
+  def int( self ):
+    nbits = self._nbits
+    u = self._uint.astype( object )
+    return np.where( u >> (nbits - 1), u - (1 << nbits), u )
+
+  def uint( self ):
+    return self._uint
+
+  # Print
+
+  def __repr__( self ):
+    return f"BatchBits{self._nbits}({self})"
+
+  def __str__( self ):
+    width = ((self._nbits-1)//4)+1
+    if self.is_uniform():
+      return "{:x}".format( int(self._uint[0]) ).zfill( width )
+    lanes = [ "{:x}".format( int(x) ).zfill( width ) for x in self._uint[:4] ]
+    if len(self._uint) > 4:
+      lanes.append( "..." )
+    return "{" + ",".join( lanes ) + "}"
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+# Batch counterparts of the helpers in helpers.py. They fall back to the
+# scalar version if no operand is a BatchBits.
+
+from . import helpers as _helpers # isort:skip
+
+def _new_width( new_width ):
+  if isinstance( new_width, int ):
+    return new_width
+  assert issubclass( new_width, Bits )
+  return new_width.nbits
+
+def batch_trunc( value, new_width ):
+  if not isinstance( value, BatchBits ):
+    return _helpers.trunc( value, new_width )
+  nbits = _new_width( new_width )
+  assert nbits <= value.nbits
+  return _new_valid_batch_bits( nbits, value._uint & _mask[nbits] )
+
+def batch_zext( value, new_width ):
+  if not isinstance( value, BatchBits ):
+    return _helpers.zext( value, new_width )
+  nbits = _new_width( new_width )
+  assert nbits >= value.nbits
+  return _new_valid_batch_bits( nbits, value._uint )
+
+def batch_sext( value, new_width ):
+  if not isinstance( value, BatchBits ):
+    return _helpers.sext( value, new_width )
+  nbits = _new_width( new_width )
+  assert nbits >= value.nbits
+  sign  = (value._uint >> _u64(value.nbits - 1)) & _u64(1)
+  ext   = _mask[nbits] ^ _mask[value.nbits]
+  return _new_valid_batch_bits( nbits, np.where( sign, value._uint | ext, value._uint ) )
+
+def batch_concat( *args ):
+  lanes = None
+  for x in args:
+    if isinstance( x, BatchBits ):
+      lanes = len(x._uint)
+      break
+  if lanes is None:
+    return _helpers.concat( *args )
+
+  nbits = 0
+  value = np.zeros( lanes, dtype=_u64 )
+  for x in args:
+    xnb = x.nbits
+    nbits += xnb
+    if nbits > 64:
+      raise ValueError( f"BatchBits only supports 1 <= nbits <= 64, not {nbits}" )
+    xv = x._uint if isinstance( x, BatchBits ) else _u64( int(x) )
+    value = (value << _u64(xnb)) | xv
+  return _new_valid_batch_bits( nbits, value )
+
+def batch_reduce_and( value ):
+  if not isinstance( value, BatchBits ):
+    return _helpers.reduce_and( value )
+  return value._cmp( value._uint == _mask[value.nbits] )
+
+def batch_reduce_or( value ):
+  if not isinstance( value, BatchBits ):
+    return _helpers.reduce_or( value )
+  return value._cmp( value._uint != 0 )
+
+def batch_reduce_xor( value ):
+  if not isinstance( value, BatchBits ):
+    return _helpers.reduce_xor( value )
+  v = value._uint
+  parity = np.zeros( len(v), dtype=_u64 )
+  for i in range( value.nbits ):
+    parity ^= (v >> _u64(i)) & _u64(1)
+  return _new_valid_batch_bits( 1, parity )
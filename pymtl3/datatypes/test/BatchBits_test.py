@@ -0,0 +1,93 @@
+"""
+==========================================================================
+BatchBits_test.py
+==========================================================================
+Test cases for BatchBits, checked lane by lane against Bits
+
+Date : Oct 17, 2026
+"""
+import operator
+
+import pytest
+
+from pymtl3.datatypes import Bits1, Bits8, Bits12, Bits16, concat, sext, zext
+
+np = pytest.importorskip( "numpy" )
+
+from pymtl3.datatypes.BatchBits import ( # isort:skip
+  BatchBits,
+  batch_concat,
+  batch_reduce_xor,
+  batch_sext,
+  batch_zext,
+  masked,
+)
+
+lanes_a = [ 0, 1, 0x7f, 0x80, 0xff, 0x13, 0x20, 0xfe ]
+lanes_b = [ 0, 3, 0x01, 0x80, 0x02, 0xff, 0x07, 0x10 ]
+
+def _check( res, ref_fn ):
+  for i, (a, b) in enumerate( zip( lanes_a, lanes_b ) ):
+    assert res.lane( i ) == ref_fn( Bits8(a), Bits8(b) )
+
+@pytest.mark.parametrize( "op", [ operator.add, operator.sub, operator.mul,
+                                  operator.and_, operator.or_, operator.xor,
+                                  operator.eq, operator.ne, operator.lt,
+                                  operator.le, operator.gt, operator.ge ] )
+def test_binops( op ):
+  a = BatchBits( 8, len(lanes_a), lanes_a )
+  b = BatchBits( 8, len(lanes_b), lanes_b )
+  _check( op( a, b ), op )
+  _check( op( a, Bits8(0x42) ), lambda x, y: op( x, Bits8(0x42) ) )
+  _check( op( a, 3 ), lambda x, y: op( x, 3 ) )
+
+def test_shifts_and_div():
+  a = BatchBits( 8, len(lanes_a), lanes_a )
+  b = BatchBits( 8, len(lanes_b), lanes_b )
+  _check( a << b, lambda x, y: x << y )
+  _check( a >> b, lambda x, y: x >> y )
+  _check( a // b, lambda x, y: x // y if y else Bits8(0) )
+  _check( a % b,  lambda x, y: x %  y if y else Bits8(0) )
+  _check( ~a, lambda x, y: ~x )
+
+def test_width_mismatch():
+  a = BatchBits( 8, 4 )
+  with pytest.raises( ValueError ):
+    a + BatchBits( 16, 4 )
+  with pytest.raises( ValueError ):
+    a + Bits16(1)
+  with pytest.raises( ValueError ):
+    a @= 0x100
+
+def test_slices_and_helpers():
+  a = BatchBits( 8, len(lanes_a), lanes_a )
+  _check( a[4:8], lambda x, y: x[4:8] )
+  _check( a[7], lambda x, y: x[7] )
+  _check( batch_zext( a, 12 ), lambda x, y: zext( x, 12 ) )
+  _check( batch_sext( a, 12 ), lambda x, y: sext( x, 12 ) )
+  _check( batch_concat( a, Bits1(1), a[0:3] ), lambda x, y: concat( x, Bits1(1), x[0:3] ) )
+  _check( batch_reduce_xor( a ), lambda x, y: Bits1( bin(int(x)).count("1") & 1 ) )
+
+  a[0:4] = Bits8(0x5a)[0:4]
+  _check( a, lambda x, y: concat( x[4:8], Bits8(0xa)[0:4] ) )
+
+def test_masked_assignment_and_flip():
+  a = BatchBits( 8, 4, [ 1, 2, 3, 4 ] )
+  a @= masked( np.array( [ True, False, True, False ] ), 9 )
+  assert list( a.uint() ) == [ 9, 2, 9, 4 ]
+
+  a._next = a._uint
+  a <<= masked( np.array( [ False, True, False, False ] ), a + 1 )
+  assert list( a.uint() ) == [ 9, 2, 9, 4 ]
+  a._flip()
+  assert list( a.uint() ) == [ 9, 3, 9, 4 ]
+
+def test_uniform_conversion():
+  a = BatchBits( 8, 4, 7 )
+  assert a == 7
+  assert int( a ) == 7 and bool( a )
+  assert str( a ) == "07"
+  a @= [ 1, 2, 3, 4 ]
+  with pytest.raises( ValueError ):
+    int( a )
+  assert str( a ) == "{01,02,03,04}"
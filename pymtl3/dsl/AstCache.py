@@ -0,0 +1,155 @@
+"""
+========================================================================
+AstCache.py
+========================================================================
+An on-disk cache of the source, AST and the read/write/call names that
+ComponentLevel2._cache_func_meta extracts from update blocks, so that
+repeated runs and pytest workers don't reparse the same update blocks.
+
+Entries are grouped by source file. Each file of the cache is keyed by
+the path and the content hash of the source file, so editing a source
+file invalidates all its entries. The cache is disabled unless a
+directory is given through PYMTL_AST_CACHE_DIR or set_cache_dir().
+
+Date   : Oct 17, 2026
+"""
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+# Bump this whenever the AST visitors change what they extract
+CACHE_VERSION = 1
+
+_cache_dir = os.environ.get( "PYMTL_AST_CACHE_DIR" ) or None
+
+# source path -> _SourceFile
+_source_files = {}
+
+hits   = 0
+misses = 0
+
+def set_cache_dir( path ):
+  """ Enable the cache in the given directory, or disable it if path is
+  None. """
+  global _cache_dir
+  flush()
+  _cache_dir = path
+  _source_files.clear()
+
+def get_cache_dir():
+  return _cache_dir
+
+class _SourceFile:
+
+  def __init__( s, path ):
+    s.path    = path
+    s.entries = {}
+    s.dirty   = False
+
+    try:
+      with open( path, "rb" ) as f:
+        content = f.read()
+    except OSError:
+      s.filename = None # not a real file, e.g. <string>
+      return
+
+    path_hash = hashlib.sha1( path.encode() ).hexdigest()[:16]
+    digest    = hashlib.sha1( content ).hexdigest()[:16]
+    s.prefix   = f"{path_hash}-"
+    s.filename = os.path.join( _cache_dir, f"{path_hash}-{digest}-v{CACHE_VERSION}.pkl" )
+    s.entries  = s._load()
+
+  def _load( s ):
+    try:
+      with open( s.filename, "rb" ) as f:
+        return pickle.load( f )
+    except Exception:
+      return {}
+
+  def flush( s ):
+    if not s.dirty or s.filename is None:
+      return
+    s.dirty = False
+
+    os.makedirs( _cache_dir, exist_ok=True )
+
+    # Another process may have added entries in the meantime
+    entries = s._load()
+    entries.update( s.entries )
+    s.entries = entries
+
+    fd, tmp = tempfile.mkstemp( dir=_cache_dir, suffix=".tmp" )
+    try:
+      with os.fdopen( fd, "wb" ) as f:
+        pickle.dump( entries, f, protocol=pickle.HIGHEST_PROTOCOL )
+      os.replace( tmp, s.filename )
+    except BaseException:
+      os.unlink( tmp )
+      raise
+
+    # Remove entries of older versions of the same source file
+    name = os.path.basename( s.filename )
+    for x in os.listdir( _cache_dir ):
+      if x.startswith( s.prefix ) and x.endswith( ".pkl" ) and x != name:
+        try:
+          os.unlink( os.path.join( _cache_dir, x ) )
+        except OSError:
+          pass
+
+def _get_source_file( func ):
+  path = func.__code__.co_filename
+  try:
+    return _source_files[ path ]
+  except KeyError:
+    ret = _source_files[ path ] = _SourceFile( path )
+    return ret
+
+def _func_key( func ):
+  # Whether a name refers to a global or a closure variable affects the
+  # extracted names, so it is part of the key.
+  code = func.__code__
+  return ( sys.version_info[:2], code.co_firstlineno, code.co_name, code.co_freevars,
+           tuple( sorted( x for x in code.co_names if x in func.__globals__ ) ) )
+
+def lookup( func ):
+  """ Return the cached ( info, reads, writes, calls ) of func, or None. """
+  global hits, misses
+
+  if _cache_dir is None:
+    return None
+
+  data = _get_source_file( func ).entries.get( _func_key( func ) )
+  if data is None:
+    misses += 1
+    return None
+
+  try:
+    ret = pickle.loads( data )
+  except Exception:
+    misses += 1
+    return None
+  hits += 1
+  return ret
+
+def store( func, value ):
+  if _cache_dir is None:
+    return
+
+  # Pickle right away because passes may annotate the AST later
+  source_file = _get_source_file( func )
+  if source_file.filename is None:
+    return
+  source_file.entries[ _func_key( func ) ] = pickle.dumps( value, protocol=pickle.HIGHEST_PROTOCOL )
+  source_file.dirty = True
+
+def flush():
+  """ Write all new entries to disk. """
+  if _cache_dir is None:
+    return
+  for x in _source_files.values():
+    try:
+      x.flush()
+    except OSError:
+      pass # the cache is best effort
@@ -7,6 +7,7 @@ Add clk/reset signals.
 Author : Yanghui Ou
   Date : Apr 6, 2019
 """
+from collections import defaultdict
 
 from .ComponentLevel1 import ComponentLevel1
 from .ComponentLevel7 import ComponentLevel7
@@ -24,6 +25,7 @@ from .errors import (
     InvalidAPICallError,
     InvalidConnectionError,
     NotElaboratedError,
+    ReleasedMetadataError,
     UnsetMetadataError,
 )
 from .MetadataKey import MetadataKey
@@ -116,6 +118,33 @@ class Component( ComponentLevel7 ):
       s._dsl.all_method_nets = s._resolve_method_connections()
       s._dsl._has_pending_method_connections = False
 
+  # The named objects at the top are also indexed by their exact class
+  # and, for connectables, by their host component, so that queries on a
+  # type or a host don't need to scan all_named_objects. These two must
+  # be called whenever all_named_objects changes.
+
+  def _index_named_objects( s, objs ):
+    by_type = s._dsl.all_objects_by_type
+    by_host = s._dsl.all_objects_by_host
+    for x in objs:
+      by_type[ x.__class__ ].add( x )
+      if isinstance( x, Connectable ):
+        by_host[ x.get_host_component() ].add( x )
+
+  def _unindex_named_objects( s, objs ):
+    by_type = s._dsl.all_objects_by_type
+    by_host = s._dsl.all_objects_by_host
+    for x in objs:
+      cls = x.__class__
+      by_type[ cls ].discard( x )
+      if not by_type[ cls ]:
+        del by_type[ cls ]
+      if isinstance( x, Connectable ):
+        host = x.get_host_component()
+        by_host[ host ].discard( x )
+        if not by_host[ host ]:
+          del by_host[ host ]
+
   # These internal functions are implemented in a more generic way. The
   # public APIs should wrap around these functions.
 
@@ -185,7 +214,7 @@ class Component( ComponentLevel7 ):
       obj._dsl._my_indices  = indices
 
       obj._dsl.elaborate_top = top
-      obj._dsl.NamedObject_fields = set()
+      obj._dsl.NamedObject_fields = None
 
       NamedObject._elaborate_stack.append( obj )
       NamedObject.__setattr__ = NamedObject.__setattr_for_elaborate__
@@ -200,9 +229,10 @@ class Component( ComponentLevel7 ):
     for c in added_components:
       c._elaborate_read_write_func()
 
-    added_signals, added_method_ports = \
+    added_signals, added_method_ports, added_ifcs = \
       obj._collect_all( [ lambda x: isinstance( x, Signal ), \
-                          lambda x: isinstance( x, MethodPort ) ] )
+                          lambda x: isinstance( x, MethodPort ), \
+                          lambda x: isinstance( x, Interface ) ] )
 
     top._dsl.all_components    |= added_components
     top._dsl.all_signals       |= added_signals
@@ -211,6 +241,12 @@ class Component( ComponentLevel7 ):
     top._dsl.all_named_objects |= added_components
     top._dsl.all_named_objects |= added_signals
     top._dsl.all_named_objects |= added_method_ports
+    top._dsl.all_named_objects |= added_ifcs
+
+    top._index_named_objects( added_components )
+    top._index_named_objects( added_signals )
+    top._index_named_objects( added_method_ports )
+    top._index_named_objects( added_ifcs )
 
     for c in added_components:
       top._collect_vars( c )
@@ -292,10 +328,11 @@ class Component( ComponentLevel7 ):
         parent._dsl.NamedObject_fields.remove( foo._dsl.my_name )
 
       # Remove all components, signals, and method ports
-      removed_components, removed_signals, removed_method_ports = \
+      removed_components, removed_signals, removed_method_ports, removed_ifcs = \
         foo._collect_all( [ lambda x: isinstance( x, Component ), \
                             lambda x: isinstance( x, Signal ), \
-                            lambda x: isinstance( x, MethodPort ) ] )
+                            lambda x: isinstance( x, MethodPort ), \
+                            lambda x: isinstance( x, Interface ) ] )
 
       top._dsl.all_components    -= removed_components
       top._dsl.all_signals       -= removed_signals
@@ -305,6 +342,11 @@ class Component( ComponentLevel7 ):
 
       removed_connectables = removed_signals | removed_method_ports
       top._dsl.all_named_objects -= removed_connectables
+      top._dsl.all_named_objects -= removed_ifcs
+
+      top._unindex_named_objects( removed_components )
+      top._unindex_named_objects( removed_connectables )
+      top._unindex_named_objects( removed_ifcs )
 
       removed_consts = set()
       if isinstance( foo, Placeholder ):
@@ -382,6 +424,7 @@ class Component( ComponentLevel7 ):
         parent._dsl.func_calls[func] -= to_save
 
       saved_connections = []
+      net_frontier      = set()
 
       for x in removed_connectables:
         # Clean up all_adjancency at top
@@ -391,6 +434,8 @@ class Component( ComponentLevel7 ):
             # If other will be removed, we don't need to remove it here ..
             if other not in removed_connectables and other not in removed_consts:
               top._dsl.all_adjacency[other].remove( x )
+              if isinstance( other, (Signal, Const) ):
+                net_frontier.add( other )
               if isinstance( other, Const ):
                 other = other._dsl.const
               saved_connections.append( (other, "top"+repr(x)[1:]) ) # other is from outside
@@ -418,6 +463,12 @@ class Component( ComponentLevel7 ):
       # that the next get_xxx_net will immediately recollect nets.
       top._dsl._has_pending_value_connections = True
       top._dsl._has_pending_method_connections = True
+      # The consts of removed components are only connected to removed
+      # signals. Only the nets that lose a member are rebuilt in the
+      # union-find forest.
+      for y in removed_consts:
+        top._dsl.all_adjacency.pop( y, None )
+      top._split_value_nets( net_frontier, removed_connectables | removed_consts )
 
       # We clean up the connect_order list. If we want to preserve the
       # original connect order, we can play some other tricks here such as
@@ -437,8 +488,19 @@ class Component( ComponentLevel7 ):
     # import gc
     # gc.collect() # this takes 0.1 seconds
 
+  # Override
+  def _elaborate_collect_all_named_objects( s ):
+    super()._elaborate_collect_all_named_objects()
+
+    s._dsl.all_objects_by_type = defaultdict(set)
+    s._dsl.all_objects_by_host = defaultdict(set)
+    s._index_named_objects( s._dsl.all_named_objects )
+
   # Override, add pypy hooks
   def elaborate( s ):
+    if getattr( s._dsl, "metadata_released", False ):
+      raise ReleasedMetadataError()
+
     try:
       import pypyjit
       pypyjit.set_param("off")
@@ -588,6 +650,27 @@ class Component( ComponentLevel7 ):
     except AttributeError:
       return s._collect_all_single( filt )
 
+  def get_all_objects_of_type( s, Type, host = None ):
+    """ Return the set of named objects that are instances of Type (a
+    class or a tuple of classes). If host is given, only the connectables
+    hosted by that component are returned. """
+    try:
+      if host is not None:
+        return { x for x in s._dsl.all_objects_by_host.get( host, () )
+                   if isinstance( x, Type ) }
+
+      ret = set()
+      for cls, objs in s._dsl.all_objects_by_type.items():
+        if issubclass( cls, Type ):
+          ret |= objs
+      return ret
+
+    except AttributeError:
+      if host is not None:
+        return s._collect_all_single( lambda x: isinstance( x, Type ) and
+                        isinstance( x, Connectable ) and x.get_host_component() is host )
+      return s._collect_all_single( lambda x: isinstance( x, Type ) )
+
   def get_local_object_filter( s, filt, sort_key = None ):
     assert callable( filt )
     return s._collect_objects_local( filt, sort_key )
@@ -738,6 +821,7 @@ class Component( ComponentLevel7 ):
 
     top._dsl.all_signals.add( o )
     top._dsl.all_named_objects.add( o )
+    top._index_named_objects( [ o ] )
 
   def add_connection( top, o1, o2 ):
 
@@ -20,7 +20,7 @@ from collections import defaultdict
 
 from pymtl3.datatypes import Bits, is_bitstruct_class
 
-from . import AstHelper
+from . import AstCache, AstHelper, InstanceTemplate
 from .ComponentLevel1 import ComponentLevel1
 from .Connectable import Connectable, Const, InPort, Interface, OutPort, Signal, Wire
 from .ConstraintTypes import RD, WR, U, ValueConstraint
@@ -74,7 +74,9 @@ class ComponentLevel2( ComponentLevel1 ):
     keeps the caching valid, but also make the code more readable.
 
     According to the convention, we can cache the information of a
-    function in the *class object* to avoid redundant parsing. """
+    function in the *class object* to avoid redundant parsing. If the
+    on-disk AstCache is enabled, the information also persists across
+    processes. """
     cls = s.__class__
     try:
       name_info = cls._name_info
@@ -100,6 +102,11 @@ class ComponentLevel2( ComponentLevel1 ):
       AstHelper.extract_reads_writes_calls( s, func, _ast, _rd, _wr, _fc )
 
     elif name not in name_info:
+      cached = AstCache.lookup( func )
+      if cached is not None:
+        name_info[ name ], name_rd[ name ], name_wr[ name ], name_fc[ name ] = cached
+        return
+
       _src, _line = inspect.getsourcelines( func )
       _src = "".join( _src )
       _ast = ast.parse( compiled_re.sub( r'\2', _src ) )
@@ -110,7 +117,21 @@ class ComponentLevel2( ComponentLevel1 ):
       name_fc[ name ]   = _fc   = []
       AstHelper.extract_reads_writes_calls( s, func, _ast, _rd, _wr, _fc )
 
-  def _elaborate_read_write_func( s ):
+      AstCache.store( func, ( name_info[ name ], _rd, _wr, _fc ) )
+
+  def _elaborate_read_write_func( s, templates=None ):
+
+    # With shared elaboration, templates maps the key of structurally
+    # identical instances to the reads/writes/calls resolved on the first
+    # of them, and the other instances only bind their own objects.
+
+    key = None
+    if templates is not None:
+      key = InstanceTemplate.instance_key( s )
+      if key is not None:
+        template = templates.get( key )
+        if template is not None and InstanceTemplate.bind( s, template ):
+          return
 
     # We have parsed AST to extract every read/write variable name.
     # I refactor the process of materializing objects in this function
@@ -307,6 +328,9 @@ class ComponentLevel2( ComponentLevel1 ):
                                     update_ff = blk in s._dsl.update_ff, is_write=True )
       s._dsl.upblk_calls [ blk ] = extract_obj_from_names( blk, name_fc[ name ] )
 
+    if key is not None and key not in templates:
+      templates[ key ] = InstanceTemplate.record( s )
+
   # Override
   def _collect_vars( s, m ):
     super()._collect_vars( m )
@@ -609,14 +633,43 @@ class ComponentLevel2( ComponentLevel1 ):
         s._dsl.all_components.add( c )
         s._collect_vars( c )
 
+  # Same as _collect_all_single but returns the components in
+  # declaration order, so that the first instance of each class, which
+  # records the instance template, is the same in every run.
+
+  def _collect_all_components_in_order( s ):
+    ret   = []
+    seen  = set()
+    stack = [s]
+    while stack:
+      u = stack.pop()
+
+      if   isinstance( u, NamedObject ):
+        if id(u) in seen:
+          continue
+        seen.add( id(u) )
+
+        if isinstance( u, ComponentLevel2 ):
+          ret.append( u )
+
+        children = [ obj for name, obj in u.__dict__.items()
+                     if isinstance( name, tuple ) or ( isinstance( name, str ) and name[0] != '_' ) ]
+        stack.extend( reversed( children ) )
+
+      elif isinstance( u, list ):
+        stack.extend( reversed( u ) )
+    return ret
+
   # Override
   def elaborate( s ):
     # Don't directly use the base class elaborate anymore
     s._elaborate_construct()
+    AstCache.flush()
 
     # First elaborate all functions to spawn more named objects
-    for c in s._collect_all_single( lambda s: isinstance( s, ComponentLevel2 ) ):
-      c._elaborate_read_write_func()
+    templates = {} if InstanceTemplate.is_enabled() else None
+    for c in s._collect_all_components_in_order():
+      c._elaborate_read_write_func( templates )
 
     s._elaborate_collect_all_named_objects()
 
@@ -15,7 +15,7 @@ Date   : Jan 29, 2020
 import ast
 import inspect
 import linecache
-from collections import defaultdict
+from collections import defaultdict, deque
 
 from pymtl3.datatypes import Bits, is_bitstruct_inst
 from pymtl3.extra.pypy import custom_exec
@@ -49,6 +49,38 @@ def connect( o1, o2 ):
   host, o1_connectable, o2_connectable = _connect_check( o1, o2, internal=False )
   host._connect_dispatch( o1, o2, o1_connectable, o2_connectable )
 
+# Union-find over connected signals/constants. parent maps every node to
+# its parent in the forest, and size is only meaningful for roots.
+
+def _net_find( parent, x ):
+  # Path halving keeps the trees flat without recursion
+  while parent[x] is not x:
+    p = parent[x]
+    parent[x] = x = parent[p]
+  return x
+
+def _net_union( parent, size, o1, o2 ):
+  """ Merge the nets of o1 and o2. Return False if they are already in the
+  same net. """
+
+  if o1 not in parent:
+    parent[o1] = o1
+    size[o1]   = 1
+  if o2 not in parent:
+    parent[o2] = o2
+    size[o2]   = 1
+
+  r1 = _net_find( parent, o1 )
+  r2 = _net_find( parent, o2 )
+  if r1 is r2:
+    return False
+
+  if size[r1] < size[r2]:
+    r1, r2 = r2, r1
+  parent[r2] = r1
+  size[r1] += size.pop( r2 )
+  return True
+
 class ComponentLevel3( ComponentLevel2 ):
 
   #-----------------------------------------------------------------------
@@ -250,6 +282,7 @@ class ComponentLevel3( ComponentLevel2 ):
     s._dsl.adjacency[o2].add( o1 )
 
     s._dsl.connect_order.append( (o1, o2) )
+    s._add_to_net( o1, o2 )
 
   def _connect_signal_signal( s, o1, o2 ):
     if not (o1._dsl.Type is o2._dsl.Type):
@@ -263,6 +296,21 @@ class ComponentLevel3( ComponentLevel2 ):
       s._dsl.adjacency[o2].add( o1 )
 
       s._dsl.connect_order.append( (o1, o2) )
+      s._add_to_net( o1, o2 )
+
+  def _add_to_net( s, o1, o2 ):
+    """ Merge the nets of o1 and o2 in the union-find forest kept at the
+    elaborate top. A new connection between two members of the same net
+    closes a loop. """
+    top_dsl = s._dsl.elaborate_top._dsl
+
+    # The forest is only dropped before the first elaboration and is
+    # rebuilt from all_adjacency when the nets are recollected.
+    if top_dsl.net_parent is None:
+      return
+
+    if not _net_union( top_dsl.net_parent, top_dsl.net_size, o1, o2 ):
+      raise InvalidConnectionError(repr(o2)+" is in a connection loop.")
 
   def _connect_interfaces( s, o1, o2 ):
     # When we connect two interfaces, we first try to use o1's and o2's
@@ -392,9 +440,9 @@ class ComponentLevel3( ComponentLevel2 ):
     may _intersect_, so they need to check sibling slices' write/read
     status as well. """
 
-    # First of all, bfs the "forest" to find out all nets
+    # First of all, collect the nets from the union-find forest
 
-    nets = s._floodfill_nets( s._dsl.all_signals, s._dsl.all_adjacency )
+    nets = s._collect_value_nets()
 
     # Then figure out writers: all writes in upblks and their nest objects
 
@@ -423,17 +471,50 @@ class ComponentLevel3( ComponentLevel2 ):
            ( isinstance( member, OutPort ) and isinstance( host, Placeholder ) ):
           writer_prop[ member ] = True
 
-    headless = nets
-    headed   = []
+    # Propagatable writer slices grouped by their parent signal, for the
+    # sibling slice check below
+
+    slice_writers = defaultdict(list)
+    for obj, prop in writer_prop.items():
+      if prop and obj._dsl.slice is not None:
+        slice_writers[ obj.get_parent_object() ].append( obj )
+
+    def is_writer( v ):
+      """ Return whether v is a writer and the signal that makes v a
+      writer (None if v itself is). """
+
+      # Check if itself is a writer or a constant
+      if v in writer_prop or isinstance( v, Const ):
+        return True, None
+
+      # Check if an ancestor is a propagatable writer
+      obj = v.get_parent_object()
+      while obj.is_signal():
+        if writer_prop.get( obj ):
+          return True, obj
+        obj = obj.get_parent_object()
+
+      # Check sibling slices
+      if v._dsl.slice is not None:
+        for obj in slice_writers.get( v.get_parent_object(), () ):
+          if obj is not v and obj.slice_overlap( v ):
+            return True, obj
+
+      return False, None
 
     # Convention: we store a net in a tuple ( writer, set([readers]) )
     # The first element is writer; it should be None if there is no
     # writer. The second element is a set of signals including the writer.
 
-    while headless:
-      new_headless = []
-      wcount = len(writer_prop)
+    headed  = []
+    writers = [ None ] * len(nets)
+
+    # Once tracking starts, every change to writer_prop is recorded as
+    # ( obj, is_new_key, is_propagatable ) so that only the nets it can
+    # affect are revisited.
+    changes = None
 
+    def resolve_net( i ):
       # For each net, figure out the writer among all vars and their
       # ancestors. Moreover, if x's ancestor has a writer in another net,
       # x should be the writer of this net.
@@ -448,73 +529,167 @@ class ComponentLevel3( ComponentLevel2 ):
       # be a unpropagatable writer because we don't want x[5:15] to
       # propagate to x[12:17] later.
 
-      for net in headless:
-        has_writer = False
-
-        for v in net:
-          obj = None
-          try:
-            # Check if itself is a writer or a constant
-            if v in writer_prop or isinstance( v, Const ):
-              assert not has_writer
-              has_writer, writer = True, v
+      net = nets[i]
+      has_writer = False
 
-            else:
-              # Check if an ancestor is a propagatable writer
-              obj = v.get_parent_object()
-              while obj.is_signal():
-                if obj in writer_prop and writer_prop[ obj ]:
-                  assert not has_writer
-                  has_writer, writer = True, v
-                  break
-                obj = obj.get_parent_object()
-
-              # Check sibling slices
-              for obj in v.get_sibling_slices():
-                if obj.slice_overlap( v ):
-                  if obj in writer_prop and writer_prop[ obj ]:
-                    assert not has_writer
-                    has_writer, writer = True, v
-                    # Shunning: is breaking out of here enough? If we
-                    # don't break the loop, we might a list here storing
-                    # "why the writer became writer" and do some sibling
-                    # overlap checks when we enter the loop body later
-                    break
-
-          except AssertionError:
+      for v in net:
+        found, obj = is_writer( v )
+        if found:
+          if has_writer:
             raise MultiWriterError( \
             "Two-writer conflict \"{}\"{}, \"{}\" in the following net:\n - {}".format(
               repr(v), "" if not obj else "(as \"{}\" is written somewhere else)".format( repr(obj) ),
               repr(writer), "\n - ".join([repr(x) for x in net])) )
+          has_writer, writer = True, v
 
-        if not has_writer:
-          new_headless.append( net )
-          continue
+      if not has_writer:
+        return
 
-        # Child s.x.y of some propagatable s.x, or sibling of some
-        # propagatable s[a:b].
-        # This means that at least other variables are able to see s.x/s[a:b]
-        # so it doesn't matter if s.x.y is not in writer_prop
-        if writer not in writer_prop:
-          pass
+      writers[i] = writer
+      headed.append( (writer, net) )
 
-        for v in net:
-          if v != writer:
+      for v in net:
+        if v != writer:
+          old = writer_prop.get( v )
+          if not old:
             writer_prop[ v ] = True # The reader becomes new writer
+            if v._dsl.slice is not None:
+              slice_writers[ v.get_parent_object() ].append( v )
+            if changes is not None:
+              changes.append( (v, old is None, True) )
+
+          obj = v.get_parent_object()
+          while obj.is_signal():
+            if obj not in writer_prop:
+              writer_prop[ obj ] = False
+              if changes is not None:
+                changes.append( (obj, True, False) )
+            obj = obj.get_parent_object()
+
+    # Most nets are resolved in the first round
+
+    for i in range(len(nets)):
+      resolve_net( i )
+
+    headless = [ i for i in range(len(nets)) if writers[i] is None ]
+    if not headless:
+      return headed
+
+    # For the rest, index the members once so that a new writer only
+    # revisits the nets it can affect, instead of rescanning all headless
+    # nets until nothing changes. net_of maps a member to its net,
+    # descendants maps a signal to the ( net, member ) pairs of its nested
+    # fields/slices, and slices groups the sliced members by parent.
+
+    net_of      = {}
+    descendants = defaultdict(list)
+    slices      = defaultdict(list)
+
+    for i in headless:
+      for v in nets[i]:
+        net_of[ v ] = i
+        if v.is_sliced_signal():
+          slices[ v.get_parent_object() ].append( v )
+        obj = v.get_parent_object()
+        while obj.is_signal():
+          descendants[ obj ].append( (i, v) )
+          obj = obj.get_parent_object()
 
-            obj = v.get_parent_object()
-            while obj.is_signal():
-              if obj not in writer_prop:
-                writer_prop[ obj ] = False
-              obj = obj.get_parent_object()
+    # Writers found late in the first round may have headed nets that
+    # were visited earlier, so give every headless net a second round.
+
+    changes = []
+    for i in headless:
+      resolve_net( i )
+
+    worklist = deque()
+    while True:
+      for obj, is_new, prop in changes:
+        if is_new and obj in net_of:
+          worklist.append( (net_of[ obj ], obj) )
+        if prop:
+          worklist.extend( descendants.get( obj, () ) )
+          if obj._dsl.slice is not None:
+            for sib in slices.get( obj.get_parent_object(), () ):
+              if sib is not obj and sib.slice_overlap( obj ):
+                worklist.append( (net_of[ sib ], sib) )
+      changes.clear()
+
+      if not worklist:
+        break
 
-        headed.append( (writer, net) )
+      # A net is fully rescanned only if the member really became a writer
+      i, v = worklist.popleft()
+      if writers[i] is None and is_writer( v )[0]:
+        resolve_net( i )
 
-      if wcount == len(writer_prop): # no more new writers
-        break
-      headless = new_headless
+    return headed + [ (None, nets[i]) for i in headless if writers[i] is None ]
 
-    return headed + [ (None, x) for x in headless ]
+  def _collect_value_nets( s ):
+    """ Group the connected signals and constants by their union-find
+    root. Return a list of sets. """
+
+    parent = s._dsl.net_parent
+
+    # Rebuild the forest from all_adjacency if it has been dropped
+    if parent is None:
+      parent = s._dsl.net_parent = {}
+      size   = s._dsl.net_size   = {}
+      done   = set()
+
+      for u, adjs in s._dsl.all_adjacency.items():
+        if isinstance( u, (Signal, Const) ):
+          for v in adjs:
+            if v not in done and not _net_union( parent, size, u, v ):
+              raise InvalidConnectionError(repr(v)+" is in a connection loop.")
+          done.add( u )
+
+    nets = {}
+    for x in parent:
+      r = _net_find( parent, x )
+      if r in nets: nets[r].add( x )
+      else:         nets[r] = { x }
+
+    return list( nets.values() )
+
+  def _split_value_nets( s, frontier, removed=() ):
+    """ Update the union-find forest after connections are removed from
+    all_adjacency. Only the nets that contained a removed node or one of
+    the frontier nodes (the surviving endpoints of a removed connection)
+    are rebuilt, by floodfilling all_adjacency from the frontier. """
+
+    parent = s._dsl.net_parent
+    if parent is None:
+      return
+
+    size      = s._dsl.net_size
+    adjacency = s._dsl.all_adjacency
+
+    visited = set()
+    edges   = []
+    for obj in frontier:
+      if obj not in visited:
+        visited.add( obj )
+        Q = [ obj ]
+        while Q:
+          u = Q.pop()
+          for v in adjacency.get( u, () ):
+            if v not in visited:
+              visited.add( v )
+              edges.append( (u, v) )
+              Q.append( v )
+
+    # Survivors of the old nets only point to other members of the same
+    # old nets, so it is safe to drop all of them before re-merging
+    for x in removed:
+      parent.pop( x, None )
+      size.pop( x, None )
+    for x in visited:
+      parent.pop( x, None )
+      size.pop( x, None )
+
+    for u, v in edges:
+      _net_union( parent, size, u, v )
 
   def _check_port_in_nets( s ):
     nets = s._dsl.all_value_nets
@@ -687,6 +862,7 @@ class ComponentLevel3( ComponentLevel2 ):
         assert o1 in s._dsl.all_adjacency[o2] and o2 in s._dsl.all_adjacency[o1]
         s._dsl.all_adjacency[o2].remove( o1 )
         s._dsl.all_adjacency[o1].remove( o2 )
+        s._split_value_nets( (o1, o2) )
 
         # Disconnect a const from a signal just removes the writer in the net
         signals.remove( writer )
@@ -701,6 +877,7 @@ class ComponentLevel3( ComponentLevel2 ):
     # I don't remove it from m._adjacency since they are not used later
     s._dsl.all_adjacency[o2].remove( o1 )
     s._dsl.all_adjacency[o1].remove( o2 )
+    s._split_value_nets( (o1, o2) )
 
     for i, net in enumerate( nets ):
       writer, signals = net
@@ -769,6 +946,15 @@ class ComponentLevel3( ComponentLevel2 ):
   # template in ComponentLevel2, we just need to add a bit more
   # functionalities to handle nets.
 
+  # Override
+  def _elaborate_construct( s ):
+    # connect() merges nets into this union-find forest at the top as
+    # construction goes
+    if not s._dsl.constructed:
+      s._dsl.net_parent = {}
+      s._dsl.net_size   = {}
+    super()._elaborate_construct()
+
   # Override
   def _elaborate_declare_vars( s ):
     super()._elaborate_declare_vars()
@@ -13,10 +13,28 @@ from collections import deque
 from pymtl3.datatypes import Bits, Bits1, is_bitstruct_class, mk_bits
 
 from .errors import InvalidConnectionError
-from .NamedObject import DSLMetadata, NamedObject
+from .NamedObject import NAMED_OBJECT_DSL_FIELDS, NamedObject
 from .Placeholder import Placeholder
 
 
+#-------------------------------------------------------------------------
+# Compact _dsl metadata
+#-------------------------------------------------------------------------
+# A design has far more signals, constants and method ports than
+# components and interfaces, so their _dsl uses __slots__ instead of a
+# per-instance dict. Unset fields still raise AttributeError.
+
+class SignalMetadata:
+  __slots__ = NAMED_OBJECT_DSL_FIELDS + ( "host", "Type", "type_instance",
+                                          "slice", "top_level_signal",
+                                          "needs_double_buffer" )
+
+class ConstMetadata:
+  __slots__ = ( "host", "Type", "const", "parent_obj" )
+
+class MethodPortMetadata:
+  __slots__ = NAMED_OBJECT_DSL_FIELDS + ( "host", "in_non_blocking_ifc", "is_rdy" )
+
 class Connectable:
   # I've given up maintaining adjacency list or disjoint set locally since
   # we need to easily disconnect things
@@ -114,7 +132,7 @@ def _overlap( x, y ):
 # internal class for connecting signals and constants, not named object
 class Const( Connectable ):
   def __init__( s, Type, v, parent ):
-    s._dsl = DSLMetadata()
+    s._dsl = ConstMetadata()
     s._dsl.Type = Type
     s._dsl.const = v
     s._dsl.parent_obj = parent
@@ -140,6 +158,7 @@ class Const( Connectable ):
     return False
 
 class Signal( NamedObject, Connectable ):
+  _dsl_metadata = SignalMetadata
 
   def __init__( s, Type=Bits1 ):
     if isinstance( Type, int ):
@@ -153,7 +172,6 @@ class Signal( NamedObject, Connectable ):
     s._dsl.type_instance = None
 
     s._dsl.slice  = None # None -- not a slice of some wire by default
-    s._dsl.slices = {}
     s._dsl.top_level_signal = s
 
     s._dsl.needs_double_buffer = False
@@ -268,7 +286,7 @@ class Signal( NamedObject, Connectable ):
       xd.full_name = f"{sd.full_name}{sl_str}"
 
       xd.slice       = slice( start, stop )
-      top_signal.__dict__[ sl_tuple ] = sd.slices[ sl_tuple ] = x
+      top_signal.__dict__[ sl_tuple ] = x
 
     return top_signal.__dict__[ sl_tuple ]
 
@@ -339,7 +357,8 @@ class Signal( NamedObject, Connectable ):
   def get_sibling_slices( s ):
     if s._dsl.slice:
       parent = s.get_parent_object()
-      ret = list(parent._dsl.slices.values())
+      # Slices are stored in the parent's __dict__ with ( start, stop )
+      ret = [ x for k, x in parent.__dict__.items() if isinstance( k, tuple ) ]
       ret.remove( s )
       return ret
     return []
@@ -415,6 +434,7 @@ class Interface( NamedObject, Connectable ):
 # CalleePort exposes the method in the component to outside world
 
 class MethodPort( NamedObject, Connectable ):
+  _dsl_metadata = MethodPortMetadata
 
   def construct( self, *args, **kwargs ):
     raise NotImplementedError("You can only instantiate Caller/CalleePort.")
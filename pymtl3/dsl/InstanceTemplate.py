@@ -0,0 +1,159 @@
+"""
+========================================================================
+InstanceTemplate.py
+========================================================================
+Shared elaboration of structurally identical instances, i.e. instances
+of the same component class constructed with the same arguments, such
+as the tiles of a mesh.
+
+The first instance of each class/arguments resolves the names read,
+written and called in its update blocks and functions as usual. The
+resolved objects are then recorded as paths relative to the instance,
+e.g. ( "in_", 2, "a", slice(0,4) ) for s.in_[2].a[0:4]. The other
+instances only walk these paths to bind their own objects, skipping the
+closure lookups, index expansion and assignment checks.
+
+Every instance still runs its own construct() because it creates the
+objects and the update block closures of that instance.
+
+The sharing assumes that construct() only depends on the class and the
+arguments, so it is disabled unless PYMTL_SHARE_ELABORATION is set to a
+non-zero value or set_enabled( True ) is called. An instance whose
+update blocks/functions don't match the template falls back to the
+normal resolution.
+
+Date   : Oct 17, 2026
+"""
+import os
+
+from .Connectable import Signal
+from .NamedObject import NamedObject
+
+_enabled = os.environ.get( "PYMTL_SHARE_ELABORATION", "0" ) not in ( "", "0" )
+
+hits   = 0
+misses = 0
+
+def set_enabled( enabled ):
+  global _enabled
+  _enabled = bool( enabled )
+
+def is_enabled():
+  return _enabled
+
+def instance_key( c ):
+  """ Return the key of structurally identical instances of c, or None
+  if the construction arguments are not hashable. """
+  d = c._dsl
+  try:
+    key = ( c.__class__, d.args, tuple( sorted( d.kwargs.items() ) ) )
+    hash( key )
+  except TypeError:
+    return None
+  return key
+
+def _get_path( c, obj ):
+  steps = []
+  while obj is not c:
+    d = obj._dsl
+    if isinstance( obj, Signal ) and d.slice is not None:
+      steps.append( d.slice )
+    else:
+      if d._my_indices:
+        steps.extend( reversed( d._my_indices ) )
+      steps.append( d._my_name )
+    obj = d.parent_obj
+  steps.reverse()
+  return tuple( steps )
+
+def _record_objs( c, objs ):
+  ret = []
+  for obj in objs:
+    if isinstance( obj, NamedObject ):
+      ret.append( ( obj.__class__, _get_path( c, obj ) ) )
+    else: # a function called by name
+      ret.append( ( None, obj.__name__ ) )
+  return ret
+
+def record( c ):
+  """ Return the template of c's resolved reads/writes/calls, or None if
+  some object cannot be reached from c. """
+  d = c._dsl
+  try:
+    funcs = { name: ( _record_objs( c, d.func_reads [ func ] ),
+                      _record_objs( c, d.func_writes[ func ] ),
+                      _record_objs( c, d.func_calls [ func ] ) )
+              for name, func in d.name_func.items() }
+    upblks = { name: ( _record_objs( c, d.upblk_reads [ blk ] ),
+                       _record_objs( c, d.upblk_writes[ blk ] ),
+                       _record_objs( c, d.upblk_calls [ blk ] ) )
+               for name, blk in d.name_upblk.items() }
+  except AttributeError:
+    return None
+  return funcs, upblks
+
+def _bind_objs( c, entries ):
+  name_func = c._dsl.name_func
+  ret = set()
+  for cls, path in entries:
+    if cls is None:
+      ret.add( name_func[ path ] )
+      continue
+
+    obj = c
+    for step in path:
+      if step.__class__ is str:
+        obj = getattr( obj, step )
+      else: # list index or slice
+        obj = obj[ step ]
+
+    if obj.__class__ is not cls:
+      raise TypeError()
+    ret.add( obj )
+  return ret
+
+def bind( c, template ):
+  """ Fill in c's reads/writes/calls from the template. Return False if
+  c doesn't match the template. """
+  global hits, misses
+
+  d = c._dsl
+  funcs, upblks = template
+  if d.name_func.keys() != funcs.keys() or d.name_upblk.keys() != upblks.keys():
+    misses += 1
+    return False
+
+  try:
+    func_reads  = {}
+    func_writes = {}
+    func_calls  = {}
+    for name, func in d.name_func.items():
+      rd, wr, fc = funcs[ name ]
+      func_reads [ func ] = _bind_objs( c, rd )
+      func_writes[ func ] = _bind_objs( c, wr )
+      func_calls [ func ] = _bind_objs( c, fc )
+
+    upblk_reads  = {}
+    upblk_writes = {}
+    upblk_calls  = {}
+    for name, blk in d.name_upblk.items():
+      rd, wr, fc = upblks[ name ]
+      upblk_reads [ blk ] = _bind_objs( c, rd )
+      upblk_writes[ blk ] = _bind_objs( c, wr )
+      upblk_calls [ blk ] = _bind_objs( c, fc )
+
+  except ( AttributeError, IndexError, KeyError, TypeError, AssertionError ):
+    misses += 1
+    return False
+
+  # The writes of update_ff blocks have passed the checks on the first
+  # instance, so they are top level signals that need double buffering.
+  for blk in d.update_ff:
+    for obj in upblk_writes[ blk ]:
+      obj._dsl.needs_double_buffer = True
+
+  d.func_reads,  d.func_writes,  d.func_calls  = func_reads,  func_writes,  func_calls
+  d.upblk_reads, d.upblk_writes, d.upblk_calls = upblk_reads, upblk_writes, upblk_calls
+
+  hits += 1
+  return True
@@ -27,6 +27,15 @@ from .errors import FieldReassignError, NotElaboratedError
 class DSLMetadata:
   pass
 
+# The _dsl fields that NamedObject itself maintains. Classes with many
+# instances such as signals use a compact metadata class whose __slots__
+# are these fields plus their own instead of DSLMetadata.
+NAMED_OBJECT_DSL_FIELDS = (
+  "args", "kwargs", "constructed", "param_tree", "parent_obj", "level",
+  "_my_name", "my_name", "full_name", "_my_indices", "NamedObject_fields",
+  "elaborate_top",
+)
+
 # Special data structure for constructing the parameter tree.
 class ParamTreeNode:
   def __init__( self ):
@@ -99,10 +108,13 @@ class ParamTreeNode:
 
 class NamedObject:
 
+  # The class of _dsl, see NAMED_OBJECT_DSL_FIELDS
+  _dsl_metadata = DSLMetadata
+
   def __new__( cls, *args, **kwargs ):
 
     inst = super().__new__( cls )
-    inst._dsl = DSLMetadata() # TODO an actual object?
+    inst._dsl = cls._dsl_metadata()
 
     # Save parameters for elaborate
 
@@ -151,7 +163,9 @@ class NamedObject:
       # for common cases.
       if isinstance( obj, NamedObject ):
         fields = sd.NamedObject_fields
-        if name in fields:
+        if fields is None:
+          fields = sd.NamedObject_fields = set()
+        elif name in fields:
           if getattr( s, name ) is obj:
             return
           raise FieldReassignError(f"The attempt to assign hardware construct to field {name} is illegal:\n"
@@ -185,7 +199,9 @@ class NamedObject:
                     ud.param_tree = ParamTreeNode()
                   ud.param_tree.merge( node )
 
-        ud.NamedObject_fields = set()
+        # Lazily created because most named objects, e.g. signals, have
+        # no named children
+        ud.NamedObject_fields = None
 
         # Point u's top to my top
         top = ud.elaborate_top = sd.elaborate_top
@@ -201,7 +217,9 @@ class NamedObject:
 
       elif isinstance( obj, list ) and obj and isinstance( obj[0], (NamedObject, list) ):
         fields = sd.NamedObject_fields
-        if name in fields:
+        if fields is None:
+          fields = sd.NamedObject_fields = set()
+        elif name in fields:
           if getattr( s, name ) is obj:
             return
           raise FieldReassignError(f"The attempt to assign hardware construct to field {name} is illegal:\n"
@@ -242,7 +260,7 @@ class NamedObject:
                         ud.param_tree = ParamTreeNode()
                       ud.param_tree.merge( node )
 
-            ud.NamedObject_fields = set()
+            ud.NamedObject_fields = None
 
             # Point u's top to my top
             top = ud.elaborate_top = sd.elaborate_top
@@ -371,7 +389,7 @@ class NamedObject:
     s._dsl.my_name       = "s"
     s._dsl.full_name     = "s"
     s._dsl.elaborate_top = s
-    s._dsl.NamedObject_fields = set()
+    s._dsl.NamedObject_fields = None
 
     # Secret sauce for letting the child know the field name of itself
     # -- override setattr for elaboration, and remove it afterwards
@@ -255,6 +255,13 @@ class NotElaboratedError( Exception ):
     return super().__init__( \
     "Please elaborate the model first." )
 
+class ReleasedMetadataError( Exception ):
+  """ Raise when elaborating a model whose elaboration metadata is released """
+  def __init__( self ):
+    return super().__init__( \
+    "The elaboration metadata of this model has been released after "
+    "lock_in_simulation. Please create a new instance of the model." )
+
 class InvalidAPICallError( Exception ):
   """ Raise when processing a model that hasn't been elaborated yet """
   def __init__( self, api_name, obj, top ):
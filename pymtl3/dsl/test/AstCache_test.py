@@ -0,0 +1,87 @@
+"""
+========================================================================
+AstCache_test.py
+========================================================================
+
+Date   : Oct 17, 2026
+"""
+import importlib.util
+import os
+
+import pytest
+
+from pymtl3.dsl import AstCache
+
+SRC = """
+from pymtl3 import *
+
+class Foo( Component ):
+  def construct( s ):
+    s.in_ = InPort( 8 )
+    s.out = OutPort( 8 )
+    s.a   = Wire( 8 )
+    s.b   = Wire( 8 )
+
+    @update
+    def up_w():
+      s.a @= s.in_
+      s.b @= s.in_ + 1
+
+    @update_ff
+    def up_out():
+      s.out <<= {}
+"""
+
+@pytest.fixture
+def cache_dir( tmp_path ):
+  old = AstCache.get_cache_dir()
+  AstCache.set_cache_dir( str(tmp_path / "cache") )
+  yield str(tmp_path / "cache")
+  AstCache.set_cache_dir( old )
+
+def _load( path, upblk_expr ):
+  with open( path, "w" ) as f:
+    f.write( SRC.format( upblk_expr ) )
+  spec = importlib.util.spec_from_file_location( "ast_cache_foo", path )
+  mod  = importlib.util.module_from_spec( spec )
+  spec.loader.exec_module( mod )
+
+  # Drop the per-process caches to emulate a new process
+  AstCache._source_files.clear()
+  return mod.Foo
+
+def _elaborate( cls ):
+  hits, misses = AstCache.hits, AstCache.misses
+  top = cls()
+  top.elaborate()
+  reads, writes, _ = top.get_all_upblk_metadata()
+  ret = { blk.__name__: ( sorted( map( repr, reads[blk] ) ),
+                          sorted( map( repr, writes[blk] ) ) )
+          for blk in top.get_all_update_blocks() }
+  return ret, AstCache.hits - hits, AstCache.misses - misses
+
+def test_ast_cache( tmp_path, cache_dir ):
+  path = str(tmp_path / "foo.py")
+
+  ref, hits, misses = _elaborate( _load( path, "s.a" ) )
+  assert (hits, misses) == (0, 2)
+  assert len( os.listdir( cache_dir ) ) == 1
+
+  ret, hits, misses = _elaborate( _load( path, "s.a" ) )
+  assert (hits, misses) == (2, 0)
+  assert ret == ref
+
+  # Changing the source file invalidates its entries
+  ret, hits, misses = _elaborate( _load( path, "s.b + 1" ) )
+  assert (hits, misses) == (0, 2)
+  assert ret["up_out"] == ( ["s.b"], ["s.out"] )
+  assert len( os.listdir( cache_dir ) ) == 1
+
+def test_ast_cache_disabled( tmp_path ):
+  old = AstCache.get_cache_dir()
+  AstCache.set_cache_dir( None )
+  try:
+    _, hits, misses = _elaborate( _load( str(tmp_path / "foo.py"), "s.a" ) )
+    assert (hits, misses) == (0, 0)
+  finally:
+    AstCache.set_cache_dir( old )
@@ -405,6 +405,80 @@ def test_connect_upblk_orders():
   assert u[1].__name__ == "up_ff"
   assert u[2].__name__ == "up_out2"
 
+def test_get_all_objects_of_type():
+
+  class Inner( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+      connect( s.in_, s.out )
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.w   = Wire( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.inner = Inner()
+      connect( s.in_, s.inner.in_ )
+      connect( s.inner.out, s.w )
+      connect( s.w, s.out )
+
+  a = Top()
+  a.elaborate()
+
+  for T in ( Component, InPort, OutPort, Wire, (InPort, OutPort) ):
+    assert a.get_all_objects_of_type( T ) == \
+           a.get_all_object_filter( lambda x: isinstance( x, T ) )
+
+  assert a.get_all_objects_of_type( OutPort, host=a.inner ) == { a.inner.out }
+  assert a.get_all_objects_of_type( InPort, host=a ) == { a.in_, a.clk, a.reset }
+
+  a.replace_component( a.inner, Inner )
+  assert a.get_all_objects_of_type( InPort ) == \
+         a.get_all_object_filter( lambda x: isinstance( x, InPort ) )
+  assert a.get_all_objects_of_type( OutPort, host=a.inner ) == { a.inner.out }
+
+def test_compact_signal_metadata():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits16 )
+      s.out //= s.in_[0:16]
+      s.lo  = OutPort( Bits8 )
+      s.lo  //= s.in_[16:24]
+      s.c   = OutPort( Bits8 )
+      s.c   //= 3
+
+  a = Top()
+  a.elaborate()
+
+  for x in a.get_all_object_filter( lambda x: isinstance( x, (InPort, OutPort) ) ):
+    assert not hasattr( x._dsl, "__dict__" )
+  const, = [ w for w, net in a.get_all_value_nets() if a.c in net ]
+  assert not hasattr( const._dsl, "__dict__" )
+
+  assert a.in_._dsl.NamedObject_fields is None
+  assert a.in_[0:16].get_sibling_slices() == [ a.in_[16:24] ]
+  assert a.in_[16:24].get_sibling_slices() == [ a.in_[0:16] ]
+
+def test_replace_component_keeps_net_forest():
+
+  foo_wrap = Foo_shamt_list_wrap( 32 )
+  foo_wrap.elaborate()
+
+  for i in range(5):
+    foo_wrap.replace_component( foo_wrap.inner[i], Real_shamt )
+
+  # Only the nets that lost a member are rebuilt in the forest
+  assert foo_wrap._dsl.net_parent is not None
+  nets = sorted( sorted( repr(x) for x in net ) for _, net in foo_wrap.get_all_value_nets() )
+
+  foo_wrap._dsl.net_parent = None
+  foo_wrap._dsl._has_pending_value_connections = True
+  assert nets == sorted( sorted( repr(x) for x in net ) for _, net in foo_wrap.get_all_value_nets() )
+  assert len(nets) == 8
+
 # def test_garbage_collection():
 
   # class X( Component ):
@@ -1028,3 +1028,58 @@ def test_slice_over_slice():
   a = A()
   a.elaborate()
   assert str(a._dsl.connect_order) == "[(s.out, s.in_[20:28])]"
+
+def test_connection_loop():
+
+  class Top( ComponentLevel3 ):
+    def construct( s ):
+      s.x = Wire( Bits8 )
+      s.y = Wire( Bits8 )
+      s.z = Wire( Bits8 )
+      connect( s.x, s.y )
+      connect( s.y, s.z )
+      connect( s.z, s.x )
+
+  a = Top()
+  try:
+    a.elaborate()
+  except InvalidConnectionError as e:
+    print(e)
+    return
+  raise Exception("Should've thrown InvalidConnectionError")
+
+def test_writer_propagates_through_struct_and_slice_chain():
+
+  @bitstruct
+  class SomeMsg:
+    a: Bits8
+    b: Bits32
+
+  class Top( ComponentLevel3 ):
+    def construct( s, n ):
+      s.in_ = InPort( SomeMsg )
+      s.w = [ Wire( SomeMsg ) for _ in range(n) ]
+      s.v = [ Wire( Bits8 ) for _ in range(n) ]
+      s.out = OutPort( Bits8 )
+
+      # Connect the chain backwards so that every net only gets its
+      # writer after the net before it is resolved.
+      connect( s.out, s.v[n-1] )
+      for i in reversed(range(1, n)):
+        connect( s.w[i].a, s.v[i-1] )
+        connect( s.w[i].b[0:8], s.v[i-1] )
+        connect( s.v[i], s.w[i].b[4:12] )
+      connect( s.w[0], s.in_ )
+      connect( s.v[0], s.w[0].a )
+
+  a = Top( 8 )
+  a.elaborate()
+
+  for writer, net in a.get_all_value_nets():
+    assert writer is not None
+    if a.out in net:
+      assert writer is a.w[7].b[4:12]
+    if a.w[3].a in net:
+      assert writer is a.w[2].b[4:12]
+    if a.v[0] in net:
+      assert writer is a.w[0].a
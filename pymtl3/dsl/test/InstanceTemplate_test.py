@@ -0,0 +1,135 @@
+"""
+========================================================================
+InstanceTemplate_test.py
+========================================================================
+
+Date   : Oct 17, 2026
+"""
+import pytest
+
+from pymtl3.datatypes import Bits8, Bits32, bitstruct
+from pymtl3.dsl import (
+    Component,
+    InPort,
+    InstanceTemplate,
+    OutPort,
+    Wire,
+    update,
+    update_ff,
+)
+
+
+@bitstruct
+class Pkt:
+  a: Bits8
+  b: Bits32
+
+def total( ports ):
+  ret = Bits8(0)
+  for p in ports:
+    ret = ret + p.a
+  return ret
+
+class Tile( Component ):
+  def construct( s, n ):
+    s.in_ = [ InPort( Pkt ) for _ in range(n) ]
+    s.out = OutPort( Bits8 )
+    s.w   = Wire( Bits8 )
+    s.acc = OutPort( Bits32 )
+
+    @s.func
+    def lo( x ):
+      return x[0:8]
+
+    @update
+    def up_w():
+      s.w @= total( s.in_ ) + lo( s.acc[4:20] )
+
+    @update
+    def up_out():
+      s.out @= s.w
+
+    @update_ff
+    def up_acc():
+      s.acc <<= s.acc + 1
+
+class Mesh( Component ):
+  def construct( s, ntiles, n ):
+    s.in_   = InPort( Pkt )
+    s.out   = OutPort( Bits8 )
+    s.tiles = [ Tile( n ) for _ in range(ntiles) ]
+    for t in s.tiles:
+      for i in range(n):
+        t.in_[i] //= s.in_
+    s.out //= s.tiles[-1].out
+
+@pytest.fixture
+def shared():
+  old = InstanceTemplate.is_enabled()
+  InstanceTemplate.set_enabled( True )
+  yield
+  InstanceTemplate.set_enabled( old )
+
+def _metadata( top ):
+  reads, writes, calls = top.get_all_upblk_metadata()
+  return { repr(top.get_update_block_host_component(blk)) + "." + blk.__name__:
+            ( sorted( map( repr, reads[blk] ) ), sorted( map( repr, writes[blk] ) ) )
+           for blk in top.get_all_update_blocks() }
+
+def test_shared_elaboration_same_metadata( shared ):
+  hits = InstanceTemplate.hits
+  a = Mesh( 4, 3 )
+  a.elaborate()
+  assert InstanceTemplate.hits - hits == 3
+
+  InstanceTemplate.set_enabled( False )
+  b = Mesh( 4, 3 )
+  b.elaborate()
+
+  assert _metadata( a ) == _metadata( b )
+  for t in a.tiles:
+    assert t.acc._dsl.needs_double_buffer
+
+def test_shared_elaboration_different_args( shared ):
+
+  class Top( Component ):
+    def construct( s ):
+      s.t = [ Tile( 1 ), Tile( 2 ), Tile( 1 ) ]
+
+  hits = InstanceTemplate.hits
+  a = Top()
+  a.elaborate()
+  assert InstanceTemplate.hits - hits == 1
+  assert len( a.t[1].get_upblk_metadata()[0][ a.t[1]._dsl.name_upblk['up_w'] ] ) == 3
+
+def test_shared_elaboration_mismatch_falls_back( shared ):
+  count = [0]
+
+  class Odd( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits8 )
+      count[0] += 1
+
+      if count[0] % 2:
+        @update
+        def up_a():
+          s.out @= s.in_
+      else:
+        @update
+        def up_b():
+          s.out @= s.in_ + 1
+
+  class Top( Component ):
+    def construct( s ):
+      s.t = [ Odd() for _ in range(3) ]
+
+  misses = InstanceTemplate.misses
+  a = Top()
+  a.elaborate()
+  assert InstanceTemplate.misses - misses == 1
+
+  reads, writes, _ = a.get_all_upblk_metadata()
+  for t in a.t:
+    blk, = t.get_update_blocks()
+    assert reads[blk] == { t.in_ } and writes[blk] == { t.out }
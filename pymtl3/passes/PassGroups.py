@@ -1,14 +1,22 @@
+from pymtl3.dsl import CalleePort
+from pymtl3.dsl.errors import ReleasedMetadataError
+
 from .autotick.OpenLoopCLPass import OpenLoopCLPass
 from .BasePass import BasePass
+from .mamba.UpblkFusionPass import UpblkFusionPass
 from .sim.DynamicSchedulePass import DynamicSchedulePass
+from .sim.EventDrivenSchedulePass import EventDrivenSchedulePass
 from .sim.GenDAGPass import GenDAGPass
+from .sim.PartitionedSimPass import PartitionedSimPass
 from .sim.PrepareSimPass import PrepareSimPass
+from .sim.SimOptimizePass import SimOptimizePass
 from .sim.SimpleSchedulePass import SimpleSchedulePass
 from .sim.SimpleTickPass import SimpleTickPass
 from .sim.WrapGreenletPass import WrapGreenletPass
 from .tracing.CLLineTracePass import CLLineTracePass
 from .tracing.LineTraceParamPass import LineTraceParamPass
 from .tracing.PrintTextWavePass import PrintTextWavePass
+from .tracing.UpblkProfilePass import UpblkProfilePass
 from .tracing.VcdGenerationPass import VcdGenerationPass
 
 
@@ -27,31 +35,112 @@ class SimpleSimPass( BasePass ):
 
 class DefaultPassGroup( BasePass ):
   def __init__( s, *, vcdwave=None, textwave=False,
-                      print_line_trace=True, reset_active_high=True ):
+                      print_line_trace=True, reset_active_high=True,
+                      fast_forward=False, cache_dir=None,
+                      upblk_profile=False, sim_stats=False,
+                      sim_optimize=False, fuse_upblks=False,
+                      release_metadata=False ):
 
     s.vcdwave = vcdwave
     s.textwave = textwave
     s.print_line_trace = print_line_trace
     s.reset_active_high = reset_active_high
+    s.fast_forward = fast_forward
+    s.cache_dir = cache_dir
+    s.upblk_profile = upblk_profile
+    s.sim_stats = sim_stats
+    s.sim_optimize = sim_optimize
+    s.fuse_upblks = fuse_upblks
+    s.release_metadata = release_metadata
 
   def __call__( s, top ):
 
+    # Applying the pass group again, e.g. after the design is mutated
+    if hasattr( top, "_sim" ):
+      s.revert( top )
+
     if s.vcdwave:
       top.set_metadata( VcdGenerationPass.vcdwave, s.vcdwave )
 
     if s.textwave:
       top.set_metadata( PrintTextWavePass.enable, True )
 
+    if s.cache_dir:
+      top.set_metadata( GenDAGPass.cache_dir, s.cache_dir )
+
+    if s.upblk_profile:
+      top.set_metadata( UpblkProfilePass.enable, True )
+
+    if s.sim_optimize:
+      top.set_metadata( SimOptimizePass.enable, True )
+      top.set_metadata( SimOptimizePass.line_trace, s.print_line_trace )
+
+    if s.fuse_upblks:
+      top.set_metadata( UpblkFusionPass.enable, True )
+
     LineTraceParamPass()( top )
     GenDAGPass()( top )
+    SimOptimizePass()( top )
     WrapGreenletPass()( top )
     CLLineTracePass()( top )
     DynamicSchedulePass()( top )
+    UpblkFusionPass()( top )
     VcdGenerationPass()( top )
     PrintTextWavePass()( top )
+    UpblkProfilePass()( top )
 
     PrepareSimPass(print_line_trace=s.print_line_trace,
-                   reset_active_high=s.reset_active_high)( top )
+                   reset_active_high=s.reset_active_high,
+                   fast_forward=s.fast_forward,
+                   collect_stats=s.sim_stats,
+                   release_metadata=s.release_metadata)( top )
+
+  # Attributes that the passes add to the top component
+  _sim_attrs = [ "_sim", "_sched", "_profile",
+                 "sim_eval_combinational", "sim_tick", "sim_reset",
+                 "sim_cycle_count", "print_line_trace",
+                 "lock_in_simulation", "unlock_simulation",
+                 "sim_save_checkpoint", "sim_restore_checkpoint",
+                 "sim_fast_forward", "sim_stats", "print_textwave",
+                 "upblk_profile_report", "print_upblk_profile", "dump_upblk_profile" ]
+
+  @staticmethod
+  def revert( top ):
+    """ Undo the simulation set up by a previous application so that the
+    design can be mutated with replace_component, add_connection, etc.
+    This has to be called before the mutation. Applying the pass group
+    again only regenerates the net blocks, implicit constraints and SCC
+    blocks for the part of the design that changed. """
+
+    if not hasattr( top, "_sim" ):
+      return
+
+    if getattr( top._dsl, "metadata_released", False ):
+      raise ReleasedMetadataError()
+
+    if getattr( top._sim, "locked_simulation", False ):
+      top.unlock_simulation()
+
+    # Unwrap the methods counted by the fast-forward and the callee
+    # methods wrapped by CLLineTracePass, and disconnect the method net
+    # members connected by GenDAGPass
+    for mport, method in reversed( getattr( top._sim, "counted_methods", [] ) ):
+      mport.method = method
+
+    for mport in top.get_all_objects_of_type( CalleePort ):
+      if "raw_method" in mport.__dict__:
+        mport.method = mport.raw_method
+        del mport.raw_method
+
+    for mport in getattr( top._dag, "net_method_ports", [] ):
+      mport.method = None
+
+    for key in [ CLLineTracePass.clear_cl_trace_func, VcdGenerationPass.vcd_func,
+                 PrintTextWavePass.textwave_func, PrintTextWavePass.textwave_dict ]:
+      top._metadata.pop( key, None )
+
+    for name in DefaultPassGroup._sim_attrs:
+      top.__dict__.pop( name, None )
 
 class AutoTickSimPass( BasePass ):
   def __init__( s, print_line_trace=True ):
@@ -11,7 +11,7 @@ Author : Shunning Jiang
 Date   : Jul 5, 2020
 """
 
-from pymtl3.dsl import Component, InPort, MetadataKey, OutPort
+from pymtl3.dsl import Component, InPort, MetadataKey, OutPort, Signal
 from pymtl3.passes.BasePass import BasePass
 
 
@@ -27,8 +27,8 @@ class AddDebugSignalPass( BasePass ):
       assert '[' not in name, "Currently don't support any array of components"
       s_signal_names.append( f"s{name[3:]}")
 
-    signals = sorted( top.get_all_object_filter( lambda x: repr(x) in s_signal_names ),
-                      key=repr )
+    signals = sorted( [ x for x in top.get_all_objects_of_type( Signal )
+                        if repr(x) in s_signal_names ], key=repr )
 
     for i, signal in enumerate( signals ):
       debug_pin_name = f"debug_{i}"
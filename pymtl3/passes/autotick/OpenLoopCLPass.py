@@ -50,11 +50,9 @@ class OpenLoopCLPass( BasePass ):
     E = set()
 
     # We collect all top level callee ports/nonblocking callee interfaces
-    top_level_callee_ports = top.get_all_object_filter(
-      lambda x: isinstance(x, CalleePort) and x.get_host_component() is top )
+    top_level_callee_ports = top.get_all_objects_of_type( CalleePort, host=top )
 
-    top_level_nb_ifcs = top.get_all_object_filter(
-      lambda x: isinstance(x, CalleeIfcCL) and x.get_host_component() is top )
+    top_level_nb_ifcs = top.get_all_objects_of_type( CalleeIfcCL, host=top )
 
     method_callee_mapping = {}
     method_guard_mapping  = {}
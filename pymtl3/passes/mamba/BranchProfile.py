@@ -0,0 +1,251 @@
+"""
+========================================================================
+BranchProfile.py
+========================================================================
+Static and profiled branchiness of update blocks.
+
+CountBranchesLoops counts the branches of an update block in its AST.
+A BranchProfile records for the same branches how often each way was
+taken during simulation, together with the number of calls and executed
+lines of every block. A branch that always goes the same way doesn't
+break a trace, so the profiled branchiness only counts the branches
+that went both ways.
+
+BranchProfiler collects a BranchProfile with sys.settrace by counting
+the line events of the test and the first statement of each branch.
+
+Date   : Oct 17, 2026
+"""
+import ast
+import json
+import sys
+from collections import defaultdict
+
+# Shunning feb-14-2020: This CountBranchesLoops is enhanced to recognize
+# if a block only has loop at the top. So we found that a loop actually
+# trace-breaks itselfs by calling call_assembler_r and return after the
+# execution is complete. This means loops are totally different from
+# branches.
+
+class CountBranchesLoops( ast.NodeVisitor ):
+
+  def enter( self, node ):
+    self.num_br = 0
+    self.branches = [] # the If/IfExp nodes we count, in order
+    self.loop_stack = 0
+    self.only_loop_at_top = False
+    self.visit( node )
+    return self.num_br, self.only_loop_at_top
+
+  def visit_FunctionDef( self, node ):
+    for stmt in node.body:
+      self.only_loop_at_top |= isinstance( stmt, (ast.For, ast.While) )
+
+    for stmt in node.body:
+      self.visit( stmt )
+
+    if node.returns:
+      for expr in node.returns:
+        self.visit( expr )
+
+  def visit_If( self, node ):
+    self.only_loop_at_top &= (self.loop_stack > 0)
+
+    # Special case "if s.reset:" -- it's only high for a cycle
+    if isinstance( node.test, ast.Attribute ) and \
+       node.test.attr == 'reset' and \
+       isinstance( node.test.value, ast.Name ) and \
+       node.test.value.id == 's':
+      pass
+    else:
+      self.num_br += 1
+      self.branches.append( node )
+    self.visit( node.test )
+
+    for stmt in node.body:
+      self.visit( stmt )
+
+    for stmt in node.orelse:
+      self.visit( stmt )
+
+  def visit_IfExp( self, node ):
+    self.only_loop_at_top &= (self.loop_stack > 0)
+
+    # Special case "if s.reset:" -- it's only high for a cycle
+    if isinstance( node.test, ast.Attribute ) and \
+       node.test.attr == 'reset' and \
+       isinstance( node.test.value, ast.Name ) and \
+       node.test.value.id == 's':
+      pass
+    else:
+      self.num_br += 1
+      self.branches.append( node )
+
+    self.visit( node.test )
+    self.visit( node.body )
+    self.visit( node.orelse )
+
+  # For/while is fine
+  def visit_For( self, node ):
+    self.loop_stack += 1
+    # self.num_br += 0
+    for stmt in node.body:
+      self.visit( stmt )
+    self.loop_stack -= 1
+
+  def visit_While( self, node ):
+    self.loop_stack += 1
+    # self.num_br += 0
+    for stmt in node.body:
+      self.visit( stmt )
+    self.loop_stack -= 1
+
+def block_name( hostobj, blk ):
+  """ Name an update block in a profile. Instances of the same class
+  share the source of their update blocks, so they share the record. """
+  cls = type( hostobj )
+  return f"{cls.__module__}.{cls.__qualname__}:{blk.__name__}"
+
+def branch_lines( branches, first_line ):
+  """ Map each branch node to the source lines of its test and of the
+  first statement of its body, or None if line events cannot tell the
+  two ways apart: conditional expressions, one-line ifs, tests spanning
+  several lines, and bodies starting with a loop whose header line is
+  hit once per iteration. first_line is the line number of the first
+  line of the parsed source. """
+  ret = []
+  for node in branches:
+    if isinstance( node, ast.If ):
+      body = node.body[0]
+      if node.test.end_lineno == node.lineno and body.lineno > node.lineno and \
+         not isinstance( body, (ast.For, ast.While) ):
+        ret.append( ( first_line + node.lineno - 1, first_line + body.lineno - 1 ) )
+        continue
+    ret.append( None )
+  return ret
+
+#-------------------------------------------------------------------------
+# BranchProfile
+#-------------------------------------------------------------------------
+
+class BranchProfile:
+  """ Profile of the update blocks of one design. blocks maps the block
+  name to { "calls": int, "lines": int, "branches": [ [taken, not_taken]
+  or None for each branch counted by CountBranchesLoops ] }. """
+
+  VERSION = 1
+
+  # A branch breaks the trace if it goes its less frequent way in at
+  # least this fraction of its executions
+  mixed_ratio = 0.01
+
+  def __init__( s, key, cycles=0, blocks=None ):
+    s.key    = key
+    s.cycles = cycles
+    s.blocks = {} if blocks is None else blocks
+
+  @classmethod
+  def load( cls, filename, key ):
+    """ Return the profile in filename if it was recorded for the design
+    with the given key, otherwise None. """
+    try:
+      with open( filename ) as f:
+        data = json.load( f )
+    except (OSError, ValueError):
+      return None
+
+    if not isinstance( data, dict ) or data.get( "version" ) != cls.VERSION or \
+       data.get( "key" ) != key:
+      return None
+    return cls( key, data[ "cycles" ], data[ "blocks" ] )
+
+  def dump( s, filename ):
+    with open( filename, "w" ) as f:
+      json.dump( { "version": s.VERSION, "key": s.key, "cycles": s.cycles,
+                   "blocks": s.blocks }, f, indent=1, sort_keys=True )
+
+  def branchiness( s, name ):
+    """ Return the number of branches of the block that went both ways,
+    or None if the block is not in the profile. Branches we could not
+    observe count as branchy. """
+    record = s.blocks.get( name )
+    if record is None:
+      return None
+
+    ret = 0
+    for branch in record[ "branches" ]:
+      if branch is None:
+        ret += 1
+      else:
+        taken, not_taken = branch
+        minor = min( taken, not_taken )
+        if minor > 0 and minor >= s.mixed_ratio * ( taken + not_taken ):
+          ret += 1
+    return ret
+
+  def cost( s, name ):
+    """ Return the average number of lines the block executes per call,
+    which roughly tracks the length of its trace. """
+    record = s.blocks.get( name )
+    if not record or not record[ "calls" ]:
+      return 0
+    return record[ "lines" ] / record[ "calls" ]
+
+#-------------------------------------------------------------------------
+# BranchProfiler
+#-------------------------------------------------------------------------
+
+class BranchProfiler:
+  """ Count the calls, executed lines and branch outcomes of update blocks
+  in the functions called through run(). Update blocks of different
+  instances share one code object, so they also share one record. """
+
+  def __init__( s ):
+    s.codes  = {} # code -> [ calls, { line: count } ]
+    s.blocks = {} # name -> ( code, branch lines )
+
+  def add_block( s, name, blk, first_line, branches ):
+    code = blk.__code__
+    if code not in s.codes:
+      s.codes[ code ] = [ 0, defaultdict(int) ]
+    s.blocks[ name ] = ( code, branch_lines( branches, first_line ) )
+
+  def _trace_call( s, frame, event, arg ):
+    record = s.codes.get( frame.f_code )
+    if record is None:
+      return None
+
+    record[0] += 1
+    lines = record[1]
+
+    def trace_line( frame, event, arg ):
+      if event == 'line':
+        lines[ frame.f_lineno ] += 1
+      return trace_line
+    return trace_line
+
+  def run( s, func ):
+    prev = sys.gettrace()
+    sys.settrace( s._trace_call )
+    try:
+      func()
+    finally:
+      sys.settrace( prev )
+
+  def profile( s, key, cycles ):
+    blocks = {}
+    for name, ( code, br_lines ) in s.blocks.items():
+      calls, lines = s.codes[ code ]
+
+      branches = []
+      for x in br_lines:
+        if x is None:
+          branches.append( None )
+        else:
+          test, body = x
+          taken = lines.get( body, 0 )
+          branches.append( [ taken, max( 0, lines.get( test, 0 ) - taken ) ] )
+
+      blocks[ name ] = { "calls": calls, "lines": sum( lines.values() ), "branches": branches }
+
+    return BranchProfile( key, cycles, blocks )
@@ -7,93 +7,17 @@ Author : Shunning Jiang
 Date   : Feb 14, 2020
 """
 
-import ast
 from queue import PriorityQueue
 
 from ..BasePass import BasePass, PassMetadata
 from ..errors import PassOrderError
 from ..sim.SimpleSchedulePass import SimpleSchedulePass, check_schedule
-from .UnrollSimPass import UnrollSimPass
+from .BranchProfile import CountBranchesLoops
+from .ProfileGuidedSimPass import ProfileGuidedSimPass
 
 # FIXME also apply branchiness to all update_ff blocks
 
-# Shunning feb-14-2020: This CountBranchesLoops is enhanced to recognize
-# if a block only has loop at the top. So we found that a loop actually
-# trace-breaks itselfs by calling call_assembler_r and return after the
-# execution is complete. This means loops are totally different from
-# branches.
-
-class CountBranchesLoops( ast.NodeVisitor ):
-
-  def enter( self, node ):
-    self.num_br = 0
-    self.loop_stack = 0
-    self.only_loop_at_top = False
-    self.visit( node )
-    return self.num_br, self.only_loop_at_top
-
-  def visit_FunctionDef( self, node ):
-    for stmt in node.body:
-      self.only_loop_at_top |= isinstance( stmt, (ast.For, ast.While) )
-
-    for stmt in node.body:
-      self.visit( stmt )
-
-    if node.returns:
-      for expr in node.returns:
-        self.visit( expr )
-
-  def visit_If( self, node ):
-    self.only_loop_at_top &= (self.loop_stack > 0)
-
-    # Special case "if s.reset:" -- it's only high for a cycle
-    if isinstance( node.test, ast.Attribute ) and \
-       node.test.attr == 'reset' and \
-       isinstance( node.test.value, ast.Name ) and \
-       node.test.value.id == 's':
-      pass
-    else:
-      self.num_br += 1
-    self.visit( node.test )
-
-    for stmt in node.body:
-      self.visit( stmt )
-
-    for stmt in node.orelse:
-      self.visit( stmt )
-
-  def visit_IfExp( self, node ):
-    self.only_loop_at_top &= (self.loop_stack > 0)
-
-    # Special case "if s.reset:" -- it's only high for a cycle
-    if isinstance( node.test, ast.Attribute ) and \
-       node.test.attr == 'reset' and \
-       isinstance( node.test.value, ast.Name ) and \
-       node.test.value.id == 's':
-      pass
-    else:
-      self.num_br += 1
-
-    self.visit( node.test )
-    self.visit( node.body )
-    self.visit( node.orelse )
-
-  # For/while is fine
-  def visit_For( self, node ):
-    self.loop_stack += 1
-    # self.num_br += 0
-    for stmt in node.body:
-      self.visit( stmt )
-    self.loop_stack -= 1
-
-  def visit_While( self, node ):
-    self.loop_stack += 1
-    # self.num_br += 0
-    for stmt in node.body:
-      self.visit( stmt )
-    self.loop_stack -= 1
-
-class HeuristicTopoPass( UnrollSimPass ):
+class HeuristicTopoPass( ProfileGuidedSimPass ):
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
       raise PassOrderError( "all_constraints" )
@@ -103,7 +27,9 @@ class HeuristicTopoPass( UnrollSimPass ):
 
     top._sched = PassMetadata()
 
-    self.schedule_intra_cycle( top )
+    self.load_profile( top )
+    self.extract_branchiness( top )
+    self.schedule( top )
 
     # Reuse simple's ff and flip schedule
     simple = SimpleSchedulePass()
@@ -120,6 +46,10 @@ class HeuristicTopoPass( UnrollSimPass ):
     self.create_sim_eval_comb( top )
     self.create_sim_tick( top )
     self.create_sim_reset( top )
+    self.create_profile_warmup( top )
+
+  def schedule( self, top ):
+    self.schedule_intra_cycle( top )
 
   def schedule_intra_cycle( self, top ):
 
@@ -136,16 +66,8 @@ class HeuristicTopoPass( UnrollSimPass ):
         Es[u].append( v )
         E.add( (u, v) )
 
-    # Extract branchiness
-
-    # Initialize all generated net block to 0 branchiness
-    branchiness = { x: 0 for x in top._dag.genblks }
-
-    visitor = CountBranchesLoops()
     # FIXME use the pure-loop info
-    for blk in top.get_all_update_blocks():
-      hostobj = top.get_update_block_host_component( blk )
-      branchiness[ blk ], _ = visitor.enter( hostobj.get_update_block_info( blk )[-1] )
+    branchiness = self.branchiness
 
     # Perform topological sort for a serial schedule.
     # Note that here we use a priority queue to get the blocks with small
@@ -0,0 +1,353 @@
+"""
+========================================================================
+InlineSimPass.py
+========================================================================
+Generate a tick function whose body is the concatenation of the bodies
+of the scheduled update blocks. UnrollSimPass still pays one Python
+call per update block, plus the closure and attribute lookups to get
+from s to the signal. Here we take the cached AST of every update block
+(cls._name_info) and net block (top._dag.genblk_src), rename its local
+variables, and replace closure/global variables with bindings in the
+closure of the generated function. Attribute chains that lead to a
+component or an interface, e.g. s.inners[3], are resolved once at
+generation time so s.inners[3].out becomes _v5.out.
+
+Each schedule chunk (the combinational schedule and the clock edge
+functions) becomes one fused function, and sim_tick simply calls the
+fused chunks in order. UpblkFusionPass uses the same gen_fused_function
+to fuse smaller groups of blocks in the default simulation.
+
+Date   : Oct 17, 2026
+"""
+import ast
+import builtins
+import copy
+from bisect import bisect_right
+
+from pymtl3.dsl.Component import Component
+from pymtl3.dsl.Connectable import Interface, MethodPort
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.extra.pypy import custom_exec
+
+from .UnrollSimPass import UnrollSimPass
+
+# Statements we cannot move into another function body without changing
+# the semantics. Blocks containing any of them are called instead.
+
+_unsupported_nodes = (
+  ast.Return, ast.Yield, ast.YieldFrom, ast.Global, ast.Nonlocal,
+  ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef,
+  ast.Import, ast.ImportFrom, ast.ListComp, ast.SetComp, ast.DictComp,
+  ast.GeneratorExp,
+) + ( (ast.match_case,) if hasattr( ast, "match_case" ) else () )
+
+_unsupported_names = { 'locals', 'vars', 'eval', 'exec', 'globals', 'super' }
+
+class _CannotInline( Exception ):
+  pass
+
+class _NotStatic:
+  pass
+
+class _InlineTransformer( ast.NodeTransformer ):
+  """ Rewrite the body of blk so that it can be pasted into the fused
+  function. Local variables are prefixed with the schedule index, and
+  the other variables are looked up in the closure/globals of blk and
+  replaced by the variable name returned by bind(). """
+
+  def __init__( self, blk, prefix, bind, structural_lists ):
+    self.blk      = blk
+    self.code     = blk.__code__
+    self.prefix   = prefix
+    self.bind     = bind
+    self.local_names      = set( self.code.co_varnames )
+    self.structural_lists = structural_lists
+
+  def resolve( self, name ):
+    code = self.code
+    if name in code.co_freevars:
+      try:
+        return self.blk.__closure__[ code.co_freevars.index( name ) ].cell_contents
+      except ValueError: # empty cell
+        raise _CannotInline()
+    if name in self.blk.__globals__:
+      return self.blk.__globals__[ name ]
+    if name in _unsupported_names or not hasattr( builtins, name ):
+      raise _CannotInline()
+    return _NotStatic # builtin, keep the name
+
+  def is_structural( self, obj ):
+    if isinstance( obj, (Component, Interface) ):
+      return True
+    if isinstance( obj, list ) and obj:
+      try:
+        return self.structural_lists[ id(obj) ]
+      except KeyError:
+        ret = self.structural_lists[ id(obj) ] = all( self.is_structural( x ) for x in obj )
+        return ret
+    return False
+
+  def static_index( self, node ):
+    if isinstance( node, ast.Index ): # Python < 3.9
+      node = node.value
+    if isinstance( node, ast.Num ):
+      return node.n
+    if isinstance( node, ast.Name ) and node.id not in self.local_names:
+      v = self.resolve( node.id )
+      if isinstance( v, int ):
+        return v
+    return None
+
+  def static_eval( self, node ):
+    """ Return the object that node evaluates to if the whole chain can
+    be resolved at generation time and only goes through components,
+    interfaces, and lists of them. """
+    if isinstance( node, ast.Name ):
+      if node.id in self.local_names:
+        return _NotStatic
+      obj = self.resolve( node.id )
+
+    elif isinstance( node, ast.Attribute ):
+      base = self.static_eval( node.value )
+      if not isinstance( base, NamedObject ):
+        return _NotStatic
+      # Only look at the instance dict to avoid triggering properties
+      obj = base.__dict__.get( node.attr, _NotStatic )
+
+    elif isinstance( node, ast.Subscript ):
+      base = self.static_eval( node.value )
+      if not isinstance( base, list ):
+        return _NotStatic
+      idx = self.static_index( node.slice )
+      if not isinstance( idx, int ):
+        return _NotStatic
+      try:
+        obj = base[ idx ]
+      except IndexError:
+        return _NotStatic
+
+    else:
+      return _NotStatic
+
+    return obj if self.is_structural( obj ) else _NotStatic
+
+  def _visit_chain( self, node ):
+    if isinstance( node.ctx, ast.Load ):
+      obj = self.static_eval( node )
+      if obj is not _NotStatic:
+        return ast.copy_location( ast.Name( id=self.bind( obj ), ctx=ast.Load() ), node )
+    return self.generic_visit( node )
+
+  def visit_Attribute( self, node ):
+    return self._visit_chain( node )
+
+  def visit_Subscript( self, node ):
+    return self._visit_chain( node )
+
+  def visit_Name( self, node ):
+    if node.id in self.local_names:
+      node.id = f"{self.prefix}{node.id}"
+      return node
+
+    obj = self.resolve( node.id )
+    if obj is _NotStatic:
+      return node
+    return ast.copy_location( ast.Name( id=self.bind( obj ), ctx=node.ctx ), node )
+
+  def visit_ExceptHandler( self, node ):
+    if node.name is not None:
+      node.name = f"{self.prefix}{node.name}"
+    return self.generic_visit( node )
+
+def _inline_block( blk, tree, prefix, bind, structural_lists ):
+  """ Return the rewritten statements of blk, or None if it has to be
+  called instead. """
+  if not isinstance( tree, ast.Module ) or len(tree.body) != 1:
+    return None
+  func = tree.body[0]
+  if not isinstance( func, ast.FunctionDef ) or func.name != blk.__name__:
+    return None
+  if not hasattr( blk, "__code__" ) or blk.__code__.co_argcount:
+    return None
+
+  for node in func.body:
+    for x in ast.walk( node ):
+      if isinstance( x, _unsupported_nodes ):
+        return None
+
+  # Bind lazily so a failed attempt doesn't leave unused bindings
+  objs = []
+  def _bind( obj ):
+    objs.append( obj )
+    return f"_obj{len(objs)-1}"
+
+  transformer = _InlineTransformer( blk, prefix, _bind, structural_lists )
+  try:
+    stmts = [ transformer.visit( x ) for x in func.body ]
+  except _CannotInline:
+    return None
+
+  # Now replace the temporary names with the real bindings
+  real = [ bind( obj ) for obj in objs ]
+  for node in stmts:
+    for x in ast.walk( node ):
+      if isinstance( x, ast.Name ) and x.id.startswith( "_obj" ):
+        x.id = real[ int( x.id[4:] ) ]
+
+  return [ x for x in stmts if not isinstance( x, ast.Pass ) ]
+
+def block_name( top, blk ):
+  """ Return the name of an update block or net block used in error
+  messages and profiles, e.g. s.inner.up or net:s_in___1_0. """
+  if blk in getattr( top._dag, "genblk_src", {} ):
+    return f"net:{blk.__name__}"
+  hostobj = top._dsl.all_upblk_hostobj.get( blk )
+  if hostobj is None:
+    return blk.__name__
+  return f"{hostobj!r}.{blk.__name__}"
+
+def gen_fused_function( top, schedule, name ):
+  """ Return ( func, inlined ) where func executes the blocks in the
+  schedule in order with their bodies pasted into one function, and
+  inlined is the set of blocks that were pasted. The other blocks are
+  called from func. If a block raises an exception, its name is added to
+  the exception as a note (Python 3.11+) since the traceback only shows
+  the line in the fused function. """
+
+  genblk_src = getattr( top._dag, "genblk_src", {} )
+  hostobj    = top._dsl.all_upblk_hostobj
+
+  # Lists that hold signals are mutated in place by lock_in_simulation
+  # so they are safe to bind even if they contain Bits objects. We
+  # also cache whether other lists only hold components/interfaces.
+  structural_lists = {}
+  if hasattr( top, "_sim" ) and hasattr( top._sim, "signal_object_mapping" ):
+    for current_obj, _, is_list, _ in top._sim.signal_object_mapping.values():
+      if is_list:
+        structural_lists[ id(current_obj) ] = True
+
+  # Every object referenced by the fused function is bound to a
+  # closure variable _v<i> of the generated function
+  values  = []
+  var_map = {}
+
+  def bind( obj ):
+    try:
+      return var_map[ id(obj) ]
+    except KeyError:
+      var_map[ id(obj) ] = var = f"_v{len(values)}"
+      values.append( obj )
+      return var
+
+  body    = []
+  inlined = set()
+
+  # Each block gets its own range of line numbers in the fused function
+  # starting from bases[i], which maps a line back to the block
+  bases = []
+  names = []
+  next_line = 10
+
+  for i, blk in enumerate( schedule ):
+    tree = None
+    if blk in genblk_src:
+      tree = ast.parse( genblk_src[ blk ] )
+    elif blk in hostobj:
+      info = hostobj[ blk ].get_update_block_info( blk )
+      if info is not None:
+        tree = copy.deepcopy( info[-1] )
+
+    stmts = None
+    if tree is not None:
+      stmts = _inline_block( blk, tree, f"_{i}_", bind, structural_lists )
+
+    if stmts is None:
+      stmts = [ ast.parse( f"{bind( blk )}()" ).body[0] ]
+    else:
+      inlined.add( blk )
+
+    span = 1
+    for stmt in stmts:
+      for x in ast.walk( stmt ):
+        span = max( span, getattr( x, "end_lineno", None ) or getattr( x, "lineno", 1 ) )
+      ast.increment_lineno( stmt, next_line )
+
+    bases.append( next_line )
+    names.append( block_name( top, blk ) )
+    next_line += span + 1
+    body.extend( stmts )
+
+  def add_block_note( e ):
+    if hasattr( e, "add_note" ):
+      i = bisect_right( bases, e.__traceback__.tb_lineno ) - 1
+      if i >= 0:
+        e.add_note( f"(raised in update block {names[i]}, fused into {name})" )
+
+  # Build the function from a template and splice the inlined body in
+  # to avoid building ast.arguments across different Python versions
+
+  bindings = ""
+  if values:
+    bindings = "  {}, = _V\n".format( ", ".join( [ f"_v{i}" for i in range(len(values)) ] ) )
+
+  tree = ast.parse( f"def compile_inlined( _V, _E ):\n{bindings}"
+                    f"  def {name}():\n"
+                    f"    try:\n      pass\n"
+                    f"    except Exception as e:\n      _E( e )\n      raise\n"
+                    f"  return {name}\n" )
+  if body:
+    tree.body[0].body[-2].body[0].body[:] = body
+  ast.fix_missing_locations( tree )
+
+  _locals = {}
+  custom_exec( compile( tree, filename=name, mode="exec" ), {}, _locals )
+  return _locals['compile_inlined']( values, add_block_note ), inlined
+
+
+class InlineSimPass( UnrollSimPass ):
+
+  # Override
+  def create_sim_eval_comb( self, top ):
+    # FIXME update_once? currently check if the design has method_port
+    method_ports = top.get_all_objects_of_type( MethodPort )
+
+    top._sim.inlined_blocks = set()
+    top._sim.inlined_comb   = self.gen_inlined_function( top, top._sched.update_schedule, "inlined_comb" )
+
+    if len(method_ports) == 0: # Pure RTL design, add eval_combinational
+      sim_eval_combinational = self.gen_tick_function( [ top._sim.check_top_level_inports,
+                                                         top._sim.inlined_comb ], self.tick_chunk_size )
+    else:
+      def sim_eval_combinational():
+        raise NotImplementedError(f"top is not a pure RTL design. {'top'+repr(list(method_ports)[0])[1:]} is a method port.")
+
+    top.sim_eval_combinational = sim_eval_combinational
+
+  # Override
+  def create_sim_tick( self, top ):
+    comb = top._sim.inlined_comb
+    ff   = self.gen_inlined_function( top, self.collect_ff_funcs( top ), "inlined_ff" )
+
+    final_schedule = []
+    if not top.get_all_objects_of_type( MethodPort ):
+      # Pure RTL -- tick update blocks first
+      final_schedule.append( comb )
+
+    if self.print_line_trace and hasattr( top, 'line_trace' ):
+      final_schedule.append( top.print_line_trace )
+    final_schedule.append( ff )
+    final_schedule.append( comb )
+    final_schedule.append( top._sim.check_top_level_inports )
+    top.sim_tick = self.gen_tick_function( final_schedule, self.tick_chunk_size )
+
+  def gen_inlined_function( self, top, schedule, name ):
+
+    # Fuse long schedules chunk by chunk, see UnrollSimPass.tick_chunk_size
+    n = self.tick_chunk_size
+    if len(schedule) > n:
+      return self.gen_tick_function( [ self.gen_inlined_function( top, schedule[i:i+n], f"{name}{i//n}" )
+                                       for i in range( 0, len(schedule), n ) ], n )
+
+    func, inlined = gen_fused_function( top, schedule, name )
+    top._sim.inlined_blocks |= inlined
+    return func
@@ -22,13 +22,18 @@ from pymtl3.passes.errors import PassOrderError
 
 from ..sim.DynamicSchedulePass import kosaraju_scc
 from ..sim.SimpleSchedulePass import SimpleSchedulePass, dump_dag
-from .HeuristicTopoPass import CountBranchesLoops
-from .UnrollSimPass import UnrollSimPass
+from .ProfileGuidedSimPass import ProfileGuidedSimPass
 
 # _DEBUG = True
 _DEBUG = False
 
-class Mamba2020Pass( UnrollSimPass ):
+class Mamba2020Pass( ProfileGuidedSimPass ):
+
+  # Cost factor is the bound of the profiled cost of a meta block, i.e.
+  # the number of lines its blocks execute, so that a long chain of
+  # straight-line blocks doesn't exceed the trace limit. Without a
+  # profile all costs are 0.
+  cost_factor = 1000
 
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
@@ -40,36 +45,16 @@ class Mamba2020Pass( UnrollSimPass ):
     top._sched = PassMetadata()
 
     # Extract branchiness first
-    # Initialize all generated net block to 0 branchiness
 
     self.meta_block_id = 0
-    self.branchiness = { x: 0 for x in top._dag.genblks }
-    self.only_loop_at_top = { x: False for x in top._dag.genblks }
-    v = CountBranchesLoops()
-
-    # Shunning: since each loop turns into call_assembler_r, a pure-loop
-    # update block is basically 0 branchiness and can be inserted anywhere.
-    # At the beginning I tried not to put those blocks into any metablock
-    # to avoid double call_assembler_r but it just turned out that there
-    # is no difference of where you put the call_assembler_r.. Plus,
-    # treating loop blocks as normal update block can activate subsequent
-    # schedulable 0-branchiness block.
-
-    for blk in top.get_all_update_blocks():
-      hostobj = top.get_update_block_host_component( blk )
-      if blk in top._dag.blk_greenlet_mapping:
-        gblk = top._dag.blk_greenlet_mapping[ blk ]
-        self.branchiness[ gblk ], self.only_loop_at_top[ gblk ] = 0, 0
-      else:
-        self.branchiness[ blk ], self.only_loop_at_top[ blk ] = v.enter( hostobj.get_update_block_info( blk )[-1] )
-
-    self.schedule_ff( top )
+    self.load_profile( top )
+    self.extract_branchiness( top )
 
     # Reuse simple's flip schedule
     simple = SimpleSchedulePass()
     simple.schedule_posedge_flip( top )
 
-    self.schedule_intra_cycle( top )
+    self.schedule( top )
 
     top._sim = PassMetadata()
     self.create_print_line_trace( top )
@@ -80,6 +65,11 @@ class Mamba2020Pass( UnrollSimPass ):
     self.create_sim_eval_comb( top )
     self.create_sim_tick( top )
     self.create_sim_reset( top )
+    self.create_profile_warmup( top )
+
+  def schedule( self, top ):
+    self.schedule_ff( top )
+    self.schedule_intra_cycle( top )
 
   #-----------------------------------------------------------------------
   # compile_meta_block
@@ -131,13 +121,15 @@ class Mamba2020Pass( UnrollSimPass ):
   def schedule_ff( self, top ):
 
     top._sched.schedule_ff = schedule = []
-    if not top.get_all_update_ff():
+    removed = getattr( top._dag, "removed_upblks", () )
+    update_ff = [ x for x in top.get_all_update_ff() if x not in removed ]
+    if not update_ff:
       return
 
     # tuples in ffs: ( branchiness, blk )
 
     ffs = []
-    for x in top.get_all_update_ff():
+    for x in update_ff:
       # Here we treat loop-only upblk as 0 branchiness
       ffs.append( (0 if self.only_loop_at_top[x] else self.branchiness[x], x) )
     ffs = sorted( ffs, key=lambda x:x[0] )
@@ -151,21 +143,21 @@ class Mamba2020Pass( UnrollSimPass ):
     # meta block.
     branchy_block_factor = 6
 
-    cur_meta, cur_br, cur_count = [], 0, 0
+    cur_meta, cur_br, cur_count, cur_cost = [], 0, 0, 0
 
     for i, (br, blk) in enumerate( ffs ):
-      if br == 0:
-        cur_meta.append( blk )
+      cur_meta.append( blk )
+      cur_cost += self.block_cost.get( blk, 0 )
 
-      else: # this means the remaining blocks are all branchy
-        cur_meta.append( blk )
+      if br > 0: # this means the remaining blocks are all branchy
         cur_br += br
         cur_count += 1
 
-        if cur_br >= branchiness_factor or cur_count >= branchy_block_factor:
-          schedule.append( self.compile_meta_block( cur_meta ) )
-          cur_br = cur_count = 0
-          cur_meta = []
+      if cur_br >= branchiness_factor or cur_count >= branchy_block_factor or \
+         cur_cost >= self.cost_factor:
+        schedule.append( self.compile_meta_block( cur_meta ) )
+        cur_br = cur_count = cur_cost = 0
+        cur_meta = []
 
     if cur_meta:
       schedule.append( self.compile_meta_block( cur_meta ) )
@@ -498,6 +490,9 @@ generated_block = wrapped_SCC_{0}
     # meta block.
     branchy_block_factor = 6
 
+    def scc_cost( u ):
+      return sum( self.block_cost.get( x, 0 ) for x in SCCs[u] )
+
     # refactored code ...
     def expand_node( u ):
       nonlocal cnt
@@ -518,7 +513,7 @@ generated_block = wrapped_SCC_{0}
     # Run topological sort
 
     cur_meta = []
-    cur_br = cur_count = 0
+    cur_br = cur_count = cur_cost = 0
 
     while Q:
       if cur_br == 0:
@@ -527,10 +522,11 @@ generated_block = wrapped_SCC_{0}
         cur_meta.append( compile_scc(u) )
         cur_br += br
         cur_count += (br > 0)
+        cur_cost += scc_cost( u )
 
-        if cur_br >= branchiness_factor:
+        if cur_br >= branchiness_factor or cur_cost >= self.cost_factor:
           schedule.append( cur_meta )
-          cur_meta, cur_br, cur_count = [], 0, 0
+          cur_meta, cur_br, cur_count, cur_cost = [], 0, 0, 0
 
       else:
         (br, _), u = Q.pop()
@@ -541,16 +537,19 @@ generated_block = wrapped_SCC_{0}
           cur_meta, cur_br, cur_count = [], 0, 0
 
           cur_meta.append( compile_scc(u) )
+          cur_cost = scc_cost( u )
 
         # Limit the number of branchiness and number of branchy blocks
         else:
           cur_meta.append( compile_scc(u) )
           cur_br += br
           cur_count += (br > 0)
+          cur_cost += scc_cost( u )
 
-          if cur_br + br >= branchiness_factor or cur_count + 1 >= branchy_block_factor:
+          if cur_br + br >= branchiness_factor or cur_count + 1 >= branchy_block_factor or \
+             cur_cost >= self.cost_factor:
             schedule.append( cur_meta )
-            cur_meta, cur_br, cur_count = [], 0, 0
+            cur_meta, cur_br, cur_count, cur_cost = [], 0, 0, 0
 
       expand_node( u )
 
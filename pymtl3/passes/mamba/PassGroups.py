@@ -6,6 +6,7 @@ from ..sim.WrapGreenletPass import WrapGreenletPass
 from ..tracing.CLLineTracePass import CLLineTracePass
 from ..tracing.LineTraceParamPass import LineTraceParamPass
 from .HeuristicTopoPass import HeuristicTopoPass
+from .InlineSimPass import InlineSimPass
 from .Mamba2020Pass import Mamba2020Pass
 from .UnrollSimPass import UnrollSimPass
 
@@ -24,24 +25,46 @@ class UnrollSim( BasePass ):
     UnrollSimPass(print_line_trace=s.print_line_trace,
                   reset_active_high=s.reset_active_high)( top )
 
-class HeuTopoUnrollSim( BasePass ):
+class InlineSim( BasePass ):
   def __init__( s, *, waveform=None, print_line_trace=True, reset_active_high=True ):
     s.waveform = waveform
     s.print_line_trace = print_line_trace
     s.reset_active_high = reset_active_high
 
+  def __call__( s, top ):
+    top.elaborate()
+    GenDAGPass()( top )
+    WrapGreenletPass()( top )
+    SimpleSchedulePass()( top )
+    InlineSimPass(print_line_trace=s.print_line_trace,
+                  reset_active_high=s.reset_active_high)( top )
+
+class HeuTopoUnrollSim( BasePass ):
+  def __init__( s, *, waveform=None, print_line_trace=True, reset_active_high=True,
+                    profile_file=None, profile_cycles=1000 ):
+    s.waveform = waveform
+    s.print_line_trace = print_line_trace
+    s.reset_active_high = reset_active_high
+    s.profile_file = profile_file
+    s.profile_cycles = profile_cycles
+
   def __call__( s, top ):
     top.elaborate()
     GenDAGPass()( top )
     WrapGreenletPass()( top )
     HeuristicTopoPass(print_line_trace=s.print_line_trace,
-                      reset_active_high=s.reset_active_high)( top )
+                      reset_active_high=s.reset_active_high,
+                      profile_file=s.profile_file,
+                      profile_cycles=s.profile_cycles)( top )
 
 class Mamba2020( BasePass ):
-  def __init__( s, *, waveform=None, print_line_trace=True, reset_active_high=True ):
+  def __init__( s, *, waveform=None, print_line_trace=True, reset_active_high=True,
+                    profile_file=None, profile_cycles=1000 ):
     s.waveform = waveform
     s.print_line_trace = print_line_trace
     s.reset_active_high = reset_active_high
+    s.profile_file = profile_file
+    s.profile_cycles = profile_cycles
 
   def __call__( s, top ):
     top.elaborate()
@@ -51,4 +74,6 @@ class Mamba2020( BasePass ):
       CLLineTracePass()( top )
       LineTraceParamPass()( top )
     Mamba2020Pass(print_line_trace=s.print_line_trace,
-                  reset_active_high=s.reset_active_high)( top )
+                  reset_active_high=s.reset_active_high,
+                  profile_file=s.profile_file,
+                  profile_cycles=s.profile_cycles)( top )
@@ -0,0 +1,118 @@
+"""
+========================================================================
+ProfileGuidedSimPass.py
+========================================================================
+Base class of the schedule passes that form the schedule from the
+branchiness of update blocks (HeuristicTopoPass and Mamba2020Pass).
+
+By default the branchiness is counted statically. With profile_file,
+the pass uses the BranchProfile stored there if it was recorded for the
+same design. Otherwise the first profile_cycles cycles of the
+simulation run the static schedule under a BranchProfiler. Then the
+profile is written to profile_file, and the design is scheduled again
+with it and gets new sim_tick, sim_reset and sim_eval_combinational.
+
+Subclasses implement schedule( top ), which forms top._sched from the
+branchiness and is called again by apply_profile.
+
+Date   : Oct 17, 2026
+"""
+from ..sim.DesignCache import design_hash
+from .BranchProfile import BranchProfile, BranchProfiler, CountBranchesLoops, block_name
+from .UnrollSimPass import UnrollSimPass
+
+
+class ProfileGuidedSimPass( UnrollSimPass ):
+
+  def __init__( self, *args, profile_file=None, profile_cycles=1000, **kwargs ):
+    super().__init__( *args, **kwargs )
+    self.profile_file   = profile_file
+    self.profile_cycles = profile_cycles
+
+  #-----------------------------------------------------------------------
+  # extract_branchiness
+  #-----------------------------------------------------------------------
+
+  def load_profile( self, top ):
+    top._sched.branch_profile = None
+    if self.profile_file is not None:
+      self.profile_key = design_hash( top )
+      top._sched.branch_profile = BranchProfile.load( self.profile_file, self.profile_key )
+
+  def extract_branchiness( self, top ):
+    profile = top._sched.branch_profile
+
+    # Initialize all generated net block to 0 branchiness
+    self.branchiness      = { x: 0 for x in top._dag.genblks }
+    self.only_loop_at_top = { x: False for x in top._dag.genblks }
+    # Profiled cost (executed lines per call) of each block
+    self.block_cost       = {}
+    # Update blocks and their branch nodes for the profiler
+    self.block_branches   = {}
+
+    v = CountBranchesLoops()
+
+    # Shunning: since each loop turns into call_assembler_r, a pure-loop
+    # update block is basically 0 branchiness and can be inserted anywhere.
+    # At the beginning I tried not to put those blocks into any metablock
+    # to avoid double call_assembler_r but it just turned out that there
+    # is no difference of where you put the call_assembler_r.. Plus,
+    # treating loop blocks as normal update block can activate subsequent
+    # schedulable 0-branchiness block.
+
+    for blk in top.get_all_update_blocks():
+      hostobj = top.get_update_block_host_component( blk )
+      if blk in top._dag.blk_greenlet_mapping:
+        gblk = top._dag.blk_greenlet_mapping[ blk ]
+        self.branchiness[ gblk ], self.only_loop_at_top[ gblk ] = 0, 0
+        continue
+
+      info = hostobj.get_update_block_info( blk )
+      name = block_name( hostobj, blk )
+      self.branchiness[ blk ], self.only_loop_at_top[ blk ] = v.enter( info[-1] )
+      self.block_branches[ blk ] = ( name, info[2], v.branches )
+
+      if profile is not None:
+        br = profile.branchiness( name )
+        if br is not None:
+          self.branchiness[ blk ] = br
+          self.block_cost [ blk ] = profile.cost( name )
+
+  #-----------------------------------------------------------------------
+  # create_profile_warmup
+  #-----------------------------------------------------------------------
+
+  def create_profile_warmup( self, top ):
+    if self.profile_file is None or top._sched.branch_profile is not None:
+      return
+
+    profiler = BranchProfiler()
+    for blk, ( name, first_line, branches ) in self.block_branches.items():
+      profiler.add_block( name, blk, first_line, branches )
+
+    sim_tick  = top.sim_tick
+    sim_reset = top.sim_reset
+    sim_eval_combinational = top.sim_eval_combinational
+
+    def profiled_sim_tick():
+      profiler.run( sim_tick )
+      if top._sim.simulated_cycles >= self.profile_cycles:
+        self.apply_profile( top, profiler.profile( self.profile_key, top._sim.simulated_cycles ) )
+
+    top.sim_tick  = profiled_sim_tick
+    top.sim_reset = lambda: profiler.run( sim_reset )
+    top.sim_eval_combinational = lambda: profiler.run( sim_eval_combinational )
+
+  def apply_profile( self, top, profile ):
+    profile.dump( self.profile_file )
+    top._sched.branch_profile = profile
+
+    self.extract_branchiness( top )
+    self.schedule( top )
+
+    # The new sim_tick counts cycles from 0 again
+    cycles = top._sim.simulated_cycles
+    self.create_sim_eval_comb( top )
+    self.create_sim_tick( top )
+    self.create_sim_reset( top )
+    top._sim.simulated_cycles = cycles
@@ -19,8 +19,36 @@ from ..sim.PrepareSimPass import PrepareSimPass
 
 class UnrollSimPass( PrepareSimPass ):
 
+  # Schedules longer than tick_chunk_size blocks are unrolled into
+  # sub-functions of at most tick_chunk_size calls each, which keeps the
+  # time and memory to compile a tick roughly linear in the size of the
+  # schedule, and gives PyPy one trace per chunk.
+  tick_chunk_size = 1000
+
+  def __init__( self, *args, tick_chunk_size=None, **kwargs ):
+    super().__init__( *args, **kwargs )
+    if tick_chunk_size is not None:
+      assert tick_chunk_size > 1
+      self.tick_chunk_size = tick_chunk_size
+
   @staticmethod
-  def gen_tick_function( funclist ):
+  def gen_tick_function( funclist, chunk_size=None ):
+    if chunk_size is None:
+      chunk_size = UnrollSimPass.tick_chunk_size
+
+    if len(funclist) > chunk_size:
+      chunks = [ UnrollSimPass.gen_tick_function( funclist[i:i+chunk_size], chunk_size )
+                 for i in range( 0, len(funclist), chunk_size ) ]
+
+      # Trace each chunk on its own instead of inlining it into the caller
+      try:
+        from pypyjit import dont_trace_here
+        for chunk in chunks:
+          dont_trace_here( 0, False, chunk.__code__ )
+      except:
+        pass
+
+      return UnrollSimPass.gen_tick_function( chunks, chunk_size )
 
     # Berkin IlBeyi's recipe ( updated using f-strings and enumerate )
     strs = [ f"_{idx}_{x.__name__}()" for idx, x in enumerate( funclist ) ]
@@ -43,10 +71,10 @@ def compile_unroll( schedule ):
   # Override
   def create_sim_eval_comb( self, top ):
     # FIXME update_once? currently check if the design has method_port
-    method_ports = top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) )
+    method_ports = top.get_all_objects_of_type( MethodPort )
 
     if len(method_ports) == 0: # Pure RTL design, add eval_combinational
-      sim_eval_combinational = self.gen_tick_function( top._sched.update_schedule )
+      sim_eval_combinational = self.gen_tick_function( top._sched.update_schedule, self.tick_chunk_size )
     else:
       def sim_eval_combinational():
         raise NotImplementedError(f"top is not a pure RTL design. {'top'+repr(list(method_ports)[0])[1:]} is a method port.")
@@ -56,7 +84,7 @@ def compile_unroll( schedule ):
   # Override
   def create_sim_tick( self, top ):
     final_schedule = []
-    if not top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) ):
+    if not top.get_all_objects_of_type( MethodPort ):
       # Pure RTL -- tick update blocks first
       final_schedule = top._sched.update_schedule[::]
 
@@ -65,4 +93,4 @@ def compile_unroll( schedule ):
     final_schedule += self.collect_ff_funcs( top )
     final_schedule += top._sched.update_schedule
     final_schedule.append( top._sim.check_top_level_inports )
-    top.sim_tick = self.gen_tick_function( final_schedule )
+    top.sim_tick = self.gen_tick_function( final_schedule, self.tick_chunk_size )
@@ -0,0 +1,167 @@
+"""
+========================================================================
+UpblkFusionPass.py
+========================================================================
+Fuse adjacent entries of the schedule into one generated function to
+save the Python call per update block. Small components like Mux, RegEn
+or Adder contribute a few tiny blocks each, so the calls can cost more
+than the blocks themselves.
+
+A run of adjacent blocks is fused if every block is hosted by a
+component of the run, or reads a signal that a block of the run writes
+through a net, i.e. the blocks of a component and of a chain of
+directly connected components stay together. The bodies are pasted
+with gen_fused_function of InlineSimPass, and the fused function keeps
+the names of its blocks in top._sched.fused_blocks for error messages
+and UpblkProfilePass.
+
+This pass has to be applied after a schedule pass and before
+PrepareSimPass.
+
+Date   : Oct 17, 2026
+"""
+from pymtl3.dsl import MetadataKey, Signal
+from pymtl3.passes.BasePass import BasePass
+from pymtl3.passes.errors import PassOrderError
+
+from .InlineSimPass import gen_fused_function
+
+
+class UpblkFusionPass( BasePass ):
+
+  # UpblkFusionPass public pass data
+
+  #: enable
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: False
+  enable = MetadataKey(bool)
+
+  #: The maximum number of blocks in a fused function
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 32
+  max_blocks = MetadataKey(int)
+
+  def __call__( self, top ):
+    if not ( top.has_metadata( self.enable ) and top.get_metadata( self.enable ) ):
+      return
+
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+    if hasattr( top, "_sim" ):
+      raise PassOrderError( "_sched (UpblkFusionPass must be applied before PrepareSimPass)" )
+
+    self.limit = top.get_metadata( self.max_blocks ) if top.has_metadata( self.max_blocks ) else 32
+
+    self.collect_block_info( top )
+
+    # Map each fused function to the blocks it executes
+    top._sched.fused_blocks = {}
+
+    top._sched.update_schedule = self.fuse( top, top._sched.update_schedule, "fused_comb" )
+
+    # update_ff blocks can run in any order, so we put the blocks of the
+    # same component next to each other first
+    ffs = top._sched.schedule_ff
+    if all( x in self.info for x in ffs ):
+      order = {}
+      for x in ffs:
+        order.setdefault( self.info[x][0], len(order) )
+      ffs = sorted( ffs, key=lambda x: order[ self.info[x][0] ] )
+    top._sched.schedule_ff = self.fuse( top, ffs, "fused_ff" )
+
+  #-----------------------------------------------------------------------
+  # collect_block_info
+  #-----------------------------------------------------------------------
+  # Map every update block and net block to ( host, reads, writes ) where
+  # reads and writes are the nets of the accessed signals. Members of a
+  # net share one key, so a block that reads the input port of a
+  # component reads the output port of the component that drives it.
+
+  def collect_block_info( self, top ):
+    parent = {}
+    def find( x ):
+      root = x
+      while parent.get( root, root ) is not root:
+        root = parent[ root ]
+      while x is not root:
+        parent[ x ], x = root, parent[ x ]
+      return root
+
+    for writer, signals in top.get_all_value_nets():
+      signals = [ x.get_top_level_signal() for x in signals if isinstance( x, Signal ) ]
+      root = find( signals[0] )
+      for x in signals[1:]:
+        y = find( x )
+        if y is not root:
+          parent[ y ] = root
+
+    def nets( objs ):
+      return { find( x.get_top_level_signal() ) for x in objs if isinstance( x, Signal ) }
+
+    upblk_reads, upblk_writes, _ = top.get_all_upblk_metadata()
+    hostobj = top._dsl.all_upblk_hostobj
+
+    self.info = {}
+    for blk in top.get_all_update_blocks():
+      self.info[ blk ] = ( hostobj[ blk ], nets( upblk_reads.get( blk, () ) ),
+                           nets( upblk_writes.get( blk, () ) ) )
+
+    # Net blocks are compiled with their lowest common ancestor as s
+    for blk, src in top._dag.genblk_src.items():
+      self.info[ blk ] = ( blk.__globals__.get( 's', top ), nets( top._dag.genblk_reads.get( blk, () ) ),
+                           nets( top._dag.genblk_writes[ blk ] ) )
+
+  #-----------------------------------------------------------------------
+  # fuse
+  #-----------------------------------------------------------------------
+
+  def fuse( self, top, schedule, prefix ):
+    nop = top._dag.nop_genblks
+    ret = []
+    run = []
+    run_hosts  = set()
+    run_writes = set()
+
+    def flush():
+      if len(run) > 1:
+        name = f"{prefix}_{len( top._sched.fused_blocks )}"
+        func, inlined = gen_fused_function( top, run, name )
+        if inlined:
+          top._sched.fused_blocks[ func ] = list( run )
+          ret.append( func )
+        else:
+          ret.extend( run )
+      else:
+        ret.extend( run )
+      run.clear()
+      run_hosts.clear()
+      run_writes.clear()
+
+    for blk in schedule:
+      # Net blocks without anything to copy are dropped by PrepareSimPass
+      # and don't break the run
+      if blk in nop:
+        ret.append( blk )
+        continue
+
+      # SCC blocks, greenlet wrappers, Mamba meta blocks, etc.
+      if blk not in self.info:
+        flush()
+        ret.append( blk )
+        continue
+
+      host, reads, writes = self.info[ blk ]
+      if run and ( len(run) >= self.limit or
+                   ( host not in run_hosts and not ( reads & run_writes ) ) ):
+        flush()
+
+      run.append( blk )
+      run_hosts.add( host )
+      run_writes.update( writes )
+
+    flush()
+    return ret
@@ -0,0 +1,186 @@
+from pymtl3.datatypes import Bits8, Bits32, bitstruct, zext
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..PassGroups import InlineSim
+
+N_CONST = 3
+
+def _check_against_default( cls, inputs ):
+  A = cls()
+  A.apply( InlineSim(print_line_trace=False) )
+  A.sim_reset()
+  B = cls()
+  B.apply( DefaultPassGroup(print_line_trace=False) )
+  B.sim_reset()
+  for v in inputs:
+    A.in_ @= v
+    B.in_ @= v
+    A.sim_tick()
+    B.sim_tick()
+    assert A.out == B.out
+  return A
+
+def test_very_deep_dag():
+
+  class Inner(Component):
+    def construct( s ):
+      s.in_ = InPort(Bits32)
+      s.out = OutPort(Bits32)
+
+      @update
+      def up():
+        s.out @= s.in_ + 1
+
+  class Top(Component):
+    def construct( s, N=2000 ):
+      s.inners = [ Inner() for i in range(N) ]
+      for i in range(N-1):
+        s.inners[i].out //= s.inners[i+1].in_
+
+      s.last = Wire(Bits32)
+      s.last //= s.inners[N-1].out
+
+      s.out = OutPort(Bits32)
+      @update_ff
+      def ff():
+        if s.reset:
+          s.out <<= 0
+        else:
+          s.out <<= s.out + s.last
+
+  N = 2000
+  A = Top( N )
+  A.apply( InlineSim(print_line_trace=False) )
+  A.sim_reset()
+
+  # All update blocks and net blocks are inlined
+  assert A._sim.inlined_blocks == A.get_all_update_blocks() | A._dag.genblks
+
+  T = 0
+  while T < 5:
+    assert A.out == T * N
+    A.sim_tick()
+    T += 1
+
+def test_locals_closure_globals():
+
+  class Inner(Component):
+    def construct( s, k ):
+      s.in_ = InPort(Bits32)
+      s.out = OutPort(Bits32)
+
+      @update
+      def up():
+        tmp = s.in_ + k
+        for i in range(N_CONST):
+          tmp = tmp + 1
+        s.out @= tmp
+
+  class Top(Component):
+    def construct( s ):
+      s.in_ = InPort(Bits32)
+      s.out = OutPort(Bits32)
+      s.inners = [ Inner(i) for i in range(4) ]
+      s.wires  = [ Wire(Bits32) for i in range(4) ]
+      s.inners[0].in_ //= s.in_
+      for i in range(3):
+        s.inners[i+1].in_ //= s.wires[i]
+        s.inners[i].out //= s.wires[i]
+      s.last = s.inners[3]
+
+      @update
+      def up_out():
+        tmp = s.last.out
+        s.out @= tmp
+
+  A = _check_against_default( Top, [ 0, 1, 10, 100 ] )
+  assert A.out == 100 + 6 + 4*N_CONST
+
+def test_bitstruct_slices():
+
+  @bitstruct
+  class SomeMsg:
+    a: Bits8
+    b: Bits32
+
+  class Top(Component):
+    def construct( s ):
+      s.in_ = InPort(Bits32)
+      s.msg = Wire( SomeMsg )
+      s.tmp = Wire( Bits8 )
+      s.out = OutPort(Bits32)
+
+      @update
+      def up_msg():
+        s.msg @= SomeMsg( s.in_[0:8], s.in_ )
+
+      @update
+      def up_tmp():
+        s.tmp @= s.msg.a + 1
+
+      @update
+      def up_out():
+        s.out @= s.msg.b + zext( s.tmp, 32 )
+
+  _check_against_default( Top, [ 0, 0x12, 0x1234, 0xff ] )
+
+def test_fallback_to_call():
+
+  class Top(Component):
+    def construct( s ):
+      s.in_ = InPort(Bits32)
+      s.out = OutPort(Bits32)
+
+      @update
+      def up_return():
+        if s.in_ == 0:
+          s.out @= 0
+          return
+        s.out @= sum( [ s.in_ for _ in range(2) ] )
+
+  A = _check_against_default( Top, [ 0, 1, 0, 3 ] )
+  assert A._sim.inlined_blocks == set()
+
+def test_cl_design():
+
+  class Queue(Component):
+    def construct( s ):
+      s.q = []
+      s.count = 0
+
+      @update
+      def up_count():
+        s.count = len(s.q)
+
+    @method_port
+    def enq( s, msg ):
+      s.q.append( msg )
+
+    @method_port
+    def deq( s ):
+      return s.q.pop(0)
+
+  class Top(Component):
+    def construct( s ):
+      s.queue = Queue()
+      s.n = 0
+      s.got = []
+
+      @update_once
+      def up_enq():
+        s.queue.enq( s.n )
+        s.n += 1
+
+      @update_once
+      def up_deq():
+        if s.queue.q:
+          s.got.append( s.queue.deq() )
+
+  A = Top()
+  A.apply( InlineSim(print_line_trace=False) )
+  A.sim_reset()
+  for i in range(5):
+    A.sim_tick()
+  assert len(A.got) >= 5
+  assert A.got == list(range(len(A.got)))
@@ -2,7 +2,8 @@ from pymtl3.datatypes import Bits32
 from pymtl3.dsl import *
 from pymtl3.dsl.errors import UpblkCyclicError
 
-from ..PassGroups import Mamba2020
+from ..BranchProfile import block_name
+from ..PassGroups import HeuTopoUnrollSim, Mamba2020
 
 
 def test_very_deep_dag():
@@ -143,3 +144,70 @@ def test_update_once():
     return
 
   raise Exception("Should've thrown UpblkCyclicError")
+
+def test_profile_guided( tmp_path ):
+
+  class Top(Component):
+    def construct( s ):
+      s.mode = InPort()
+      s.out  = OutPort(Bits32)
+      s.cnt  = Wire(Bits32)
+
+      @update_ff
+      def ff():
+        if s.reset:
+          s.cnt <<= 0
+        else:
+          s.cnt <<= s.cnt + 1
+
+      # "if s.mode" always goes the same way, "elif s.cnt & 1" doesn't
+      @update
+      def up():
+        if s.mode:
+          s.out @= 0
+        elif s.cnt & 1:
+          s.out @= s.cnt + 1
+        else:
+          s.out @= s.cnt
+
+  def run( top ):
+    top.sim_reset()
+    trace = []
+    for i in range(20):
+      top.sim_tick()
+      trace.append( (top.sim_cycle_count(), int(top.out)) )
+    return trace
+
+  for Group in [ Mamba2020, HeuTopoUnrollSim ]:
+    filename = str( tmp_path / f"{Group.__name__}.json" )
+    A = Top()
+    A.apply( Group( print_line_trace=False, profile_file=filename, profile_cycles=10 ) )
+    assert A._sched.branch_profile is None
+    trace = run( A )
+    assert trace == [ (i+4, i+2 if i & 1 == 0 else i+1) for i in range(20) ]
+
+    # The profile of the first 10 cycles is used for the rest
+    profile = A._sched.branch_profile
+    assert profile.cycles == 10
+    up, = [ x for x in A.get_all_update_blocks() if x.__name__ == "up" ]
+    ff, = [ x for x in A.get_all_update_blocks() if x.__name__ == "ff" ]
+    (taken0, not_taken0), (taken1, not_taken1) = profile.blocks[ block_name( A, up ) ][ "branches" ]
+    assert taken0 == 0 and not_taken0 > 0
+    assert taken1 > 0 and not_taken1 > 0
+    assert profile.branchiness( block_name( A, up ) ) == 1
+    assert profile.blocks[ block_name( A, ff ) ][ "branches" ] == []
+    assert profile.cost( block_name( A, up ) ) > 0
+
+    # The next simulation of the same design loads the profile
+    B = Top()
+    B.apply( Group( print_line_trace=False, profile_file=filename, profile_cycles=10 ) )
+    assert B._sched.branch_profile.blocks == profile.blocks
+    assert run( B ) == trace
+
+  # A different design doesn't use it
+  class Top2( Top ):
+    pass
+
+  C = Top2()
+  C.apply( Mamba2020( print_line_trace=False, profile_file=filename ) )
+  assert C._sched.branch_profile is None
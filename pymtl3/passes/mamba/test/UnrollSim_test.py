@@ -1,7 +1,11 @@
 from pymtl3.datatypes import Bits32
 from pymtl3.dsl import *
 
+from ...sim.GenDAGPass import GenDAGPass
+from ...sim.SimpleSchedulePass import SimpleSchedulePass
+from ..InlineSimPass import InlineSimPass
 from ..PassGroups import UnrollSim
+from ..UnrollSimPass import UnrollSimPass
 
 
 def test_very_deep_dag():
@@ -69,3 +73,66 @@ def test_equal_top_level():
     print(e)
     assert str(e).startswith("Please use @= to assign top level InPort")
     return
+
+def test_chunked_tick():
+
+  class Inner(Component):
+    def construct( s ):
+      s.in_ = InPort(Bits32)
+      s.out = OutPort(Bits32)
+
+      @update
+      def up():
+        s.out @= s.in_ + 1
+
+  class Top(Component):
+    def construct( s, N ):
+      s.inners = [ Inner() for i in range(N) ]
+      for i in range(N-1):
+        s.inners[i].out //= s.inners[i+1].in_
+
+      s.last = Wire(Bits32)
+      s.last //= s.inners[N-1].out
+
+      s.out = OutPort(Bits32)
+      @update_ff
+      def ff():
+        if s.reset:
+          s.out <<= 0
+        else:
+          s.out <<= s.out + s.last
+
+  calls = []
+  def mk( i ):
+    def blk():
+      calls.append( i )
+    return blk
+
+  # 10 blocks in chunks of 3 are called through a tree of depth 2
+  tick = UnrollSimPass.gen_tick_function( [ mk(i) for i in range(10) ], 3 )
+  tick()
+  assert calls == list(range(10))
+
+  N = 50
+  for SimPass in [ UnrollSimPass, InlineSimPass ]:
+    A = Top( N )
+    A.elaborate()
+    A.apply( GenDAGPass() )
+    A.apply( SimpleSchedulePass() )
+    A.apply( SimPass( print_line_trace=False, tick_chunk_size=4 ) )
+    A.sim_reset()
+
+    for T in range(5):
+      assert A.out == T * N
+      A.sim_tick()
+
+  # The outer tick of InlineSimPass is chunked as well
+  A = Top( N )
+  A.elaborate()
+  A.apply( GenDAGPass() )
+  A.apply( SimpleSchedulePass() )
+  A.apply( InlineSimPass( print_line_trace=False, tick_chunk_size=2 ) )
+  assert len( A.sim_tick.__code__.co_freevars ) <= 2
+  A.sim_reset()
+  A.sim_tick()
+  assert A.out == N
@@ -0,0 +1,112 @@
+from sys import version_info
+
+import pytest
+
+from pymtl3.datatypes import Bits32
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.passes.mamba.UpblkFusionPass import UpblkFusionPass
+from pymtl3.stdlib.basic_rtl import Adder, Incrementer, RegEn
+
+
+class Stage( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+
+    s.inc = Incrementer( Bits32 )
+    s.add = Adder( Bits32 )
+    s.reg = RegEn( Bits32 )
+
+    s.inc.in_ //= s.in_
+    s.add.in0 //= s.inc.out
+    s.add.in1 //= s.reg.out
+    s.reg.in_ //= s.add.out
+    s.reg.en  //= 1
+    s.out //= s.add.out
+
+class Top( Component ):
+  def construct( s, N=4 ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+    s.stages = [ Stage() for _ in range(N) ]
+    s.stages[0].in_ //= s.in_
+    for i in range(N-1):
+      s.stages[i+1].in_ //= s.stages[i].out
+
+    s.last = Wire( Bits32 )
+    s.last //= s.stages[N-1].out
+    s.tmp  = Wire( Bits32 )
+
+    @update
+    def up_tmp():
+      s.tmp @= s.last + 1
+
+    @update
+    def up_out():
+      assert s.in_ != 0xdead
+      s.out @= s.tmp + 1
+
+def _run( top, inputs ):
+  top.sim_reset()
+  ret = []
+  for x in inputs:
+    top.in_ @= x
+    top.sim_tick()
+    ret.append( int(top.out) )
+  return ret
+
+def test_fuse_components():
+  ref = Top()
+  ref.apply( DefaultPassGroup(print_line_trace=False) )
+
+  top = Top()
+  top.apply( DefaultPassGroup(print_line_trace=False, fuse_upblks=True) )
+
+  # The chain of stages and the blocks of top form one fused function.
+  # The registers of different stages are not fused.
+  fused = top._sched.fused_blocks
+  assert len( fused ) == 1
+  comb, = [ x for x in top._sched.update_schedule if x not in top._dag.nop_genblks ]
+  names = { x.__name__ for x in fused[ comb ] }
+  assert { "up_incrementer", "up_adder", "up_tmp", "up_out" } <= names
+  assert len( top._sched.update_schedule ) < len( ref._sched.update_schedule )
+
+  inputs = [ 3, 1, 4, 1, 5, 9, 2, 6 ]
+  assert _run( top, inputs ) == _run( ref, inputs )
+
+def test_max_blocks():
+  ref = Top()
+  ref.apply( DefaultPassGroup(print_line_trace=False) )
+
+  top = Top()
+  top.elaborate()
+  top.set_metadata( UpblkFusionPass.max_blocks, 3 )
+  top.apply( DefaultPassGroup(print_line_trace=False, fuse_upblks=True) )
+
+  fused = top._sched.fused_blocks
+  assert len( fused ) > 2
+  assert all( 2 <= len(x) <= 3 for x in fused.values() )
+
+  inputs = [ 3, 1, 4, 1, 5 ]
+  assert _run( top, inputs ) == _run( ref, inputs )
+
+def test_upblk_profile():
+  top = Top()
+  top.apply( DefaultPassGroup(print_line_trace=False, fuse_upblks=True, upblk_profile=True) )
+  _run( top, [ 1, 2, 3 ] )
+
+  names = [ r.name for r in top._profile.records if r.kind == "fused" ]
+  assert names
+  assert any( "s.stages[0].add.up_adder" in x for x in names )
+
+@pytest.mark.skipif( version_info < (3, 11), reason="exception notes need Python 3.11" )
+def test_error_names_block():
+  top = Top()
+  top.apply( DefaultPassGroup(print_line_trace=False, fuse_upblks=True) )
+  top.sim_reset()
+
+  top.in_ @= 0xdead
+  with pytest.raises( AssertionError ) as e:
+    top.sim_eval_combinational()
+  assert any( "s.up_out" in x for x in e.value.__notes__ )
@@ -0,0 +1,520 @@
+"""
+========================================================================
+BatchSimPass.py
+========================================================================
+Simulate B independent instances of the same pure RTL design at once.
+Every signal holds a BatchBits object, i.e. a NumPy uint64 vector with
+one lane per instance, so each update block is executed once per cycle
+for all lanes:
+
+  top.apply( GenDAGPass() )
+  top.apply( DynamicSchedulePass() )
+  top.apply( BatchSimPass( batch_size=1024 ) )
+  top.sim_reset()
+  top.in_ @= np.arange( 1024 )
+  top.sim_tick()
+  top.out.uint() # uint64 vector of 1024 outputs
+
+Since different lanes can take different paths in data-dependent
+control flow, update blocks are recompiled from their cached AST with
+if-conversion. The condition of an if statement becomes a lane mask, and
+all assignments inside the branch are merged into the target under the
+mask. If all active lanes agree on the condition, only the taken branch
+is executed. Loops, break, continue, and return can only depend on
+values that are uniform across the active lanes.
+
+Date   : Oct 17, 2026
+"""
+import ast
+import copy
+
+import numpy as np
+
+from pymtl3.datatypes import Bits, helpers
+from pymtl3.datatypes.BatchBits import (
+    BatchBits,
+    batch_concat,
+    batch_reduce_and,
+    batch_reduce_or,
+    batch_reduce_xor,
+    batch_sext,
+    batch_trunc,
+    batch_zext,
+    masked,
+)
+from pymtl3.dsl import MethodPort
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.errors import ModelTypeError, PassOrderError
+from pymtl3.passes.tracing.PrintTextWavePass import PrintTextWavePass
+from pymtl3.passes.tracing.VcdGenerationPass import VcdGenerationPass
+
+from .NetAliasing import is_slice_view, mk_slice_view
+from .PrepareSimPass import PrepareSimPass
+
+_batch_helpers = {
+  helpers.concat     : batch_concat,
+  helpers.trunc      : batch_trunc,
+  helpers.zext       : batch_zext,
+  helpers.sext       : batch_sext,
+  helpers.reduce_and : batch_reduce_and,
+  helpers.reduce_or  : batch_reduce_or,
+  helpers.reduce_xor : batch_reduce_xor,
+}
+
+#-------------------------------------------------------------------------
+# Runtime support of the if-converted update blocks
+#-------------------------------------------------------------------------
+# A mask is either None (all lanes are active), False (no lane is
+# active), or a bool vector.
+
+def _lanes_true( x ):
+  if isinstance( x, BatchBits ):
+    return x._uint != 0
+  return bool( x )
+
+def _cond( m, test ):
+  t = _lanes_true( test )
+  if t is True:  return m
+  if t is False: return False
+  if m is not None:
+    t = t & m
+  if not t.any():
+    return False
+  if t.all():
+    return None
+  return t
+
+def _else( m, c ):
+  if c is False: return m
+  if c is None or c is m: return False
+  e = ~c if m is None else m & ~c
+  return e if e.any() else False
+
+def _merge( m, v, old ):
+  if m is None or old is None:
+    return v
+  if isinstance( v, BatchBits ):
+    template = v
+  elif isinstance( old, BatchBits ):
+    template = old
+  elif isinstance( v, Bits ) and isinstance( old, Bits ) and v.nbits == old.nbits:
+    template = BatchBits( v.nbits, len(m) )
+  else:
+    raise NotImplementedError( f"Cannot merge local variable values {v!r} and {old!r} "
+                               "under a lane-dependent condition. Please use Bits.")
+  ret = template.clone()
+  ret @= old
+  ret @= masked( m, v )
+  return ret
+
+def _select( c, a, b ):
+  t = _lanes_true( c )
+  if t is True:  return a
+  if t is False: return b
+  return _merge( t, a, b )
+
+def _lnot( x ):
+  t = _lanes_true( x )
+  if t is True or t is False:
+    return not t
+  return BatchBits( 1, len(t), ~t )
+
+def _land( *xs ):
+  ret = True
+  for x in xs:
+    t = _lanes_true( x )
+    if t is False:
+      return x
+    if t is not True:
+      ret = t if ret is True else ret & t
+  if ret is True:
+    return xs[-1]
+  return BatchBits( 1, len(ret), ret )
+
+def _lor( *xs ):
+  ret = False
+  for x in xs:
+    t = _lanes_true( x )
+    if t is True:
+      return x
+    if t is not False:
+      ret = t if ret is False else ret | t
+  if ret is False:
+    return xs[-1]
+  return BatchBits( 1, len(ret), ret )
+
+def _uniform( m, what ):
+  if m is not None:
+    raise NotImplementedError( f"{what} under a lane-dependent condition is not supported "
+                               "in batch simulation." )
+
+def _index( base, idx ):
+  if isinstance( idx, BatchBits ) and isinstance( base, (list, tuple) ) and not idx.is_uniform():
+    template = None
+    u = idx._uint
+    for k in np.unique( u ):
+      v = base[ int(k) ]
+      if template is None:
+        if not isinstance( v, (Bits, BatchBits) ):
+          raise NotImplementedError( f"Cannot index a list of {type(v)} with lane-dependent index {idx}" )
+        template = BatchBits( v.nbits, len(u) )
+      template @= masked( u == k, v )
+    return template
+  return base[ idx ]
+
+def _bits_cast( cls ):
+  """ Bits constructors used in update blocks return BatchBits if the
+  value is a BatchBits. The width has to match, same as Bits. """
+  def from_batch( nbits, v ):
+    if v.nbits != nbits:
+      raise ValueError( f"The BatchBits{v.nbits} object on RHS cannot be used to construct Bits{nbits}!\n"
+                        f"- Suggestion: directly use trunc/zext/sext( value, {nbits} )" )
+    return v.clone()
+
+  if cls is Bits:
+    def cast( nbits, v=0, trunc_int=False ):
+      if isinstance( v, BatchBits ):
+        return from_batch( nbits, v )
+      return Bits( nbits, v, trunc_int )
+  else:
+    def cast( v=0, *, trunc_int=False ):
+      if isinstance( v, BatchBits ):
+        return from_batch( cls.nbits, v )
+      return cls( v, trunc_int=trunc_int )
+    cast.nbits = cls.nbits
+  return cast
+
+_runtime = {
+  "_bx_cond"   : _cond,
+  "_bx_else"   : _else,
+  "_bx_merge"  : _merge,
+  "_bx_select" : _select,
+  "_bx_lnot"   : _lnot,
+  "_bx_land"   : _land,
+  "_bx_lor"    : _lor,
+  "_bx_uniform": _uniform,
+  "_bx_index"  : _index,
+  "_bx_masked" : masked,
+}
+
+#-------------------------------------------------------------------------
+# _IfConverter
+#-------------------------------------------------------------------------
+
+class _IfConverter( ast.NodeTransformer ):
+  """ Rewrite the body of an update block so that each statement is
+  executed under the lane mask of the innermost enclosing branch. """
+
+  def __init__( self, local_names ):
+    self.local_names = local_names
+    self.mask  = "None"
+    self.count = 0
+
+  def _new_mask( self ):
+    self.count += 1
+    return f"_bx_m{self.count}"
+
+  def _call( self, func, args, node ):
+    return ast.copy_location( ast.Call( func=ast.Name( id=func, ctx=ast.Load() ),
+                                        args=args, keywords=[] ), node )
+
+  def _mask_expr( self ):
+    return ast.Name( id=self.mask, ctx=ast.Load() ) if self.mask != "None" else ast.Constant( None )
+
+  def convert_body( self, stmts ):
+    ret = []
+    for x in stmts:
+      y = self.visit( x )
+      if isinstance( y, list ): ret.extend( y )
+      elif y is not None:       ret.append( y )
+    return ret or [ ast.Pass() ]
+
+  # Statements
+
+  def visit_If( self, node ):
+    parent = self.mask
+    c, e   = self._new_mask(), self._new_mask()
+    test   = self.visit( node.test )
+
+    pre = [
+      ast.Assign( targets=[ ast.Name( id=c, ctx=ast.Store() ) ],
+                  value=self._call( "_bx_cond", [ self._mask_expr(), test ], node ) ),
+      ast.Assign( targets=[ ast.Name( id=e, ctx=ast.Store() ) ],
+                  value=self._call( "_bx_else", [ self._mask_expr(), ast.Name( id=c, ctx=ast.Load() ) ], node ) ),
+    ]
+
+    def guarded( mask, body ):
+      self.mask = mask
+      body = self.convert_body( body )
+      self.mask = parent
+      return ast.If( test=ast.Compare( left=ast.Name( id=mask, ctx=ast.Load() ),
+                                       ops=[ ast.IsNot() ], comparators=[ ast.Constant( False ) ] ),
+                     body=body, orelse=[] )
+
+    ret = pre + [ guarded( c, node.body ) ]
+    if node.orelse:
+      ret.append( guarded( e, node.orelse ) )
+    return [ ast.copy_location( x, node ) for x in ret ]
+
+  def _masked_value( self, value ):
+    if self.mask == "None":
+      return value
+    return self._call( "_bx_masked", [ self._mask_expr(), value ], value )
+
+  def _merge_local( self, name, value, node ):
+    if self.mask == "None":
+      return value
+    return self._call( "_bx_merge", [ self._mask_expr(), value,
+                                      ast.Name( id=name, ctx=ast.Load() ) ], node )
+
+  def visit_AugAssign( self, node ):
+    node.value = self.visit( node.value )
+    if isinstance( node.op, (ast.MatMult, ast.LShift) ):
+      node.target = self.visit( node.target )
+      node.value  = self._masked_value( node.value )
+      return node
+
+    # Other augmented assignments are only allowed on local variables
+    if self.mask != "None":
+      if not isinstance( node.target, ast.Name ) or node.target.id not in self.local_names:
+        raise NotImplementedError( "Only local variables can be updated with "
+                                   f"{type(node.op).__name__} under a lane-dependent condition." )
+      value = ast.BinOp( left=ast.Name( id=node.target.id, ctx=ast.Load() ), op=node.op, right=node.value )
+      return ast.copy_location( ast.Assign( targets=[ ast.Name( id=node.target.id, ctx=ast.Store() ) ],
+                                            value=self._merge_local( node.target.id, value, node ) ), node )
+    node.target = self.visit( node.target )
+    return node
+
+  def visit_Assign( self, node ):
+    node.value = self.visit( node.value )
+    if self.mask == "None":
+      node.targets = [ self.visit( x ) for x in node.targets ]
+      return node
+
+    if len(node.targets) != 1 or not isinstance( node.targets[0], ast.Name ):
+      raise NotImplementedError( "Only single local variable assignment is supported "
+                                 "under a lane-dependent condition." )
+    name = node.targets[0].id
+    node.value = self._merge_local( name, node.value, node )
+    return node
+
+  def _check_uniform( self, node, what ):
+    if self.mask == "None":
+      return node
+    check = ast.Expr( value=self._call( "_bx_uniform", [ self._mask_expr(), ast.Constant( what ) ], node ) )
+    return [ ast.copy_location( check, node ), node ]
+
+  def visit_Return( self, node ):
+    self.generic_visit( node )
+    return self._check_uniform( node, "return" )
+
+  def visit_Break( self, node ):
+    return self._check_uniform( node, "break" )
+
+  def visit_Continue( self, node ):
+    return self._check_uniform( node, "continue" )
+
+  def visit_While( self, node ):
+    node.test = self.visit( node.test )
+    node.body = self.convert_body( node.body )
+    if node.orelse:
+      node.orelse = self.convert_body( node.orelse )
+    return self._check_uniform( node, "while loop" )
+
+  def visit_For( self, node ):
+    node.iter = self.visit( node.iter )
+    if self.mask != "None" and not ( isinstance( node.target, ast.Name ) and
+                                     node.target.id in self.local_names ):
+      raise NotImplementedError( "Only local loop variables are supported under a lane-dependent condition." )
+    node.body = self.convert_body( node.body )
+    if node.orelse:
+      node.orelse = self.convert_body( node.orelse )
+    return node
+
+  # Expressions
+
+  def visit_IfExp( self, node ):
+    self.generic_visit( node )
+    return self._call( "_bx_select", [ node.test, node.body, node.orelse ], node )
+
+  def visit_BoolOp( self, node ):
+    self.generic_visit( node )
+    func = "_bx_land" if isinstance( node.op, ast.And ) else "_bx_lor"
+    return self._call( func, node.values, node )
+
+  def visit_UnaryOp( self, node ):
+    self.generic_visit( node )
+    if isinstance( node.op, ast.Not ):
+      return self._call( "_bx_lnot", [ node.operand ], node )
+    return node
+
+  def visit_Subscript( self, node ):
+    self.generic_visit( node )
+    idx = node.slice
+    if isinstance( idx, ast.Index ): # Python < 3.9
+      idx = idx.value
+    if isinstance( node.ctx, ast.Load ) and not isinstance( idx, (ast.Slice, ast.Constant) ):
+      return self._call( "_bx_index", [ node.value, idx ], node )
+    return node
+
+#-------------------------------------------------------------------------
+# BatchSimPass
+#-------------------------------------------------------------------------
+
+class BatchSimPass( PrepareSimPass ):
+
+  def __init__( self, batch_size, print_line_trace=True, reset_active_high=True ):
+    super().__init__( print_line_trace, reset_active_high )
+    assert batch_size >= 1
+    self.batch_size = batch_size
+
+  def __call__( self, top ):
+    if not hasattr( top, "_dag" ):
+      raise PassOrderError( "_dag" )
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+    if not hasattr( top._sched, "update_schedule" ):
+      raise PassOrderError( "update_schedule" )
+    if not hasattr( top._sched, "schedule_ff" ):
+      raise PassOrderError( "schedule_ff" )
+
+    if top.get_all_objects_of_type( MethodPort ) or \
+       top._dag.greenlet_upblks:
+      raise ModelTypeError( "pure RTL designs" )
+
+    if getattr( top._sched, "scc_blocks", None ):
+      raise ModelTypeError( "designs without combinational loops" )
+
+    if top.has_metadata( VcdGenerationPass.vcd_func ) or \
+       top.has_metadata( PrintTextWavePass.textwave_func ):
+      raise NotImplementedError( "Waveform generation is not supported in batch simulation." )
+
+    top._sched.update_schedule = [ self.batch_block( top, x ) for x in top._sched.update_schedule ]
+    top._sched.schedule_ff     = [ self.batch_block( top, x ) for x in top._sched.schedule_ff ]
+
+    super().__call__( top )
+
+    top._sim.batch_size = self.batch_size
+
+  #-----------------------------------------------------------------------
+  # batch_block
+  #-----------------------------------------------------------------------
+  # Recompile the update block with if-conversion. Net blocks and blocks
+  # without a cached AST only use @= and <<=, so we keep them as is.
+
+  def batch_block( self, top, blk ):
+    hostobj = top._dsl.all_upblk_hostobj
+    if blk not in hostobj:
+      return blk
+
+    info = hostobj[ blk ].get_update_block_info( blk )
+    if info is None:
+      return blk
+    is_lambda, src, line, filename, tree = info
+    if is_lambda:
+      return blk
+
+    func = copy.deepcopy( tree ).body[0]
+    assert isinstance( func, ast.FunctionDef ) and func.name == blk.__name__
+
+    code = blk.__code__
+    converter = _IfConverter( set( code.co_varnames ) )
+    body = converter.convert_body( func.body )
+
+    # Predeclare locals and masks so that _bx_merge can see unbound ones
+    predecl = [ x for x in code.co_varnames ] + \
+              [ f"_bx_m{i}" for i in range( 1, converter.count+1 ) ]
+    if predecl:
+      body.insert( 0, ast.parse( " = ".join( predecl ) + " = None" ).body[0] )
+
+    func.body = body
+    func.decorator_list = []
+    func.name = f"batch_{blk.__name__}"
+
+    # Wrap the block in a function that takes the closure variables
+    freevars = code.co_freevars
+    cells    = blk.__closure__ or ()
+    outer    = ast.parse( f"def _bx_compile( {', '.join(freevars)} ):\n  pass\n" ).body[0]
+    outer.body = [ func, ast.parse( f"return {func.name}" ).body[0] ]
+    module = ast.Module( body=[ outer ], type_ignores=[] )
+    ast.fix_missing_locations( module )
+
+    def batchify( v ):
+      try:
+        if v in _batch_helpers:
+          return _batch_helpers[ v ]
+      except TypeError: # unhashable
+        return v
+      if isinstance( v, type ) and issubclass( v, Bits ):
+        return _bits_cast( v )
+      return v
+
+    _globals = { k: batchify( v ) for k, v in blk.__globals__.items() }
+    _globals.update( _runtime )
+
+    args = [ batchify( x.cell_contents ) for x in cells ]
+
+    _locals = {}
+    custom_exec( compile( module, filename=f"{filename}:batch", mode="exec" ), _globals, _locals )
+    ret = _locals["_bx_compile"]( *args )
+    ret.__name__ = blk.__name__
+    return ret
+
+  #-----------------------------------------------------------------------
+  # Lock in simulation
+  #-----------------------------------------------------------------------
+  # Replace every Bits object in the design with a BatchBits object after
+  # the original lock_in_simulation is done. Signals in the same net
+  # share the same Bits object so we map the Bits objects by id.
+
+  def create_lock_unlock_simulation( self, top ):
+    super().create_lock_unlock_simulation( top )
+
+    lock_in_simulation = top.lock_in_simulation
+    batch_size = self.batch_size
+
+    def batch_lock_in_simulation():
+      lock_in_simulation()
+
+      mapping = top._sim.signal_object_mapping
+      new_values = {}
+
+      # A view of a slice becomes a view of the batch value of its parent
+      def get_batch_value( value ):
+        try:
+          return new_values[ id(value) ]
+        except KeyError:
+          pass
+        if is_slice_view( value ):
+          start = int( value._start )
+          ret = mk_slice_view( get_batch_value( value._parent ), start, start + value._nbits,
+                               BatchBits, np.uint64 )
+        else:
+          ret = BatchBits( value.nbits, batch_size, value )
+          ret._next = ret._uint
+        new_values[ id(value) ] = ret
+        return ret
+
+      for obj, (current_obj, i, is_list, value) in mapping.items():
+        if not isinstance( value, Bits ):
+          if isinstance( value, int ): # driven by an int constant
+            continue
+          raise ModelTypeError( f"designs whose signals are all Bits (not {obj!r} of {type(value)})" )
+
+        batch_value = get_batch_value( value )
+        mapping[ obj ] = (current_obj, i, is_list, batch_value)
+        if is_list: current_obj[i] = batch_value
+        else:       setattr( current_obj, i, batch_value )
+
+      inports = [ x for x in top._dsl.all_signals
+                  if x.is_input_value_port() and x.is_top_level_signal() and x.get_host_component() is top ]
+      checks  = [ mapping[x] + (repr(x)[2:],) for x in inports ]
+
+      def check_top_level_inports():
+        for host, i, is_list, obj, name in checks:
+          current = host[i] if is_list else host.__dict__[i]
+          assert current is obj, f'Please use @= to assign top level InPort top.{name}'
+
+      top._sim.check_top_level_inports = check_top_level_inports
+
+    top.lock_in_simulation = batch_lock_in_simulation
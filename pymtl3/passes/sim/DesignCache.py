@@ -0,0 +1,207 @@
+"""
+========================================================================
+DesignCache.py
+========================================================================
+An on-disk cache for the results of the DAG and schedule passes. Each
+entry is keyed by a hash of the elaborated design so that the second
+simulation of the same design can skip straight to tick creation.
+
+Everything is stored by name (repr of the object, host component +
+name for update blocks) and resolved back to the objects of the newly
+elaborated design on load.
+
+Date   : Oct 17, 2026
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+
+from pymtl3.dsl import Const, MethodPort, NamedObject
+
+# Bump this whenever the layout of cached entries changes
+CACHE_VERSION = 3
+
+_class_hashes = {}
+
+def _class_hash( cls ):
+  try:
+    return _class_hashes[ cls ]
+  except KeyError:
+    pass
+  try:
+    src = inspect.getsource( cls )
+  except (OSError, TypeError):
+    src = ""
+  ret = _class_hashes[ cls ] = hashlib.sha1( src.encode() ).hexdigest()
+  return ret
+
+#-------------------------------------------------------------------------
+# Naming
+#-------------------------------------------------------------------------
+
+def upblk_names( top ):
+  """ Return a dict that maps every update block of top, including net
+  blocks and greenlet wrappers if they exist, to a unique name. """
+
+  ret = {}
+  for blk in top.get_all_update_blocks():
+    ret[ blk ] = f"{top.get_update_block_host_component( blk )!r}:{blk.__name__}"
+
+  if hasattr( top, "_dag" ):
+    for blk in getattr( top._dag, "genblks", () ):
+      ret[ blk ] = f"net:{blk.__name__}"
+    for blk, wrapped in getattr( top._dag, "blk_greenlet_mapping", {} ).items():
+      ret[ wrapped ] = f"{ret[ blk ]}:greenlet"
+
+  return ret
+
+def signal_names( top ):
+  """ Return a dict that maps every signal-like object that can appear
+  in the DAG (net members, update block reads and writes) to a name.
+  Constants are named after the net they drive. """
+
+  ret = {}
+  for writer, net in top.get_all_value_nets():
+    for x in net:
+      if isinstance( x, Const ):
+        ret[ x ] = f"{x!r}@{min( repr(y) for y in net if y is not x )}"
+      else:
+        ret[ x ] = repr(x)
+
+  reads, writes, _ = top.get_all_upblk_metadata()
+  for data in [ reads, writes ]:
+    for objs in data.values():
+      for x in objs:
+        ret[ x ] = repr(x)
+
+  _, RD_U, WR_U, _ = top.get_all_explicit_constraints()
+  for data in [ RD_U, WR_U ]:
+    for x in data:
+      ret[ x ] = repr(x)
+
+  return ret
+
+def method_names( top ):
+  """ Return a dict that maps the actual method of every method port to
+  the name of the first (by name) port that holds it. """
+
+  ret = {}
+  ports = top.get_all_objects_of_type( MethodPort )
+  for port in sorted( ports, key=repr ):
+    if port.method is not None and port.method not in ret:
+      ret[ port.method ] = repr(port)
+  return ret
+
+class Namer:
+  """ Bidirectional mapping between the objects of a design and their
+  cached names. Encoding an unknown object raises KeyError so the caller
+  can give up on caching. """
+
+  def __init__( s, *dicts ):
+    s.names = {}
+    s.objs  = {}
+    for d in dicts:
+      for obj, name in d.items():
+        s.names.setdefault( obj, name )
+        s.objs.setdefault( name, obj )
+
+  def enc( s, obj ):
+    return s.names[ obj ]
+
+  def dec( s, name ):
+    return s.objs[ name ]
+
+#-------------------------------------------------------------------------
+# Design hash
+#-------------------------------------------------------------------------
+
+def design_hash( top ):
+  """ Hash the class sources and parameters of all components together
+  with the connections, update blocks and constraints of the design. """
+
+  h = hashlib.sha256()
+
+  def add( *items ):
+    h.update( repr(items).encode() )
+    h.update( b"\n" )
+
+  # The entries contain marshaled code objects, which are specific to
+  # the interpreter, e.g. PyPy and CPython report the same version_info
+  add( CACHE_VERSION, sys.implementation.name, sys.implementation.cache_tag, sys.version_info[:2] )
+
+  for c in sorted( top._dsl.all_components, key=repr ):
+    add( "component", repr(c),
+         [ (x.__module__, x.__qualname__, _class_hash(x)) for x in type(c).__mro__ ],
+         c._dsl.args, sorted( c._dsl.kwargs.items() ) )
+
+  for x in sorted( top._dsl.all_signals, key=repr ):
+    add( "signal", repr(x), repr(x._dsl.Type) )
+
+  blks = upblk_names( top )
+  sigs = signal_names( top )
+  def names( objs ):
+    return sorted( blks[x] if x in blks else sigs.get( x, repr(x) ) for x in objs )
+
+  for writer, net in sorted( top.get_all_value_nets(), key=lambda x: sigs[x[0]] ):
+    add( "net", sigs[ writer ], names( net ) )
+
+  for writer, net in sorted( top.get_all_method_nets(), key=lambda x: repr(x[0]) ):
+    add( "method_net", repr(writer), names( net ) )
+
+  reads, writes, calls = top.get_all_upblk_metadata()
+  update_ff   = top.get_all_update_ff()
+  update_once = top.get_all_update_once()
+  for blk in sorted( top.get_all_update_blocks(), key=blks.get ):
+    add( "upblk", blks[ blk ], blk in update_ff, blk in update_once,
+         names( reads.get( blk, () ) ), names( writes.get( blk, () ) ),
+         names( calls.get( blk, () ) ) )
+
+  U_U, RD_U, WR_U, U_M = top.get_all_explicit_constraints()
+  add( "U_U", sorted( (blks[x], blks[y]) for x, y in U_U ) )
+  for typ, data in [ ("RD_U", RD_U), ("WR_U", WR_U) ]:
+    add( typ, sorted( (sigs[x], sorted( (sign, blks[y]) for sign, y in v ))
+                      for x, v in data.items() ) )
+  add( "U_M", sorted( (names([x]), names([y]), is_equal) for x, y, is_equal in U_M ) )
+
+  return h.hexdigest()
+
+#-------------------------------------------------------------------------
+# DesignCache
+#-------------------------------------------------------------------------
+
+class DesignCache:
+  """ A directory of pickled entries. Each pass stores its own section
+  of the entry of a design. """
+
+  def __init__( s, path, key ):
+    s.path = path
+    s.key  = key
+    s.hits = set()
+
+  def _filename( s, section ):
+    return os.path.join( s.path, f"{s.key}.{section}.pkl" )
+
+  def load( s, section ):
+    try:
+      with open( s._filename( section ), "rb" ) as f:
+        ret = pickle.load( f )
+    except Exception:
+      return None
+    s.hits.add( section )
+    return ret
+
+  def store( s, section, data ):
+    os.makedirs( s.path, exist_ok=True )
+    # Write to a temporary file first so that a concurrent run never
+    # sees a partial entry
+    fd, tmp = tempfile.mkstemp( dir=s.path, suffix=".tmp" )
+    try:
+      with os.fdopen( fd, "wb" ) as f:
+        pickle.dump( data, f, protocol=pickle.HIGHEST_PROTOCOL )
+      os.replace( tmp, s._filename( section ) )
+    except BaseException:
+      os.unlink( tmp )
+      raise
@@ -17,8 +17,8 @@ from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 from pymtl3.passes.errors import PassOrderError
 
+from .DesignCache import Namer, upblk_names
 from .SimpleSchedulePass import SimpleSchedulePass, dump_dag
-from .SimpleTickPass import SimpleTickPass
 
 
 class DynamicSchedulePass( BasePass ):
@@ -31,13 +31,84 @@ class DynamicSchedulePass( BasePass ):
 
     top._sched = PassMetadata()
 
-    self.schedule_intra_cycle( top )
+    cache = getattr( top._dag, "cache", None )
+    if cache is None or not self._load_cached_schedule( top, cache ):
+      self.schedule_intra_cycle( top )
+      if cache is not None:
+        self._store_cached_schedule( top, cache )
 
     # Reuse simple's ff and flip schedule
     simple = SimpleSchedulePass()
     simple.schedule_ff( top )
     simple.schedule_posedge_flip( top )
 
+  #-----------------------------------------------------------------------
+  # On-disk cache
+  #-----------------------------------------------------------------------
+  # Each schedule entry is either the name of an update block or the
+  # names of the blocks in an SCC together with its generated source.
+
+  def _load_cached_schedule( self, top, cache ):
+    data = cache.load( "schedule" )
+    if data is None:
+      return False
+
+    namer = Namer( upblk_names( top ) )
+    top._sched.update_schedule = schedule = []
+    top._sched.scc_blocks = {}
+    top._sched.scc_srcs   = {}
+    top._sched.scc_stats  = {}
+    try:
+      for entry in data:
+        if isinstance( entry, str ):
+          schedule.append( namer.dec( entry ) )
+        else:
+          names, src = entry
+          tmp_schedule = [ namer.dec(x) for x in names ]
+          scc_blk = self.gen_wrapped_SCCblk( top, tmp_schedule, src )
+          top._sched.scc_blocks[ scc_blk ] = tmp_schedule
+          top._sched.scc_srcs[ scc_blk ] = src
+          top._sched.scc_stats[ scc_blk ] = scc_blk.__globals__[ "stats" ]
+          schedule.append( scc_blk )
+    except KeyError:
+      cache.hits.discard( "schedule" )
+      return False
+
+    # The cached schedule may have been formed with a different set of
+    # blocks, e.g. with or without SimOptimizePass. Net blocks that do
+    # nothing are never executed, so they don't matter.
+    blks = set()
+    for x in schedule:
+      blks.update( top._sched.scc_blocks.get( x, [x] ) )
+    nop = top._dag.nop_genblks
+    if blks - nop != top._dag.final_upblks - top.get_all_update_ff() - nop:
+      cache.hits.discard( "schedule" )
+      return False
+    return True
+
+  def _store_cached_schedule( self, top, cache ):
+    namer = Namer( upblk_names( top ) )
+    data = []
+    for blk in top._sched.update_schedule:
+      if blk in top._sched.scc_blocks:
+        data.append( ( [ namer.enc(x) for x in top._sched.scc_blocks[ blk ] ],
+                       top._sched.scc_srcs[ blk ] ) )
+      else:
+        data.append( namer.enc( blk ) )
+    cache.store( "schedule", data )
+
+  @staticmethod
+  def gen_wrapped_SCCblk( s, scc, src ):
+
+    # stats counts the calls, the iterations and the executed blocks
+    _globals = { f"blk{i}": blk for i, blk in enumerate( scc ) }
+    _globals.update( { 's': s, 'stats': [ 0, 0, 0 ], 'deepcopy': deepcopy,
+                       'UpblkCyclicError': UpblkCyclicError } )
+    _locals  = {}
+
+    custom_exec(py.code.Source( src ).compile(), _globals, _locals)
+    return _locals[ 'generated_block' ]
+
   def schedule_intra_cycle( self, top ):
 
     # Construct the intra-cycle graph based on normal update blocks
@@ -96,6 +167,19 @@ class DynamicSchedulePass( BasePass ):
     # Put the graph schedule to _sched
     top._sched.update_schedule = schedule = []
 
+    # Map each generated SCC block to the update blocks it wraps, to its
+    # source, and to its [ calls, iterations, executed blocks ]
+    top._sched.scc_blocks = {}
+    top._sched.scc_srcs   = {}
+    top._sched.scc_stats  = {}
+
+    # The SCC blocks generated by a previous run on the same design are
+    # reused if their blocks and variables are the same, see GenDAGPass.
+    # The key leaves out the SCC id which only names the block.
+    prev_scc_blks = getattr( top._dag, "prev_scc_blks", None ) or {}
+    top._dag.prev_scc_blks = None
+    top._dag.scc_blks = {}
+
     scc_id = 0
     for i in scc_schedule:
       scc = SCCs[i]
@@ -121,6 +205,10 @@ class DynamicSchedulePass( BasePass ):
                               f"in 'top.{repr(top.get_update_block_host_component(y))[2:]}')"
                               for y in scc] ))
 
+        # Collect the edges within the SCC once instead of scanning all
+        # edges of the graph for every SCC
+        scc_edges = [ (u, v) for u in scc for v in G[u] if v in scc ]
+
         tmp_schedule = []
         Q = deque()
 
@@ -128,9 +216,8 @@ class DynamicSchedulePass( BasePass ):
           # We start bfs from the block that has the least number of input
           # edges in the SCC
           InD = { v: 0 for v in scc }
-          for (u, v) in E: # u -> v
-            if u in scc and v in scc:
-              InD[ v ] += 1
+          for (u, v) in scc_edges: # u -> v
+            InD[ v ] += 1
           Q.append( max(InD, key=InD.get) )
 
         else:
@@ -155,104 +242,108 @@ class DynamicSchedulePass( BasePass ):
 
         scc_id += 1
         variables = set()
-        for (u, v) in E:
+        for (u, v) in scc_edges:
           # Collect all variables that triggers other blocks in the SCC
-          if u in scc and v in scc:
-            variables.update( constraint_objs[ (u, v) ] )
+          variables.update( constraint_objs[ (u, v) ] )
 
         if len(variables) == 0:
           raise UpblkCyclicError("There is a cyclic dependency without involving variables."
                           "Probably a loop that involves blocks that should be update_once:\n{}"\
                           .format(", ".join( [ x.__name__ for x in scc] )))
 
-        # generate a loop for scc
-        # Shunning: we just simply loop over the whole SCC block
-        # TODO performance optimizations using Mamba techniques within a SCC block
-
-        def gen_wrapped_SCCblk( s, scc, src ):
-
-          # TODO mamba?
-          scc_tick_func = SimpleTickPass.gen_tick_function( scc )
-          _globals = { 's': s, 'scc_tick_func': scc_tick_func, 'deepcopy': deepcopy,
-                       'UpblkCyclicError': UpblkCyclicError }
-          _locals  = {}
-
-          custom_exec(py.code.Source( src ).compile(), _globals, _locals)
-          return _locals[ 'generated_block' ]
-
-        template = """
-def wrapped_SCC_{0}():
-  N = 0
-  while True:
-    N += 1
-    if N > 100:
-      raise UpblkCyclicError("Combinational loop detected at runtime in {{{3}}} after 100 iters!")
-    {1}
-    scc_tick_func()
-    {2}
-    # print( "SCC block{0} is executed", num_iters, "times" )
-    break
-generated_block = wrapped_SCC_{0}
-          """
-
-        copy_srcs  = []
-        check_srcs = []
-        # print_srcs = []
-
-        # clean up non-top variables if top is there. remove slices
-
-        final_variables = set()
-
-        for x in sorted( variables, key=repr ):
-          w = x.get_top_level_signal()
-          if w is x:
-            final_variables.add( x )
-            continue
-
-          # w is not x
-          if issubclass( w._dsl.Type, Bits ):
-            if w not in final_variables:
-              final_variables.add( w )
-          elif is_bitstruct_class( w._dsl.Type ):
-            if w not in final_variables:
-              final_variables.add( x )
-          else:
-            final_variables.add( x )
-
-        # group them by host component so that we create less bytecode
-
-        final_var_host = defaultdict(list)
-        for x in final_variables:
-          final_var_host[ x.get_host_component() ].append( x )
-
-        # create a block of copy/check code for each host component. Need
-        # to allocate global var_id across different host components.
-
-        var_id = 0
-        for host, var_list in final_var_host.items():
-
-          copy_srcs .append( f"host={host!r}" )
-          check_srcs.append( f"host={host!r}" )
-
-          sub_check_srcs = []
-
-          hostlen = len(repr(host))
-          for var in var_list:
-            var_id += 1
-            subname = repr(var)[hostlen+1:]
-            if issubclass( var._dsl.Type, Bits ):     copy_srcs.append( f"t{var_id}=host.{subname}.clone()" )
-            elif is_bitstruct_class( var._dsl.Type ): copy_srcs.append( f"t{var_id}=host.{subname}.clone()" )
-            else:                                     copy_srcs.append( f"t{var_id}=deepcopy(host.{subname})" )
-
-            sub_check_srcs.append( f"host.{subname} != t{var_id}" )
-
-          check_srcs.append( f"if { ' or '.join(sub_check_srcs)}: continue" )
-
-        scc_block_src = template.format( scc_id, "; ".join( copy_srcs ), "\n    ".join( check_srcs ),
-                                         ", ".join( [ x.__name__ for x in scc] ) )
-
-        # print(scc_block_src)
-        schedule.append( gen_wrapped_SCCblk( top, tmp_schedule, scc_block_src ) )
+        scc_block_src = self.gen_SCC_src( scc_id, tmp_schedule, scc_edges, constraint_objs )
+        key = ( tuple( tmp_schedule ), scc_block_src.replace( f"wrapped_SCC_{scc_id}", "wrapped_SCC" ) )
+
+        if key in prev_scc_blks:
+          scc_blk, scc_block_src = prev_scc_blks[ key ]
+        else:
+          scc_blk = self.gen_wrapped_SCCblk( top, tmp_schedule, scc_block_src )
+
+        top._dag.scc_blks[ key ] = ( scc_blk, scc_block_src )
+        top._sched.scc_blocks[ scc_blk ] = tmp_schedule
+        top._sched.scc_srcs  [ scc_blk ] = scc_block_src
+        top._sched.scc_stats [ scc_blk ] = scc_blk.__globals__[ "stats" ]
+        schedule.append( scc_blk )
+
+  @staticmethod
+  def gen_SCC_src( scc_id, tmp_schedule, scc_edges, constraint_objs ):
+    """ Generate a worklist evaluator of the SCC. Every block starts
+    dirty and the blocks are executed in the order of tmp_schedule until
+    none is dirty. The evaluator keeps the last seen value of every
+    variable that connects two blocks in the SCC, which is the raw
+    _uint for Bits, so after a block is executed it only compares the
+    variables the block writes and marks their readers dirty. """
+
+    # Use the top-level signal of a slice, and the field of a bitstruct
+    # unless the whole bitstruct is a variable as well
+
+    variables = set()
+    for (u, v) in scc_edges:
+      variables.update( constraint_objs[ (u, v) ] )
+
+    def get_var( x ):
+      w = x.get_top_level_signal()
+      if w is x or issubclass( w._dsl.Type, Bits ) or w in variables:
+        return w
+      return x
+
+    index   = { blk: i for i, blk in enumerate( tmp_schedule ) }
+    var_id  = {}
+    writes  = [ set() for _ in tmp_schedule ]
+    readers = defaultdict(set)
+
+    for x in sorted( variables, key=repr ):
+      w = get_var( x )
+      if w not in var_id:
+        var_id[ w ] = len(var_id)
+
+    for (u, v) in scc_edges:
+      for x in constraint_objs[ (u, v) ]:
+        w = var_id[ get_var( x ) ]
+        writes [ index[u] ].add( w )
+        readers[ w ].add( index[v] )
+
+    # The last seen value is the raw _uint of Bits, and a copy otherwise
+    var_read = {}
+    var_copy = {}
+    for w, i in var_id.items():
+      if issubclass( w._dsl.Type, Bits ):
+        var_read[i] = f"{w!r}._uint"
+      else:
+        var_read[i] = repr(w)
+        var_copy[i] = f"{w!r}.clone()" if is_bitstruct_class( w._dsl.Type ) else f"deepcopy({w!r})"
+
+    n = len(tmp_schedule)
+    srcs = [ f"def wrapped_SCC_{scc_id}():",
+             "  " + "; ".join( f"t{i} = {var_copy.get( i, x )}" for i, x in sorted( var_read.items() ) ),
+             "  " + " = ".join( f"d{i}" for i in range(n) ) + " = True",
+             "  N = R = 0",
+             "  while True:",
+             "    N += 1",
+             "    if N > 100:",
+             "      raise UpblkCyclicError(\"Combinational loop detected at runtime in "
+               f"{{{', '.join( x.__name__ for x in tmp_schedule )}}} after 100 iters!\")" ]
+
+    for i, blk in enumerate( tmp_schedule ):
+      srcs += [ f"    if d{i}:",
+                f"      d{i} = False; R += 1",
+                f"      blk{i}() # {blk.__name__}" ]
+      for w in sorted( writes[i] ):
+        wake = " = ".join( f"d{j}" for j in sorted( readers[w] ) ) + " = True"
+        if w in var_copy:
+          srcs += [ f"      if {var_read[w]} != t{w}:",
+                    f"        t{w} = {var_copy[w]}; {wake}" ]
+        else:
+          srcs += [ f"      x = {var_read[w]}",
+                    f"      if x != t{w}:",
+                    f"        t{w} = x; {wake}" ]
+
+    srcs += [ "    if not (" + " or ".join( f"d{i}" for i in range(n) ) + "):",
+              "      break",
+              "  stats[0] += 1; stats[1] += N; stats[2] += R",
+              f"generated_block = wrapped_SCC_{scc_id}" ]
+
+    return "\n".join( srcs ) + "\n"
 
 def kosaraju_scc( G, G_T ):
 
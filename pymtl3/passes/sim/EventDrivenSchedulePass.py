@@ -0,0 +1,249 @@
+"""
+========================================================================
+EventDrivenSchedulePass.py
+========================================================================
+Generate an activity-driven schedule on top of the dynamic schedule.
+Instead of replaying the whole intra-cycle schedule every cycle, we
+dirty-mark an update block only when one of the signals it reads has
+changed, and then execute the dirty blocks in topological order.
+
+Date   : Oct 17, 2026
+"""
+import ast
+import linecache
+from collections import defaultdict
+
+from pymtl3.datatypes import Bits
+from pymtl3.dsl import CalleePort, Component, Interface, MethodPort, Signal
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.errors import PassOrderError
+
+from .DynamicSchedulePass import DynamicSchedulePass
+
+
+# Python-level state that the update blocks read cannot be observed, so
+# a block that reads a component attribute other than signals, ports,
+# subcomponents, interfaces and types is kept active every cycle, e.g.
+# s.cnt that an update_ff block increments with s.cnt = s.cnt + 1.
+
+def _is_structural( obj ):
+  if isinstance( obj, (Signal, Component, Interface, MethodPort, type) ):
+    return True
+  if isinstance( obj, list ):
+    return all( _is_structural( x ) for x in obj )
+  return False
+
+def _resolve( blk, name ):
+  code = blk.__code__
+  if name in code.co_freevars:
+    try:
+      return blk.__closure__[ code.co_freevars.index( name ) ].cell_contents
+    except ValueError: # empty cell
+      return None
+  return blk.__globals__.get( name )
+
+def _static_bases( blk, node ):
+  """ Return the components and interfaces that node in update block blk
+  can evaluate to, e.g. every element of s.inners for s.inners[i]. """
+  if isinstance( node, ast.Name ):
+    objs = [ _resolve( blk, node.id ) ]
+  elif isinstance( node, ast.Attribute ):
+    objs = [ x.__dict__.get( node.attr ) for x in _static_bases( blk, node.value ) ]
+  elif isinstance( node, ast.Subscript ):
+    objs = [ y for x in _static_lists( blk, node.value ) for y in x ]
+  else:
+    return []
+  return [ x for x in objs if isinstance( x, (Component, Interface) ) ]
+
+def _static_lists( blk, node ):
+  """ Return the lists of components/interfaces that node can evaluate
+  to, e.g. s.inners or s.grid[i]. """
+  if isinstance( node, ast.Attribute ):
+    objs = [ x.__dict__.get( node.attr ) for x in _static_bases( blk, node.value ) ]
+  elif isinstance( node, ast.Subscript ):
+    objs = [ y for x in _static_lists( blk, node.value ) for y in x ]
+  else:
+    return []
+  return [ x for x in objs if isinstance( x, list ) ]
+
+def _python_state_access( blk, tree ):
+  """ Return ( reads, writes ) where reads is whether update block blk
+  reads a Python attribute of a component and writes is whether it
+  assigns one. """
+  reads = writes = False
+  for node in ast.walk( tree ):
+    if isinstance( node, (ast.Assign, ast.AugAssign, ast.AnnAssign) ):
+      if isinstance( node, ast.AugAssign ) and isinstance( node.op, (ast.MatMult, ast.LShift) ):
+        continue
+      targets = node.targets if isinstance( node, ast.Assign ) else [ node.target ]
+      for target in targets:
+        for x in ast.walk( target ):
+          if isinstance( x, ast.Attribute ) and _static_bases( blk, x.value ):
+            writes = True
+
+    elif isinstance( node, ast.Attribute ) and isinstance( node.ctx, ast.Load ):
+      for base in _static_bases( blk, node.value ):
+        if not _is_structural( base.__dict__.get( node.attr ) ):
+          reads = True
+
+  return reads, writes
+
+class EventDrivenSchedulePass( DynamicSchedulePass ):
+
+  def __call__( self, top ):
+    super().__call__( top )
+
+    self.schedule_event_driven( top )
+
+  def schedule_event_driven( self, top ):
+    if not hasattr( top._sched, "scc_blocks" ):
+      raise PassOrderError( "scc_blocks" )
+
+    schedule = top._sched.update_schedule
+
+    upblk_reads, upblk_writes, upblk_calls = top.get_all_upblk_metadata()
+    genblk_reads, genblk_writes = top._dag.genblk_reads, top._dag.genblk_writes
+    onces = top.get_all_update_once()
+
+    greenlet_blks = set()
+    if hasattr( top._dag, "blk_greenlet_mapping" ):
+      greenlet_blks = set( top._dag.blk_greenlet_mapping.values() )
+
+    # Update blocks in a component that exposes callee methods usually
+    # read Python-level state that is modified by method calls, which we
+    # cannot observe. The same goes for a component where some update
+    # block assigns a Python attribute, and for every block that reads
+    # one. We conservatively keep them active every cycle.
+
+    stateful_hosts = { x.get_host_component() for x in top.get_all_objects_of_type( CalleePort )
+                       if x.method is not None }
+    stateful_blks  = set()
+
+    for blk in top.get_all_update_blocks():
+      host = top.get_update_block_host_component( blk )
+      info = host.get_update_block_info( blk )
+      if info is None:
+        stateful_blks.add( blk )
+        continue
+      reads, writes = _python_state_access( blk, info[-1] )
+      if reads:
+        stateful_blks.add( blk )
+      if writes:
+        stateful_hosts.add( host )
+
+    #---------------------------------------------------------------------
+    # Collect the top level signals each schedule entry reads/writes
+    #---------------------------------------------------------------------
+    # An entry is either a single block or a generated SCC block. We
+    # always track the top level signal since slices and bitstruct fields
+    # share the same value object with their top level signal.
+
+    always_active = set()
+    read_entries  = defaultdict(set) # signal -> entries that read it
+    entry_writes  = [ set() for _ in schedule ]
+
+    for i, entry in enumerate( schedule ):
+      for blk in top._sched.scc_blocks.get( entry, (entry,) ):
+
+        if blk in genblk_writes:
+          reads  = genblk_reads.get( blk, () )
+          writes = genblk_writes[ blk ]
+
+        elif blk in greenlet_blks or blk not in upblk_reads:
+          always_active.add( i )
+          continue
+
+        else:
+          reads  = upblk_reads[ blk ]
+          writes = upblk_writes[ blk ]
+
+          if not reads or upblk_calls[ blk ] or blk in onces or blk in stateful_blks or \
+             top.get_update_block_host_component( blk ) in stateful_hosts:
+            always_active.add( i )
+
+        for x in reads:
+          if isinstance( x, Signal ):
+            read_entries[ x.get_top_level_signal() ].add( i )
+          else: # interface/component as a whole, cannot track
+            always_active.add( i )
+
+        for x in writes:
+          entry_writes[i].add( x.get_top_level_signal() )
+
+    all_writes = set()
+    for writes in entry_writes:
+      all_writes |= writes
+
+    # Source signals are read by some entry but written outside the
+    # intra-cycle schedule, e.g. top level inports and update_ff outputs
+
+    sources = [ x for x in read_entries if x not in all_writes ]
+
+    #---------------------------------------------------------------------
+    # Generate the event-driven block
+    #---------------------------------------------------------------------
+    # We keep the last observed value of every tracked signal in L and
+    # the dirty flag of every entry in D. After an entry executes we
+    # compare the signals it writes against the last observed values and
+    # dirty-mark the readers of the signals that changed. Since entries
+    # are in topological order, readers are executed later in the same
+    # evaluation. Note that we compare raw _uint for Bits signals.
+
+    var_id = {}
+
+    def gen_check_srcs( signals, indent ):
+      srcs = []
+      for x in sorted( signals, key=repr ):
+        readers = read_entries.get( x )
+        if not readers:
+          continue # nobody in the schedule cares about this signal
+
+        if x not in var_id:
+          var_id[x] = len(var_id)
+        v = var_id[x]
+
+        mark = " = ".join( [ f"D[{j}]" for j in sorted(readers) ] ) + " = True"
+
+        srcs.append( f"x = s.{repr(x)[2:]}" )
+        if issubclass( x._dsl.Type, Bits ):
+          srcs.append( f"if x._uint != L[{v}]:" )
+          srcs.append( f"  L[{v}] = x._uint; {mark}" )
+        else:
+          srcs.append( f"if x != L[{v}]:" )
+          srcs.append( f"  L[{v}] = x.clone(); {mark}" )
+
+      return [ indent + y for y in srcs ]
+
+    lines = [ "def event_driven_comb():" ] + gen_check_srcs( sources, "  " )
+
+    for i, entry in enumerate( schedule ):
+      lines.append( f"  # [{i}] {entry.__name__}" )
+      if i in always_active:
+        lines.append( f"  blk{i}()" )
+        lines.extend( gen_check_srcs( entry_writes[i], "  " ) )
+      else:
+        lines.append( f"  if D[{i}]:" )
+        lines.append( f"    D[{i}] = False" )
+        lines.append( f"    blk{i}()" )
+        lines.extend( gen_check_srcs( entry_writes[i], "    " ) )
+
+    lines.append( "  pass" )
+
+    # Every entry needs to execute in the first evaluation
+
+    D = [ True ] * len(schedule)
+    L = [ None ] * len(var_id)
+
+    _globals = { f"blk{i}": entry for i, entry in enumerate( schedule ) }
+    _globals.update( { 's': top, 'D': D, 'L': L } )
+    _locals  = {}
+
+    # Same as schedule_posedge_flip, use exec(compile()) + linecache to
+    # avoid py.code.Source overhead for huge designs
+    custom_exec( compile( '\n'.join(lines), filename='event_driven_comb', mode='exec' ), _globals, _locals )
+    linecache.cache['event_driven_comb'] = (1, None, lines, 'event_driven_comb')
+
+    top._sched.event_dirty_flags  = D
+    top._sched.event_last_values  = L
+    top._sched.event_always_active = always_active
+    top._sched.update_schedule = [ _locals['event_driven_comb'] ]
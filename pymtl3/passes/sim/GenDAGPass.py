@@ -8,6 +8,7 @@ a model.
 Author : Shunning Jiang
 Date   : Jan 18, 2018
 """
+import marshal
 from collections import defaultdict, deque
 from linecache import cache as line_cache
 
@@ -18,12 +19,29 @@ from pymtl3.dsl.errors import LeftoverPlaceholderError
 from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 
+from .DesignCache import DesignCache, Namer, design_hash, method_names, signal_names, upblk_names
+from .NetAliasing import split_net
+
 
 class GenDAGPass( BasePass ):
 
+  #: Directory of the on-disk DAG/schedule cache
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: None (no caching)
+  cache_dir = MetadataKey(str)
+
   def __call__( self, top ):
     top.check()
+
+    # When the pass is applied again after the design is mutated (e.g.
+    # replace_component or add_connection), the net blocks, implicit
+    # constraints and SCC blocks of the previous run are reused for the
+    # part of the design that didn't change.
+    prev = getattr( top, "_dag", None )
     top._dag = PassMetadata()
+    top._dag.prev_scc_blks = getattr( prev, "scc_blks", {} )
 
     placeholders = [ x for x in top._dsl.all_named_objects
                      if isinstance( x, Placeholder ) ]
@@ -31,82 +49,211 @@ class GenDAGPass( BasePass ):
     if placeholders:
       raise LeftoverPlaceholderError( placeholders )
 
-    self._generate_net_blocks( top )
-    self._process_value_constraints( top )
+    top._dag.cache = None
+    if top.has_metadata( self.cache_dir ) and top.get_metadata( self.cache_dir ) is not None:
+      top._dag.cache = DesignCache( top.get_metadata( self.cache_dir ), design_hash( top ) )
+
+    self._connect_method_nets( top )
+
+    if top._dag.cache is not None and self._load_cached_dag( top ):
+      return
+
+    self._generate_net_blocks( top, prev=prev )
+    self._process_value_constraints( top, prev )
     self._process_methods( top )
 
-  def _generate_net_blocks( self, top ):
+    if top._dag.cache is not None:
+      self._store_cached_dag( top )
+
+  #-----------------------------------------------------------------------
+  # On-disk cache
+  #-----------------------------------------------------------------------
+
+  def _load_cached_dag( self, top ):
+    data = top._dag.cache.load( "dag" )
+    if data is None:
+      return False
+
+    try:
+      self._generate_net_blocks( top, data["genblks"] )
+
+      namer = Namer( upblk_names( top ), signal_names( top ) )
+      methods = Namer( method_names( top ) )
+
+      def dec_callee( x ):
+        kind, name = x
+        return namer.dec( name ) if kind == "U" else methods.dec( name )
+
+      top._dag.all_constraints = { (namer.dec(x), namer.dec(y)) for x, y in data["all_constraints"] }
+      top._dag.constraint_objs = defaultdict(set)
+      for (x, y), objs in data["constraint_objs"]:
+        top._dag.constraint_objs[ (namer.dec(x), namer.dec(y)) ] = { namer.dec(z) for z in objs }
+      top._dag.top_level_callee_constraints = { (dec_callee(x), dec_callee(y))
+                                                for x, y in data["top_level_callee_constraints"] }
+      top._dag.greenlet_upblks = { namer.dec(x) for x in data["greenlet_upblks"] }
+
+    except (KeyError, ValueError, TypeError, EOFError):
+      # Stale entry that doesn't match this design; rebuild everything
+      top._dag.cache.hits.discard( "dag" )
+      return False
+
+    return True
+
+  def _store_cached_dag( self, top ):
+    namer = Namer( upblk_names( top ), signal_names( top ) )
+    methods = Namer( method_names( top ) )
+
+    def enc_callee( x ):
+      if x in namer.names:
+        return ( "U", namer.enc(x) )
+      return ( "M", methods.enc(x) )
+
+    try:
+      data = {
+        "genblks": top._dag.genblk_records,
+        "all_constraints": [ (namer.enc(x), namer.enc(y)) for x, y in top._dag.all_constraints ],
+        "constraint_objs": [ ((namer.enc(x), namer.enc(y)), [ namer.enc(z) for z in objs ])
+                             for (x, y), objs in top._dag.constraint_objs.items() ],
+        "top_level_callee_constraints": [ (enc_callee(x), enc_callee(y))
+                                          for x, y in top._dag.top_level_callee_constraints ],
+        "greenlet_upblks": [ namer.enc(x) for x in top._dag.greenlet_upblks ],
+      }
+    except KeyError:
+      # Some object in the DAG has no stable name (e.g. a plain method
+      # in a method constraint). Don't cache this design.
+      return
+
+    top._dag.cache.store( "dag", data )
+
+  def _generate_net_blocks( self, top, cached=None, prev=None ):
     """ _generate_net_blocks:
     Each net is an update block. Readers are actually "written" here.
       >>> s.net_reader1 = s.net_writer
-      >>> s.net_reader2 = s.net_writer """
+      >>> s.net_reader2 = s.net_writer
+
+    If cached records are given, the net blocks are recreated from the
+    cached code objects without analyzing the nets again. If the DAG
+    metadata of a previous run is given, the blocks of the nets that
+    still have the same writer and members are reused. """
 
     top._dag.genblks = set()
     top._dag.genblk_hostobj = {}
     top._dag.genblk_reads   = {}
     top._dag.genblk_writes  = {}
-    # top._dag.genblk_src     = {}
-
-    # Fall back to compiling one block at a time
-    # This is currently because there might be different structs with
-    # the same name but essentially different type. It requires name
-    # disambiguation to let them co-exist in closure. With block-by-block
-    # compilation, we minimize the effect.
+    top._dag.genblk_src     = {}
+
+    # Net blocks without anything to copy, e.g. when all members share
+    # one value. They only convey the constraints of the net, so the
+    # simulation doesn't have to execute them.
+    top._dag.nop_genblks = set()
+
+    # ( writer, lca, name, src, code, reads, writes ) of every net block,
+    # used to populate the on-disk cache
+    top._dag.genblk_records = []
+
+    # Arguments of add_net_blk for every net block by ( writer, members )
+    top._dag.net_blks = {}
+    prev_net_blks = getattr( prev, "net_blks", {} )
+
+    # Net blocks with the same source relative to their LCA, e.g. the
+    # nets inside every instance of a component, share one compiled
+    # module that defines a generic net_blk. Each net executes the module
+    # with its own globals (the LCA and the struct types of a constant
+    # writer), so there is no name collision between different structs
+    # with the same name, and then the block is renamed.
+    codes  = {} # generic source -> code
+    dumped = {} # code -> marshaled code for the on-disk cache
+
+    def compile_net_blk( _globals, name, src, writer, data=None ):
+      generic = src.replace( f"def {name}():", "def net_blk():", 1 )
+      code = codes.get( generic )
+      if code is None:
+        if data is not None:
+          code = marshal.loads( data )
+        else:
+          fname = f"Net block {len(codes)} (e.g. writer is {writer!r})"
+          code  = compile( generic, filename=fname, mode="exec" )
+          line_cache[ fname ] = (len(generic), None, generic.splitlines(), fname )
+        codes[ generic ] = code
 
-    # TODO see if directly compiling AST instead of source can be faster
-    def compile_net_blk( _globals, src, writer ):
       _locals = {}
-      fname = f"Net (writer is {writer!r}"
-      custom_exec( compile( src, filename=fname, mode="exec"), _globals, _locals )
-      line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
-      return list(_locals.values())[0]
+      custom_exec( code, _globals, _locals )
+      blk = _locals[ "net_blk" ]
+      blk.__name__ = blk.__qualname__ = name
+      return blk, code
+
+    def add_net_blk( blk, code, src, writer, lca, reads, writes ):
+      top._dag.genblks.add( blk )
+      top._dag.genblk_src[ blk ] = src
+      if reads:
+        top._dag.genblk_reads[ blk ] = reads
+      top._dag.genblk_writes[ blk ] = writes
+      if lca is None: # def blk(): pass
+        top._dag.nop_genblks.add( blk )
+      if top._dag.cache is not None:
+        if code not in dumped:
+          dumped[ code ] = marshal.dumps( code )
+        top._dag.genblk_records.append( ( sigs.enc( writer ), lca if lca is None else repr(lca),
+                                          blk.__name__, src, dumped[ code ],
+                                          [ sigs.enc(x) for x in reads ],
+                                          [ sigs.enc(x) for x in writes ] ) )
+
+    sigs = Namer( signal_names( top ) ) if top._dag.cache is not None else None
+
+    if cached is not None:
+      components = { repr(x): x for x in top._dsl.all_components }
+      for writer, lca, name, src, data, reads, writes in cached:
+        writer = sigs.dec( writer )
+        if lca is None:
+          _globals = {}
+        else:
+          lca = components[ lca ]
+          _globals = self._net_blk_globals( writer, lca )
+        blk, code = compile_net_blk( _globals, name, src, writer, data )
+        add_net_blk( blk, code, src, writer, lca,
+                     [ sigs.dec(x) for x in reads ], [ sigs.dec(x) for x in writes ] )
+
+      top._dag.final_upblks = top.get_all_update_blocks() | top._dag.genblks
+      return
 
     for writer, signals in top.get_all_value_nets():
       if len(signals) == 1:
         continue
 
+      key = ( writer, frozenset( signals ) )
+      if key in prev_net_blks:
+        args = top._dag.net_blks[ key ] = prev_net_blks[ key ]
+        add_net_blk( *args )
+        continue
+
       all_readers = [ x for x in signals if x is not writer ]
       all_fanout  = len( all_readers )
 
-      # Here we remove every top-level signal from the reader list, but need to keep a shallow
-      # one as the delegate
+      # Here we remove every reader that shares the value of the writer
+      # (or of a delegate) in lock_in_simulation from the reader list, see
+      # NetAliasing. These are top-level signals and bitstruct fields,
+      # and all of them if the writer is a slice that can have a view.
       #
-      # - writer: a,  reader: b, c
+      # - writer: a,  reader: b, c.f
       #   nothing
       # - writer: a,  reader: b[0], c
-      #   # 1 selected_reader
       #   b[0] @= a
       # - writer: a,  reader: b[0], c[0]
-      #   x = a[0]
+      #   x = a
       #   b[0] @= x
       #   c[0] @= x
       # - writer: a[0],  reader: b, c
-      #   # 1 selected_reader
-      #   b @= a[0]
+      #   nothing (b and c are views of a[0])
       # - writer: a[0],  reader: b[0], c
       #   x = a[0]
       #   b[0] @= x
-      #   c    @= x
-      # - writer: a[0],  reader: b[0], c[0]
-      #   x = a[0]
-      #   b[0] @= x
-      #   c[0] @= x
+      #
+      # Without views, the first aliasable reader is the delegate:
+      #
+      # - writer: a[0],  reader: b, c
+      #   b @= a[0]
 
-      readers = []
-      if isinstance( writer, Const ) or writer.is_top_level_signal():
-        for x in all_readers:
-          if not x.is_top_level_signal():
-            readers.append( x )
-      else:
-        residence = None
-        for x in all_readers:
-          if x.is_top_level_signal():
-            if residence is None:
-              residence = x
-              readers.append( x )
-            # skip other top signals
-          else:
-            readers.append( x )
+      _, readers = split_net( writer, signals )
 
       fanout = len(readers)
 
@@ -120,12 +267,11 @@ class GenDAGPass( BasePass ):
       # to convey the constraints using all_readers
 
       if fanout == 0:
-        blk = compile_net_blk( {}, f"""def {genblk_name}(): pass""", writer )
-
-        top._dag.genblks.add( blk )
-        if writer.is_signal():
-          top._dag.genblk_reads[ blk ] = [ writer ]
-        top._dag.genblk_writes[ blk ] = all_readers
+        gen_src = f"""def {genblk_name}(): pass"""
+        blk, code = compile_net_blk( {}, genblk_name, gen_src, writer )
+        args = top._dag.net_blks[ key ] = ( blk, code, gen_src, writer, None,
+                                            [ writer ] if writer.is_signal() else [], all_readers )
+        add_net_blk( *args )
         continue
       # readers = all_readers
       # fanout  = all_fanout
@@ -165,15 +311,9 @@ class GenDAGPass( BasePass ):
           rd_lcas[i] = rd_lcas[i].get_parent_object()
 
       lca_len = len( repr(wr_lca) )
-      _globals = {'s': wr_lca }
+      _globals = self._net_blk_globals( writer, wr_lca )
 
       if isinstance( writer, Const ) and type(writer._dsl.const) is not int:
-        types = get_bitstruct_inst_all_classes( writer._dsl.const )
-
-        for t in types:
-          if t.__name__ in _globals:
-            assert t is _globals[ t.__name__ ], "Cannot handle two subfields with the same struct name but different structs"
-          _globals[ t.__name__ ] = t
         wstr = repr(writer)
 
       else:
@@ -186,17 +326,29 @@ def {}():
   x = {}
   {}""".format( genblk_name, wstr, '\n  '.join([ f"{rstr} @= x" for rstr in rstrs ]) )
 
-      blk = compile_net_blk( _globals, gen_src, writer )
-
-      top._dag.genblks.add( blk )
-      if writer.is_signal():
-        top._dag.genblk_reads[ blk ] = [ writer ]
-      top._dag.genblk_writes[ blk ] = all_readers
+      blk, code = compile_net_blk( _globals, genblk_name, gen_src, writer )
+      args = top._dag.net_blks[ key ] = ( blk, code, gen_src, writer, wr_lca,
+                                          [ writer ] if writer.is_signal() else [], all_readers )
+      add_net_blk( *args )
 
     # Get the final list of update blocks
     top._dag.final_upblks = top.get_all_update_blocks() | top._dag.genblks
 
-  def _process_value_constraints( self, top ):
+  @staticmethod
+  def _net_blk_globals( writer, lca ):
+    _globals = {'s': lca }
+
+    if isinstance( writer, Const ) and type(writer._dsl.const) is not int:
+      types = get_bitstruct_inst_all_classes( writer._dsl.const )
+
+      for t in types:
+        if t.__name__ in _globals:
+          assert t is _globals[ t.__name__ ], "Cannot handle two subfields with the same struct name but different structs"
+        _globals[ t.__name__ ] = t
+
+    return _globals
+
+  def _process_value_constraints( self, top, prev=None ):
 
     # Query update block metadata from top
 
@@ -205,6 +357,10 @@ def {}():
     genblk_reads, genblk_writes  = top._dag.genblk_reads, top._dag.genblk_writes
     U_U, RD_U, WR_U, U_M         = top.get_all_explicit_constraints()
 
+    # Don't add the derived constraints to the explicit ones kept at the
+    # top since the pass may be applied again
+    U_U = set( U_U )
+
     #---------------------------------------------------------------------
     # Explicit constraint
     #---------------------------------------------------------------------
@@ -223,7 +379,6 @@ def {}():
     write_upblks = defaultdict(set)
 
     constraint_objs = defaultdict(set)
-    expl_constraints = set( top._dsl.all_U_U_constraints )
 
     for data in [ upblk_reads, genblk_reads ]:
       for blk, reads in data.items():
@@ -249,7 +404,7 @@ def {}():
         # enumerate upblks that has a constraint with x
         for (sign, co_blk) in constrained_blks:
 
-          for eq_blk in equal_blks[ obj ]: # blocks that are U == RD(x)
+          for eq_blk in equal_blks.get( obj, () ): # blocks that are U == RD(x)
             if co_blk != eq_blk:
               if sign == 1: # RD/WR(x) < U is 1, RD/WR(x) > U is -1
                 # eq_blk == RD/WR(x) < co_blk
@@ -269,39 +424,93 @@ def {}():
     #
     # Implicitly, WR(x) < RD(x), so when U1 writes X and U2 reads x
     # - U1 == WR(x) & U2 == RD(x) --> U1 == WR(x) < RD(x) == U2
+    #
+    # impl_objs maps each implicit constraint to the variables that imply
+    # it and impl_pairs maps each variable to the constraints it implies,
+    # so that a later run only revisits the variables that changed.
+
+    objs = None
+    if prev is not None and hasattr( prev, "impl_constraint_objs" ):
+      objs = self._changed_constraint_objs( prev, read_upblks, write_upblks )
+
+    if objs is not None:
+      impl_objs  = prev.impl_constraint_objs
+      impl_pairs = prev.impl_constraint_pairs
+
+      for obj in objs:
+        for pair in impl_pairs.pop( obj, () ):
+          x = impl_objs[ pair ]
+          x.discard( obj )
+          if not x:
+            del impl_objs[ pair ]
+    else:
+      impl_objs  = defaultdict(set)
+      impl_pairs = {}
+      objs = read_upblks.keys() | write_upblks.keys()
+
+    for obj in objs:
+      pairs = []
+      if obj in read_upblks:
+        self._add_reader_constraints( pairs, obj, read_upblks[ obj ], write_upblks, update_ff )
+      if obj in write_upblks:
+        self._add_writer_constraints( pairs, obj, write_upblks[ obj ], read_upblks, update_ff )
+      if pairs:
+        impl_pairs[ obj ] = pairs
+        for pair in pairs:
+          impl_objs[ pair ].add( obj )
+
+    top._dag.read_upblks  = read_upblks
+    top._dag.write_upblks = write_upblks
+    top._dag.impl_constraint_objs  = impl_objs
+    top._dag.impl_constraint_pairs = impl_pairs
+
+    for pair, x in constraint_objs.items():
+      if pair in impl_objs:
+        x |= impl_objs[ pair ]
+    for pair, x in impl_objs.items():
+      if pair not in constraint_objs:
+        constraint_objs[ pair ] = x
 
-    impl_constraints = set()
+    top._dag.constraint_objs = constraint_objs
+    top._dag.all_constraints = { *U_U }
+    for (x, y) in impl_objs:
+      if (y, x) not in U_U: # no conflicting expl
+        top._dag.all_constraints.add( (x, y) )
+
+  @staticmethod
+  def _add_reader_constraints( pairs, obj, rd_blks, write_upblks, update_ff ):
 
     # Collect all objs that write the variable whose id is "read"
     # 1) RD A.b.b     - WR A.b.b, A.b, A
     # 2) RD A.b[1:10] - WR A.b[1:10], A.b, A
     # 3) RD A.b[1:10] - WR A.b[0:5], A.b[6], A.b[8:11]
 
-    for obj, rd_blks in read_upblks.items():
-      writers = []
+    writers = []
+
+    # Check parents. Cover 1) and 2)
+    x = obj
+    while x.is_signal():
+      if x in write_upblks:
+        writers.append( x )
+      x = x.get_parent_object()
 
-      # Check parents. Cover 1) and 2)
-      x = obj
-      while x.is_signal():
-        if x in write_upblks:
+    # Check the sibling slices. Cover 3)
+    if obj.is_signal():
+      for x in obj.get_sibling_slices():
+        if x.slice_overlap( obj ) and x in write_upblks:
           writers.append( x )
-        x = x.get_parent_object()
-
-      # Check the sibling slices. Cover 3)
-      if obj.is_signal():
-        for x in obj.get_sibling_slices():
-          if x.slice_overlap( obj ) and x in write_upblks:
-            writers.append( x )
-
-      # Add all constraints
-      for writer in writers:
-        for wr_blk in write_upblks[ writer ]:
-          if wr_blk not in update_ff:
-            for rd_blk in rd_blks:
-              if wr_blk != rd_blk:
-                # if rd_blk not in update_ff:
-                impl_constraints.add( (wr_blk, rd_blk) ) # wr < rd default
-                constraint_objs[ (wr_blk, rd_blk) ].add( obj )
+
+    # Add all constraints
+    for writer in writers:
+      for wr_blk in write_upblks[ writer ]:
+        if wr_blk not in update_ff:
+          for rd_blk in rd_blks:
+            if wr_blk != rd_blk:
+              # if rd_blk not in update_ff:
+              pairs.append( (wr_blk, rd_blk) ) # wr < rd default
+
+  @staticmethod
+  def _add_writer_constraints( pairs, obj, wr_blks, read_upblks, update_ff ):
 
     # Collect all objs that read the variable whose id is "write"
     # 1) WR A.b.b.b, A.b.b, A.b, A (detect 2-writer conflict)
@@ -310,31 +519,56 @@ def {}():
     # 4) WR A.b[1:10], A.b[0:5], A.b[6] (detect 2-writer conflict)
     # "WR A.b[1:10] - RD A.b[0:5], A.b[6], A.b[8:11]" has been discovered
 
-    for obj, wr_blks in write_upblks.items():
-      readers = []
-
-      # Check parents. Cover 2) and 3). 1) and 4) should be detected in elaboration
-      x = obj
-      while x.is_signal():
-        if x in read_upblks:
-          readers.append( x )
-        x = x.get_parent_object()
-
-      # Add all constraints
-      for wr_blk in wr_blks:
-        if wr_blk not in update_ff:
-          for reader in readers:
-              for rd_blk in read_upblks[ reader ]:
-                if wr_blk != rd_blk:
-                  # if rd_blk not in update_ff:
-                  impl_constraints.add( (wr_blk, rd_blk) ) # wr < rd default
-                  constraint_objs[ (wr_blk, rd_blk) ].add( obj )
-
-    top._dag.constraint_objs = constraint_objs
-    top._dag.all_constraints = { *U_U }
-    for (x, y) in impl_constraints:
-      if (y, x) not in U_U: # no conflicting expl
-        top._dag.all_constraints.add( (x, y) )
+    readers = []
+
+    # Check parents. Cover 2) and 3). 1) and 4) should be detected in elaboration
+    x = obj
+    while x.is_signal():
+      if x in read_upblks:
+        readers.append( x )
+      x = x.get_parent_object()
+
+    # Add all constraints
+    for wr_blk in wr_blks:
+      if wr_blk not in update_ff:
+        for reader in readers:
+          for rd_blk in read_upblks[ reader ]:
+            if wr_blk != rd_blk:
+              # if rd_blk not in update_ff:
+              pairs.append( (wr_blk, rd_blk) ) # wr < rd default
+
+  @staticmethod
+  def _changed_constraint_objs( prev, read_upblks, write_upblks ):
+    """ Return the variables whose implicit constraints have to be
+    recomputed since the previous run, or None if most of them have to
+    be recomputed anyway. """
+
+    changed = set()
+    for new, old in [ (read_upblks, prev.read_upblks), (write_upblks, prev.write_upblks) ]:
+      for obj, blks in new.items():
+        if old.get( obj ) != blks:
+          changed.add( obj )
+      for obj in old:
+        if obj not in new:
+          changed.add( obj )
+
+    total = len(read_upblks) + len(write_upblks)
+    if 2 * len(changed) > total:
+      return None
+
+    # The constraints of a variable depend on the blocks that access its
+    # parents and overlapping slices, so every variable under the same
+    # top-level signal as a changed one is revisited.
+    tops = { x.get_top_level_signal() for x in changed if x.is_signal() }
+    if tops:
+      for new in [ read_upblks, write_upblks ]:
+        for obj in new:
+          if obj.is_signal() and obj.get_top_level_signal() in tops:
+            changed.add( obj )
+
+    if 2 * len(changed) > total:
+      return None
+    return changed
 
   #-----------------------------------------------------------------------
   # Process methods
@@ -344,6 +578,24 @@ def {}():
   # Do bfs to find out all potential total constraints associated with
   # each method, direction conflicts, and incomplete constraints
 
+  def _connect_method_nets( self, top ):
+
+    # All members in a method net point to the method of the writer. We
+    # keep the members so that the connection can be undone before the
+    # design is mutated.
+
+    top._dag.net_method_ports = ports = []
+
+    for writer, net in top.get_all_method_nets():
+      if writer is not None:
+        for member in net:
+          if member is not writer:
+            assert member.method is None
+            member.method = writer.method
+            ports.append( member )
+
+    top._dsl.top_level_callee_ports = top.get_all_objects_of_type( CalleePort, host=top )
+
   def _process_methods( self, top ):
     _, _, _, all_M_constraints = top.get_all_explicit_constraints()
 
@@ -354,19 +606,12 @@ def {}():
     # because all members in the net will eventually point to the same
     # method object.
 
-    top._dsl.top_level_callee_ports = top.get_all_object_filter(
-      lambda x: isinstance(x, CalleePort) and x.get_host_component() is top )
-
     method_is_top_level_callee = set()
 
     all_method_nets = top.get_all_method_nets()
     for writer, net in all_method_nets:
       if writer is not None:
         for member in net:
-          if member is not writer:
-            assert member.method is None
-            member.method = writer.method
-
           # If the member is a top level callee, we add the writer's
           # actual method to the set
           if member.get_host_component() is top:
@@ -583,7 +828,7 @@ def {}():
     # Mark update blocks that call blocking methods
     # (CalleeIfcFL/CallerIfcFL) for greenlet wrapping
 
-    blocking_ifcs = top.get_all_object_filter( lambda x: isinstance( x, (CalleeIfcFL, CallerIfcFL) ) )
+    blocking_ifcs = top.get_all_objects_of_type( (CalleeIfcFL, CallerIfcFL) )
 
     top._dag.greenlet_upblks = set()
 
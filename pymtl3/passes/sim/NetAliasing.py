@@ -0,0 +1,104 @@
+"""
+========================================================================
+NetAliasing.py
+========================================================================
+Decide which members of a value net share one value object during
+simulation, so that GenDAGPass only generates copies for the rest and
+lock_in_simulation points the shared members to the same object.
+
+A member can share the object if it is a top-level signal or a
+(nested) bitstruct field of one, since its value is an attribute or a
+list item we can replace. A sliced member cannot, but if the writer is
+a sliced signal the other members can share a view object that reads
+and writes the bits of the parent in place.
+
+Date   : Oct 17, 2026
+"""
+from pymtl3.datatypes import Bits, mk_bits
+from pymtl3.datatypes.PythonBits import Bits as PythonBits
+from pymtl3.dsl import Const
+
+# Views need the pure-Python Bits whose _uint we can shadow with a property
+slice_views_supported = Bits is PythonBits
+
+def is_aliasable( x ):
+  """ Return whether the value of signal x can be replaced by a shared
+  object, i.e. x is not a slice and not inside a slice. """
+  while not x.is_top_level_signal():
+    if x._dsl.slice is not None:
+      return False
+    x = x._dsl.parent_obj
+  return True
+
+def split_net( writer, signals ):
+  """ Return ( residence, readers ) of the net. All aliasable members
+  share the value of residence, which is the writer, an aliasable
+  member, or None if no member is aliasable. readers are the members
+  that still have to be copied from the writer in a net block. """
+
+  if isinstance( writer, Const ) or is_aliasable( writer ) or slice_views_supported:
+    return writer, [ x for x in signals if x is not writer and not is_aliasable( x ) ]
+
+  # The writer is a slice and we cannot make a view of it, so one member
+  # gets a copy and the other aliasable members share its value. We
+  # prefer a top-level signal as before.
+  residence = None
+  for x in signals:
+    if x is not writer and x.is_top_level_signal():
+      residence = x
+      break
+  else:
+    for x in signals:
+      if x is not writer and is_aliasable( x ):
+        residence = x
+        break
+
+  return residence, [ x for x in signals if x is not writer and
+                      ( x is residence or not is_aliasable( x ) ) ]
+
+#-------------------------------------------------------------------------
+# Slice views
+#-------------------------------------------------------------------------
+# A view is an instance of a subclass of the type of the slice whose
+# _uint property shadows the slot of the base class, so all operations
+# of the base class read and write the bits of the parent.
+
+_view_types = {}
+_all_view_types = set()
+
+def _mk_view_type( Base ):
+  try:
+    return _view_types[ Base ]
+  except KeyError:
+    pass
+
+  def get_uint( s ):
+    return ( s._parent._uint >> s._start ) & s._mask
+
+  def set_uint( s, v ):
+    p = s._parent
+    p._uint = ( p._uint & s._hole ) | ( ( v & s._mask ) << s._start )
+
+  ret = _view_types[ Base ] = type( f"{Base.__name__}View", ( Base, ), {
+    "__slots__": ( "_parent", "_start", "_mask", "_hole" ),
+    "_uint": property( get_uint, set_uint ),
+  } )
+  _all_view_types.add( ret )
+  return ret
+
+def mk_slice_view( parent, start, stop, Base=None, start_type=int ):
+  """ Return a view of parent[start:stop]. Base is the class of the
+  view (BitsN by default) and start_type converts the shift amount and
+  the masks, e.g. to numpy.uint64 for BatchBits. """
+  nbits = stop - start
+  Type  = _mk_view_type( mk_bits( nbits ) if Base is None else Base )
+  ret   = object.__new__( Type )
+  ret._nbits  = nbits
+  ret._parent = parent
+  ret._start  = start_type( start )
+  ret._mask   = start_type( (1 << nbits) - 1 )
+  ret._hole   = start_type( ( (1 << parent._nbits) - 1 ) ^ ( ( (1 << nbits) - 1 ) << start ) )
+  return ret
+
+def is_slice_view( value ):
+  return type( value ) in _all_view_types
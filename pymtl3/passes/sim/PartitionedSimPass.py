@@ -0,0 +1,419 @@
+"""
+========================================================================
+PartitionedSimPass.py
+========================================================================
+Split the design into partitions and simulate every partition in its
+own worker process. A partition is the union of the subtrees rooted at
+the components marked with the same partition id:
+
+  top.tiles[0].set_metadata( PartitionedSimPass.partition, 1 )
+  top.tiles[1].set_metadata( PartitionedSimPass.partition, 2 )
+
+Unmarked components inherit the id of their parent. Partition 0, which
+always contains top, is simulated by the main process.
+
+The cut signals, i.e. signals written in one partition and read in
+another, are exchanged through a shared memory buffer. To support
+combinational paths that cross partitions, every schedule entry is
+assigned a level: the number of partition crossings on its longest
+input path in the DAG. In each evaluation all partitions execute their
+entries of one level, publish the cut signals written at that level,
+wait at a barrier, and read the cut signals published by others before
+moving on to the next level.
+
+Only pure RTL designs are supported. Since partition 0 only has a stale
+copy of the signals inside other partitions, line trace, as well as any
+signal inspection from the main process, can only observe partition 0
+and the cut signals.
+
+Date   : Oct 17, 2026
+"""
+import linecache
+import multiprocessing
+import traceback
+from collections import defaultdict
+from threading import BrokenBarrierError
+
+from pymtl3.datatypes import is_bitstruct_class, mk_bits
+from pymtl3.dsl import MetadataKey, MethodPort, Signal
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.errors import ModelTypeError, PassOrderError
+from pymtl3.passes.tracing.PrintTextWavePass import PrintTextWavePass
+from pymtl3.passes.tracing.VcdGenerationPass import VcdGenerationPass
+
+from .PrepareSimPass import PrepareSimPass
+
+_CMD_COMB = 1
+_CMD_FF   = 2
+_CMD_STOP = 3
+
+_MASK64 = "0xffffffffffffffff"
+
+class PartitionedSimPass( PrepareSimPass ):
+
+  #: Partition id of the subtree rooted at the given component. Every
+  #: distinct non-zero id is simulated by one worker process.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: the partition id of the parent component
+  partition = MetadataKey(int)
+
+  def __call__( self, top ):
+    if not hasattr( top, "_dag" ):
+      raise PassOrderError( "_dag" )
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+    if not hasattr( top._sched, "update_schedule" ):
+      raise PassOrderError( "update_schedule" )
+    if not hasattr( top._sched, "schedule_ff" ):
+      raise PassOrderError( "schedule_ff" )
+
+    if top.get_all_objects_of_type( MethodPort ) or \
+       top._dag.greenlet_upblks:
+      raise ModelTypeError( "pure RTL designs" )
+
+    if top.has_metadata( VcdGenerationPass.vcd_func ) or \
+       top.has_metadata( PrintTextWavePass.textwave_func ):
+      raise NotImplementedError( "Waveform generation is not supported in partitioned simulation." )
+
+    if self.fast_forward:
+      raise NotImplementedError( "Idle-cycle fast-forward is not supported in partitioned simulation." )
+
+    self.partition_schedule( top )
+
+    super().__call__( top )
+
+    self.start_workers( top )
+
+  #-----------------------------------------------------------------------
+  # partition_schedule
+  #-----------------------------------------------------------------------
+
+  def partition_schedule( self, top ):
+
+    #---------------------------------------------------------------------
+    # Assign every component and block to a partition
+    #---------------------------------------------------------------------
+
+    comp_part = { top: 0 }
+
+    def get_part( c ):
+      try:
+        return comp_part[c]
+      except KeyError:
+        pass
+      if c.has_metadata( self.partition ):
+        p = c.get_metadata( self.partition )
+      else:
+        p = get_part( c.get_parent_object() )
+      comp_part[c] = p
+      return p
+
+    upblk_reads, upblk_writes, _ = top.get_all_upblk_metadata()
+    genblk_reads, genblk_writes  = top._dag.genblk_reads, top._dag.genblk_writes
+
+    # Net blocks driven by a constant have no input so we just execute
+    # them in every partition. We mark them with ALL.
+    ALL = None
+
+    def get_blk_part( blk ):
+      if blk in genblk_writes:
+        if blk not in genblk_reads:
+          return ALL
+        return get_part( genblk_reads[ blk ][0].get_host_component() )
+      return get_part( top.get_update_block_host_component( blk ) )
+
+    def get_blk_rw( blk ):
+      if blk in genblk_writes:
+        return genblk_reads.get( blk, () ), genblk_writes[ blk ]
+      return upblk_reads[ blk ], upblk_writes[ blk ]
+
+    schedule   = top._sched.update_schedule
+    scc_blocks = getattr( top._sched, "scc_blocks", {} )
+
+    entry_part = []
+    blk_entry  = {}
+
+    for i, entry in enumerate( schedule ):
+      parts = set()
+      for blk in scc_blocks.get( entry, (entry,) ):
+        blk_entry[ blk ] = i
+        p = get_blk_part( blk )
+        if p is not ALL:
+          parts.add( p )
+
+      if len(parts) > 1:
+        raise ModelTypeError( "designs without combinational loops across partitions" )
+      entry_part.append( parts.pop() if parts else ALL )
+
+    ff_part = { blk: get_part( top.get_update_block_host_component( blk ) )
+                for blk in top._sched.schedule_ff }
+
+    #---------------------------------------------------------------------
+    # Compute the level of each schedule entry
+    #---------------------------------------------------------------------
+    # The schedule is in topological order so the level of all the
+    # predecessors is final when we reach an entry.
+
+    preds = defaultdict(set)
+    for (x, y) in top._dag.all_constraints:
+      if x in blk_entry and y in blk_entry:
+        i, j = blk_entry[x], blk_entry[y]
+        if i != j:
+          preds[j].add( i )
+
+    level = [ 0 ] * len(schedule)
+    for j, pj in enumerate( entry_part ):
+      for i in preds[j]:
+        pi = entry_part[i]
+        level[j] = max( level[j], level[i] + (pi is not ALL and pj is not ALL and pi != pj) )
+
+    max_level = max( level, default=0 )
+
+    #---------------------------------------------------------------------
+    # Find cut signals
+    #---------------------------------------------------------------------
+    # We index readers by top level signal. The main process reads the
+    # signals of top on behalf of the user.
+
+    readers = defaultdict(set)
+
+    for i, entry in enumerate( schedule ):
+      for blk in scc_blocks.get( entry, (entry,) ):
+        for x in get_blk_rw( blk )[0]:
+          if isinstance( x, Signal ):
+            readers[ x.get_top_level_signal() ].add( entry_part[i] )
+
+    for blk, p in ff_part.items():
+      for x in upblk_reads[ blk ]:
+        if isinstance( x, Signal ):
+          readers[ x.get_top_level_signal() ].add( p )
+
+    for x in top._dsl.all_signals:
+      if x.is_top_level_signal() and x.get_host_component() is top:
+        readers[ x ].add( 0 )
+
+    # Source signals are not written by the intra-cycle schedule. They
+    # are exchanged at the beginning of each evaluation.
+
+    sources = {}
+    for blk, p in ff_part.items():
+      for x in upblk_writes[ blk ]:
+        rps = readers[ x.get_top_level_signal() ] - { p }
+        if rps:
+          sources[ x ] = (p, rps)
+
+    for x in top._dsl.all_signals:
+      if x.is_input_value_port() and x.is_top_level_signal() and x.get_host_component() is top:
+        rps = readers[ x ] - { 0 }
+        if rps:
+          sources[ x ] = (0, rps)
+
+    exchanges = [ {} for _ in range(max_level+1) ]
+    for i, entry in enumerate( schedule ):
+      p = entry_part[i]
+      if p is ALL:
+        continue
+      for blk in scc_blocks.get( entry, (entry,) ):
+        for x in get_blk_rw( blk )[1]:
+          rps = readers[ x.get_top_level_signal() ] - { p }
+          if rps:
+            exchanges[ level[i] ][ x ] = (p, rps)
+
+    # Allocate 64-bit words in the shared buffer
+
+    offsets = {}
+    nwords  = 0
+    for exchange in [ sources ] + exchanges:
+      for x in exchange:
+        if x not in offsets:
+          offsets[ x ] = nwords
+          nwords += (x._dsl.Type.nbits + 63) // 64
+
+    #---------------------------------------------------------------------
+    # Generate per-partition comb and ff functions
+    #---------------------------------------------------------------------
+
+    all_parts = sorted( { 0 } | set( comp_part.values() ) )
+
+    dbuf_owner = {}
+    for blk, p in ff_part.items():
+      for x in upblk_writes[ blk ]:
+        dbuf_owner[ x.get_top_level_signal() ] = p
+
+    def gen_publish( x ):
+      Type = x._dsl.Type
+      expr = f"s.{repr(x)[2:]}"
+      if is_bitstruct_class( Type ):
+        expr = f"{expr}.to_bits()"
+      o = offsets[ x ]
+      n = (Type.nbits + 63) // 64
+      if n == 1:
+        return [ f"B[{o}] = int( {expr} )" ]
+      return [ f"v = int( {expr} )" ] + \
+             [ f"B[{o+j}] = v >> {64*j} & {_MASK64}" for j in range(n) ]
+
+    def gen_receive( x ):
+      Type = x._dsl.Type
+      o = offsets[ x ]
+      n = (Type.nbits + 63) // 64
+      value = " | ".join( [ f"B[{o}]" ] + [ f"B[{o+j}] << {64*j}" for j in range(1, n) ] )
+      if is_bitstruct_class( Type ):
+        value = f"_bits{Type.nbits}( {value} )"
+      return [ f"s.{repr(x)[2:]} @= {value}" ]
+
+    def gen_exchange( exchange, p ):
+      lines = []
+      for x, (wp, _) in exchange.items():
+        if wp == p:
+          lines.extend( gen_publish( x ) )
+      lines.append( "W()" )
+      for x, (_, rps) in exchange.items():
+        if p in rps:
+          lines.extend( gen_receive( x ) )
+      return lines
+
+    _globals = { f"blk{i}": entry for i, entry in enumerate( schedule ) }
+    _globals.update( { f"ff{i}": blk for i, blk in enumerate( top._sched.schedule_ff ) } )
+    _globals[ 's' ] = top
+    for exchange in [ sources ] + exchanges:
+      for x in exchange:
+        if is_bitstruct_class( x._dsl.Type ):
+          _globals[ f"_bits{x._dsl.Type.nbits}" ] = mk_bits( x._dsl.Type.nbits )
+
+    srcs = []
+    for p in all_parts:
+      body = []
+      if sources:
+        body.extend( gen_exchange( sources, p ) )
+      for l in range(max_level+1):
+        for i, entry in enumerate( schedule ):
+          if level[i] == l and entry_part[i] in (p, ALL):
+            body.append( f"blk{i}() # {entry.__name__}" )
+        if exchanges[l]:
+          body.extend( gen_exchange( exchanges[l], p ) )
+
+      srcs.append( f"def comb_{p}():" )
+      srcs.extend( [ f"  {x}" for x in body ] )
+      srcs.append( "  pass" )
+
+      body = []
+      for i, blk in enumerate( top._sched.schedule_ff ):
+        if ff_part[ blk ] == p:
+          body.append( f"ff{i}() # {blk.__name__}" )
+      for x in sorted( top._dsl.all_signals, key=repr ):
+        if x._dsl.needs_double_buffer and \
+           dbuf_owner.get( x.get_top_level_signal(), get_part( x.get_host_component() ) ) == p:
+          body.append( f"s.{repr(x)[2:]}._flip()" )
+
+      srcs.append( f"def ff_{p}():" )
+      srcs.extend( [ f"  {x}" for x in body ] )
+      srcs.append( "  pass" )
+
+    #---------------------------------------------------------------------
+    # Create the shared states and the main process side entries
+    #---------------------------------------------------------------------
+
+    ctx     = multiprocessing.get_context( "fork" )
+    barrier = ctx.Barrier( len(all_parts) )
+    buf     = ctx.RawArray( 'Q', max( nwords, 1 ) )
+    cmd     = ctx.RawArray( 'i', 2 )
+    errors  = ctx.SimpleQueue()
+
+    _globals[ 'B' ] = buf
+    _globals[ 'W' ] = barrier.wait
+    _locals = {}
+
+    custom_exec( compile( '\n'.join(srcs), filename='partitioned_sim', mode='exec' ), _globals, _locals )
+    linecache.cache['partitioned_sim'] = (1, None, srcs, 'partitioned_sim')
+
+    # The command is written to alternating slots so a slow worker can
+    # still read the previous command after the main process moves on.
+    toggle = [ 0 ]
+
+    def send_command( c ):
+      t = toggle[0] = 1 - toggle[0]
+      cmd[t] = c
+      barrier.wait()
+
+    def run_main( c, func ):
+      try:
+        send_command( c )
+        func()
+      except BrokenBarrierError:
+        msg = "" if errors.empty() else errors.get()
+        raise RuntimeError( f"A partition worker has failed.\n{msg}" )
+      except Exception:
+        barrier.abort()
+        raise
+
+    comb_0 = _locals[ 'comb_0' ]
+    ff_0   = _locals[ 'ff_0' ]
+
+    def partitioned_comb():
+      run_main( _CMD_COMB, comb_0 )
+
+    def partitioned_ff():
+      run_main( _CMD_FF, ff_0 )
+
+    def worker_loop( comb, ff ):
+      t = 0
+      try:
+        while True:
+          barrier.wait()
+          t = 1 - t
+          c = cmd[t]
+          if   c == _CMD_COMB: comb()
+          elif c == _CMD_FF:   ff()
+          else:                return
+      except BrokenBarrierError:
+        pass
+      except Exception:
+        errors.put( traceback.format_exc() )
+        barrier.abort()
+
+    top._sched.partitions = all_parts
+    top._sched.partition_levels = max_level + 1
+    top._sched.partition_workers = [ ctx.Process( target=worker_loop, daemon=True,
+                                                  args=(_locals[f'comb_{p}'], _locals[f'ff_{p}']) )
+                                     for p in all_parts if p != 0 ]
+    top._sched.partition_stop = lambda: send_command( _CMD_STOP )
+
+    # The flips are merged into the per-partition ff functions
+    top._sched.update_schedule       = [ partitioned_comb ]
+    top._sched.schedule_ff           = [ partitioned_ff ]
+    top._sched.schedule_posedge_flip = []
+
+  # Override
+  @staticmethod
+  def create_checkpoint( top ):
+    # The state of the other partitions lives in the worker processes
+    def sim_save_checkpoint():
+      raise NotImplementedError( "Checkpointing is not supported in partitioned simulation." )
+    def sim_restore_checkpoint( blob ):
+      raise NotImplementedError( "Checkpointing is not supported in partitioned simulation." )
+    top.sim_save_checkpoint    = sim_save_checkpoint
+    top.sim_restore_checkpoint = sim_restore_checkpoint
+
+  #-----------------------------------------------------------------------
+  # start_workers
+  #-----------------------------------------------------------------------
+  # We fork after lock_in_simulation so every worker inherits a copy of
+  # the simulation-ready design.
+
+  def start_workers( self, top ):
+    workers = top._sched.partition_workers
+    for w in workers:
+      w.start()
+
+    def sim_stop_partitions():
+      if any( w.is_alive() for w in workers ):
+        try:
+          top._sched.partition_stop()
+        except BrokenBarrierError:
+          pass
+      for w in workers:
+        w.join()
+
+    top.sim_stop_partitions = sim_stop_partitions
@@ -7,12 +7,19 @@ Author : Shunning Jiang
 Date   : Jan 26, 2020
 """
 
+import ast
+import pickle
+import sys
+import zlib
+from collections import deque
+from time import perf_counter_ns
+
 import py
 
-from pymtl3.datatypes import Bits, b1
+from pymtl3.datatypes import Bits, b1, is_bitstruct_inst
 from pymtl3.dsl.Component import Component
 from pymtl3.dsl.Connectable import Const, Interface, MethodPort, Signal
-from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.dsl.NamedObject import NamedObject, ParamTreeNode
 from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.backends.verilog import VerilogTBGenPass
 from pymtl3.passes.BasePass import BasePass, PassMetadata
@@ -22,15 +29,140 @@ from pymtl3.passes.tracing.LineTraceParamPass import LineTraceParamPass
 from pymtl3.passes.tracing.PrintTextWavePass import PrintTextWavePass
 from pymtl3.passes.tracing.VcdGenerationPass import VcdGenerationPass
 
+from .EventDrivenSchedulePass import _python_state_access
+from .NetAliasing import is_aliasable, mk_slice_view, split_net
 from .SimpleTickPass import SimpleTickPass
 
+#-------------------------------------------------------------------------
+# Checkpoint helpers
+#-------------------------------------------------------------------------
+# Signal values have to be restored in place because the generated
+# schedule and the update block closures hold references to them.
+
+def _get_value_state( value ):
+  if hasattr( value, '_uint' ):
+    return ( value._uint, getattr( value, '_next', None ) )
+  if is_bitstruct_inst( value ):
+    return [ _get_value_state( getattr( value, x ) ) for x in value.__bitstruct_fields__ ]
+  if isinstance( value, list ):
+    return [ _get_value_state( x ) for x in value ]
+  return None # constant
+
+def _set_value_state( value, state ):
+  if hasattr( value, '_uint' ):
+    value._uint, _next = state
+    if _next is not None:
+      value._next = _next
+  elif is_bitstruct_inst( value ):
+    for x, s in zip( value.__bitstruct_fields__, state ):
+      _set_value_state( getattr( value, x ), s )
+  elif isinstance( value, list ):
+    for x, s in zip( value, state ):
+      _set_value_state( x, s )
+
+def _is_python_state( obj, signal_values ):
+  if id(obj) in signal_values or isinstance( obj, (NamedObject, type) ) or callable( obj ):
+    return False
+  if isinstance( obj, (list, tuple) ):
+    return all( _is_python_state( x, signal_values ) for x in obj )
+  return True
+
+def _set_python_state( c, name, obj ):
+  # Mutable containers might be referenced elsewhere so we update them
+  # in place. The maxlen of a deque is also preserved this way.
+  current = c.__dict__.get( name )
+  if isinstance( current, (list, bytearray) ) and type(current) is type(obj):
+    current[:] = obj
+  elif isinstance( current, deque ) and type(current) is type(obj):
+    current.clear()
+    current.extend( obj )
+  elif isinstance( current, (dict, set) ) and type(current) is type(obj):
+    current.clear()
+    current.update( obj )
+  else:
+    setattr( c, name, obj )
+
+#-------------------------------------------------------------------------
+# Release helpers
+#-------------------------------------------------------------------------
+# The fields of _dsl that are only used to elaborate, mutate and schedule
+# the design. The naming fields (my_name, full_name, parent_obj, ...),
+# the types of signals and the sets of update blocks stay because line
+# tracing, waveforms and unlock_simulation rely on them.
+
+_ELABORATION_ONLY_FIELDS = (
+  "adjacency", "connect_order", "consts", "NamedObject_fields",
+  "M_constraints", "RD_U_constraints", "WR_U_constraints", "U_U_constraints",
+  "func_reads", "func_writes", "func_calls", "name_func",
+  "upblk_reads", "upblk_writes", "upblk_calls", "upblk_order",
+)
+
+_ELABORATION_ONLY_TOP_FIELDS = (
+  "all_named_objects", "all_objects_by_type", "all_objects_by_host",
+  "all_signals", "all_adjacency", "net_parent", "net_size",
+  "all_value_nets", "all_method_nets",
+  "all_upblk_reads", "all_upblk_writes", "all_upblk_calls",
+  "all_M_constraints", "all_RD_U_constraints", "all_WR_U_constraints",
+  "all_U_U_constraints",
+)
+
+def _sizeof( obj, seen ):
+  """ Estimate the bytes held by obj and the containers, strings and ASTs
+  inside it. Named objects, functions and types are not counted because
+  they outlive the metadata. """
+  if id(obj) in seen or isinstance( obj, (NamedObject, type) ) or callable( obj ):
+    return 0
+  seen.add( id(obj) )
+
+  ret = sys.getsizeof( obj )
+  if isinstance( obj, dict ):
+    for k, v in obj.items():
+      ret += _sizeof( k, seen ) + _sizeof( v, seen )
+  elif isinstance( obj, (list, tuple, set, frozenset, deque) ):
+    for x in obj:
+      ret += _sizeof( x, seen )
+  elif isinstance( obj, (ast.AST, ParamTreeNode) ):
+    ret += _sizeof( obj.__dict__, seen )
+  return ret
+
+def _release_fields( d, fields, seen ):
+  # d is either a DSLMetadata or one of the compact metadata classes
+  # with __slots__, so we cannot go through d.__dict__
+  ret = 0
+  for name in fields:
+    try:
+      value = getattr( d, name )
+    except AttributeError:
+      continue
+    if value is not None:
+      ret += _sizeof( value, seen )
+    delattr( d, name )
+  return ret
+
+def _release_param_tree( d, seen ):
+  # Line traces look up their parameters in the leaf of the tree at
+  # simulation time, so we only keep the leaf of such nodes.
+  tree = d.param_tree
+  if tree is None:
+    return 0
+  if tree.leaf is not None and 'line_trace' in tree.leaf:
+    ret = _sizeof( tree.children, seen )
+    tree.children = None
+  else:
+    ret = _sizeof( tree, seen )
+    d.param_tree = None
+  return ret
 
 class PrepareSimPass( BasePass ):
-  def __init__( self, print_line_trace=True, reset_active_high=True ):
+  def __init__( self, print_line_trace=True, reset_active_high=True, fast_forward=False,
+                      collect_stats=False, release_metadata=False ):
     assert reset_active_high in [ True, False ]
 
     self.print_line_trace  = print_line_trace
     self.reset_active_high = reset_active_high
+    self.fast_forward      = fast_forward
+    self.collect_stats     = collect_stats
+    self.release_metadata  = release_metadata
 
   def __call__( self, top ):
     if hasattr(top, "sim_reset"):
@@ -47,6 +179,7 @@ class PrepareSimPass( BasePass ):
       raise PassOrderError( "schedule_posedge_flip" )
 
     top._sim = PassMetadata()
+    top._sim.phase_ns = {}
 
     self.create_print_line_trace( top )
     self.create_sim_cycle_count( top )
@@ -57,14 +190,23 @@ class PrepareSimPass( BasePass ):
     self.create_sim_eval_comb( top )
     self.create_sim_tick( top )
     self.create_sim_reset( top )
+    self.create_checkpoint( top )
+
+    if self.fast_forward:
+      self.create_fast_forward( top )
 
+    if self.collect_stats:
+      self.create_sim_stats( top )
+
+    if self.release_metadata:
+      self.release_elaboration_metadata( top )
 
   def create_sim_eval_comb( self, top ):
     # FIXME update_once? currently check if the design has method_port
-    method_ports = top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) )
+    method_ports = top.get_all_objects_of_type( MethodPort )
 
     if len(method_ports) == 0: # Pure RTL design, add eval_combinational
-      sim_eval_combinational = SimpleTickPass.gen_tick_function( [top._sim.check_top_level_inports] + top._sched.update_schedule )
+      sim_eval_combinational = SimpleTickPass.gen_tick_function( [top._sim.check_top_level_inports] + self.comb_schedule( top ) )
     else:
       def sim_eval_combinational():
         raise NotImplementedError(f"top is not a pure RTL design. {'top'+repr(list(method_ports)[0])[1:]} is a method port.")
@@ -72,45 +214,73 @@ class PrepareSimPass( BasePass ):
     top.sim_eval_combinational = sim_eval_combinational
 
   def create_sim_tick( self, top ):
-    final_schedule = []
-    if not top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) ):
+    phases = []
+    if not top.get_all_objects_of_type( MethodPort ):
       # Pure RTL -- tick update blocks first
-      final_schedule = top._sched.update_schedule[::]
+      phases.append( ("comb", self.comb_schedule( top )) )
 
     if self.print_line_trace and hasattr( top, 'line_trace' ):
-      final_schedule.append( top.print_line_trace )
-    final_schedule += self.collect_ff_funcs( top )
-    final_schedule += top._sched.update_schedule
-    final_schedule.append( top._sim.check_top_level_inports )
-    top.sim_tick = SimpleTickPass.gen_tick_function( final_schedule )
-
-  def collect_ff_funcs( self, top ):
-    # ff_funcs summarizes the execution at the clock edge
+      phases.append( ("line_trace", [ top.print_line_trace ]) )
+    phases += self.collect_ff_phases( top )
+    phases.append( ("comb", self.comb_schedule( top ) + [ top._sim.check_top_level_inports ]) )
+    top.sim_tick = SimpleTickPass.gen_tick_function( self.gen_phase_schedule( top, phases ) )
+
+  def comb_schedule( self, top ):
+    # Net blocks that copy nothing stay in the schedule for the other
+    # passes, but we don't need to call them
+    nop = getattr( getattr( top, "_dag", None ), "nop_genblks", () )
+    return [ blk for blk in top._sched.update_schedule if blk not in nop ]
+
+  def collect_ff_phases( self, top ):
+    # ff_phases summarizes the execution at the clock edge as a list of
+    # ( phase name, functions )
     ret = []
     # append tracing related work
     if top.has_metadata( VcdGenerationPass.vcd_func ):
-      ret.append( top.get_metadata( VcdGenerationPass.vcd_func ) )
+      ret.append( ("vcd", [ top.get_metadata( VcdGenerationPass.vcd_func ) ]) )
 
     if top.has_metadata( PrintTextWavePass.textwave_func ):
-      ret.append( top.get_metadata( PrintTextWavePass.textwave_func ) )
+      ret.append( ("textwave", [ top.get_metadata( PrintTextWavePass.textwave_func ) ]) )
 
     if top.has_metadata( VerilogTBGenPass.vtbgen_hooks ):
-      ret.extend( top.get_metadata( VerilogTBGenPass.vtbgen_hooks ) )
+      ret.append( ("tbgen", top.get_metadata( VerilogTBGenPass.vtbgen_hooks )) )
 
-    ret.extend( top._sched.schedule_ff )
-    ret.extend( top._sched.schedule_posedge_flip )
-    ret.append( self.create_advance_sim_cycle( top ) )
+    ret.append( ("update_ff", top._sched.schedule_ff) )
+    ret.append( ("flip", top._sched.schedule_posedge_flip + [ self.create_advance_sim_cycle( top ) ]) )
 
     # clear cl method flag after flip
     if top.has_metadata( CLLineTracePass.clear_cl_trace_func ):
-      ret.append( top.get_metadata( CLLineTracePass.clear_cl_trace_func ) )
+      ret.append( ("line_trace", [ top.get_metadata( CLLineTracePass.clear_cl_trace_func ) ]) )
 
     return ret
 
+  def collect_ff_funcs( self, top ):
+    return [ f for _, funcs in self.collect_ff_phases( top ) for f in funcs ]
+
+  def gen_phase_schedule( self, top, phases ):
+    """ Flatten the phases into one schedule. If we collect statistics,
+    each phase becomes a single function that accumulates its time in
+    top._sim.phase_ns. """
+    if not self.collect_stats:
+      return [ f for _, funcs in phases for f in funcs ]
+
+    phase_ns = top._sim.phase_ns
+
+    def timed_phase( name, funcs ):
+      phase_ns.setdefault( name, 0 )
+      tick = SimpleTickPass.gen_tick_function( funcs )
+      def timed():
+        t0 = perf_counter_ns()
+        tick()
+        phase_ns[ name ] += perf_counter_ns() - t0
+      return timed
+
+    return [ timed_phase( name, list(funcs) ) for name, funcs in phases ]
+
   # Simulation related APIs
   def create_sim_reset( self, top ):
-    ff = SimpleTickPass.gen_tick_function( self.collect_ff_funcs( top ) )
-    up = SimpleTickPass.gen_tick_function( top._sched.update_schedule )
+    ff = SimpleTickPass.gen_tick_function( self.gen_phase_schedule( top, self.collect_ff_phases( top ) ) )
+    up = SimpleTickPass.gen_tick_function( self.gen_phase_schedule( top, [ ("comb", self.comb_schedule( top )) ] ) )
 
     print_line_trace = self.print_line_trace and hasattr( top, 'line_trace' )
     active_high      = self.reset_active_high
@@ -160,6 +330,361 @@ class PrepareSimPass( BasePass ):
       return top._sim.simulated_cycles
     top.sim_cycle_count = sim_cycle_count
 
+  # Idle-cycle fast-forward
+  def create_fast_forward( self, top ):
+    """ Wrap top.sim_tick so that once a tick changes no state and calls
+    no method, the following ticks only advance the cycle count until a
+    top-level input changes, a method is called or a CL component has
+    something to do. Skipped cycles are counted in
+    top._sim.skipped_cycles.
+
+    Regular update blocks have to keep their state in signals, a block
+    that assigns a Python attribute of a component prevents the
+    fast-forward. Components with update_once blocks evolve on their own
+    every cycle, so they have to describe their idle behavior with two
+    methods:
+
+    - sim_idle_cycles( s ): the number of upcoming cycles in which the
+      component calls no method and writes no signal, or None if it
+      stays idle until someone calls its methods
+    - sim_skip_cycles( s, n ): advance the internal state by n such
+      cycles
+
+    Components defining these methods also promise that calling their
+    rdy methods has no side effect. Any call to other methods counts
+    as activity. """
+
+    top._sim.skipped_cycles = 0
+
+    # Find out what prevents us from fast-forwarding this design
+
+    blockers = []
+    if top.has_metadata( VcdGenerationPass.vcd_func ) or \
+       top.has_metadata( PrintTextWavePass.textwave_func ) or \
+       top.has_metadata( VerilogTBGenPass.vtbgen_hooks ):
+      blockers.append( "waveform/testbench generation needs every cycle" )
+    if getattr( top._dag, "greenlet_upblks", None ):
+      blockers.append( "blocking update blocks run in greenlets" )
+
+    idle_components = []
+    for c in sorted( top.get_all_components(), key=repr ):
+      if hasattr( c, "sim_idle_cycles" ) and hasattr( c, "sim_skip_cycles" ):
+        idle_components.append( c )
+        continue
+      if getattr( c._dsl, "update_once", None ):
+        blockers.append( f"{c!r} has update_once blocks but no sim_idle_cycles/sim_skip_cycles" )
+
+      # e.g. s.cnt = s.cnt + 1 in an update_ff block changes no signal
+      for blk in sorted( c._dsl.upblks, key=lambda x: x.__name__ ):
+        info = c.get_update_block_info( blk )
+        if info is None or _python_state_access( blk, info[-1] )[1]:
+          blockers.append( f"{c!r}.{blk.__name__} keeps state in Python attributes" )
+
+    top._sim.fast_forward_blockers = blockers
+
+    # Count method calls. Calls to rdy methods of components that
+    # implement the idle protocol are free of side effects.
+
+    trusted = set( idle_components )
+    activity = [ 0 ]
+
+    def wrap( method ):
+      def counted_method( *args, **kwargs ):
+        activity[0] += 1
+        return method( *args, **kwargs )
+      return counted_method
+
+    def is_trusted_rdy( port ):
+      return getattr( port._dsl, "is_rdy", False ) and port.get_host_component() in trusted
+
+    # Members of a method net share the method of the writer
+    skipped = set()
+    for writer, net in top.get_all_method_nets():
+      if writer is not None and is_trusted_rdy( writer ):
+        skipped.update( net )
+
+    # DefaultPassGroup.revert restores the methods we wrap
+    top._sim.counted_methods = []
+    for port in top.get_all_objects_of_type( MethodPort ):
+      if port.method is not None and port not in skipped and not is_trusted_rdy( port ):
+        top._sim.counted_methods.append( (port, port.method) )
+        port.method = wrap( port.method )
+
+    # Flatten the sources of the combinational schedule into Bits. The
+    # other signals are a function of the signals written by update_ff
+    # and update_once blocks and of the top-level inports, so we don't
+    # have to look at them to tell if a tick changed anything.
+
+    def flatten( value, ret ):
+      if isinstance( value, Bits ):
+        ret.append( value )
+      elif is_bitstruct_inst( value ):
+        for x in value.__bitstruct_fields__:
+          flatten( getattr( value, x ), ret )
+      elif isinstance( value, list ):
+        for x in value:
+          flatten( x, ret )
+
+    _, upblk_writes, _ = top.get_all_upblk_metadata()
+
+    state_bits = []
+    seen       = set()
+    for blk in list( top.get_all_update_ff() ) + list( top.get_all_update_once() ):
+      for x in upblk_writes.get( blk, () ):
+        if isinstance( x, Signal ):
+          value = top._sim.signal_object_mapping[ x.get_top_level_signal() ][-1]
+          if id(value) not in seen:
+            seen.add( id(value) )
+            flatten( value, state_bits )
+
+    inport_bits = []
+    for x in top._dsl.all_signals:
+      if x.is_input_value_port() and x.is_top_level_signal() and x.get_host_component() is top:
+        flatten( top._sim.signal_object_mapping[x][-1], inport_bits )
+
+    def snapshot( bits ):
+      return [ int(x) for x in bits ]
+
+    def get_idle_cycles():
+      ret = None
+      for c in idle_components:
+        n = c.sim_idle_cycles()
+        if n is not None and (ret is None or n < ret):
+          ret = n
+      return ret
+
+    def skip_cycles( n ):
+      for c in idle_components:
+        c.sim_skip_cycles( n )
+      top._sim.simulated_cycles += n
+      top._sim.skipped_cycles   += n
+
+    # The state of the fast-forward: None means not idle, otherwise
+    # idle_state[0] is ( remaining idle cycles (None for unbounded),
+    # top-level inputs, method call count, state ) when we became idle.
+    # last_tick[0] is ( state, inputs, method call count ) after the
+    # last simulated tick.
+
+    idle_state = [ None ]
+    last_tick  = [ None ]
+    sim_reset  = top.sim_reset
+
+    def reset_idle_state():
+      idle_state[0] = last_tick[0] = None
+
+    top._sim.restore_hooks.append( reset_idle_state )
+    sim_tick   = top.sim_tick
+    print_line_trace = self.print_line_trace and hasattr( top, 'line_trace' )
+
+    def is_idle():
+      if idle_state[0] is None:
+        return False
+      remaining, inputs, calls, state = idle_state[0]
+      if remaining == 0 or activity[0] != calls or snapshot( inport_bits ) != inputs or \
+         snapshot( state_bits ) != state:
+        reset_idle_state()
+        return False
+      return True
+
+    # A tick with the same inputs as the previous one that changes no
+    # state and calls no method, also since the previous tick, leaves
+    # the design exactly as the previous tick did, so we are idle.
+
+    def fast_forward_sim_tick():
+      if is_idle():
+        remaining, inputs, calls, state = idle_state[0]
+        if print_line_trace:
+          top.print_line_trace()
+        skip_cycles( 1 )
+        idle_state[0] = ( None if remaining is None else remaining - 1, inputs, calls, state )
+        return
+
+      inputs = snapshot( inport_bits )
+      sim_tick()
+      tick = ( snapshot( state_bits ), inputs, activity[0] )
+      if tick == last_tick[0]:
+        idle_state[0] = ( get_idle_cycles(), inputs, activity[0], tick[0] )
+      last_tick[0] = tick
+
+    # sim_reset runs the ff and comb functions directly
+    def fast_forward_sim_reset():
+      reset_idle_state()
+      sim_reset()
+
+    def sim_fast_forward( max_cycles ):
+      if not is_idle():
+        return 0
+      remaining, inputs, calls, state = idle_state[0]
+      n = max_cycles if remaining is None else min( remaining, max_cycles )
+      skip_cycles( n )
+      idle_state[0] = ( None if remaining is None else remaining - n, inputs, calls, state )
+      return n
+
+    if blockers:
+      top.sim_fast_forward = lambda max_cycles: 0
+    else:
+      top.sim_tick         = fast_forward_sim_tick
+      top.sim_reset        = fast_forward_sim_reset
+      top.sim_fast_forward = sim_fast_forward
+
+  # Simulation statistics
+  @staticmethod
+  def create_sim_stats( top ):
+    """ Measure the wall-clock time spent in top.sim_tick and
+    top.sim_reset and add top.sim_stats() that returns
+
+    - cycles: simulated cycles
+    - wall_time: seconds spent in sim_tick/sim_reset
+    - cycles_per_sec: simulated cycles per wall-clock second
+    - phases: seconds spent in each phase of the tick (comb, update_ff,
+      flip, vcd, textwave, tbgen, line_trace), "other" being the time
+      outside of these phases, e.g. checking idle cycles
+    - sccs: for each strongly connected component of update blocks, the
+      number of calls, fixed-point iterations and executed blocks """
+
+    top._sim.wall_ns = 0
+
+    def timed( func ):
+      def timed_func():
+        t0 = perf_counter_ns()
+        func()
+        top._sim.wall_ns += perf_counter_ns() - t0
+      return timed_func
+
+    top.sim_tick  = timed( top.sim_tick )
+    top.sim_reset = timed( top.sim_reset )
+
+    def sim_stats():
+      wall_ns  = top._sim.wall_ns
+      phase_ns = dict( top._sim.phase_ns )
+      phase_ns[ "other" ] = max( 0, wall_ns - sum( phase_ns.values() ) )
+      cycles   = top._sim.simulated_cycles
+      return {
+        "cycles":         cycles,
+        "wall_time":      wall_ns / 1e9,
+        "cycles_per_sec": cycles * 1e9 / wall_ns if wall_ns else 0.0,
+        "phases":         { k: v / 1e9 for k, v in phase_ns.items() },
+        "sccs":           { blk.__name__: dict( zip( ( "calls", "iterations", "blocks" ), stats ) )
+                            for blk, stats in getattr( top._sched, "scc_stats", {} ).items() },
+      }
+
+    top.sim_stats = sim_stats
+
+  # Checkpoint APIs
+  @staticmethod
+  def create_checkpoint( top ):
+    """ Add top.sim_save_checkpoint() that returns a compressed blob of
+    all simulation state, and top.sim_restore_checkpoint( blob ) that
+    restores it in place. The blob can be restored into any instance of
+    the same design prepared by the same passes, e.g. in another
+    process.
+
+    Functions that cache state across ticks register a function in
+    top._sim.restore_hooks that invalidates the cache after a restore. """
+
+    top._sim.restore_hooks = []
+
+    # The event-driven schedule has to evaluate every entry again
+    D = getattr( top._sched, "event_dirty_flags", None )
+    if D is not None:
+      L = top._sched.event_last_values
+      def invalidate_event_driven():
+        D[:] = [ True ] * len(D)
+        L[:] = [ None ] * len(L)
+      top._sim.restore_hooks.append( invalidate_event_driven )
+
+    # Signals in the same net share the same value object
+    values = []
+    seen   = set()
+    for _, _, _, value in top._sim.signal_object_mapping.values():
+      if id(value) not in seen:
+        seen.add( id(value) )
+        values.append( value )
+
+    # Python state of components, e.g. CL queues and memory. We sort the
+    # components by name so that the order is the same across instances.
+    components = sorted( top.get_all_components(), key=repr )
+    fingerprint = ( len(values), tuple( repr(x) for x in components ) )
+
+    def get_python_state():
+      ret = []
+      for c in components:
+        state = {}
+        for name, obj in c.__dict__.items():
+          if name[0] == '_' or not _is_python_state( obj, seen ):
+            continue
+          state[ name ] = obj
+        ret.append( state )
+      return ret
+
+    def sim_save_checkpoint():
+      state = ( fingerprint, top._sim.simulated_cycles,
+                [ _get_value_state( x ) for x in values ], get_python_state() )
+      try:
+        blob = pickle.dumps( state, protocol=pickle.HIGHEST_PROTOCOL )
+      except Exception as e:
+        raise TypeError( f"Cannot checkpoint the Python state of the components: {e}" ) from e
+      return zlib.compress( blob, 1 )
+
+    def sim_restore_checkpoint( blob ):
+      saved_fingerprint, cycles, value_states, python_states = pickle.loads( zlib.decompress( blob ) )
+      if saved_fingerprint != fingerprint:
+        raise ValueError( "The checkpoint was saved from a different design." )
+
+      for value, state in zip( values, value_states ):
+        _set_value_state( value, state )
+
+      for c, state in zip( components, python_states ):
+        for name, obj in state.items():
+          _set_python_state( c, name, obj )
+
+      top._sim.simulated_cycles = cycles
+
+      for hook in top._sim.restore_hooks:
+        hook()
+
+    top.sim_save_checkpoint    = sim_save_checkpoint
+    top.sim_restore_checkpoint = sim_restore_checkpoint
+
+  # Release elaboration metadata
+  @staticmethod
+  def release_elaboration_metadata( top ):
+    """ Free the elaboration metadata that the simulation doesn't need
+    after lock_in_simulation, i.e. the connectivity, constraints,
+    read/write sets of update blocks and the design-wide indexes. The
+    tick, reset, checkpoint, tracing and unlock_simulation functions keep
+    working but the design can no longer be elaborated, mutated or
+    processed by other passes. The update block ASTs cached in the
+    component classes are shared with other designs and stay.
+
+    Return the estimated number of bytes reclaimed, which is also saved
+    in top._sim.released_metadata_bytes. """
+
+    if not getattr( top._sim, "locked_simulation", False ):
+      raise PassOrderError( "lock_in_simulation" )
+
+    top_dsl = top._dsl
+    if getattr( top_dsl, "metadata_released", False ):
+      return 0
+
+    # After lock_in_simulation, signals are no longer attributes of the
+    # components so we have to find them through the elaboration sets.
+    objs = set( top_dsl.all_named_objects )
+    objs.update( top._sim.signal_object_mapping )
+
+    seen = set()
+    ret  = 0
+
+    for obj in objs:
+      ret += _release_fields( obj._dsl, _ELABORATION_ONLY_FIELDS, seen )
+      ret += _release_param_tree( obj._dsl, seen )
+
+    ret += _release_fields( top_dsl, _ELABORATION_ONLY_TOP_FIELDS, seen )
+
+    top_dsl.metadata_released = True
+    top._sim.released_metadata_bytes = ret
+    return ret
+
   @staticmethod
   def create_lock_unlock_simulation( top ):
 
@@ -216,43 +741,82 @@ class PrepareSimPass( BasePass ):
       # Swap all Signal objects with actual data
       nets = top.get_all_value_nets()
 
-      # First step is to consolidate all non-slice signals in the same net
-      # by pointing them to the same object
-      # TODO optimize for bitstruct fields. Essentially only sliced signals
-      # should be excluded.
+      # Then we consolidate the members of each net that can share the
+      # value of the residence by pointing them to the same object, see
+      # NetAliasing. Besides top-level signals, these can be fields of a
+      # bitstruct value, and the shared value can be a view of a sliced
+      # writer. shared maps every such member to its residence.
+      shared = {}
       for writer, signals in nets:
-        residence = None
-
-        # Find the residence value
-        if isinstance( writer, Const ) or writer.is_top_level_signal():
-          residence = writer
-        else:
-          for x in signals:
-            if x.is_top_level_signal():
-              residence = x
-              break
-
+        residence, _ = split_net( writer, signals )
         if residence is None:
           continue # whole net is slice
+        for x in signals:
+          if x is not residence and is_aliasable( x ):
+            shared[ x ] = residence
+
+      # The value of a field depends on the value of its parents, which
+      # might be replaced by another net, so we resolve the values on
+      # demand and replace the value of a shared member right before it
+      # is first used.
+      values    = {}
+      resolving = set()
+
+      def get_value( x ):
+        if isinstance( x, Const ):
+          return x._dsl.const
+        try:
+          return values[ x ]
+        except KeyError:
+          pass
+
+        if x in resolving:
+          raise ValueError( f"Cannot resolve the value of {x!r} because its net "
+                            f"depends on itself through bitstruct fields" )
+        resolving.add( x )
+
+        if x in shared:
+          value = get_value( shared[ x ] )
+          if x.is_top_level_signal():
+            current_obj, i, is_list, _ = signal_object_mapping[ x ]
+            signal_object_mapping[ x ] = (current_obj, i, is_list, value)
+            if is_list:
+              current_obj[i] = value
+            else:
+              setattr( current_obj, i, value )
+          else:
+            obj = get_value( x._dsl.parent_obj )
+            indices = x._dsl._my_indices
+            if not indices:
+              setattr( obj, x._dsl._my_name, value )
+            else:
+              obj = getattr( obj, x._dsl._my_name )
+              for j in indices[:-1]:
+                obj = obj[j]
+              obj[ indices[-1] ] = value
 
-        if isinstance( residence, Const ):
-          residence_value = residence._dsl.const
-        else:
-          residence_value = signal_object_mapping[ residence ][-1]
+        elif x.is_top_level_signal():
+          value = signal_object_mapping[ x ][-1]
 
-        # Replace top-level signals in the net with residence value
+        elif x._dsl.slice is not None:
+          sl = x._dsl.slice
+          value = mk_slice_view( get_value( x._dsl.parent_obj ), sl.start, sl.stop )
 
-        for x in signals:
-          if x is not residence and x.is_top_level_signal():
-            # swap old value with new residence value
+        else:
+          value = getattr( get_value( x._dsl.parent_obj ), x._dsl._my_name )
+          for j in x._dsl._my_indices:
+            value = value[j]
 
-            current_obj, i, is_list, value = signal_object_mapping[ x ]
-            signal_object_mapping[ x ] = (current_obj, i, is_list, residence_value)
+        resolving.discard( x )
+        values[ x ] = value
+        return value
 
-            if is_list:
-              current_obj[i] = residence_value
-            else:
-              setattr( current_obj, i, residence_value )
+      for x in shared:
+        get_value( x )
+
+      # The constant nets found by SimOptimizePass are copied only once
+      for blk in getattr( getattr( top, "_dag", None ), "once_genblks", () ):
+        blk()
 
       top._sim.signal_object_mapping = signal_object_mapping
       top._sim.locked_simulation = True
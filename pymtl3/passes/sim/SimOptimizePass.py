@@ -0,0 +1,424 @@
+"""
+========================================================================
+SimOptimizePass.py
+========================================================================
+Remove work that doesn't change what the simulation shows. This pass
+has to be applied after GenDAGPass and before a schedule pass.
+
+- Constant nets: a net block whose writer is a constant, or a signal
+  that only constant nets write, always copies the same value. Such
+  blocks are removed from the schedule and executed once when the
+  simulation is locked in.
+
+- Dead logic: an update block or net block that only writes signals
+  nobody observes is removed. The observable signals are the signals of
+  the top component, the signals of every component with a line_trace
+  (if line traces are used), the signals and components given in the
+  observable metadata, and everything read by the blocks that are kept.
+  Blocks that may have side effects (e.g. assert, print, attribute
+  assignments, calls other than the bits helpers) are always kept.
+
+Nothing is removed as dead logic if a waveform is generated or the
+design has method ports, because these can access every signal.
+
+The names of the removed blocks are stored in the removed metadata.
+
+Date   : Oct 17, 2026
+"""
+import ast
+import builtins
+from collections import defaultdict, deque
+
+from pymtl3.datatypes import (
+    Bits,
+    concat,
+    is_bitstruct_class,
+    reduce_and,
+    reduce_or,
+    reduce_xor,
+    sext,
+    trunc,
+    zext,
+)
+from pymtl3.dsl import Component, MetadataKey, MethodPort, Signal
+from pymtl3.passes.BasePass import BasePass
+from pymtl3.passes.errors import PassOrderError
+from pymtl3.passes.tracing.PrintTextWavePass import PrintTextWavePass
+from pymtl3.passes.tracing.VcdGenerationPass import VcdGenerationPass
+
+# Functions an update block can call without side effects
+_pure_funcs = { concat, zext, sext, trunc, reduce_and, reduce_or, reduce_xor,
+                int, bool, len, range, min, max, abs }
+_pure_methods = { "uint", "int", "clone" }
+
+def _resolve( blk, name ):
+  """ Return the object name refers to in update block blk, or None if
+  it is a local variable or cannot be found. """
+  code = blk.__code__
+  if name in code.co_varnames:
+    return None
+  if name in code.co_freevars:
+    try:
+      return blk.__closure__[ code.co_freevars.index( name ) ].cell_contents
+    except ValueError: # empty cell
+      return None
+  if name in blk.__globals__:
+    return blk.__globals__[ name ]
+  return getattr( builtins, name, None )
+
+def _is_signal_target( blk, node ):
+  """ Return whether the target of @= or <<= is a signal, a part of a
+  signal, or an item of a list of signals, i.e. the write shows up in
+  the metadata of the block. """
+  chain = []
+  while isinstance( node, (ast.Attribute, ast.Subscript) ):
+    chain.append( node )
+    node = node.value
+  if not isinstance( node, ast.Name ) or not chain:
+    return False
+
+  obj = _resolve( blk, node.id )
+  for x in reversed( chain ):
+    if isinstance( obj, Signal ) or isinstance( x, ast.Subscript ):
+      break
+    obj = getattr( obj, x.attr, None )
+
+  Q = [ obj ]
+  while Q:
+    obj = Q.pop()
+    if isinstance( obj, list ):
+      Q.extend( obj )
+    elif not isinstance( obj, Signal ):
+      return False
+  return True
+
+def _is_pure_call( blk, node ):
+  func = node.func
+  if isinstance( func, ast.Attribute ):
+    return func.attr in _pure_methods
+  if isinstance( func, ast.Name ):
+    obj = _resolve( blk, func.id )
+    if isinstance( obj, type ):
+      return issubclass( obj, Bits ) or is_bitstruct_class( obj ) or obj in _pure_funcs
+    return obj in _pure_funcs
+  return False
+
+def is_pure_upblk( blk, tree ):
+  """ Return whether executing update block blk, whose AST is tree, has
+  no effect other than writing the signals in its metadata. """
+  for node in ast.walk( tree ):
+    if isinstance( node, (ast.Assert, ast.Raise, ast.Global, ast.Nonlocal, ast.Delete,
+                          ast.With, ast.Yield, ast.YieldFrom, ast.Await, ast.Lambda) ):
+      return False
+
+    if isinstance( node, ast.Assign ):
+      for target in node.targets:
+        for x in ast.walk( target ):
+          if isinstance( x, (ast.Attribute, ast.Subscript) ):
+            return False
+
+    elif isinstance( node, ast.AnnAssign ):
+      if not isinstance( node.target, ast.Name ):
+        return False
+
+    elif isinstance( node, ast.AugAssign ):
+      if isinstance( node.op, (ast.MatMult, ast.LShift) ):
+        if not _is_signal_target( blk, node.target ):
+          return False
+      elif not isinstance( node.target, ast.Name ):
+        return False
+
+    elif isinstance( node, ast.Call ):
+      if not _is_pure_call( blk, node ):
+        return False
+
+  return True
+
+class SimOptimizePass( BasePass ):
+
+  # SimOptimizePass public pass data
+
+  #: Enable the optimization
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: False
+  enable = MetadataKey(bool)
+
+  #: Signals, interfaces and components that the test bench accesses
+  #: directly. They are neither removed nor treated as constants.
+  #:
+  #: Type: ``list``; input
+  #:
+  #: Default value: []
+  observable = MetadataKey(list)
+
+  #: Whether the line traces of the components are printed
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: True
+  line_trace = MetadataKey(bool)
+
+  #: Print what the pass removed
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: False
+  verbose = MetadataKey(bool)
+
+  #: Names of the removed blocks by kind: "const_nets", "dead_nets" and
+  #: "dead_upblks"
+  #:
+  #: Type: ``dict``; output
+  removed = MetadataKey(dict)
+
+  def __call__( self, top ):
+    if not ( top.has_metadata( self.enable ) and top.get_metadata( self.enable ) ):
+      return
+
+    if not hasattr( top, "_dag" ):
+      raise PassOrderError( "_dag" )
+    if hasattr( top, "_sched" ):
+      raise PassOrderError( "_dag (SimOptimizePass must be applied before the schedule pass)" )
+
+    self.observable_objs = top.get_metadata( self.observable ) if top.has_metadata( self.observable ) else []
+    self.use_line_trace  = top.get_metadata( self.line_trace ) if top.has_metadata( self.line_trace ) else True
+
+    self.has_methods = bool( top.get_all_objects_of_type( MethodPort ) )
+
+    self.collect_accesses( top )
+    self.collect_observable( top )
+
+    const_blks = self.find_const_nets( top )
+    dead_blks  = self.find_dead_blocks( top, const_blks )
+
+    # Constant nets that copy values run once in lock_in_simulation
+    nop = top._dag.nop_genblks
+    top._dag.once_genblks = [ x for x in const_blks if x not in nop ]
+
+    removed = set( const_blks ) | dead_blks
+    top._dag.removed_upblks = removed
+    top._dag.final_upblks   = top._dag.final_upblks - removed
+    top._dag.all_constraints = { (x, y) for (x, y) in top._dag.all_constraints
+                                 if x not in removed and y not in removed }
+    constraint_objs = defaultdict(set)
+    for (x, y), objs in top._dag.constraint_objs.items():
+      if x not in removed and y not in removed:
+        constraint_objs[ (x, y) ] = objs
+    top._dag.constraint_objs = constraint_objs
+
+    genblks = top._dag.genblks
+    report = {
+      "const_nets":  [ x.__name__ for x in const_blks ],
+      "dead_nets":   sorted( x.__name__ for x in dead_blks if x in genblks ),
+      "dead_upblks": sorted( f"{top.get_update_block_host_component(x)!r}.{x.__name__}"
+                             for x in dead_blks if x not in genblks ),
+    }
+    top.set_metadata( self.removed, report )
+
+    if top.has_metadata( self.verbose ) and top.get_metadata( self.verbose ):
+      print( f"\nSimOptimizePass removed {len(removed)} of "
+             f"{len(top._dag.final_upblks) + len(removed)} blocks" )
+      for kind, names in report.items():
+        print( f"- {kind} ({len(names)})" )
+        for name in names:
+          print( f"    {name}" )
+
+  #-----------------------------------------------------------------------
+  # collect_accesses
+  #-----------------------------------------------------------------------
+  # Track the accesses of blocks at the granularity of top-level signals.
+  # We build them from the metadata of the blocks since the read_upblks
+  # and write_upblks of GenDAGPass don't exist if the DAG is cached.
+
+  def collect_accesses( self, top ):
+    upblk_reads, upblk_writes, upblk_calls = top.get_all_upblk_metadata()
+    genblk_reads, genblk_writes = top._dag.genblk_reads, top._dag.genblk_writes
+
+    self.blk_reads  = blk_reads  = {}
+    self.blk_writes = blk_writes = {}
+    self.writers    = writers    = defaultdict(list) # top-level signal -> blocks
+
+    # Blocks that may be removed if nobody observes what they write
+    self.removable = set()
+
+    update_once = getattr( top._dsl, "all_update_once", () )
+    greenlets   = top._dag.greenlet_upblks
+    U_U, RD_U, WR_U, _ = top.get_all_explicit_constraints()
+
+    # Blocks in explicit constraints might order other blocks
+    pinned = { x for pair in U_U for x in pair }
+    for constraints in [ RD_U, WR_U ]:
+      for blks in constraints.values():
+        pinned.update( x for _, x in blks )
+
+    for blk in top.get_all_update_blocks():
+      reads  = [ x for x in upblk_reads.get( blk, () ) if isinstance( x, Signal ) ]
+      writes = upblk_writes.get( blk, () )
+
+      blk_reads [ blk ] = { x.get_top_level_signal() for x in reads }
+      blk_writes[ blk ] = { x.get_top_level_signal() for x in writes if isinstance( x, Signal ) }
+
+      if writes and all( isinstance( x, Signal ) for x in writes ) and \
+         not upblk_calls.get( blk ) and blk not in update_once and \
+         blk not in greenlets and blk not in pinned:
+        info = top.get_update_block_host_component( blk ).get_update_block_info( blk )
+        if info is not None and not info[0] and is_pure_upblk( blk, info[-1] ):
+          self.removable.add( blk )
+
+    for blk in top._dag.genblks:
+      blk_reads [ blk ] = { x.get_top_level_signal() for x in genblk_reads.get( blk, () ) }
+      blk_writes[ blk ] = { x.get_top_level_signal() for x in genblk_writes[ blk ] }
+      self.removable.add( blk )
+
+    for blk, tops in blk_writes.items():
+      for x in tops:
+        writers[ x ].append( blk )
+
+  #-----------------------------------------------------------------------
+  # collect_observable
+  #-----------------------------------------------------------------------
+
+  def collect_observable( self, top ):
+    objs = set()
+    Q = list( self.observable_objs )
+    while Q:
+      x = Q.pop()
+      if isinstance( x, list ):
+        Q.extend( x )
+      else:
+        objs.add( x )
+
+    # Whether a component is ( inside an observable component, inside a
+    # component with a line trace )
+    memo = { None: ( False, False ) }
+    def lookup( c ):
+      try:
+        return memo[ c ]
+      except KeyError:
+        pass
+      p_obs, p_traced = lookup( c.get_parent_object() if c is not top else None )
+      ret = memo[ c ] = ( p_obs or c in objs,
+                          p_traced or ( self.use_line_trace and hasattr( c, "line_trace" ) ) )
+      return ret
+
+    # The test bench may write the signals of observable objects, so
+    # they are not constant
+    self.external = set()
+    self.observed = set()
+
+    for x in top._dsl.all_signals:
+      y = x
+      while not isinstance( y, Component ):
+        if y in objs:
+          obs, traced = True, True
+          break
+        y = y.get_parent_object()
+      else:
+        obs, traced = lookup( y )
+
+      if obs:
+        self.external.add( x.get_top_level_signal() )
+      if obs or traced:
+        self.observed.add( x.get_top_level_signal() )
+
+    self.observed.update( x.get_top_level_signal()
+                          for x in top.get_all_objects_of_type( Signal, host=top ) )
+
+  #-----------------------------------------------------------------------
+  # find_const_nets
+  #-----------------------------------------------------------------------
+  # A net block is constant if it reads nothing (the writer is a Const)
+  # or only reads constant top-level signals. A top-level signal is
+  # constant if every block that writes it is a constant net block, and
+  # nobody outside the design can write it. We return the constant net
+  # blocks in an order that they can be executed once.
+
+  def find_const_nets( self, top ):
+    genblks = top._dag.genblks
+    ret = []
+
+    if self.has_methods:
+      # Methods can write signals without metadata, so we only trust the
+      # nets with a Const writer
+      return [ x for x in genblks if not self.blk_reads[x] ]
+
+    inports = { x for x in top.get_all_objects_of_type( Signal, host=top )
+                if x.is_input_value_port() }
+
+    remaining_reads   = { x: len( self.blk_reads[x] ) for x in genblks }
+    remaining_writers = {}
+    net_readers = defaultdict(list)
+    for blk in genblks:
+      for x in self.blk_reads[ blk ]:
+        net_readers[ x ].append( blk )
+
+    Q = deque( x for x in genblks if not remaining_reads[x] )
+
+    def sig_is_const( x ):
+      for blk in net_readers[ x ]:
+        remaining_reads[ blk ] -= 1
+        if not remaining_reads[ blk ]:
+          Q.append( blk )
+
+    def is_fixed( x ):
+      return x not in inports and x not in self.external
+
+    for x in net_readers:
+      remaining_writers[ x ] = len( self.writers.get( x, () ) )
+      if not remaining_writers[ x ] and is_fixed( x ):
+        sig_is_const( x )
+
+    while Q:
+      blk = Q.popleft()
+      ret.append( blk )
+      for x in self.blk_writes[ blk ]:
+        if x in remaining_writers:
+          remaining_writers[ x ] -= 1
+          if not remaining_writers[ x ] and is_fixed( x ):
+            sig_is_const( x )
+
+    return ret
+
+  #-----------------------------------------------------------------------
+  # find_dead_blocks
+  #-----------------------------------------------------------------------
+
+  def find_dead_blocks( self, top, const_blks ):
+    if self.has_methods or \
+       ( top.has_metadata( VcdGenerationPass.vcd_file_name ) and
+         top.get_metadata( VcdGenerationPass.vcd_file_name ) is not None ) or \
+       ( top.has_metadata( PrintTextWavePass.enable ) and
+         top.get_metadata( PrintTextWavePass.enable ) ):
+      return set()
+
+    const_blks = set( const_blks )
+    live_sigs  = set()
+    live_blks  = set()
+    Q = []
+
+    def mark_blk( blk ):
+      if blk not in live_blks:
+        live_blks.add( blk )
+        for x in self.blk_reads.get( blk, () ):
+          if x not in live_sigs:
+            live_sigs.add( x )
+            Q.append( x )
+
+    for x in self.observed:
+      live_sigs.add( x )
+      Q.append( x )
+
+    # Also the update blocks wrapped in greenlets are kept
+    for blk in top._dag.final_upblks | self.blk_reads.keys():
+      if blk not in self.removable:
+        mark_blk( blk )
+
+    while Q:
+      for blk in self.writers.get( Q.pop(), () ):
+        if blk not in const_blks:
+          mark_blk( blk )
+
+    return { x for x in self.removable
+             if x not in live_blks and x not in const_blks and x in top._dag.final_upblks }
@@ -72,7 +72,9 @@ class SimpleSchedulePass( BasePass ):
 
     if not hasattr( top, "_sched" ):
       raise Exception( "Please create top._sched pass metadata namespace first!" )
-    top._sched.schedule_ff = list( top.get_all_update_ff().copy() )
+    # Skip the blocks removed by SimOptimizePass
+    removed = getattr( top._dag, "removed_upblks", () )
+    top._sched.schedule_ff = [ x for x in top.get_all_update_ff() if x not in removed ]
 
   def schedule_posedge_flip( self, top ):
 
@@ -0,0 +1,172 @@
+#=========================================================================
+# BatchSimPass_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import Bits1, Bits4, Bits8, Bits16, Bits32, bitstruct, zext
+from pymtl3.dsl import *
+from pymtl3.passes.errors import ModelTypeError
+
+from ..DynamicSchedulePass import DynamicSchedulePass
+from ..GenDAGPass import GenDAGPass
+from ..PrepareSimPass import PrepareSimPass
+
+np = pytest.importorskip( "numpy" )
+
+from ..BatchSimPass import BatchSimPass # isort:skip
+
+B = 37
+
+def _prepare( top, batch_size ):
+  top.elaborate()
+  top.apply( GenDAGPass() )
+  top.apply( DynamicSchedulePass() )
+  if batch_size:
+    top.apply( BatchSimPass( batch_size, print_line_trace=False ) )
+  else:
+    top.apply( PrepareSimPass(print_line_trace=False) )
+  top.sim_reset()
+  return top
+
+def _check_against_reference( cls, nbits, ncycles=8, seed=0xbeef ):
+  rng = np.random.default_rng( seed )
+  vectors = rng.integers( 0, 1 << nbits, size=(ncycles, B), dtype=np.uint64 )
+
+  A = _prepare( cls(), B )
+  refs = [ _prepare( cls(), 0 ) for _ in range(B) ]
+
+  for v in vectors:
+    A.in_ @= v
+    A.sim_tick()
+    for lane, ref in enumerate( refs ):
+      ref.in_ @= int( v[lane] )
+      ref.sim_tick()
+      assert A.out.lane( lane ) == ref.out
+  return A
+
+class Accumulator( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits16 )
+    s.out = OutPort( Bits16 )
+    s.acc = Wire( Bits16 )
+    s.odd = Wire( Bits1 )
+    s.odd //= s.in_[0]
+
+    @update_ff
+    def up_acc():
+      if s.reset:
+        s.acc <<= 0
+      elif s.odd:
+        s.acc <<= s.acc + s.in_
+      else:
+        s.acc <<= s.acc ^ s.in_
+
+    s.out //= s.acc
+
+def test_register_with_divergent_branches():
+  _check_against_reference( Accumulator, 16 )
+
+def test_nested_if_and_locals():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits32 )
+      s.lo  = Wire( Bits4 )
+      s.lo //= s.in_[0:4]
+
+      @update
+      def up_out():
+        tmp = zext( s.in_, 32 )
+        if s.in_ > 100:
+          if s.lo == 3:
+            tmp = tmp * 3
+          else:
+            tmp = tmp + 7
+          tmp = tmp << 1
+        elif (s.in_ < 10) and not (s.lo == 0):
+          tmp = Bits32( 0xffff )
+        s.out @= tmp if s.lo != 5 else Bits32(5)
+
+  _check_against_reference( Top, 8, ncycles=32 )
+
+def test_pipeline_of_components():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits16 )
+      s.out = OutPort( Bits16 )
+      s.accs = [ Accumulator() for _ in range(3) ]
+      s.accs[0].in_ //= s.in_
+      s.accs[1].in_ //= s.accs[0].out
+      s.accs[2].in_ //= s.accs[1].out
+      s.out //= s.accs[2].out
+
+  _check_against_reference( Top, 16 )
+
+def test_slice_views():
+
+  # The readers of the sliced writers share views of in_
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits16 )
+      s.out = OutPort( Bits16 )
+      s.lo  = Wire( Bits8 )
+      s.hi  = Wire( Bits8 )
+      s.lo //= s.in_[0:8]
+      s.hi //= s.in_[8:16]
+
+      @update
+      def up_out():
+        s.out @= zext( s.lo, 16 ) * zext( s.hi, 16 )
+
+  A = _check_against_reference( Top, 16 )
+  assert A.lo._parent is A.in_
+
+def test_uniform_and_lane_access():
+  A = _prepare( Accumulator(), 4 )
+  A.in_ @= 3
+  A.sim_tick()
+  assert A.out.is_uniform() and A.out == 3
+
+  A.in_ @= [ 1, 2, 3, 4 ]
+  A.sim_tick()
+  assert list( A.out.uint() ) == [ 4, 1, 6, 7 ]
+  with pytest.raises( ValueError ):
+    bool( A.out )
+
+  with pytest.raises( AssertionError ):
+    A.in_ = 3
+    A.sim_eval_combinational()
+
+def test_bitstruct_not_supported():
+
+  @bitstruct
+  class SomeMsg:
+    a: Bits8
+    b: Bits8
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( SomeMsg )
+      s.out = OutPort( Bits8 )
+      s.out //= s.in_.a
+
+  with pytest.raises( ModelTypeError ):
+    _prepare( Top(), B )
+
+def test_method_port_not_supported():
+
+  class Top( Component ):
+    def construct( s ):
+      s.out = OutPort( Bits1 )
+
+    @method_port
+    def get( s ):
+      return 1
+
+  with pytest.raises( ModelTypeError ):
+    _prepare( Top(), B )
@@ -0,0 +1,182 @@
+#=========================================================================
+# DesignCache_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import os
+import sys
+
+from pymtl3.datatypes import Bits8, Bits16, bitstruct
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.stdlib.test_utils.test_sinks import TestSinkCL
+from pymtl3.stdlib.test_utils.test_srcs import TestSrcCL
+
+from ..DesignCache import design_hash
+
+
+@bitstruct
+class Point:
+  x: Bits8
+  y: Bits8
+
+class Child( Component ):
+  def construct( s, k ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.pt  = OutPort( Point )
+    s.pt //= Point( 1, 2 )
+
+    @update
+    def up_out():
+      s.out @= s.in_ + k
+
+class FalseLoop( Component ):
+  def construct( s, k=3 ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits16 )
+    s.x   = Wire( Bits8 )
+    s.y   = Wire( Bits8 )
+    s.z   = Wire( Bits8 )
+    s.w   = Wire( Bits8 )
+    s.ptx = Wire( Bits8 )
+    s.c   = [ Child( k ) for _ in range(2) ]
+    s.c[0].in_ //= s.in_
+    s.c[1].in_ //= s.c[0].out
+    s.out[8:16] //= s.c[1].out
+    s.out[0:8]  //= s.w
+    s.ptx //= s.c[1].pt.x
+
+    # up1 -> up2 -> up3 -> up1 is a false combinational loop
+    @update
+    def up1():
+      s.x @= s.in_ + 1
+      s.w @= s.z
+
+    @update
+    def up2():
+      s.y @= s.x + s.ptx
+
+    @update
+    def up3():
+      s.z @= s.y + 1
+
+def _run( top, cache_dir ):
+  top.apply( DefaultPassGroup(print_line_trace=False, cache_dir=cache_dir) )
+  top.sim_reset()
+  ret = []
+  for i in range(10):
+    top.in_ @= i * 13
+    top.sim_tick()
+    ret.append( int(top.out) )
+  return ret
+
+def test_cache_hit( tmp_path ):
+  cache_dir = str(tmp_path)
+  ref = _run( FalseLoop(), None )
+
+  A = FalseLoop()
+  assert _run( A, cache_dir ) == ref
+  assert A._dag.cache.hits == set()
+  assert A._sched.scc_blocks
+  assert len( os.listdir( cache_dir ) ) == 2
+
+  B = FalseLoop()
+  assert _run( B, cache_dir ) == ref
+  assert B._dag.cache.hits == { "dag", "schedule" }
+  assert B._sched.scc_blocks
+  assert len( B._dag.genblks ) == len( A._dag.genblks )
+  assert len( B._dag.all_constraints ) == len( A._dag.all_constraints )
+
+def test_design_change_misses( tmp_path ):
+  cache_dir = str(tmp_path)
+  _run( FalseLoop(), cache_dir )
+
+  A = FalseLoop( k=4 )
+  assert _run( A, cache_dir ) == _run( FalseLoop( k=4 ), None )
+  assert A._dag.cache.hits == set()
+
+  A = FalseLoop(); A.elaborate()
+  B = FalseLoop(); B.elaborate()
+  C = FalseLoop( k=4 ); C.elaborate()
+  assert design_hash( A ) == design_hash( B ) != design_hash( C )
+
+def test_interpreter_misses( monkeypatch ):
+  A = FalseLoop(); A.elaborate()
+  key = design_hash( A )
+
+  # Same version_info but incompatible bytecode
+  monkeypatch.setattr( sys.implementation, "name", "pypy" )
+  monkeypatch.setattr( sys.implementation, "cache_tag", "pypy311" )
+  assert design_hash( A ) != key
+
+def test_corrupted_entry( tmp_path ):
+  cache_dir = str(tmp_path)
+  _run( FalseLoop(), cache_dir )
+  for name in os.listdir( cache_dir ):
+    with open( os.path.join( cache_dir, name ), "wb" ) as f:
+      f.write( b"garbage" )
+
+  A = FalseLoop()
+  assert _run( A, cache_dir ) == _run( FalseLoop(), None )
+  assert A._dag.cache.hits == set()
+
+def test_cache_cl( tmp_path ):
+
+  class Harness( Component ):
+    def construct( s, msgs ):
+      s.src  = TestSrcCL ( Bits16, msgs, initial_delay=2, interval_delay=1 )
+      s.sink = TestSinkCL( Bits16, msgs, initial_delay=1, interval_delay=2 )
+      s.src.send //= s.sink.recv
+
+    def done( s ):
+      return s.src.done() and s.sink.done()
+
+  def run( cache_dir ):
+    top = Harness( [ Bits16(i) for i in range(8) ] )
+    top.apply( DefaultPassGroup(print_line_trace=False, cache_dir=cache_dir) )
+    top.sim_reset()
+    while not top.done():
+      top.sim_tick()
+      assert top.sim_cycle_count() < 100
+    return top
+
+  ref = run( None ).sim_cycle_count()
+  assert run( str(tmp_path) ).sim_cycle_count() == ref
+  A = run( str(tmp_path) )
+  assert A.sim_cycle_count() == ref
+  assert A._dag.cache.hits == { "dag", "schedule" }
+
+def test_shared_net_blk_code( tmp_path ):
+  cache_dir = str(tmp_path)
+
+  class Swap( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits16 )
+      s.out = OutPort( Bits16 )
+      s.out[0:8]  //= s.in_[8:16]
+      s.out[8:16] //= s.in_[0:8]
+
+  class Top( Component ):
+    def construct( s ):
+      s.loop = FalseLoop()
+      s.swap = [ Swap() for _ in range(2) ]
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits16 )
+      s.loop.in_     //= s.in_
+      s.swap[0].in_  //= s.loop.out
+      s.swap[1].in_  //= s.swap[0].out
+      s.out          //= s.swap[1].out
+
+  for i in range(2):
+    A = Top()
+    assert _run( A, cache_dir ) == _run( FalseLoop(), None )
+
+    # The nets of the two instances of Swap share the code of their
+    # blocks, one per distinct source
+    blks = [ blk for blk in A._dag.genblks
+             if blk.__name__.startswith( "s_swap" ) and "@=" in A._dag.genblk_src[ blk ] ]
+    assert len( blks ) == 4
+    assert len( { blk.__code__ for blk in blks } ) == 2
+  assert A._dag.cache.hits == { "dag", "schedule" }
@@ -0,0 +1,233 @@
+#=========================================================================
+# EventDrivenSchedulePass_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+from pymtl3.datatypes import Bits8, Bits32, bitstruct
+from pymtl3.dsl import *
+
+from ..DynamicSchedulePass import DynamicSchedulePass
+from ..EventDrivenSchedulePass import EventDrivenSchedulePass
+from ..GenDAGPass import GenDAGPass
+from ..PrepareSimPass import PrepareSimPass
+
+
+def _prepare( cls, *args, sched=EventDrivenSchedulePass ):
+  A = cls( *args )
+  A.elaborate()
+  A.apply( GenDAGPass() )
+  A.apply( sched() )
+  A.apply( PrepareSimPass(print_line_trace=False) )
+  A.sim_reset()
+  return A
+
+def _check_against_dynamic( cls, inputs ):
+  A = _prepare( cls )
+  B = _prepare( cls, sched=DynamicSchedulePass )
+  for v in inputs:
+    A.in_ @= v
+    B.in_ @= v
+    A.sim_tick()
+    B.sim_tick()
+    assert A.out == B.out
+
+def test_skip_idle_blocks():
+
+  # Count the calls outside the component, a Python attribute assigned
+  # by a block would keep the component active
+  calls = {}
+
+  def count( s ):
+    calls[ s ] += 1
+
+  class Inner( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      calls[ s ] = 0
+
+      @update
+      def up():
+        count( s )
+        s.out @= s.in_ + 1
+
+  class Top( Component ):
+    def construct( s, N=10 ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.inners = [ Inner() for _ in range(N) ]
+      s.inners[0].in_ //= s.in_
+      for i in range(N-1):
+        s.inners[i].out //= s.inners[i+1].in_
+      s.inners[-1].out //= s.out
+
+  A = _prepare( Top, 10 )
+
+  A.in_ @= 1
+  A.sim_eval_combinational()
+  assert A.out == 11
+
+  counts = [ calls[x] for x in A.inners ]
+  for i in range(10):
+    A.sim_tick()
+  assert A.out == 11
+  assert [ calls[x] for x in A.inners ] == counts, "Idle blocks should be skipped"
+
+  A.in_ @= 5
+  A.sim_tick()
+  assert A.out == 15
+  assert [ calls[x] for x in A.inners ] == [ x+1 for x in counts ]
+
+def test_sequential_logic():
+
+  class Top( Component ):
+    def construct( s ):
+      s.b = Wire( Bits32 )
+      s.c = Wire( Bits32 )
+      s.out = OutPort( Bits32 )
+
+      @update
+      def up1():
+        s.b @= s.c + 1
+
+      @update_ff
+      def up2():
+        if s.reset:
+          s.c <<= 0
+        else:
+          s.c <<= s.b + 1
+
+      s.out //= s.b
+
+  A = _prepare( Top )
+  for i in range(5):
+    assert A.out == i*2 + 1
+    A.sim_tick()
+
+def test_read_write_same_signal():
+
+  class Top( Component ):
+    def construct( s ):
+      s.i = Wire(32)
+      s.out = OutPort(32)
+
+      @update
+      def up():
+        s.i @= s.i + 1
+        s.out @= s.i
+
+  A = _prepare( Top )
+  B = _prepare( Top, sched=DynamicSchedulePass )
+  for i in range(5):
+    A.sim_tick()
+    B.sim_tick()
+    assert A.out == B.out
+
+def test_bitstruct_and_slices():
+
+  @bitstruct
+  class SomeMsg:
+    a: Bits8
+    b: Bits32
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.msg = Wire( SomeMsg )
+      s.out_a = OutPort( Bits8 )
+      s.out_b = OutPort( Bits32 )
+
+      @update
+      def up_msg():
+        s.msg.a @= s.in_[0:8]
+        s.msg.b @= s.in_
+
+      s.out_a //= s.msg.a
+      s.out_b //= s.msg.b
+
+  A = _prepare( Top )
+  for v in [ 0x12, 0x1234, 0x1234, 0xff00 ]:
+    A.in_ @= v
+    A.sim_tick()
+    assert A.out_a == v & 0xff
+    assert A.out_b == v
+
+def test_combinational_loop_converges():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.a = Wire(32)
+      s.b = Wire(32)
+      s.out = OutPort(32)
+
+      @update
+      def up1():
+        if s.b < 100:
+          s.a @= s.in_
+        else:
+          s.a @= 100
+
+      @update
+      def up2():
+        s.b @= s.a
+
+      s.out //= s.b
+
+  _check_against_dynamic( Top, [ 1, 2, 2, 200, 3, 3 ] )
+
+def test_python_attribute_state():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.cnt = 0
+
+      @update_ff
+      def ff():
+        s.cnt = s.cnt + 1
+
+      @update
+      def up():
+        s.out @= s.in_ + s.cnt
+
+  A = _prepare( Top )
+  B = _prepare( Top, sched=DynamicSchedulePass )
+  outs = []
+  for i in range(4):
+    A.in_ @= 4
+    B.in_ @= 4
+    A.sim_tick()
+    B.sim_tick()
+    outs.append( int(A.out) )
+    assert A.out == B.out
+  assert outs == [ outs[0] + i for i in range(4) ]
+
+def test_restore_checkpoint():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+
+      @update
+      def up():
+        s.out @= s.in_ + 1
+
+  A = _prepare( Top )
+  A.in_ @= 1
+  A.sim_tick()
+  blob = A.sim_save_checkpoint()
+
+  A.in_ @= 5
+  A.sim_tick()
+  assert A.out == 6
+
+  # The last observed value of in_ is 5 again after the restore
+  A.sim_restore_checkpoint( blob )
+  assert A.out == 2
+  A.in_ @= 5
+  A.sim_tick()
+  assert A.out == 6
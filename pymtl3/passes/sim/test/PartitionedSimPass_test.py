@@ -0,0 +1,176 @@
+#=========================================================================
+# PartitionedSimPass_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import Bits8, Bits32, bitstruct
+from pymtl3.dsl import *
+from pymtl3.passes.errors import ModelTypeError
+
+from ..DynamicSchedulePass import DynamicSchedulePass
+from ..GenDAGPass import GenDAGPass
+from ..PartitionedSimPass import PartitionedSimPass
+from ..PrepareSimPass import PrepareSimPass
+
+
+def _prepare( top, partitioned ):
+  top.elaborate()
+  if partitioned:
+    for i, tile in enumerate( top.tiles ):
+      tile.set_metadata( PartitionedSimPass.partition, i % partitioned + 1 )
+  top.apply( GenDAGPass() )
+  top.apply( DynamicSchedulePass() )
+  if partitioned:
+    top.apply( PartitionedSimPass(print_line_trace=False) )
+  else:
+    top.apply( PrepareSimPass(print_line_trace=False) )
+  top.sim_reset()
+  return top
+
+def _check_against_reference( cls, inputs, nparts=2 ):
+  A = _prepare( cls(), nparts )
+  B = _prepare( cls(), 0 )
+  try:
+    for v in inputs:
+      A.in_ @= v
+      B.in_ @= v
+      A.sim_tick()
+      B.sim_tick()
+      assert A.out == B.out
+  finally:
+    A.sim_stop_partitions()
+  return A
+
+class Tile( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+    s.reg = Wire( Bits32 )
+
+    @update_ff
+    def up_reg():
+      if s.reset:
+        s.reg <<= 0
+      else:
+        s.reg <<= s.in_ + s.reg
+
+    @update
+    def up_out():
+      s.out @= s.reg + s.in_
+
+def test_combinational_chain_across_partitions():
+
+  class Top( Component ):
+    def construct( s, N=4 ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.tiles = [ Tile() for _ in range(N) ]
+      s.tiles[0].in_ //= s.in_
+      for i in range(N-1):
+        s.tiles[i].out //= s.tiles[i+1].in_
+      s.tiles[-1].out //= s.out
+
+  A = _check_against_reference( Top, [ 1, 2, 3, 0, 0, 5, 7 ] )
+  assert A._sched.partitions == [ 0, 1, 2 ]
+  # Every hop between two tiles crosses partitions
+  assert A._sched.partition_levels == 5
+
+def test_registered_boundary():
+
+  class RegTile( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+
+      @update_ff
+      def up_out():
+        if s.reset:
+          s.out <<= 0
+        else:
+          s.out <<= s.in_ + 1
+
+  class Top( Component ):
+    def construct( s, N=6 ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.tiles = [ RegTile() for _ in range(N) ]
+      s.tiles[0].in_ //= s.in_
+      for i in range(N-1):
+        s.tiles[i].out //= s.tiles[i+1].in_
+      s.tiles[-1].out //= s.out
+
+  A = _check_against_reference( Top, list(range(20)), nparts=3 )
+  assert A._sched.partition_levels == 1
+
+def test_slices_and_bitstructs():
+
+  @bitstruct
+  class SomeMsg:
+    a: Bits8
+    b: Bits32
+
+  class MsgTile( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( SomeMsg )
+
+      @update
+      def up_out():
+        s.out.a @= s.in_[0:8]
+        s.out.b @= s.in_
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.tiles = [ MsgTile() for _ in range(2) ]
+      s.tiles[0].in_ //= s.in_
+      s.tiles[1].in_[0:8]  //= s.tiles[0].out.a
+      s.tiles[1].in_[8:32] //= s.tiles[0].out.b[0:24]
+      s.out //= s.tiles[1].out.b
+
+  _check_against_reference( Top, [ 0x12, 0x1234, 0xabcdef01 ] )
+
+def test_worker_error():
+
+  class BadTile( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+
+      @update
+      def up_out():
+        if s.in_ == 3:
+          raise ValueError( "bad value" )
+        s.out @= s.in_
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.tiles = [ BadTile() ]
+      s.tiles[0].in_ //= s.in_
+      s.tiles[0].out //= s.out
+
+  A = _prepare( Top(), 1 )
+  A.in_ @= 3
+  with pytest.raises( RuntimeError ) as e:
+    A.sim_tick()
+  assert "bad value" in str(e.value)
+  A.sim_stop_partitions()
+
+def test_method_port_not_supported():
+
+  class Top( Component ):
+    def construct( s ):
+      s.tiles = []
+
+    @method_port
+    def foo( s ):
+      pass
+
+  with pytest.raises( ModelTypeError ):
+    _prepare( Top(), 1 )
@@ -0,0 +1,619 @@
+#=========================================================================
+# PrepareSimPass_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import Bits8, Bits16, Bits32, bitstruct, zext
+from pymtl3.dsl import *
+from pymtl3.dsl.errors import ReleasedMetadataError
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.passes.tracing import VcdGenerationPass
+from pymtl3.stdlib.ifcs import RecvIfcRTL, SendIfcRTL
+from pymtl3.stdlib.test_utils.test_sinks import TestSinkCL
+from pymtl3.stdlib.test_utils.test_srcs import TestSrcCL
+
+
+@bitstruct
+class Pair:
+  lo: Bits8
+  hi: Bits8
+
+def _bump( mem, addr ):
+  mem[ addr % len(mem) ] += 1
+
+class Counter( Component ):
+  def construct( s ):
+    s.in_  = InPort( Bits16 )
+    s.out  = OutPort( Bits32 )
+    s.cnt  = Wire( Bits32 )
+    s.pair = Wire( Pair )
+    s.pair.lo //= s.cnt[0:8]
+    s.pair.hi //= s.cnt[8:16]
+    s.mem  = bytearray( 16 )
+    s.log  = []
+
+    @update_ff
+    def up_cnt():
+      if s.reset:
+        s.cnt <<= 0
+      else:
+        s.cnt <<= s.cnt + zext( s.in_, 32 )
+
+    @update
+    def up_out():
+      s.out @= s.cnt + zext( s.pair.hi, 32 ) + zext( s.pair.lo, 32 )
+
+    @update_once
+    def up_log():
+      _bump( s.mem, int(s.cnt) )
+      s.log.append( int(s.out) )
+
+def _run( top, n ):
+  ret = []
+  for i in range(n):
+    top.in_ @= i * 7
+    top.sim_tick()
+    ret.append( (int(top.out), bytes(top.mem), list(top.log)) )
+  return ret
+
+def test_save_restore_rtl():
+  A = Counter()
+  A.apply( DefaultPassGroup(print_line_trace=False) )
+  A.sim_reset()
+  _run( A, 10 )
+
+  blob   = A.sim_save_checkpoint()
+  cycles = A.sim_cycle_count()
+  log    = A.log
+  ref    = _run( A, 10 )
+
+  A.sim_restore_checkpoint( blob )
+  assert A.sim_cycle_count() == cycles
+  assert A.log is log # restored in place
+  assert _run( A, 10 ) == ref
+
+def test_restore_into_another_instance():
+  A = Counter()
+  A.apply( DefaultPassGroup(print_line_trace=False) )
+  A.sim_reset()
+  _run( A, 20 )
+  blob = A.sim_save_checkpoint()
+
+  B = Counter()
+  B.apply( DefaultPassGroup(print_line_trace=False) )
+  B.sim_reset()
+  B.sim_restore_checkpoint( blob )
+  assert B.sim_cycle_count() == A.sim_cycle_count()
+  assert _run( B, 10 ) == _run( A, 10 )
+
+def test_design_mismatch():
+
+  class Other( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits16 )
+      s.out = OutPort( Bits16 )
+      s.out //= s.in_
+
+  A = Counter()
+  A.apply( DefaultPassGroup(print_line_trace=False) )
+  A.sim_reset()
+
+  B = Other()
+  B.apply( DefaultPassGroup(print_line_trace=False) )
+  B.sim_reset()
+  with pytest.raises( ValueError ):
+    B.sim_restore_checkpoint( A.sim_save_checkpoint() )
+
+def test_save_restore_cl():
+
+  class Harness( Component ):
+    def construct( s, msgs ):
+      s.src  = TestSrcCL ( Bits16, msgs, initial_delay=2, interval_delay=1 )
+      s.sink = TestSinkCL( Bits16, msgs, initial_delay=1, interval_delay=2 )
+      s.src.send //= s.sink.recv
+
+    def done( s ):
+      return s.src.done() and s.sink.done()
+
+  msgs = [ Bits16(i) for i in range(8) ]
+  A = Harness( msgs )
+  A.apply( DefaultPassGroup(print_line_trace=False) )
+  A.sim_reset()
+  for i in range(6):
+    A.sim_tick()
+  blob = A.sim_save_checkpoint()
+
+  def run_to_done():
+    n = 0
+    while not A.done():
+      A.sim_tick()
+      n += 1
+      assert n < 100
+    return A.sim_cycle_count()
+
+  end = run_to_done()
+  A.sim_restore_checkpoint( blob )
+  assert not A.done()
+  assert run_to_done() == end
+
+#-------------------------------------------------------------------------
+# Fast-forward
+#-------------------------------------------------------------------------
+
+class Countdown( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.cnt = Wire( Bits8 )
+
+    @update_ff
+    def up_cnt():
+      if s.reset:
+        s.cnt <<= 0
+      elif s.in_ != 0:
+        s.cnt <<= s.in_
+      elif s.cnt != 0:
+        s.cnt <<= s.cnt - 1
+
+    s.out //= s.cnt
+
+def _countdown_trace( fast_forward ):
+  top = Countdown()
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=fast_forward) )
+  top.sim_reset()
+  ret = []
+  for x in [ 5 ] + [ 0 ] * 20 + [ 3 ] + [ 0 ] * 10:
+    top.in_ @= x
+    top.sim_tick()
+    ret.append( (int(top.out), top.sim_cycle_count()) )
+  return top, ret
+
+def test_fast_forward_rtl():
+  A, trace_a = _countdown_trace( True )
+  B, trace_b = _countdown_trace( False )
+  assert trace_a == trace_b
+  assert A._sim.fast_forward_blockers == []
+  assert A._sim.skipped_cycles > 0
+
+  # Unbounded idle period until the input changes
+  ncycles = A.sim_cycle_count()
+  assert A.sim_fast_forward( 1000 ) == 1000
+  assert A.sim_cycle_count() == ncycles + 1000
+  A.in_ @= 2
+  assert A.sim_fast_forward( 1000 ) == 0
+  A.sim_tick()
+  assert A.out == 2
+
+def test_fast_forward_restore_checkpoint():
+  A = Countdown()
+  A.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True) )
+  A.sim_reset()
+  A.in_ @= 3
+  A.sim_tick()
+  A.in_ @= 0
+  blob = A.sim_save_checkpoint()
+
+  # Restoring a busy checkpoint ends the idle period
+  for _ in range(10):
+    A.sim_tick()
+  assert A._sim.skipped_cycles > 0
+  A.sim_restore_checkpoint( blob )
+  ret = []
+  for _ in range(3):
+    A.sim_tick()
+    ret.append( int(A.out) )
+  assert ret == [ 2, 1, 0 ]
+
+def test_fast_forward_sim_reset():
+
+  class Reg( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits8 )
+
+      @update_ff
+      def up_reg():
+        if s.reset:
+          s.out <<= 5
+        else:
+          s.out <<= s.in_
+
+  for fast_forward in [ False, True ]:
+    A = Reg()
+    A.apply( DefaultPassGroup(print_line_trace=False, fast_forward=fast_forward) )
+    A.sim_reset()
+    A.in_ @= 0
+    for _ in range(5):
+      A.sim_tick()
+    if fast_forward:
+      assert A._sim.skipped_cycles == 3
+
+    # The reset ends the idle period
+    A.sim_reset()
+    assert A.out == 5
+    A.sim_tick()
+    assert A.out == 0
+
+def test_fast_forward_python_attribute_state():
+
+  class AttrCounter( Component ):
+    def construct( s ):
+      s.out = OutPort( Bits8 )
+      s.cnt = 0
+
+      @update_ff
+      def up_cnt():
+        s.cnt = s.cnt + 1
+        s.out <<= s.cnt
+
+  A = AttrCounter()
+  A.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True) )
+  assert any( "up_cnt" in x for x in A._sim.fast_forward_blockers )
+  A.sim_reset()
+  ret = []
+  for _ in range(5):
+    A.sim_tick()
+    ret.append( int(A.out) )
+  assert ret == [ 4, 5, 6, 7, 8 ]
+  assert A._sim.skipped_cycles == 0
+
+class PassThroughRTL( Component ):
+  def construct( s ):
+    s.recv = RecvIfcRTL( Bits16 )
+    s.send = SendIfcRTL( Bits16 )
+    s.send.msg //= s.recv.msg
+    s.send.en  //= s.recv.en
+    s.recv.rdy //= s.send.rdy
+
+class DelayHarness( Component ):
+  def construct( s, msgs ):
+    s.src  = TestSrcCL ( Bits16, msgs, initial_delay=5, interval_delay=17 )
+    s.dut  = PassThroughRTL()
+    s.sink = TestSinkCL( Bits16, msgs, initial_delay=3, interval_delay=23 )
+    s.src.send //= s.dut.recv
+    s.dut.send //= s.sink.recv
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+def _run_delay_harness( fast_forward ):
+  top = DelayHarness( [ Bits16(i) for i in range(10) ] )
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=fast_forward) )
+  top.sim_reset()
+  while not top.done():
+    top.sim_tick()
+    assert top.sim_cycle_count() < 1000
+  return top
+
+def test_fast_forward_cl_delays():
+  A = _run_delay_harness( True )
+  B = _run_delay_harness( False )
+  assert A.sim_cycle_count() == B.sim_cycle_count()
+  assert A.sink.cycle_count == B.sink.cycle_count
+  assert A._sim.fast_forward_blockers == []
+  assert A._sim.skipped_cycles > A.sim_cycle_count() // 2
+
+class Accumulator( Component ):
+  def construct( s ):
+    s.buf   = []
+    s.total = 0
+
+    @update_once
+    def up_drain():
+      while s.buf:
+        s.total += s.buf.pop()
+
+  @non_blocking( lambda s: True )
+  def push( s, msg ):
+    s.buf.append( msg )
+
+  def sim_idle_cycles( s ):
+    return 0 if s.buf else None
+
+  def sim_skip_cycles( s, n ):
+    pass
+
+@pytest.mark.parametrize( "fast_forward", [ False, True ] )
+def test_fast_forward_method_call( fast_forward ):
+  top = Accumulator()
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=fast_forward) )
+  top.sim_reset()
+  for _ in range(5):
+    top.sim_tick()
+
+  # The call between two ticks ends the idle period
+  top.push( 5 )
+  for _ in range(3):
+    top.sim_tick()
+  assert top.total == 5
+
+  if fast_forward:
+    assert top._sim.skipped_cycles > 0
+    top.push( 2 )
+    assert top.sim_fast_forward( 10 ) == 0
+    top.sim_tick()
+    assert top.total == 7
+
+def test_fast_forward_reapply():
+
+  # No idle protocol, so the rdy method is counted as well
+  class Adder( Component ):
+    def construct( s ):
+      s.total = 0
+
+    @non_blocking( lambda s: True )
+    def push( s, msg ):
+      s.total += msg
+
+  def counted( top ):
+    return [ x for x in top.get_all_objects_of_type( MethodPort )
+             if getattr( x.method, "__name__", None ) == "counted_method" ]
+
+  top = Adder()
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True) )
+  assert len( counted( top ) ) == 2
+  DefaultPassGroup.revert( top )
+  assert counted( top ) == []
+
+  # Applying again reverts the previous application first, so no method
+  # is wrapped twice
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True) )
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True) )
+  assert all( x.__name__ != "counted_method" for _, x in top._sim.counted_methods )
+
+  top.sim_reset()
+  top.push( 5 )
+  top.sim_tick()
+  assert top.total == 5
+
+def test_fast_forward_blocked():
+  A = Counter()
+  A.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True) )
+  A.sim_reset()
+  assert A._sim.fast_forward_blockers
+  _run( A, 4 )
+  A.in_ @= 0
+  A.sim_tick()
+  A.sim_tick()
+  assert A.sim_fast_forward( 10 ) == 0
+  assert A._sim.skipped_cycles == 0
+
+#-------------------------------------------------------------------------
+# Simulation statistics
+#-------------------------------------------------------------------------
+
+def test_sim_stats_rtl( tmp_path ):
+  A = Counter()
+  A.elaborate()
+  A.set_metadata( VcdGenerationPass.vcd_file_name, str(tmp_path / "counter") )
+  A.apply( DefaultPassGroup(print_line_trace=False, sim_stats=True) )
+  A.sim_reset()
+  trace_a = _run( A, 10 )
+
+  B = Counter()
+  B.apply( DefaultPassGroup(print_line_trace=False) )
+  B.sim_reset()
+  assert _run( B, 10 ) == trace_a
+  assert not hasattr( B, "sim_stats" )
+
+  stats = A.sim_stats()
+  assert stats["cycles"] == A.sim_cycle_count()
+  assert stats["wall_time"] > 0
+  assert stats["cycles_per_sec"] > 0
+  assert set( stats["phases"] ) == { "comb", "update_ff", "flip", "vcd", "line_trace", "other" }
+  assert sum( stats["phases"].values() ) == pytest.approx( stats["wall_time"] )
+
+def test_sim_stats_fast_forward():
+  top = DelayHarness( [ Bits16(i) for i in range(4) ] )
+  top.apply( DefaultPassGroup(print_line_trace=False, fast_forward=True, sim_stats=True) )
+  top.sim_reset()
+  while not top.done():
+    top.sim_tick()
+    assert top.sim_cycle_count() < 1000
+
+  stats = top.sim_stats()
+  assert stats["cycles"] == top.sim_cycle_count()
+  assert "line_trace" in stats["phases"]
+  assert stats["phases"]["other"] > 0
+
+#-------------------------------------------------------------------------
+# Release elaboration metadata
+#-------------------------------------------------------------------------
+
+def test_release_metadata_rtl( tmp_path ):
+  # Another design of the same classes elaborated before the release
+  B = Counter()
+  B.elaborate()
+
+  A = Counter()
+  A.elaborate()
+  A.set_metadata( VcdGenerationPass.vcd_file_name, str(tmp_path / "released") )
+  A.apply( DefaultPassGroup(print_line_trace=False, release_metadata=True) )
+  assert A._sim.released_metadata_bytes > 0
+  assert not hasattr( A._dsl, "all_adjacency" )
+  assert not hasattr( A._dsl, "upblk_reads" )
+
+  # The update block ASTs cached in the classes are shared with B
+  for blk in B.get_all_update_blocks():
+    assert B.get_update_block_host_component( blk ).get_update_block_info( blk ) is not None
+  B.apply( DefaultPassGroup(print_line_trace=False, sim_optimize=True) )
+
+  A.sim_reset()
+  B.sim_reset()
+  assert _run( A, 10 ) == _run( B, 10 )
+
+  # Checkpoints still work
+  blob = A.sim_save_checkpoint()
+  ref  = _run( A, 5 )
+  A.sim_restore_checkpoint( blob )
+  assert _run( A, 5 ) == ref
+
+  A.unlock_simulation()
+  assert isinstance( A.out, OutPort ) and repr( A.out ) == "s.out"
+  with pytest.raises( ReleasedMetadataError ):
+    A.elaborate()
+
+def test_release_metadata_cl_line_trace( capsys ):
+
+  class Harness( Component ):
+    def construct( s, msgs ):
+      s.src  = TestSrcCL ( Bits16, msgs, initial_delay=2, interval_delay=1 )
+      s.sink = TestSinkCL( Bits16, msgs, initial_delay=1, interval_delay=2 )
+      s.src.send //= s.sink.recv
+
+    def done( s ):
+      return s.src.done() and s.sink.done()
+
+    def line_trace( s ):
+      return f"{s.src.send}>{s.sink.recv}"
+
+  def run( release ):
+    top = Harness( [ Bits16(i) for i in range(6) ] )
+    top.apply( DefaultPassGroup(release_metadata=release) )
+    top.sim_reset()
+    while not top.done():
+      top.sim_tick()
+      assert top.sim_cycle_count() < 100
+    return capsys.readouterr().out
+
+  assert run( True ) == run( False )
+
+def test_reapply_after_replace_component( capsys ):
+
+  class Doubler( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits16 )
+      s.out = OutPort( Bits32 )
+      s.cnt = Wire( Bits32 )
+      s.a   = Wire( Bits32 )
+      s.b   = Wire( Bits32 )
+
+      @update_ff
+      def up_cnt():
+        if s.reset:
+          s.cnt <<= 0
+        else:
+          s.cnt <<= s.cnt + zext( s.in_, 32 )
+
+      # A false combinational loop that becomes an SCC block
+      @update
+      def up_a():
+        s.a   @= s.cnt + 1
+        s.out @= s.b << 1
+
+      @update
+      def up_b():
+        s.b @= s.a - 1
+
+  class Harness( Component ):
+    def construct( s, Inner ):
+      s.in_   = InPort( Bits16 )
+      s.out   = OutPort( Bits32 )
+      s.inner = Inner()
+      s.inner.in_ //= s.in_
+      s.out //= s.inner.out
+
+      s.src  = TestSrcCL ( Bits16, [ Bits16(i) for i in range(4) ], interval_delay=1 )
+      s.sink = TestSinkCL( Bits16, [ Bits16(i) for i in range(4) ], initial_delay=1 )
+      s.src.send //= s.sink.recv
+
+    def line_trace( s ):
+      return f"{s.out} {s.src.send}>{s.sink.recv}"
+
+  def run( top ):
+    top.sim_reset()
+    ret = []
+    for i in range(10):
+      top.in_ @= i
+      top.sim_tick()
+      ret.append( int(top.out) )
+    assert top.src.done() and top.sink.done()
+    return ret, capsys.readouterr().out
+
+  top = Harness( Counter )
+  top.apply( DefaultPassGroup() )
+  run( top )
+
+  # Swap the inner component and get fresh test source/sink
+  DefaultPassGroup.revert( top )
+  top.replace_component( top.inner, Doubler )
+  top.replace_component( top.src, TestSrcCL )
+  top.replace_component( top.sink, TestSinkCL )
+  top.apply( DefaultPassGroup() )
+
+  ref = Harness( Doubler )
+  ref.apply( DefaultPassGroup() )
+  assert run( top ) == run( ref )
+
+  # Applying again without any change reuses every net and SCC block
+  blks = dict( top._dag.net_blks ), dict( top._dag.scc_blks )
+  top.apply( DefaultPassGroup() )
+  assert blks == ( top._dag.net_blks, top._dag.scc_blks )
+  assert len( blks[1] ) == 1
+  assert run( top )[0] == run( ref )[0]
+
+def test_net_aliasing():
+
+  @bitstruct
+  class Nested:
+    p: Pair
+    q: Pair
+
+  class Child( Component ):
+    def construct( s ):
+      s.in_ = InPort( Nested )
+      s.lo  = OutPort( Bits8 )
+      s.lo //= s.in_.q.lo
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_  = InPort( Nested )
+      s.in16 = InPort( Bits16 )
+      s.out  = OutPort( Bits16 )
+      s.hi   = OutPort( Bits8 )
+      s.lo   = OutPort( Bits8 )
+      s.pair = Wire( Pair )
+      s.mix  = OutPort( Bits16 )
+
+      # A child port that shares the top-level struct and a field of it
+      s.child = Child()
+      s.child.in_ //= s.in_
+      s.lo //= s.child.lo
+
+      # Fields driven by a view of a slice and by a constant
+      s.pair.hi //= s.in16[8:16]
+      s.pair.lo //= 7
+
+      # A view and a slice that still needs a copy
+      s.hi //= s.in16[8:16]
+      s.mix[0:8]  //= s.in16[8:16]
+      s.mix[8:16] //= s.in_.p.hi
+
+      @update
+      def up_out():
+        s.out @= s.pair
+
+  top = Top()
+  top.apply( DefaultPassGroup(print_line_trace=False) )
+  top.sim_reset()
+
+  # Only the nets with sliced readers need a copy
+  copies = [ blk for blk in top._dag.genblks if "@=" in top._dag.genblk_src[ blk ] ]
+  assert len( copies ) == 2
+
+  assert top.child.in_ is top.in_
+  assert top.lo is top.child.lo is top.in_.q.lo
+  assert top.pair.hi._parent is top.in16
+
+  for i in range(5):
+    top.in_  @= Nested( Pair( i, i+1 ), Pair( i+2, i+3 ) )
+    top.in16 @= 0x1234 * i
+    top.sim_eval_combinational()
+    hi = (0x1234 * i) >> 8 & 0xff
+    assert top.out == 7 << 8 | hi
+    assert top.hi  == hi
+    assert top.lo  == i + 2
+    assert top.mix == (i+1) << 8 | hi
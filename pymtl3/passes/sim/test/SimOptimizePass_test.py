@@ -0,0 +1,154 @@
+#=========================================================================
+# SimOptimizePass_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+from pymtl3.datatypes import Bits8, Bits32, zext
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+from pymtl3.passes.sim.SimOptimizePass import SimOptimizePass
+from pymtl3.passes.tracing import VcdGenerationPass
+
+
+class DebugCounter( Component ):
+  def construct( s ):
+    s.en  = InPort()
+    s.out = OutPort( Bits32 )
+    s.cnt = Wire( Bits32 )
+
+    @update_ff
+    def up_cnt():
+      if s.en:
+        s.cnt <<= s.cnt + 1
+
+    @update
+    def up_out():
+      s.out @= s.cnt + 1
+
+class TracedDebugCounter( DebugCounter ):
+  def line_trace( s ):
+    return f"{s.cnt}"
+
+class Core( Component ):
+  def construct( s, Feature=DebugCounter ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+
+    # A debug feature that is tied off and whose output nobody reads
+    s.feat = Feature()
+    s.feat.en //= 0
+    s.dbg = Wire( Bits32 )
+    s.dbg //= s.feat.out
+
+    # A mode register with a hard-wired field
+    s.mode = Wire( Bits8 )
+    s.mode[0:4] //= 5
+
+    s.tmp = Wire( Bits32 )
+    s.out //= s.tmp
+
+    @update
+    def up_core():
+      s.tmp @= s.in_ + zext( s.mode, 32 )
+
+    # Nobody reads chk, but the assertion has to be checked
+    s.chk = Wire( Bits32 )
+
+    @update
+    def up_chk():
+      s.chk @= s.tmp + 1
+      assert s.chk != 0
+
+class Top( Component ):
+  def construct( s, Feature=DebugCounter ):
+    s.in_  = InPort( Bits32 )
+    s.out  = OutPort( Bits32 )
+    s.core = Core( Feature )
+    s.core.in_ //= s.in_
+    s.out //= s.core.out
+
+def _run( top, n ):
+  top.sim_reset()
+  ret = []
+  for i in range(n):
+    top.in_ @= i * 3
+    top.sim_eval_combinational()
+    ret.append( int(top.out) )
+    top.sim_tick()
+  return ret
+
+def _removed( top ):
+  return top.get_metadata( SimOptimizePass.removed )
+
+def test_tied_off_feature():
+  ref = Top()
+  ref.elaborate()
+  ref.apply( DefaultPassGroup( print_line_trace=False ) )
+
+  top = Top()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, sim_optimize=True ) )
+
+  removed = _removed( top )
+  assert removed["dead_upblks"] == [ "s.core.feat.up_cnt", "s.core.feat.up_out" ]
+  assert "s_core_feat_out__1_0" in removed["dead_nets"] # feat.out -> dbg
+  assert top._sched.schedule_ff == []
+
+  # The field of mode is written once when the simulation is locked in
+  blk, = top._dag.once_genblks
+  assert blk.__name__ in removed["const_nets"]
+  assert blk not in top._sched.update_schedule
+  assert top.core.mode == 5
+
+  assert len( top._sched.update_schedule ) < len( ref._sched.update_schedule )
+  assert _run( top, 10 ) == _run( ref, 10 ) == [ i * 3 + 5 for i in range(10) ]
+
+def test_observable():
+  top = Top()
+  top.elaborate()
+  top.set_metadata( SimOptimizePass.observable, [ top.core.feat ] )
+  top.apply( DefaultPassGroup( print_line_trace=False, sim_optimize=True ) )
+
+  assert _removed( top )["dead_upblks"] == []
+  _run( top, 3 )
+  assert top.core.feat.out == 1
+
+def test_line_trace():
+  top = Top( TracedDebugCounter )
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=True, sim_optimize=True ) )
+  assert _removed( top )["dead_upblks"] == []
+
+  top = Top( TracedDebugCounter )
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, sim_optimize=True ) )
+  assert len( _removed( top )["dead_upblks"] ) == 2
+
+def test_waveform_keeps_everything():
+  top = Top()
+  top.elaborate()
+  top.set_metadata( VcdGenerationPass.vcd_file_name, "top" )
+  top.set_metadata( SimOptimizePass.enable, True )
+  top.set_metadata( SimOptimizePass.line_trace, False )
+  GenDAGPass()( top )
+  SimOptimizePass()( top )
+
+  removed = _removed( top )
+  assert removed["dead_upblks"] == removed["dead_nets"] == []
+  assert len( removed["const_nets"] ) == 2 # feat.en and mode[0:4]
+
+def test_cached_schedule( tmp_path ):
+  ref = Top()
+  ref.elaborate()
+  ref.apply( DefaultPassGroup( print_line_trace=False, cache_dir=str(tmp_path) ) )
+
+  # The cached schedule still has the blocks we remove
+  top = Top()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, cache_dir=str(tmp_path), sim_optimize=True ) )
+
+  assert "schedule" not in top._dag.cache.hits
+  assert "up_out" not in [ x.__name__ for x in top._sched.update_schedule ]
+  assert _run( top, 5 ) == _run( ref, 5 )
@@ -69,9 +69,7 @@ class CLLineTracePass( BasePass ):
 
     # Collect all method ports and add some stamps
     all_callees = set()
-    all_method_ports = top.get_all_object_filter(
-      lambda s: isinstance( s, MethodPort )
-    )
+    all_method_ports = top.get_all_objects_of_type( MethodPort )
     for mport in all_method_ports:
       mport.called = False
       mport.saved_args = None
@@ -155,7 +153,7 @@ class CLLineTracePass( BasePass ):
       return new_str
 
     # Collecting all non blocking interfaces and replace the str hook
-    for ifc in top.get_all_object_filter( lambda s: isinstance( s, NonBlockingIfc ) ):
+    for ifc in top.get_all_objects_of_type( NonBlockingIfc ):
       if ifc.method.Type is not None:
         ifc.trace_len = len( str( ifc.method.Type() ) )
       else:
@@ -193,7 +191,7 @@ class CLLineTracePass( BasePass ):
       return new_str
 
     # Collecting all blocking interfaces and replace the str hook
-    for ifc in top.get_all_object_filter( lambda s: isinstance( s, BlockingIfc ) ):
+    for ifc in top.get_all_objects_of_type( BlockingIfc ):
       if ifc.method.Type is not None:
         ifc.trace_len = len( str( ifc.method.Type() ) )
       else:
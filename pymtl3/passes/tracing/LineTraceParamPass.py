@@ -15,9 +15,11 @@ class LineTraceParamPass( BasePass ):
   def __call__( self, top ):
 
     def wrap_line_trace( obj ):
+      # Only keep the original line_trace so that applying the pass again
+      # doesn't wrap the wrapper
       if not hasattr( obj, '_ml_trace' ):
         obj._ml_trace = PassMetadata()
-      obj._ml_trace.line_trace = obj.line_trace
+        obj._ml_trace.line_trace = obj.line_trace
 
       def wrapped_line_trace( self, *args, **kwargs ):
         if self._dsl.param_tree is not None:
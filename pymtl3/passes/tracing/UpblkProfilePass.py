@@ -0,0 +1,172 @@
+"""
+========================================================================
+UpblkProfilePass.py
+========================================================================
+Wrap every scheduled update block (including net blocks, SCC blocks and
+update_ff blocks) with a timer and a call counter to find out which
+blocks dominate the simulation time.
+
+To use, set the enable metadata (or DefaultPassGroup(upblk_profile=True))
+and after simulation call
+
+- top.print_upblk_profile( top_n ) to print the hottest blocks, host
+  components and component classes sorted by total time
+- top.dump_upblk_profile( filename ) to export all records as JSON
+
+This pass has to be applied after a schedule pass and before
+PrepareSimPass.
+
+Date   : Oct 17, 2026
+"""
+import json
+from collections import defaultdict
+from time import perf_counter_ns
+
+from pymtl3.dsl import MetadataKey
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PassOrderError
+
+
+class UpblkProfileRecord:
+  __slots__ = ( 'name', 'kind', 'host', 'calls', 'total_ns' )
+
+  def __init__( s, name, kind, host ):
+    s.name     = name
+    s.kind     = kind
+    s.host     = host
+    s.calls    = 0
+    s.total_ns = 0
+
+class UpblkProfilePass( BasePass ):
+
+  # UpblkProfilePass public pass data
+
+  #: enable
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: False
+  enable = MetadataKey(bool)
+
+  def __call__( self, top ):
+    if not ( top.has_metadata( self.enable ) and top.get_metadata( self.enable ) ):
+      return
+
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+    if hasattr( top, "_sim" ):
+      raise PassOrderError( "_sched (UpblkProfilePass must be applied before PrepareSimPass)" )
+
+    top._profile = PassMetadata()
+    top._profile.records = []
+
+    names = self._collect_block_info( top )
+
+    top._sched.update_schedule = [ self._wrap( top, blk, names, "update" )
+                                   for blk in top._sched.update_schedule ]
+    top._sched.schedule_ff     = [ self._wrap( top, blk, names, "update_ff" )
+                                   for blk in top._sched.schedule_ff ]
+
+    top.upblk_profile_report = lambda top_n=20: self._report( top, top_n )
+    top.print_upblk_profile  = lambda top_n=20: print( self._report( top, top_n ) )
+    top.dump_upblk_profile   = lambda filename: self._dump_json( top, filename )
+
+  #-----------------------------------------------------------------------
+  # Block naming
+  #-----------------------------------------------------------------------
+  # Map each schedulable function to ( name, kind, host component )
+
+  def _collect_block_info( self, top ):
+    info = {}
+
+    for blk in top.get_all_update_blocks():
+      host = top.get_update_block_host_component( blk )
+      info[ blk ] = ( f"{host!r}.{blk.__name__}", "upblk", host )
+
+    dag = getattr( top, "_dag", None )
+    if dag is not None:
+      for blk in getattr( dag, "genblks", () ):
+        # Net blocks are compiled with their lowest common ancestor as s
+        host = blk.__globals__.get( 's', top )
+        info[ blk ] = ( f"net:{blk.__name__}", "net", host )
+
+      for blk, wrapped in getattr( dag, "blk_greenlet_mapping", {} ).items():
+        name, _, host = info[ blk ]
+        info[ wrapped ] = ( name, "greenlet", host )
+
+    for blk, members in getattr( top._sched, "scc_blocks", {} ).items():
+      member_names = ", ".join( info[x][0] if x in info else x.__name__ for x in members )
+      info[ blk ] = ( f"{blk.__name__}{{{member_names}}}", "scc", top )
+
+    # Blocks fused by UpblkFusionPass are counted under the host of the
+    # first block
+    for blk, members in getattr( top._sched, "fused_blocks", {} ).items():
+      member_names = ", ".join( info[x][0] if x in info else x.__name__ for x in members )
+      info[ blk ] = ( f"{blk.__name__}{{{member_names}}}", "fused", info.get( members[0], ( 0, 0, top ) )[2] )
+
+    return info
+
+  def _wrap( self, top, blk, info, default_kind ):
+    name, kind, host = info.get( blk, ( blk.__name__, default_kind, top ) )
+    record = UpblkProfileRecord( name, kind, host )
+    top._profile.records.append( record )
+
+    def profiled_blk():
+      t0 = perf_counter_ns()
+      blk()
+      record.total_ns += perf_counter_ns() - t0
+      record.calls    += 1
+
+    profiled_blk.__name__ = blk.__name__
+    return profiled_blk
+
+  #-----------------------------------------------------------------------
+  # Reporting
+  #-----------------------------------------------------------------------
+
+  @staticmethod
+  def _aggregate( records, key ):
+    calls = defaultdict(int)
+    total = defaultdict(int)
+    for r in records:
+      k = key( r )
+      calls[k] += r.calls
+      total[k] += r.total_ns
+    return sorted( ( (total[k], calls[k], k) for k in total ), key=lambda x: (-x[0], x[2]) )
+
+  def _tables( self, top ):
+    records = top._profile.records
+    return {
+      "block": sorted( ( (r.total_ns, r.calls, r.name) for r in records ),
+                       key=lambda x: (-x[0], x[2]) ),
+      "host":  self._aggregate( records, lambda r: repr(r.host) ),
+      "class": self._aggregate( records, lambda r: type(r.host).__qualname__ ),
+    }
+
+  def _report( self, top, top_n ):
+    total_ns = sum( r.total_ns for r in top._profile.records ) or 1
+
+    lines = [ f"Update block profile ({total_ns/1e6:.3f} ms in "
+              f"{top._sim.simulated_cycles if hasattr( top, '_sim' ) else 0} cycles)" ]
+
+    for title, rows in self._tables( top ).items():
+      lines.append( "" )
+      lines.append( f"  {'time(ms)':>10} {'%':>6} {'calls':>10} {'avg(us)':>9}  per {title}" )
+      for t, calls, name in rows[:top_n]:
+        avg = t / calls / 1e3 if calls else 0.0
+        lines.append( f"  {t/1e6:10.3f} {100.0*t/total_ns:6.2f} {calls:10} {avg:9.3f}  {name}" )
+
+    return "\n".join( lines )
+
+  def _dump_json( self, top, filename ):
+    tables = self._tables( top )
+    data = {
+      "blocks": [ { "name": r.name, "kind": r.kind, "host": repr(r.host),
+                    "class": type(r.host).__qualname__,
+                    "calls": r.calls, "total_ns": r.total_ns }
+                  for r in sorted( top._profile.records, key=lambda r: -r.total_ns ) ],
+      "hosts":   [ { "host": k, "calls": c, "total_ns": t } for t, c, k in tables["host"] ],
+      "classes": [ { "class": k, "calls": c, "total_ns": t } for t, c, k in tables["class"] ],
+    }
+    with open( filename, "w" ) as f:
+      json.dump( data, f, indent=2 )
@@ -1,2 +1,3 @@
 from .PrintTextWavePass import PrintTextWavePass
+from .UpblkProfilePass import UpblkProfilePass
 from .VcdGenerationPass import VcdGenerationPass
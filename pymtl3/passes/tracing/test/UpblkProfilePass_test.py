@@ -0,0 +1,138 @@
+#=========================================================================
+# UpblkProfilePass_test.py
+#=========================================================================
+#
+# Date : Oct 17, 2026
+
+import json
+
+import pytest
+
+from pymtl3.datatypes import Bits8, Bits16
+from pymtl3.dsl import *
+from pymtl3.passes.errors import PassOrderError
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.passes.sim.DynamicSchedulePass import DynamicSchedulePass
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+from pymtl3.passes.sim.PrepareSimPass import PrepareSimPass
+from pymtl3.stdlib.test_utils.test_sinks import TestSinkCL
+from pymtl3.stdlib.test_utils.test_srcs import TestSrcCL
+
+from ..UpblkProfilePass import UpblkProfilePass
+
+
+class Child( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.reg = Wire( Bits8 )
+
+    @update_ff
+    def up_reg():
+      s.reg <<= s.in_
+
+    @update
+    def up_out():
+      s.out @= s.reg + 1
+
+class Top( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits16 )
+    s.x   = Wire( Bits8 )
+    s.y   = Wire( Bits8 )
+    s.z   = Wire( Bits8 )
+    s.c   = [ Child() for _ in range(2) ]
+    s.c[0].in_ //= s.in_
+    s.c[1].in_ //= s.c[0].out
+    s.out[0:8]  //= s.c[1].out
+    s.out[8:16] //= s.z
+
+    # up_x -> up_y -> up_x is a false combinational loop
+    @update
+    def up_x():
+      s.x @= s.in_ + 1
+      s.z @= s.y
+
+    @update
+    def up_y():
+      s.y @= s.x + 1
+
+def _run( top, **kwargs ):
+  top.apply( DefaultPassGroup(print_line_trace=False, **kwargs) )
+  top.sim_reset()
+  ret = []
+  for i in range(10):
+    top.in_ @= i * 3
+    top.sim_tick()
+    ret.append( int(top.out) )
+  return ret
+
+def test_profile_rtl( tmp_path ):
+  ref = _run( Top() )
+
+  top = Top()
+  assert _run( top, upblk_profile=True ) == ref
+
+  records = { r.name: r for r in top._profile.records }
+  cycles  = top.sim_cycle_count()
+
+  assert records["s.c[0].up_reg"].kind == "upblk"
+  assert records["s.c[0].up_reg"].host is top.c[0]
+  assert any( r.kind == "net" for r in records.values() )
+  assert any( r.kind == "scc" and "s.up_x" in r.name and "s.up_y" in r.name
+              for r in records.values() )
+  assert records["s.c[0].up_reg"].calls == cycles
+  assert len( { r.calls for r in records.values() if r.kind != "upblk" } ) == 1
+
+  report = top.upblk_profile_report( top_n=5 )
+  assert "per block" in report and "per host" in report and "per class" in report
+  assert "Child" in report
+
+  filename = tmp_path / "profile.json"
+  top.dump_upblk_profile( str(filename) )
+  with open( filename ) as f:
+    data = json.load( f )
+  assert len( data["blocks"] ) == len( top._profile.records )
+  assert { x["class"] for x in data["classes"] } == { "Top", "Child" }
+  assert sum( x["calls"] for x in data["hosts"] ) == sum( r.calls for r in top._profile.records )
+
+def test_profile_disabled():
+  top = Top()
+  _run( top )
+  assert not hasattr( top, "_profile" )
+
+def test_profile_cl():
+
+  class Harness( Component ):
+    def construct( s, msgs ):
+      s.src  = TestSrcCL ( Bits16, msgs, initial_delay=2, interval_delay=1 )
+      s.sink = TestSinkCL( Bits16, msgs, initial_delay=1, interval_delay=2 )
+      s.src.send //= s.sink.recv
+
+    def done( s ):
+      return s.src.done() and s.sink.done()
+
+  top = Harness( [ Bits16(i) for i in range(8) ] )
+  top.apply( DefaultPassGroup(print_line_trace=False, upblk_profile=True) )
+  top.sim_reset()
+  while not top.done():
+    top.sim_tick()
+    assert top.sim_cycle_count() < 100
+
+  hosts = { r.host for r in top._profile.records }
+  assert top.src in hosts and top.sink in hosts
+  assert all( r.calls >= top.sim_cycle_count() for r in top._profile.records )
+
+def test_pass_order():
+  top = Top()
+  top.elaborate()
+  top.set_metadata( UpblkProfilePass.enable, True )
+  with pytest.raises( PassOrderError ):
+    UpblkProfilePass()( top )
+
+  GenDAGPass()( top )
+  DynamicSchedulePass()( top )
+  PrepareSimPass(print_line_trace=False)( top )
+  with pytest.raises( PassOrderError ):
+    UpblkProfilePass()( top )
@@ -67,6 +67,21 @@ class DelayPipeDeqCL( Component ):
         U(up_delay) < M(s.enq.rdy),
       )
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    if s.delay == 0 or s.pipeline[-1] is not None:
+      return None
+    last = max( [ i for i, x in enumerate( s.pipeline ) if x is not None ], default=None )
+    if last is None:
+      return None
+    # The message can be dequeued in the cycle it reaches the end
+    return len( s.pipeline ) - 2 - last
+
+  def sim_skip_cycles( s, n ):
+    if s.delay > 0:
+      s.pipeline.rotate( n )
+
   def line_trace( s ):
     return "[{}]".format( "".join( [ " " if x is None else "*" for x in list(s.pipeline)[:-1] ] ) )
 
@@ -108,6 +123,23 @@ class DelayPipeSendCL( Component ):
         M(s.enq.rdy) > U(up_delay),  # pipe behavior
       )
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    if s.delay == 0:
+      return None
+    if s.pipeline[-1] is not None:
+      return 0
+    last = max( [ i for i, x in enumerate( s.pipeline ) if x is not None ], default=None )
+    if last is None:
+      return None
+    # The message is sent in the cycle after it reaches the end
+    return len( s.pipeline ) - 1 - last
+
+  def sim_skip_cycles( s, n ):
+    if s.delay > 0:
+      s.pipeline.rotate( n )
+
   def line_trace( s ):
     if s.delay > 0:
       return "[{}]".format( "".join( [ " " if x is None else "*" for x in s.pipeline ] ) )
@@ -208,6 +208,15 @@ class RecvCL2SendRTL( Component ):
   def recv( s, msg ):
     s.entry = clone_deepcopy( msg )
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    # A pending entry only moves when send.rdy changes
+    return None
+
+  def sim_skip_cycles( s, n ):
+    pass
+
   def line_trace( s ):
     return "{}(){}".format( s.recv, s.send )
 
@@ -241,6 +250,14 @@ class RecvRTL2SendCL( Component ):
 
     s.add_constraints( U( up_recv_rtl_rdy ) < U( up_send_cl ) )
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    return None
+
+  def sim_skip_cycles( s, n ):
+    s.sent_msg = None
+
   def line_trace( s ):
     return "{}(){}".format(
       s.recv.line_trace(),
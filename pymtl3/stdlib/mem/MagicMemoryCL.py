@@ -141,6 +141,17 @@ class MagicMemoryCL( Component ):
 
           s.resp_qs[i].enq( resp )
 
+  #-----------------------------------------------------------------------
+  # Idle-cycle fast-forward
+  #-----------------------------------------------------------------------
+  # All timing state lives in the child delay pipes.
+
+  def sim_idle_cycles( s ):
+    return None
+
+  def sim_skip_cycles( s, n ):
+    pass
+
   #-----------------------------------------------------------------------
   # line_trace
   #-----------------------------------------------------------------------
@@ -61,5 +61,13 @@ class MagicMemoryFL( Component ):
     assert len(s.mem) > (addr + len(data))
     s.mem[ addr : addr + len(data) ] = data
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    return None
+
+  def sim_skip_cycles( s, n ):
+    s.trace = "     "
+
   def line_trace( s ):
     return s.trace
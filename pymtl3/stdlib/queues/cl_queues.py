@@ -38,6 +38,14 @@ class PipeQueueCL( Component ):
   def peek( s ):
     return s.queue[-1]
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    return None
+
+  def sim_skip_cycles( s, n ):
+    pass
+
   def line_trace( s ):
     return "{}( ){}".format( s.enq, s.deq )
 
@@ -67,6 +75,14 @@ class BypassQueueCL( Component ):
   def peek( s ):
     return s.queue[-1]
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    return None
+
+  def sim_skip_cycles( s, n ):
+    pass
+
   def line_trace( s ):
     return "{}( ){}".format( s.enq, s.deq )
 
@@ -105,5 +121,13 @@ class NormalQueueCL( Component ):
   def peek( s ):
     return s.queue[-1]
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    return None
+
+  def sim_skip_cycles( s, n ):
+    pass
+
   def line_trace( s ):
     return "{}( ){}".format( s.enq, s.deq )
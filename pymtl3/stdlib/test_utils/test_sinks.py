@@ -113,6 +113,22 @@ class TestSinkCL( Component ):
   def done( s ):
     return s.done_flag
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    if s.error_msg or s.recv_called or s.all_msg_recved != s.done_flag or \
+       ( s.idx >= len( s.msgs ) ) != s.all_msg_recved:
+      return 0
+    # We become ready at the end of the count-th cycle
+    return s.count - 1 if s.count > 0 else None
+
+  def sim_skip_cycles( s, n ):
+    if not s.reset:
+      s.cycle_count += n
+    else:
+      s.cycle_count = 0
+    s.count = max( 0, s.count - n )
+
   # Line trace
   def line_trace( s ):
     return "{}".format( s.recv )
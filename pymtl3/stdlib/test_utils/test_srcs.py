@@ -26,18 +26,35 @@ class TestSrcCL( Component ):
     s.count  = initial_delay
     s.delay  = interval_delay
 
+    # Whether the last attempt to send found the receiver not ready
+    s.blocked = False
+
     @update_once
     def up_src_send():
+      s.blocked = False
       if s.count > 0:
         s.count -= 1
       elif not s.reset:
         if s.send.rdy() and s.msgs:
           s.send( s.msgs.popleft() )
           s.count = s.delay # reset count after a message is sent
+        else:
+          s.blocked = bool( s.msgs )
 
   def done( s ):
     return not s.msgs
 
+  # Idle-cycle fast-forward
+
+  def sim_idle_cycles( s ):
+    if s.count > 0:
+      return s.count
+    # A blocked source waits for the receiver to become ready
+    return 0 if s.msgs and not s.blocked else None
+
+  def sim_skip_cycles( s, n ):
+    s.count = max( 0, s.count - n )
+
   # Line trace
 
   def line_trace( s ):
@@ -34,6 +34,8 @@ def pytest_addoption(parser):
                     default=None, help="dump verilog test bench for each test" )
   group.addoption( "--max-cycles", dest="max_cycles", action="store",
                     default=None, help="max cycles of simulation" )
+  group.addoption( "--ast-cache-dir", dest="ast_cache_dir", action="store",
+                    default=None, help="cache parsed update blocks in this directory" )
 
 @pytest.fixture
 def cmdline_opts( request ):
@@ -56,7 +58,10 @@ def no_translation( request ):
     pytest.skip("skipping untranslatable test cases with --test-verilog")
 
 def pytest_configure(config):
-  pass
+  ast_cache_dir = config.getoption( "ast_cache_dir", None )
+  if ast_cache_dir:
+    from pymtl3.dsl import AstCache
+    AstCache.set_cache_dir( ast_cache_dir )
 
 def pytest_unconfigure(config):
   pass
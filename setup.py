@@ -88,6 +88,11 @@ setup(
     'greenlet',
   ],
 
+  extras_require = {
+    # BatchSimPass stores the lanes of each signal in a NumPy vector
+    'batch' : [ 'numpy' ],
+  },
+
   entry_points = {
     'pytest11' : [
       'pytest-pymtl3 = pytest_plugin.pytest_pymtl3',